@@ -0,0 +1,309 @@
+"""
+API JSON de cálculos metrológicos
+Recebe séries de medição de um ponto ou de lotes com milhares de pontos, valida a
+entrada, calcula erro, incerteza expandida, fator k e conformidade com o cálculo
+em lote de CalculoMetrologico e devolve os resultados em NDJSON (uma linha JSON
+por ponto), à medida que cada bloco de pontos é calculado
+
+Formato da requisição (POST /api/calculos):
+    Um ponto:
+        {"valores_medidos": [...], "valor_referencia": 10.0,
+         "fontes_incerteza": [{"descricao": ..., "valor": ..., "distribuicao": ...}],
+         "erro_maximo_permitido": 0.05}
+    Lote:
+        {"nivel_confianca": 0.95,
+         "fontes_incerteza": [...],          # orçamento comum (opcional)
+         "pontos": [{"id": ..., "valores_medidos": [...], ...}, ...]}
+
+Um ponto é respondido com um objeto JSON; um lote, com NDJSON na ordem dos pontos.
+Lotes com "assincrono": true, ou com mais de CALIBRA_API_LIMITE_SINCRONO pontos,
+são enfileirados como trabalho calculo_lote (resposta 202 com o endereço do
+trabalho; ver api.trabalhos), sem ocupar o worker web durante o cálculo.
+Pontos inválidos geram a linha {"indice": i, "erro_validacao": "..."} sem
+interromper o lote. Graus de liberdade infinitos e razões indefinidas são
+representados por null.
+"""
+
+import json
+import math
+import os
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from models.calculo_metrologico import CalculoMetrologico
+from models.conformidade import avaliar_conformidade_lote
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas na primeira requisição
+np = importar_tardio('numpy')
+
+# Limites de cada requisição (o tamanho máximo em bytes é configurado em app.py)
+MAX_PONTOS = int(os.environ.get('CALIBRA_API_MAX_PONTOS', 10000))
+MAX_LEITURAS = int(os.environ.get('CALIBRA_API_MAX_LEITURAS', 1000))
+MAX_FONTES = int(os.environ.get('CALIBRA_API_MAX_FONTES', 100))
+
+# Lotes maiores que este limite são sempre calculados em segundo plano
+LIMITE_SINCRONO = int(os.environ.get('CALIBRA_API_LIMITE_SINCRONO', 5000))
+
+# Pontos calculados por vez; cada bloco é enviado assim que fica pronto
+TAMANHO_BLOCO = 1000
+
+DISTRIBUICOES = ('normal', 'retangular', 'triangular')
+
+api_calculos = Blueprint('api_calculos', __name__, url_prefix='/api')
+
+
+def _numero(valor):
+    """Verifica se o valor é um número finito (booleanos não são aceitos)"""
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+
+
+def _nulo_se_infinito(valor):
+    """Converte um escalar em float do Python, ou None se não for finito"""
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+def validar_fontes(fontes):
+    """
+    Valida uma lista de fontes de incerteza Tipo B
+
+    Args:
+        fontes: Lista de fontes no formato de calcular_incerteza_tipo_b
+
+    Returns:
+        Mensagem de erro, ou None se as fontes forem válidas
+    """
+    if not isinstance(fontes, list):
+        return "'fontes_incerteza' deve ser uma lista"
+    if len(fontes) > MAX_FONTES:
+        return f"máximo de {MAX_FONTES} fontes de incerteza por ponto"
+
+    for j, fonte in enumerate(fontes):
+        if not isinstance(fonte, dict):
+            return f"fonte {j}: deve ser um objeto"
+        if not _numero(fonte.get('valor')):
+            return f"fonte {j}: 'valor' deve ser um número"
+        if fonte.get('distribuicao', 'normal') not in DISTRIBUICOES:
+            return f"fonte {j}: 'distribuicao' deve ser uma de {', '.join(DISTRIBUICOES)}"
+        if 'divisor' in fonte and not (_numero(fonte['divisor']) and fonte['divisor'] > 0):
+            return f"fonte {j}: 'divisor' deve ser um número positivo"
+        if 'coeficiente_sensibilidade' in fonte and not _numero(fonte['coeficiente_sensibilidade']):
+            return f"fonte {j}: 'coeficiente_sensibilidade' deve ser um número"
+        if 'graus_liberdade' in fonte:
+            gl = fonte['graus_liberdade']
+            if not (isinstance(gl, (int, float)) and not isinstance(gl, bool) and gl > 0):
+                return f"fonte {j}: 'graus_liberdade' deve ser um número positivo"
+
+    return None
+
+
+def validar_ponto(ponto, fontes_padrao=None):
+    """
+    Valida um ponto de medição
+
+    Args:
+        ponto: Objeto do ponto (valores_medidos, valor_referencia, fontes_incerteza,
+            erro_maximo_permitido)
+        fontes_padrao: Fontes usadas quando o ponto não informa as suas
+
+    Returns:
+        Mensagem de erro, ou None se o ponto for válido
+    """
+    if not isinstance(ponto, dict):
+        return "o ponto deve ser um objeto"
+
+    valores = ponto.get('valores_medidos')
+    if not isinstance(valores, list) or not valores:
+        return "'valores_medidos' deve ser uma lista com ao menos uma leitura"
+    if len(valores) > MAX_LEITURAS:
+        return f"máximo de {MAX_LEITURAS} leituras por ponto"
+    if not all(_numero(v) for v in valores):
+        return "'valores_medidos' deve conter apenas números"
+
+    for campo in ('valor_referencia', 'erro_maximo_permitido'):
+        if ponto.get(campo) is not None and not _numero(ponto[campo]):
+            return f"'{campo}' deve ser um número"
+
+    if 'fontes_incerteza' in ponto:
+        return validar_fontes(ponto['fontes_incerteza'])
+    if fontes_padrao is None:
+        return "'fontes_incerteza' não informado"
+    return None
+
+
+def calcular_pontos(calc, pontos):
+    """
+    Calcula os resultados de uma lista de pontos válidos em uma única passagem vetorizada
+
+    Args:
+        calc: Instância de CalculoMetrologico
+        pontos: Lista de pontos já validados, com 'fontes_incerteza' preenchido
+
+    Returns:
+        Lista de dicionários de resultado, na ordem dos pontos
+    """
+    n_leituras = max(len(p['valores_medidos']) for p in pontos)
+    leituras = np.full((len(pontos), n_leituras), np.nan)
+    for i, ponto in enumerate(pontos):
+        leituras[i, :len(ponto['valores_medidos'])] = ponto['valores_medidos']
+
+    resultado = calc.calcular_incerteza_completa_lote(leituras, [p['fontes_incerteza'] for p in pontos])
+    media = resultado['incerteza_tipo_a']['media']
+    incerteza_expandida = resultado['incerteza_expandida']
+
+    # Erro e conformidade (mesma regra de avaliar_conformidade), para todos os pontos de uma vez
+    referencia = np.array([np.nan if p.get('valor_referencia') is None else p['valor_referencia']
+                           for p in pontos])
+    emp = np.array([np.nan if p.get('erro_maximo_permitido') is None else p['erro_maximo_permitido']
+                    for p in pontos])
+    erro = calc.calcular_erro(media, referencia)
+    conformidade = avaliar_conformidade_lote(erro, incerteza_expandida, emp, fator_k=resultado['fator_k'])
+    conforme = conformidade['conforme']
+    razao_erro = conformidade['razao_erro']
+
+    colunas = {
+        'media': media.tolist(),
+        'erro': erro.tolist(),
+        'incerteza_tipo_a': resultado['incerteza_tipo_a']['incerteza_padrao'].tolist(),
+        'incerteza_tipo_b': resultado['incerteza_tipo_b']['incerteza_combinada'].tolist(),
+        'incerteza_combinada': resultado['incerteza_combinada']['incerteza_combinada'].tolist(),
+        'graus_liberdade_efetivos': resultado['incerteza_combinada']['graus_liberdade_efetivos'].tolist(),
+        'fator_k': resultado['fator_k'].tolist(),
+        'incerteza_expandida': incerteza_expandida.tolist(),
+        'conforme': conforme.tolist(),
+        'razao_erro': razao_erro.tolist()
+    }
+
+    resultados = []
+    for i, ponto in enumerate(pontos):
+        tem_referencia = ponto.get('valor_referencia') is not None
+        tem_emp = tem_referencia and ponto.get('erro_maximo_permitido') is not None
+        resultados.append({
+            'media': colunas['media'][i],
+            'erro': colunas['erro'][i] if tem_referencia else None,
+            'incerteza_tipo_a': colunas['incerteza_tipo_a'][i],
+            'incerteza_tipo_b': colunas['incerteza_tipo_b'][i],
+            'incerteza_combinada': colunas['incerteza_combinada'][i],
+            'graus_liberdade_efetivos': _nulo_se_infinito(colunas['graus_liberdade_efetivos'][i]),
+            'fator_k': colunas['fator_k'][i],
+            'incerteza_expandida': colunas['incerteza_expandida'][i],
+            'nivel_confianca': calc.nivel_confianca,
+            'conforme': colunas['conforme'][i] if tem_emp else None,
+            'razao_erro': _nulo_se_infinito(colunas['razao_erro'][i]) if tem_emp else None
+        })
+    return resultados
+
+
+def _linhas_lote(calc, pontos, fontes_padrao):
+    """Gera as linhas NDJSON do lote, validando e calculando um bloco de pontos por vez"""
+    for inicio in range(0, len(pontos), TAMANHO_BLOCO):
+        linhas = {}
+        validos = []
+
+        for indice in range(inicio, min(inicio + TAMANHO_BLOCO, len(pontos))):
+            ponto = pontos[indice]
+            falha = validar_ponto(ponto, fontes_padrao)
+            if falha:
+                linhas[indice] = {'indice': indice, 'erro_validacao': falha}
+                continue
+            if 'fontes_incerteza' not in ponto:
+                ponto = dict(ponto, fontes_incerteza=fontes_padrao)
+            validos.append((indice, ponto))
+
+        if validos:
+            resultados = calcular_pontos(calc, [ponto for _, ponto in validos])
+            for (indice, ponto), resultado in zip(validos, resultados):
+                linha = {'indice': indice}
+                if 'id' in ponto:
+                    linha['id'] = ponto['id']
+                linha.update(resultado)
+                linhas[indice] = linha
+
+        yield ''.join(json.dumps(linhas[indice], separators=(',', ':')) + '\n' for indice in sorted(linhas))
+
+
+def _erro(mensagem, status=400):
+    return jsonify({'erro_validacao': mensagem}), status
+
+
+def ler_json_limitado():
+    """
+    Lê o corpo JSON da requisição sem ultrapassar MAX_CONTENT_LENGTH
+
+    O Werkzeug só aplica MAX_CONTENT_LENGTH a formulários e o cabeçalho
+    Content-Length não existe em corpos enviados em partes (chunked), então
+    o corpo é lido do stream até no máximo um byte além do limite.
+
+    Returns:
+        Tupla (dados, resposta de erro); dados é None se o corpo não for JSON
+        válido e a resposta de erro é 413 se o corpo exceder o limite
+    """
+    limite = current_app.config.get('MAX_CONTENT_LENGTH')
+    if limite is None or not request.is_json:
+        return request.get_json(silent=True), None
+    if (request.content_length or 0) > limite:
+        return None, _erro("requisição acima do tamanho máximo permitido", 413)
+
+    # read() de um stream de rede pode devolver menos bytes que o pedido
+    partes, lidos = [], 0
+    while lidos <= limite:
+        parte = request.stream.read(limite + 1 - lidos)
+        if not parte:
+            break
+        partes.append(parte)
+        lidos += len(parte)
+    if lidos > limite:
+        return None, _erro("requisição acima do tamanho máximo permitido", 413)
+
+    try:
+        return json.loads(b''.join(partes)), None
+    except ValueError:
+        return None, None
+
+
+@api_calculos.route('/calculos', methods=['POST'])
+def calcular():
+    """Calcula erro, incerteza expandida, fator k e conformidade de um ponto ou de um lote"""
+    dados, resposta_erro = ler_json_limitado()
+    if resposta_erro is not None:
+        return resposta_erro
+    if not isinstance(dados, dict):
+        return _erro("o corpo da requisição deve ser um objeto JSON")
+
+    nivel_confianca = dados.get('nivel_confianca', 0.95)
+    if not (_numero(nivel_confianca) and 0 < nivel_confianca < 1):
+        return _erro("'nivel_confianca' deve estar entre 0 e 1")
+    calc = CalculoMetrologico(nivel_confianca=nivel_confianca)
+
+    if 'pontos' not in dados:
+        falha = validar_ponto(dados)
+        if falha:
+            return _erro(falha)
+        resultado = calcular_pontos(calc, [dados])[0]
+        if 'id' in dados:
+            resultado = dict(id=dados['id'], **resultado)
+        return jsonify(resultado)
+
+    pontos = dados['pontos']
+    if not isinstance(pontos, list):
+        return _erro("'pontos' deve ser uma lista")
+    if len(pontos) > MAX_PONTOS:
+        return _erro(f"máximo de {MAX_PONTOS} pontos por requisição", 413)
+
+    fontes_padrao = dados.get('fontes_incerteza')
+    if fontes_padrao is not None:
+        falha = validar_fontes(fontes_padrao)
+        if falha:
+            return _erro(falha)
+
+    if dados.get('assincrono') or len(pontos) > LIMITE_SINCRONO:
+        from api.trabalhos import enfileirar_trabalho
+
+        parametros = {'pontos': pontos, 'nivel_confianca': nivel_confianca}
+        if fontes_padrao is not None:
+            parametros['fontes_incerteza'] = fontes_padrao
+        return enfileirar_trabalho('calculo_lote', parametros)
+
+    return Response(_linhas_lote(calc, pontos, fontes_padrao), mimetype='application/x-ndjson')
+
@@ -0,0 +1,171 @@
+"""
+API de leitura de calibrações, certificados e gráficos, com cache e validação condicional
+
+    GET /api/calibracoes/<id>                     calibração com pontos e fontes (JSON)
+    GET /api/calibracoes/<id>/graficos/<tipo>     gráfico 'erros' ou 'contribuicoes' (PNG)
+    GET /api/certificados/<id>?saida=html|pdf     certificado renderizado
+
+O conteúdo é gerado uma vez por versão dos dados da calibração (ver utils.cache)
+e as respostas levam ETag e Last-Modified derivados dessa versão, sem gerar o
+conteúdo: uma nova visualização com If-None-Match (ou If-Modified-Since) recebe
+304 após uma única consulta ao banco.
+"""
+
+import datetime
+import json
+
+from flask import Blueprint, Response, jsonify, request
+
+from database.calibracoes import carregar_calibracao
+from database.conexao import obter_conexao
+from utils.cache import cache_artefatos, identificador
+
+SQL_VERSAO_CALIBRACAO = (
+    "SELECT id AS calibracao_id, instrumento_id, versao_dados, "
+    "COALESCE(data_versao, data_atualizacao, data_criacao) AS data_versao FROM calibracoes WHERE id = ?"
+)
+
+SQL_VERSAO_CERTIFICADO = (
+    "SELECT c.id AS calibracao_id, c.versao_dados, "
+    "COALESCE(c.data_versao, c.data_atualizacao, c.data_criacao) AS data_versao "
+    "FROM certificados ce JOIN calibracoes c ON c.id = ce.calibracao_id WHERE ce.id = ?"
+)
+
+TIPOS_GRAFICO = ('erros', 'contribuicoes')
+
+TIPOS_CERTIFICADO = {'html': 'text/html; charset=utf-8', 'pdf': 'application/pdf'}
+
+api_calibracoes = Blueprint('api_calibracoes', __name__, url_prefix='/api')
+
+
+class _SemDadosGrafico(Exception):
+    """A calibração não tem os dados do gráfico pedido"""
+
+
+def _erro(mensagem, status=400):
+    return jsonify({'erro_validacao': mensagem}), status
+
+
+def _instante(valor):
+    """Converte um TIMESTAMP do SQLite (UTC) em datetime com fuso, truncado ao segundo"""
+    return datetime.datetime.fromisoformat(str(valor)[:19]).replace(tzinfo=datetime.timezone.utc)
+
+
+def _resposta_condicional(chave, versao, data_versao, gerar, mimetype, nome_arquivo=None):
+    """
+    Responde 304 se o cliente já tem a versão atual; caso contrário, devolve o
+    conteúdo do cache (gerado se necessário)
+
+    Args:
+        chave: Chave do artefato no cache
+        versao: Versão dos dados do artefato
+        data_versao: Instante da versão (Last-Modified)
+        gerar: Função sem argumentos que gera o conteúdo (bytes)
+        mimetype: Tipo do conteúdo
+        nome_arquivo: Nome sugerido para download (opcional)
+    """
+    etag = identificador(chave, versao)
+    ultima_modificacao = _instante(data_versao)
+
+    # If-None-Match tem precedência sobre If-Modified-Since
+    if request.if_none_match:
+        nao_modificado = request.if_none_match.contains(etag)
+    else:
+        nao_modificado = request.if_modified_since is not None and ultima_modificacao <= request.if_modified_since
+
+    if nao_modificado:
+        resposta = Response(status=304)
+    else:
+        resposta = Response(cache_artefatos.obter(chave, versao, gerar).conteudo, mimetype=mimetype)
+        if nome_arquivo:
+            resposta.headers['Content-Disposition'] = f'inline; filename="{nome_arquivo}"'
+    resposta.set_etag(etag)
+    resposta.last_modified = ultima_modificacao
+    # O cliente pode guardar a resposta, mas deve revalidá-la a cada uso
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta
+
+
+@api_calibracoes.route('/calibracoes/<int:calibracao_id>', methods=['GET'])
+def calibracao(calibracao_id):
+    """Calibração com os seus pontos e fontes de incerteza"""
+    versao = obter_conexao().execute(SQL_VERSAO_CALIBRACAO, (calibracao_id,)).fetchone()
+    if versao is None:
+        return _erro("calibração não encontrada", 404)
+
+    def gerar():
+        return json.dumps(carregar_calibracao(calibracao_id), default=str).encode('utf-8')
+
+    return _resposta_condicional(('calibracao', calibracao_id), versao['versao_dados'], versao['data_versao'],
+                                 gerar, 'application/json')
+
+
+@api_calibracoes.route('/calibracoes/<int:calibracao_id>/graficos/<tipo>', methods=['GET'])
+def grafico(calibracao_id, tipo):
+    """Gráfico de erros ou de contribuições de uma calibração"""
+    if tipo not in TIPOS_GRAFICO:
+        return _erro(f"tipo de gráfico deve ser um de {', '.join(TIPOS_GRAFICO)}", 404)
+    conexao = obter_conexao()
+    versao = conexao.execute(SQL_VERSAO_CALIBRACAO, (calibracao_id,)).fetchone()
+    if versao is None:
+        return _erro("calibração não encontrada", 404)
+
+    from utils.gerar_graficos import GERADORES, dados_graficos_calibracao
+
+    def gerar():
+        instrumento = conexao.execute(
+            "SELECT unidade, erro_maximo_permitido FROM instrumentos WHERE id = ?", (versao['instrumento_id'],)
+        ).fetchone()
+        tarefas = dict(dados_graficos_calibracao(
+            carregar_calibracao(calibracao_id),
+            erro_maximo=instrumento['erro_maximo_permitido'] if instrumento else None,
+            unidade=(instrumento['unidade'] if instrumento else None) or 'mm'
+        ))
+        if tipo not in tarefas:
+            raise _SemDadosGrafico(tipo)
+        with open(GERADORES[tipo](**tarefas[tipo]), 'rb') as arquivo:
+            return arquivo.read()
+
+    try:
+        return _resposta_condicional(('grafico', calibracao_id, tipo), versao['versao_dados'],
+                                     versao['data_versao'], gerar, 'image/png')
+    except _SemDadosGrafico:
+        return _erro("a calibração não tem dados para este gráfico", 404)
+
+
+@api_calibracoes.route('/certificados/<int:certificado_id>', methods=['GET'])
+def certificado(certificado_id):
+    """Certificado renderizado em HTML ou PDF"""
+    saida = request.args.get('saida', 'html')
+    if saida not in TIPOS_CERTIFICADO:
+        return _erro("'saida' deve ser 'html' ou 'pdf'")
+    conexao = obter_conexao()
+    versao = conexao.execute(SQL_VERSAO_CERTIFICADO, (certificado_id,)).fetchone()
+    if versao is None:
+        return _erro("certificado não encontrado", 404)
+
+    from utils import gerar_certificados
+
+    # O certificado também depende do template e das configurações da empresa
+    configuracoes = gerar_certificados.ler_configuracoes(conexao)
+    formato = configuracoes.get('formato_certificado') or gerar_certificados.FORMATO_PADRAO
+    chave_versao = (versao['versao_dados'], gerar_certificados.versao_template(formato),
+                    tuple(sorted(configuracoes.items())))
+
+    def gerar():
+        contexto = gerar_certificados.carregar_dados_certificados(
+            [certificado_id], conexao, configuracoes
+        )[certificado_id]
+        html = gerar_certificados.renderizar_certificado(contexto, formato)
+        return gerar_certificados.converter_pdf(html) if saida == 'pdf' else html.encode('utf-8')
+
+    try:
+        return _resposta_condicional(
+            ('certificado', certificado_id, formato, saida), chave_versao, versao['data_versao'], gerar,
+            TIPOS_CERTIFICADO[saida], nome_arquivo=f"certificado_{certificado_id}.{saida}"
+        )
+    except RuntimeError as erro:
+        if saida != 'pdf':
+            raise
+        # PDF sem o pacote opcional weasyprint instalado
+        return _erro(str(erro), 501)
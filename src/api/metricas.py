@@ -0,0 +1,106 @@
+"""
+Exposição das métricas de desempenho
+GET /metrics devolve os histogramas no formato de texto do Prometheus;
+/metrics/profiler liga, desliga e lê o profiler por amostragem.
+
+    GET  /metrics                          histogramas (Prometheus)
+    GET  /metrics/profiler                 pilhas coletadas (formato "collapsed")
+    POST /metrics/profiler?acao=iniciar    inicia a amostragem
+    POST /metrics/profiler?acao=parar      interrompe a amostragem
+    POST /metrics/profiler?acao=limpar     descarta as pilhas coletadas
+
+Se CALIBRA_METRICAS_TOKEN estiver definido, as requisições devem enviar o
+cabeçalho "Authorization: Bearer <token>". Sem token, o profiler fica
+indisponível (404) e /metrics só responde a requisições locais (loopback). A duração de cada requisição é
+registrada em calibra_requisicao_segundos por registrar_requisicoes(app).
+"""
+
+import hmac
+import os
+import time
+
+from flask import Blueprint, Response, g, jsonify, request
+
+from utils import metricas
+
+TOKEN = os.environ.get('CALIBRA_METRICAS_TOKEN')
+
+# Profiler ligado desde a inicialização do worker
+PROFILER_INICIAL = os.environ.get('CALIBRA_PROFILER', '0').lower() in ('1', 'true', 'sim')
+
+# Clientes aceitos em /metrics quando não há token configurado
+ENDERECOS_LOCAIS = ('127.0.0.1', '::1')
+
+TIPO_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+api_metricas = Blueprint('api_metricas', __name__)
+
+
+@api_metricas.before_request
+def _autorizar():
+    if TOKEN is None:
+        # O profiler expõe pilhas internas e amostra a cada 5 ms: só com token
+        if request.endpoint == 'api_metricas.profiler':
+            return jsonify({'erro': 'profiler desabilitado (defina CALIBRA_METRICAS_TOKEN)'}), 404
+        if request.remote_addr not in ENDERECOS_LOCAIS:
+            return jsonify({'erro': 'não autorizado'}), 401
+        return None
+    enviado = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(enviado.encode(), f"Bearer {TOKEN}".encode()):
+        return jsonify({'erro': 'não autorizado'}), 401
+    return None
+
+
+@api_metricas.route('/metrics')
+def exportar_metricas():
+    """Histogramas de duração no formato de texto do Prometheus"""
+    return Response(metricas.registro.exportar(), content_type=TIPO_PROMETHEUS)
+
+
+@api_metricas.route('/metrics/profiler', methods=['GET', 'POST'])
+def profiler():
+    """Lê (GET) ou controla (POST ?acao=iniciar|parar|limpar) o profiler por amostragem"""
+    if request.method == 'GET':
+        return Response(metricas.profiler.exportar(), content_type='text/plain; charset=utf-8')
+
+    acoes = {
+        'iniciar': metricas.profiler.iniciar,
+        'parar': metricas.profiler.parar,
+        'limpar': metricas.profiler.limpar
+    }
+    acao = request.args.get('acao')
+    if acao not in acoes:
+        return jsonify({'erro': f"'acao' deve ser uma de {', '.join(acoes)}"}), 400
+    acoes[acao]()
+    return jsonify({
+        'ativo': metricas.profiler.ativo,
+        'amostras': metricas.profiler.amostras,
+        'intervalo': metricas.profiler.intervalo
+    })
+
+
+def registrar_requisicoes(app):
+    """
+    Registra na aplicação os ganchos que cronometram cada requisição (por rota,
+    método e status) quando a coleta de métricas está ligada
+
+    Respostas em streaming são medidas até o início do envio do corpo.
+    """
+    @app.before_request
+    def _iniciar_cronometro():
+        if metricas.ativo():
+            g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def _registrar_duracao(resposta):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            regra = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+            metricas.registro.observar(
+                'calibra_requisicao_segundos', time.perf_counter() - inicio,
+                rota=regra, metodo=request.method, status=resposta.status_code
+            )
+        return resposta
+
+    if PROFILER_INICIAL:
+        metricas.profiler.iniciar()
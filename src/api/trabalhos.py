@@ -0,0 +1,119 @@
+"""
+API JSON da fila de trabalhos em segundo plano
+Os trabalhos pesados (cálculos em lote, gráficos, certificados e recálculos) são
+apenas enfileirados pelo worker web e executados por jobs/trabalhador.py.
+
+    POST   /api/trabalhos                    {"tipo": ..., "parametros": {...}, "prioridade": 0}
+                                             -> 202 {"id": ..., "status": "pendente", "url": ...}
+    GET    /api/trabalhos/<id>               situação do trabalho
+    GET    /api/trabalhos/<id>/resultado     200 com o resultado (ou o arquivo gerado, com
+                                             ?arquivo=1), 202 enquanto não terminar, 409 se
+                                             falhou ou foi cancelado
+    DELETE /api/trabalhos/<id>               cancela um trabalho ainda pendente
+"""
+
+import json
+import os
+
+from flask import Blueprint, Response, jsonify, request, send_file, url_for
+
+from api.calculos import ler_json_limitado
+from jobs import fila
+from jobs.tarefas import DIRETORIO_RESULTADOS, validar_parametros
+
+# Intervalo sugerido aos clientes entre consultas de um trabalho em andamento (segundos)
+INTERVALO_CONSULTA = 2
+
+api_trabalhos = Blueprint('api_trabalhos', __name__, url_prefix='/api')
+
+
+def _erro(mensagem, status=400):
+    return jsonify({'erro_validacao': mensagem}), status
+
+
+def resposta_enfileirado(trabalho_id):
+    """Resposta 202 de um trabalho enfileirado, com o endereço de consulta"""
+    url = url_for('api_trabalhos.consultar', trabalho_id=trabalho_id)
+    resposta = jsonify({'id': trabalho_id, 'status': fila.PENDENTE, 'url': url})
+    resposta.status_code = 202
+    resposta.headers['Location'] = url
+    return resposta
+
+
+def enfileirar_trabalho(tipo, parametros, prioridade=0):
+    """
+    Valida e enfileira um trabalho
+
+    Returns:
+        Resposta 202 (ver resposta_enfileirado) ou resposta de erro 400
+    """
+    falha = validar_parametros(tipo, parametros)
+    if falha:
+        return _erro(falha)
+    return resposta_enfileirado(fila.enfileirar(tipo, parametros, prioridade))
+
+
+@api_trabalhos.route('/trabalhos', methods=['POST'])
+def enfileirar():
+    """Inclui um trabalho na fila"""
+    dados, resposta_erro = ler_json_limitado()
+    if resposta_erro is not None:
+        return resposta_erro
+    if not isinstance(dados, dict):
+        return _erro("o corpo da requisição deve ser um objeto JSON")
+    prioridade = dados.get('prioridade', 0)
+    if not isinstance(prioridade, int) or isinstance(prioridade, bool):
+        return _erro("'prioridade' deve ser um número inteiro")
+    return enfileirar_trabalho(dados.get('tipo'), dados.get('parametros'), prioridade)
+
+
+@api_trabalhos.route('/trabalhos/<int:trabalho_id>', methods=['GET'])
+def consultar(trabalho_id):
+    """Situação de um trabalho (sem o resultado)"""
+    trabalho = fila.obter_trabalho(trabalho_id)
+    if trabalho is None:
+        return _erro("trabalho não encontrado", 404)
+    if trabalho['status'] == fila.CONCLUIDO:
+        trabalho['url_resultado'] = url_for('api_trabalhos.resultado', trabalho_id=trabalho_id)
+    return jsonify(trabalho)
+
+
+@api_trabalhos.route('/trabalhos/<int:trabalho_id>/resultado', methods=['GET'])
+def resultado(trabalho_id):
+    """Resultado de um trabalho concluído"""
+    trabalho = fila.obter_resultado(trabalho_id)
+    if trabalho is None:
+        return _erro("trabalho não encontrado", 404)
+
+    if trabalho['status'] in (fila.PENDENTE, fila.EXECUTANDO):
+        resposta = jsonify({'id': trabalho_id, 'status': trabalho['status']})
+        resposta.status_code = 202
+        resposta.headers['Retry-After'] = str(INTERVALO_CONSULTA)
+        return resposta
+    if trabalho['status'] != fila.CONCLUIDO:
+        return jsonify({'id': trabalho_id, 'status': trabalho['status'], 'erro': trabalho['erro']}), 409
+
+    texto = trabalho['resultado'] if trabalho['resultado'] is not None else 'null'
+    if request.args.get('arquivo'):
+        # O resultado só é decodificado quando o arquivo gerado é pedido
+        dados = json.loads(texto)
+        arquivo = dados.get('arquivo') if isinstance(dados, dict) else None
+        if arquivo:
+            # Apenas arquivos gerados pelos próprios trabalhos, no diretório de resultados
+            caminho = os.path.realpath(arquivo)
+            if os.path.dirname(caminho) != os.path.realpath(DIRETORIO_RESULTADOS) or not os.path.exists(caminho):
+                return _erro("arquivo do resultado não disponível", 404)
+            return send_file(caminho, as_attachment=True)
+    # O JSON gravado pela fila é enviado como está, sem decodificar e codificar de novo
+    return Response(texto, mimetype='application/json')
+
+
+@api_trabalhos.route('/trabalhos/<int:trabalho_id>', methods=['DELETE'])
+def cancelar(trabalho_id):
+    """Cancela um trabalho pendente"""
+    if fila.cancelar(trabalho_id):
+        return jsonify({'id': trabalho_id, 'status': fila.CANCELADO})
+    trabalho = fila.obter_trabalho(trabalho_id)
+    if trabalho is None:
+        return _erro("trabalho não encontrado", 404)
+    return _erro(f"o trabalho está '{trabalho['status']}' e não pode ser cancelado", 409)
@@ -1,8 +1,22 @@
 import os
 from flask import Flask
 
+from api.calculos import api_calculos
+from api.calibracoes import api_calibracoes
+from api.metricas import api_metricas, registrar_requisicoes
+from api.trabalhos import api_trabalhos
+
 app = Flask(__name__)
 
+# Tamanho máximo do corpo das requisições (padrão: 16 MB)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('CALIBRA_API_MAX_BYTES', 16 * 1024 * 1024))
+
+app.register_blueprint(api_calculos)
+app.register_blueprint(api_calibracoes)
+app.register_blueprint(api_metricas)
+app.register_blueprint(api_trabalhos)
+registrar_requisicoes(app)
+
 @app.route('/')
 def index():
     return "Sistema de Gestão de Calibração - Teste de Deploy"
@@ -10,8 +24,11 @@ def index():
 @app.route('/teste-db')
 def teste_db():
     try:
-        # Apenas para teste, sem conexão real com banco
-        return "Rota de teste funcionando!"
+        from database.conexao import obter_conexao
+
+        # A primeira conexão do processo cria o schema e aplica as migrações
+        total = obter_conexao().execute("SELECT COUNT(*) FROM calibracoes").fetchone()[0]
+        return f"Banco de dados funcionando! Calibrações cadastradas: {total}"
     except Exception as e:
         return f"Erro: {str(e)}"
 
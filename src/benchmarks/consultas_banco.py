@@ -0,0 +1,202 @@
+"""
+Benchmark dos planos de consulta e latências das consultas principais do banco
+
+Popula um banco SQLite temporário com um inventário sintético (por padrão,
+200 mil instrumentos com uma calibração cada), aplica o schema e as migrações e,
+para cada consulta das telas de calibrações vencidas, histórico de instrumentos
+e leitura de calibrações:
+  - verifica pelo EXPLAIN QUERY PLAN que nenhuma tabela é varrida por completo;
+  - mede a latência mediana e compara com o limite configurado.
+
+Uso (a partir do diretório src):
+    python benchmarks/consultas_banco.py
+    python benchmarks/consultas_banco.py --instrumentos 20000 --limite-ms 5
+    python benchmarks/consultas_banco.py --sem-migracoes   # referência sem os índices
+
+Retorna código de saída 1 se alguma verificação falhar.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from database.calibracoes import SQL_SELECIONAR_PONTOS, SQL_SELECIONAR_FONTES
+from database.migracao import aplicar_migracoes
+
+DATA_BASE = datetime.date(2024, 1, 1)
+
+CRITICIDADES = ['baixa', 'media', 'alta']
+
+# Consultas verificadas: nome -> (sql, função que gera os parâmetros)
+CONSULTAS = {
+    'calibracoes_vencidas': (
+        "SELECT id, codigo, data_proxima_calibracao FROM instrumentos "
+        "WHERE data_proxima_calibracao < ? ORDER BY data_proxima_calibracao LIMIT 100",
+        lambda d: (d['hoje'],)
+    ),
+    'vencidas_por_setor': (
+        "SELECT id, codigo, data_proxima_calibracao FROM instrumentos "
+        "WHERE setor_id = ? AND data_proxima_calibracao < ? ORDER BY data_proxima_calibracao",
+        lambda d: (random.randint(1, d['setores']), d['hoje'])
+    ),
+    'historico_instrumento': (
+        "SELECT * FROM historico_instrumentos WHERE instrumento_id = ? ORDER BY data_evento DESC",
+        lambda d: (random.randint(1, d['instrumentos']),)
+    ),
+    'calibracoes_instrumento': (
+        "SELECT * FROM calibracoes WHERE instrumento_id = ? ORDER BY data_inicio DESC",
+        lambda d: (random.randint(1, d['instrumentos']),)
+    ),
+    'pontos_calibracao': (
+        SQL_SELECIONAR_PONTOS,
+        lambda d: (random.randint(1, d['instrumentos']),)
+    ),
+    'fontes_calibracao': (
+        SQL_SELECIONAR_FONTES,
+        lambda d: (random.randint(1, d['instrumentos']),)
+    ),
+    'certificados_calibracao': (
+        "SELECT * FROM certificados WHERE calibracao_id = ?",
+        lambda d: (random.randint(1, d['instrumentos']),)
+    ),
+}
+
+
+def popular_banco(conexao, n_instrumentos, n_setores, pontos_por_calibracao, fontes_por_ponto):
+    """Insere o inventário sintético: instrumentos, calibrações, pontos, fontes, certificados e histórico"""
+    data = lambda dias: (DATA_BASE + datetime.timedelta(days=dias)).isoformat()
+
+    with banco.transacao(conexao):
+        conexao.executemany(
+            "INSERT INTO setores (nome) VALUES (?)",
+            ((f"Setor {i}",) for i in range(1, n_setores + 1))
+        )
+        conexao.executemany(
+            "INSERT INTO instrumentos (codigo, descricao, tipo_id, setor_id, criticidade, "
+            "periodicidade_calibracao, data_ultima_calibracao, data_proxima_calibracao) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"INS-{i:07d}", f"Instrumento {i}", random.randint(1, 6), random.randint(1, n_setores),
+                 random.choice(CRITICIDADES), 365, data(dias - 365), data(dias))
+                for i in range(1, n_instrumentos + 1)
+                for dias in (random.randint(-180, 540),)
+            )
+        )
+        conexao.executemany(
+            "INSERT INTO calibracoes (numero, instrumento_id, data_inicio, status) VALUES (?, ?, ?, 'concluida')",
+            ((f"CAL-{i:07d}", i, data(random.randint(-365, 0))) for i in range(1, n_instrumentos + 1))
+        )
+        conexao.executemany(
+            "INSERT INTO pontos_calibracao (calibracao_id, sequencia, valor_referencia, valor_lido) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (c, s, 10.0 * s, 10.0 * s + random.gauss(0, 0.01))
+                for c in range(1, n_instrumentos + 1)
+                for s in range(1, pontos_por_calibracao + 1)
+            )
+        )
+        conexao.executemany(
+            "INSERT INTO fontes_incerteza (ponto_calibracao_id, descricao, tipo, valor) VALUES (?, ?, 'B', ?)",
+            (
+                (p, f"Fonte {f}", 0.001 * f)
+                for p in range(1, n_instrumentos * pontos_por_calibracao + 1)
+                for f in range(1, fontes_por_ponto + 1)
+            )
+        )
+        conexao.executemany(
+            "INSERT INTO certificados (numero, calibracao_id, data_emissao) VALUES (?, ?, ?)",
+            ((f"CERT-{i:07d}", i, data(0)) for i in range(1, n_instrumentos + 1))
+        )
+        conexao.executemany(
+            "INSERT INTO historico_instrumentos (instrumento_id, tipo_evento, data_evento) VALUES (?, ?, ?)",
+            (
+                (i, evento, data(random.randint(-720, 0)))
+                for i in range(1, n_instrumentos + 1)
+                for evento in ('cadastro', 'calibracao', 'calibracao')
+            )
+        )
+    conexao.execute('ANALYZE')
+
+
+def tabelas_varridas(conexao, sql, parametros):
+    """Retorna os detalhes do plano de consulta que indicam varredura completa de tabela"""
+    plano = conexao.execute('EXPLAIN QUERY PLAN ' + sql, parametros).fetchall()
+    return [linha['detail'] for linha in plano
+            if linha['detail'].startswith('SCAN') and 'USING' not in linha['detail']]
+
+
+def medir_consulta(conexao, sql, gerar_parametros, dados, repeticoes):
+    """Retorna a latência mediana da consulta em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        parametros = gerar_parametros(dados)
+        inicio = time.perf_counter()
+        conexao.execute(sql, parametros).fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de planos de consulta e latências do banco')
+    parser.add_argument('--instrumentos', type=int, default=200_000)
+    parser.add_argument('--setores', type=int, default=50)
+    parser.add_argument('--pontos-por-calibracao', type=int, default=5)
+    parser.add_argument('--fontes-por-ponto', type=int, default=3)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--limite-ms', type=float, default=10.0, help='Latência mediana máxima por consulta')
+    parser.add_argument('--sem-migracoes', action='store_true', help='Não aplicar as migrações (referência)')
+    parser.add_argument('--semente', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.semente)
+    diretorio = tempfile.mkdtemp(prefix='benchmark_banco_')
+    conexao = banco.criar_conexao(os.path.join(diretorio, 'benchmark.db'))
+
+    with open(banco.CAMINHO_SCHEMA, encoding='utf-8') as arquivo:
+        conexao.executescript(arquivo.read())
+    if not args.sem_migracoes:
+        aplicar_migracoes(conexao)
+
+    inicio = time.perf_counter()
+    popular_banco(conexao, args.instrumentos, args.setores, args.pontos_por_calibracao, args.fontes_por_ponto)
+    print(f"Banco populado com {args.instrumentos} instrumentos em {time.perf_counter() - inicio:.1f}s")
+
+    dados = {'instrumentos': args.instrumentos, 'setores': args.setores, 'hoje': DATA_BASE.isoformat()}
+    falhas = 0
+
+    print(f"{'Consulta':<28}{'Mediana':>10}  Plano")
+    for nome, (sql, gerar_parametros) in CONSULTAS.items():
+        varreduras = tabelas_varridas(conexao, sql, gerar_parametros(dados))
+        latencia = medir_consulta(conexao, sql, gerar_parametros, dados, args.repeticoes)
+
+        problemas = []
+        if varreduras:
+            problemas.append('varredura: ' + '; '.join(varreduras))
+        if latencia > args.limite_ms:
+            problemas.append(f'acima de {args.limite_ms:.1f}ms')
+
+        situacao = '✗ ' + ', '.join(problemas) if problemas else '✓ usa índice'
+        print(f"{nome:<28}{latencia:>8.2f}ms  {situacao}")
+        falhas += bool(problemas)
+
+    conexao.close()
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    if falhas:
+        print(f"✗ {falhas} consulta(s) fora do esperado")
+        sys.exit(1)
+    print("✓ Todas as consultas usam índices e estão dentro do limite de latência")
+
+
+if __name__ == '__main__':
+    main()
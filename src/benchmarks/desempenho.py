@@ -0,0 +1,398 @@
+"""
+Suíte de benchmarks do núcleo metrológico e dos caminhos da aplicação web
+
+Mede o tempo dos cálculos e das etapas da geração de certificados em cenários
+sintéticos fixos (mesma semente a cada execução):
+  - incerteza completa ponto a ponto × em lote;
+  - orçamentos Tipo B de 5, 50 e 500 fontes;
+  - avaliação de conformidade em lote com resumo por instrumento;
+  - geração dos gráficos de erros e de contribuições;
+  - renderização de certificados;
+  - gravação e leitura de calibrações no banco (ida e volta).
+
+Cada execução é acrescentada a um histórico em JSON. A mediana de cada caso é
+comparada à mediana das últimas execuções do mesmo ambiente (máquina, Python e
+NumPy); casos mais lentos que a referência além da tolerância são marcados como
+regressão e o script retorna código de saída 1.
+
+Uso (a partir do diretório src):
+    python benchmarks/desempenho.py
+    python benchmarks/desempenho.py --casos incerteza conformidade --repeticoes 20
+    python benchmarks/desempenho.py --tolerancia 0.5 --historico /tmp/historico.json
+    python benchmarks/desempenho.py --sem-gravar   # apenas compara com o histórico
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from database import conexao as banco
+from database.calibracoes import salvar_calibracao, carregar_calibracao, fontes_de_resultado
+from models.calculo_metrologico import CalculoMetrologico
+from models.conformidade import avaliar_conformidade_lote, resumo_por_instrumento
+
+DIRETORIO_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+# Histórico padrão das execuções (um registro por execução)
+CAMINHO_HISTORICO = os.environ.get(
+    'CALIBRA_HISTORICO_BENCHMARKS', os.path.join(DIRETORIO_BENCHMARKS, 'historico_desempenho.json')
+)
+
+# Execuções anteriores usadas como referência de cada caso
+JANELA_REFERENCIA = 5
+
+# Aumento relativo da mediana tolerado antes de marcar uma regressão
+TOLERANCIA = 0.25
+
+# Casos registrados: nome -> função de preparação (ver caso)
+CASOS = {}
+
+
+def caso(nome):
+    """
+    Registra um caso de benchmark
+
+    A função decorada recebe o diretório temporário da execução, prepara os dados
+    (fora da medição) e retorna (função medida, número de itens processados por
+    chamada), usado para o tempo por item.
+    """
+    def registrar(preparar):
+        CASOS[nome] = preparar
+        return preparar
+    return registrar
+
+
+def _leituras(n_pontos, repeticoes=5):
+    """Leituras sintéticas de n_pontos de um paquímetro (10 mm a 10 × n_pontos mm)"""
+    referencia = 10.0 * np.arange(1, n_pontos + 1)
+    return referencia, referencia[:, None] + np.random.normal(0.02, 0.01, (n_pontos, repeticoes))
+
+
+def _fontes(n_fontes):
+    """Orçamento Tipo B sintético com n_fontes fontes"""
+    distribuicoes = ['retangular', 'normal', 'triangular']
+    return [
+        {
+            'descricao': f'Fonte {i + 1}',
+            'valor': 0.001 * (i % 10 + 1),
+            'distribuicao': distribuicoes[i % 3],
+            'graus_liberdade': 10 + i if i % 4 == 0 else float('inf')
+        }
+        for i in range(n_fontes)
+    ]
+
+
+@caso('incerteza_por_ponto')
+def _incerteza_por_ponto(diretorio):
+    calc = CalculoMetrologico()
+    _, leituras = _leituras(1000)
+    leituras = leituras.tolist()
+    fontes = _fontes(3)
+
+    def executar():
+        for valores in leituras:
+            calc.calcular_incerteza_completa(valores, fontes)
+    return executar, len(leituras)
+
+
+@caso('incerteza_lote')
+def _incerteza_lote(diretorio):
+    calc = CalculoMetrologico()
+    _, leituras = _leituras(1000)
+    fontes = calc.preparar_fontes_lote([_fontes(3)] * len(leituras))
+    return lambda: calc.calcular_incerteza_completa_lote(leituras, fontes), len(leituras)
+
+
+def _caso_tipo_b(n_fontes):
+    def preparar(diretorio):
+        calc = CalculoMetrologico()
+        fontes = _fontes(n_fontes)
+        return lambda: calc.calcular_incerteza_tipo_b(fontes), n_fontes
+    return preparar
+
+
+for _n_fontes in (5, 50, 500):
+    caso(f'orcamento_tipo_b_{_n_fontes}')(_caso_tipo_b(_n_fontes))
+
+
+@caso('conformidade_lote')
+def _conformidade_lote(diretorio):
+    n_pontos = 200_000
+    erro = np.random.normal(0, 0.02, n_pontos)
+    incerteza = np.random.uniform(0.005, 0.02, n_pontos)
+    instrumentos = np.random.randint(0, n_pontos // 10, n_pontos)
+
+    def executar():
+        avaliacao = avaliar_conformidade_lote(erro, incerteza, 0.05)
+        resumo_por_instrumento(instrumentos, avaliacao)
+    return executar, n_pontos
+
+
+def _caso_grafico(tipo):
+    def preparar(diretorio):
+        from utils.gerar_graficos import GERADORES
+
+        referencia, leituras = _leituras(20)
+        erros = (leituras.mean(axis=1) - referencia).tolist()
+        fontes = _fontes(8)
+        contador = iter(range(1 << 30))
+
+        # Os gráficos ficam em cache pelo conteúdo: cada chamada varia os dados
+        # para medir sempre a renderização completa
+        def executar():
+            deslocamento = next(contador) * 1e-9
+            if tipo == 'erros':
+                parametros = {'pontos_nominais': referencia.tolist(),
+                              'erros': [e + deslocamento for e in erros],
+                              'incertezas': [0.01] * len(erros), 'erro_maximo': 0.05}
+            else:
+                parametros = {'fontes': [f['descricao'] for f in fontes],
+                              'contribuicoes': [f['valor'] + deslocamento for f in fontes]}
+            GERADORES[tipo](diretorio=diretorio, **parametros)
+        return executar, 1
+    return preparar
+
+
+caso('grafico_erros')(_caso_grafico('erros'))
+caso('grafico_contribuicoes')(_caso_grafico('contribuicoes'))
+
+
+def _calibracao_exemplo(numero, n_pontos=20):
+    """Calcula e monta os pontos de uma calibração sintética pronta para salvar_calibracao"""
+    calc = CalculoMetrologico()
+    referencia, leituras = _leituras(n_pontos, 3)
+    fontes = _fontes(3)
+    pontos = []
+    for i, (valor_referencia, valores) in enumerate(zip(referencia.tolist(), leituras.tolist())):
+        resultado = calc.calcular_incerteza_completa(valores, fontes)
+        media = resultado['incerteza_tipo_a']['media']
+        pontos.append({
+            'sequencia': i + 1,
+            'valor_referencia': valor_referencia,
+            'valor_lido': media,
+            'erro': calc.calcular_erro(media, valor_referencia),
+            'incerteza_padrao': resultado['incerteza_combinada']['incerteza_combinada'],
+            'incerteza_expandida': resultado['incerteza_expandida'],
+            'fator_k': resultado['fator_k'],
+            'conforme': True,
+            'fontes': fontes_de_resultado(resultado)
+        })
+    return {'numero': numero, 'data_inicio': '2024-01-10 08:00:00'}, pontos
+
+
+def _banco_temporario(diretorio, nome):
+    """Cria e inicializa um banco vazio no diretório da execução"""
+    conexao = banco.criar_conexao(os.path.join(diretorio, nome))
+    banco.inicializar_banco(conexao)
+    return conexao
+
+
+@caso('certificado_renderizacao')
+def _certificado_renderizacao(diretorio):
+    from utils.gerar_certificados import carregar_dados_certificados, renderizar_certificado
+
+    conexao = _banco_temporario(diretorio, 'certificados.db')
+    with banco.transacao(conexao):
+        instrumento_id = conexao.execute(
+            "INSERT INTO instrumentos (codigo, descricao, fabricante, modelo, numero_serie, resolucao, "
+            "faixa_minima, faixa_maxima, unidade) "
+            "VALUES ('PAQ-0001', 'Paquímetro digital', 'Mitutoyo', '500-196', 'SN0001', 0.01, 0, 200, 'mm')"
+        ).lastrowid
+    calibracao, pontos = _calibracao_exemplo('BEN-0001')
+    calibracao_id = salvar_calibracao(dict(calibracao, instrumento_id=instrumento_id), pontos, conexao)
+    with banco.transacao(conexao):
+        certificado_id = conexao.execute(
+            "INSERT INTO certificados (numero, calibracao_id, data_emissao) VALUES ('CERT-BEN-0001', ?, ?)",
+            (calibracao_id, '2024-01-11')
+        ).lastrowid
+
+    def executar():
+        contexto = carregar_dados_certificados([certificado_id], conexao)[certificado_id]
+        renderizar_certificado(contexto)
+    return executar, 1
+
+
+@caso('banco_ida_volta')
+def _banco_ida_volta(diretorio):
+    conexao = _banco_temporario(diretorio, 'ida_volta.db')
+    calibracao, pontos = _calibracao_exemplo('BEN-0000', n_pontos=50)
+    contador = iter(range(1, 1 << 30))
+
+    def executar():
+        calibracao_id = salvar_calibracao(dict(calibracao, numero=f'BEN-{next(contador):07d}'), pontos, conexao)
+        carregar_calibracao(calibracao_id, conexao)
+    return executar, len(pontos)
+
+
+def medir(preparar, repeticoes, tempo_minimo, diretorio):
+    """
+    Mede um caso: uma chamada de aquecimento e depois `repeticoes` chamadas (ou mais,
+    até somar tempo_minimo segundos)
+
+    Returns:
+        Dicionário com a mediana, o mínimo e o desvio padrão em ms e o tempo por item em µs
+    """
+    executar, itens = preparar(diretorio)
+    executar()
+
+    tempos = []
+    inicio_caso = time.perf_counter()
+    while len(tempos) < repeticoes or (time.perf_counter() - inicio_caso < tempo_minimo and len(tempos) < 1000):
+        inicio = time.perf_counter()
+        executar()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    mediana = statistics.median(tempos)
+    return {
+        'mediana_ms': mediana,
+        'minimo_ms': min(tempos),
+        'desvio_ms': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        'repeticoes': len(tempos),
+        'por_item_us': mediana * 1000 / itens
+    }
+
+
+def ambiente():
+    """Identifica o ambiente da execução; só execuções do mesmo ambiente são comparadas"""
+    return {
+        'maquina': platform.node(),
+        'processador': platform.machine(),
+        'python': platform.python_version(),
+        'numpy': np.__version__
+    }
+
+
+def versao_codigo():
+    """Commit atual do repositório, se disponível"""
+    try:
+        processo = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO_BENCHMARKS,
+                                  capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return processo.stdout.strip() or None
+
+
+def ler_historico(caminho):
+    """Lê o histórico de execuções (lista vazia se o arquivo não existir)"""
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_historico(caminho, historico):
+    """Grava o histórico de forma atômica (arquivo temporário + rename)"""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(historico, arquivo, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def referencias(historico, ambiente_atual, janela=JANELA_REFERENCIA):
+    """
+    Calcula a referência de cada caso: mediana das medianas das últimas execuções do
+    mesmo ambiente
+
+    Returns:
+        Dicionário nome do caso -> mediana de referência em ms
+    """
+    medianas = {}
+    for execucao in reversed(historico):
+        if execucao.get('ambiente') != ambiente_atual:
+            continue
+        for nome, resultado in execucao['resultados'].items():
+            anteriores = medianas.setdefault(nome, [])
+            if len(anteriores) < janela:
+                anteriores.append(resultado['mediana_ms'])
+    return {nome: statistics.median(valores) for nome, valores in medianas.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks do núcleo metrológico')
+    parser.add_argument('--casos', nargs='*', help='Executar apenas os casos que contêm algum destes textos')
+    parser.add_argument('--repeticoes', type=int, default=10, help='Número mínimo de medições por caso')
+    parser.add_argument('--tempo-minimo', type=float, default=0.5, help='Tempo mínimo de medição por caso (s)')
+    parser.add_argument('--historico', default=CAMINHO_HISTORICO, help='Arquivo JSON do histórico')
+    parser.add_argument('--janela', type=int, default=JANELA_REFERENCIA, help='Execuções usadas como referência')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA, help='Aumento relativo tolerado')
+    parser.add_argument('--sem-gravar', action='store_true', help='Não acrescentar a execução ao histórico')
+    parser.add_argument('--listar', action='store_true', help='Listar os casos e sair')
+    parser.add_argument('--semente', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.listar:
+        print('\n'.join(CASOS))
+        return
+
+    selecionados = [nome for nome in CASOS if not args.casos or any(texto in nome for texto in args.casos)]
+    historico = ler_historico(args.historico)
+    ambiente_atual = ambiente()
+    referencia = referencias(historico, ambiente_atual, args.janela)
+
+    diretorio = tempfile.mkdtemp(prefix='benchmark_desempenho_')
+    resultados = {}
+    regressoes = []
+
+    print(f"{'Caso':<28}{'Mediana':>12}{'Mínimo':>12}{'Por item':>12}{'Referência':>13}  Situação")
+    try:
+        for nome in selecionados:
+            random.seed(args.semente)
+            np.random.seed(args.semente)
+            resultado = medir(CASOS[nome], args.repeticoes, args.tempo_minimo, diretorio)
+
+            anterior = referencia.get(nome)
+            if anterior is None:
+                situacao, texto_referencia = '- sem referência', '-'
+            else:
+                variacao = resultado['mediana_ms'] / anterior - 1
+                resultado['variacao'] = variacao
+                resultado['regressao'] = variacao > args.tolerancia
+                texto_referencia = f"{anterior:.3f}ms"
+                if resultado['regressao']:
+                    regressoes.append(nome)
+                    situacao = f'✗ regressão ({variacao:+.0%})'
+                else:
+                    situacao = f'✓ {variacao:+.0%}'
+            resultados[nome] = resultado
+
+            print(f"{nome:<28}{resultado['mediana_ms']:>10.3f}ms{resultado['minimo_ms']:>10.3f}ms"
+                  f"{resultado['por_item_us']:>10.2f}µs{texto_referencia:>13}  {situacao}")
+    finally:
+        banco.fechar_conexoes()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    if 'incerteza_por_ponto' in resultados and 'incerteza_lote' in resultados:
+        ganho = resultados['incerteza_por_ponto']['mediana_ms'] / resultados['incerteza_lote']['mediana_ms']
+        print(f"Cálculo em lote {ganho:.0f}× mais rápido que ponto a ponto")
+
+    if not args.sem_gravar:
+        historico.append({
+            'data': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': versao_codigo(),
+            'ambiente': ambiente_atual,
+            'resultados': resultados
+        })
+        gravar_historico(args.historico, historico)
+
+    if regressoes:
+        print(f"✗ {len(regressoes)} caso(s) com regressão de desempenho: {', '.join(regressoes)}")
+        sys.exit(1)
+    print("✓ Nenhuma regressão de desempenho em relação ao histórico")
+
+
+if __name__ == '__main__':
+    main()
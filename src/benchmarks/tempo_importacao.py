@@ -0,0 +1,152 @@
+"""
+Benchmark de tempo de importação e memória dos workers do gunicorn
+
+Mede, em processos Python novos, o tempo de importação dos módulos carregados
+pelo worker (app, modelos e utilitários), a memória residente após a importação
+e o custo do primeiro uso em um processo filho criado por fork, reproduzindo o
+que acontece quando o gunicorn recicla um worker.
+
+Uso (a partir do diretório src):
+    python benchmarks/tempo_importacao.py
+    python benchmarks/tempo_importacao.py --repeticoes 10 --json resultados.json
+    python benchmarks/tempo_importacao.py --ansioso   # carrega NumPy/SciPy/Matplotlib antes
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DIRETORIO_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos cujo tempo de importação é medido
+ALVOS = ['app', 'models.calculo_metrologico', 'utils.gerar_graficos']
+
+# Dependências pesadas que devem ser carregadas somente no primeiro uso
+MODULOS_PESADOS = ['numpy', 'scipy', 'matplotlib']
+
+# Código executado em cada processo medido
+CODIGO_MEDICAO = r'''
+import importlib, json, os, sys, time
+
+def memoria_kb():
+    """Retorna (RSS, memória privada) do processo atual em kB"""
+    rss = privada = 0
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmRSS:'):
+                    rss = int(linha.split()[1])
+        with open('/proc/self/smaps_rollup') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    privada += int(linha.split()[1])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss, privada
+
+alvo, ansioso, pesados = sys.argv[1], sys.argv[2] == '1', sys.argv[3].split(',')
+if ansioso:
+    import numpy, scipy.stats, matplotlib.pyplot
+
+inicio = time.perf_counter()
+importlib.import_module(alvo)
+tempo_importacao = time.perf_counter() - inicio
+rss, _ = memoria_kb()
+carregados = [nome for nome in pesados if nome in sys.modules]
+
+# Simular o worker: fork e primeira requisição de cálculo
+leitura, escrita = os.pipe()
+pid = os.fork()
+if pid == 0:
+    os.close(leitura)
+    inicio = time.perf_counter()
+    from models.calculo_metrologico import CalculoMetrologico
+    CalculoMetrologico().calcular_incerteza_completa(
+        [10.02, 10.03, 10.01], [{'valor': 0.01, 'distribuicao': 'retangular'}]
+    )
+    primeiro_uso = time.perf_counter() - inicio
+    _, privada = memoria_kb()
+    os.write(escrita, json.dumps({'primeiro_uso': primeiro_uso, 'privada_filho_kb': privada}).encode())
+    os._exit(0)
+
+os.close(escrita)
+dados_filho = json.loads(os.read(leitura, 65536).decode())
+os.waitpid(pid, 0)
+
+print(json.dumps({
+    'tempo_importacao': tempo_importacao,
+    'rss_kb': rss,
+    'pesados_carregados': carregados,
+    **dados_filho
+}))
+'''
+
+
+def medir(alvo, ansioso=False):
+    """
+    Executa uma medição em um processo Python novo
+
+    Args:
+        alvo: Nome do módulo a importar
+        ansioso: Se True, importa as dependências pesadas antes do alvo
+
+    Returns:
+        Dicionário com os resultados da medição
+    """
+    processo = subprocess.run(
+        [sys.executable, '-c', CODIGO_MEDICAO, alvo, '1' if ansioso else '0', ','.join(MODULOS_PESADOS)],
+        cwd=DIRETORIO_SRC, capture_output=True, text=True, check=True
+    )
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def executar(repeticoes=5, ansioso=False):
+    """
+    Mede todos os alvos, repetindo cada medição e resumindo pela mediana
+
+    Args:
+        repeticoes: Número de processos medidos por alvo
+        ansioso: Se True, importa as dependências pesadas antes de cada alvo
+
+    Returns:
+        Dicionário alvo -> resumo das medições
+    """
+    resultados = {}
+    for alvo in ALVOS:
+        medicoes = [medir(alvo, ansioso) for _ in range(repeticoes)]
+        resultados[alvo] = {
+            'tempo_importacao_ms': statistics.median(m['tempo_importacao'] for m in medicoes) * 1000,
+            'primeiro_uso_ms': statistics.median(m['primeiro_uso'] for m in medicoes) * 1000,
+            'rss_mb': statistics.median(m['rss_kb'] for m in medicoes) / 1024,
+            'privada_filho_mb': statistics.median(m['privada_filho_kb'] for m in medicoes) / 1024,
+            'pesados_carregados': medicoes[-1]['pesados_carregados']
+        }
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de importação dos workers do gunicorn')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Processos medidos por módulo')
+    parser.add_argument('--ansioso', action='store_true', help='Carregar dependências pesadas antes')
+    parser.add_argument('--json', help='Arquivo para gravar os resultados em JSON')
+    args = parser.parse_args()
+
+    resultados = executar(args.repeticoes, args.ansioso)
+
+    print(f"{'Módulo':<32}{'Importação':>12}{'RSS':>10}{'1º uso':>10}{'Privada filho':>15}  Pesados carregados")
+    for alvo, r in resultados.items():
+        print(f"{alvo:<32}{r['tempo_importacao_ms']:>10.1f}ms{r['rss_mb']:>8.1f}MB"
+              f"{r['primeiro_uso_ms']:>8.1f}ms{r['privada_filho_mb']:>13.1f}MB  "
+              f"{', '.join(r['pesados_carregados']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
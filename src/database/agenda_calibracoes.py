@@ -0,0 +1,210 @@
+"""
+Agenda de calibrações a partir da tabela instrumentos
+A agenda de cada processo é carregada uma única vez e depois mantida em dia de
+forma incremental: a conclusão de uma calibração reagenda apenas o instrumento
+calibrado, e sincronizar_agenda lê somente os instrumentos alterados ou excluídos
+por outros processos (coluna revisao_agenda e tabela instrumentos_excluidos_agenda,
+mantidas por gatilhos; ver as migrações 0005 e 0010).
+"""
+
+import datetime
+import threading
+
+from database.conexao import obter_conexao, transacao
+from models.agenda import AgendaCalibracoes, para_data
+
+SQL_INSTRUMENTOS_AGENDA = (
+    "SELECT id, setor_id, criticidade, status, ativo, periodicidade_calibracao, "
+    "data_ultima_calibracao, data_proxima_calibracao, revisao_agenda FROM instrumentos"
+)
+
+# Todos os instrumentos, com a última revisão de exclusão lida na mesma consulta
+SQL_CARREGAR_AGENDA = (
+    "SELECT id, setor_id, criticidade, status, ativo, periodicidade_calibracao, "
+    "data_ultima_calibracao, data_proxima_calibracao, revisao_agenda, "
+    "(SELECT MAX(revisao_agenda) FROM instrumentos_excluidos_agenda) AS revisao_exclusoes FROM instrumentos"
+)
+
+# Instrumentos alterados e excluídos em uma única consulta (as duas tabelas lidas
+# no mesmo instante), em ordem de revisão; as exclusões têm excluido = 1
+SQL_INSTRUMENTOS_ALTERADOS = (
+    "SELECT id, setor_id, criticidade, status, ativo, periodicidade_calibracao, "
+    "data_ultima_calibracao, data_proxima_calibracao, revisao_agenda, 0 AS excluido "
+    "FROM instrumentos WHERE revisao_agenda > ?1 "
+    "UNION ALL SELECT instrumento_id, NULL, NULL, NULL, NULL, NULL, NULL, NULL, revisao_agenda, 1 "
+    "FROM instrumentos_excluidos_agenda WHERE revisao_agenda > ?1 "
+    "ORDER BY revisao_agenda"
+)
+
+SQL_CALIBRACAO = (
+    "SELECT c.id, c.instrumento_id, c.data_inicio, c.status, i.periodicidade_calibracao "
+    "FROM calibracoes c JOIN instrumentos i ON i.id = c.instrumento_id WHERE c.id = ?"
+)
+
+SQL_CONCLUIR_CALIBRACAO = (
+    "UPDATE calibracoes SET status = 'concluida', data_fim = ?, resultado = COALESCE(?, resultado), "
+    "data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?"
+)
+
+SQL_ATUALIZAR_INSTRUMENTO = (
+    "UPDATE instrumentos SET data_ultima_calibracao = ?, data_proxima_calibracao = ?, "
+    "data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?"
+)
+
+SQL_INSERIR_HISTORICO = (
+    "INSERT INTO historico_instrumentos (instrumento_id, tipo_evento, data_evento, descricao, referencia_id) "
+    "VALUES (?, 'calibracao', ?, ?, ?)"
+)
+
+_agenda = None
+_trava = threading.Lock()
+
+
+def vencimento_instrumento(instrumento):
+    """
+    Data de vencimento da calibração de um instrumento
+
+    Usa data_proxima_calibracao ou, se ausente, a última calibração somada à
+    periodicidade. Instrumentos inativos não têm vencimento.
+
+    Args:
+        instrumento: Linha (ou dicionário) de instrumentos
+
+    Returns:
+        date, ou None se o instrumento não deve ser agendado
+    """
+    if not instrumento['ativo'] or (instrumento['status'] or 'ativo') != 'ativo':
+        return None
+    proxima = para_data(instrumento['data_proxima_calibracao'])
+    if proxima is not None:
+        return proxima
+    ultima = para_data(instrumento['data_ultima_calibracao'])
+    periodicidade = instrumento['periodicidade_calibracao']
+    if ultima is None or not periodicidade:
+        return None
+    return ultima + datetime.timedelta(days=periodicidade)
+
+
+def carregar_agenda(conexao=None):
+    """
+    Monta a agenda de todos os instrumentos com uma única leitura da tabela
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        AgendaCalibracoes
+    """
+    conexao = conexao or obter_conexao()
+    linhas = conexao.execute(SQL_CARREGAR_AGENDA).fetchall()
+    agenda = AgendaCalibracoes(
+        (linha['id'], linha['setor_id'], vencimento_instrumento(linha), linha['criticidade']) for linha in linhas
+    )
+    # As exclusões já refletidas na carga não são relidas na próxima sincronização
+    agenda.revisao = max(
+        (max(linha['revisao_agenda'], linha['revisao_exclusoes'] or 0) for linha in linhas), default=0
+    )
+    return agenda
+
+
+def sincronizar_agenda(agenda, conexao=None):
+    """
+    Incorpora à agenda os instrumentos incluídos, alterados ou excluídos desde a
+    última sincronização
+
+    Uma única consulta indexada, que não retorna linhas se nada mudou.
+
+    Args:
+        agenda: AgendaCalibracoes (carregada por carregar_agenda)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Número de instrumentos atualizados (ou retirados) na agenda
+    """
+    conexao = conexao or obter_conexao()
+    linhas = conexao.execute(SQL_INSTRUMENTOS_ALTERADOS, (agenda.revisao,)).fetchall()
+    for linha in linhas:
+        if linha['excluido']:
+            agenda.remover(linha['id'])
+        else:
+            agenda.definir(linha['id'], vencimento_instrumento(linha), linha['criticidade'], linha['setor_id'])
+    if linhas:
+        agenda.revisao = linhas[-1]['revisao_agenda']
+    return len(linhas)
+
+
+def obter_agenda(conexao=None):
+    """
+    Retorna a agenda compartilhada do processo, carregada no primeiro uso e
+    sincronizada a cada chamada
+
+    O acesso à agenda retornada deve ser feito pela mesma thread ou protegido
+    pelo chamador, como em qualquer estrutura mutável compartilhada.
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+    """
+    global _agenda
+    with _trava:
+        if _agenda is None:
+            _agenda = carregar_agenda(conexao)
+        else:
+            sincronizar_agenda(_agenda, conexao)
+        return _agenda
+
+
+def descartar_agenda():
+    """Descarta a agenda compartilhada (recarregada no próximo obter_agenda)"""
+    global _agenda
+    with _trava:
+        _agenda = None
+
+
+def concluir_calibracao(calibracao_id, data_fim=None, resultado=None, conexao=None, agenda=None):
+    """
+    Conclui uma calibração e reagenda o instrumento calibrado
+
+    Em uma única transação, marca a calibração como concluída, atualiza as datas
+    da última e da próxima calibração do instrumento (data de conclusão somada à
+    periodicidade) e registra o evento no histórico. A agenda é atualizada apenas
+    para o instrumento calibrado.
+
+    Args:
+        calibracao_id: Id da calibração
+        data_fim: Data de conclusão (opcional, padrão: hoje)
+        resultado: Resultado da calibração (opcional, mantém o atual se omitido)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        agenda: Agenda a atualizar (opcional, padrão: a agenda compartilhada, se já carregada)
+
+    Returns:
+        Nova data de vencimento (date), ou None se o instrumento não tiver periodicidade
+    """
+    conexao = conexao or obter_conexao()
+    data_fim = para_data(data_fim) or datetime.date.today()
+
+    with transacao(conexao):
+        calibracao = conexao.execute(SQL_CALIBRACAO, (calibracao_id,)).fetchone()
+        if calibracao is None:
+            raise ValueError(f"Calibração {calibracao_id} não encontrada ou sem instrumento")
+
+        periodicidade = calibracao['periodicidade_calibracao']
+        vencimento = data_fim + datetime.timedelta(days=periodicidade) if periodicidade else None
+
+        conexao.execute(SQL_CONCLUIR_CALIBRACAO, (data_fim.isoformat(), resultado, calibracao_id))
+        conexao.execute(SQL_ATUALIZAR_INSTRUMENTO, (
+            data_fim.isoformat(), vencimento.isoformat() if vencimento else None, calibracao['instrumento_id']
+        ))
+        conexao.execute(SQL_INSERIR_HISTORICO, (
+            calibracao['instrumento_id'], data_fim.isoformat(), f"Calibração {calibracao_id} concluída", calibracao_id
+        ))
+        instrumento = conexao.execute(
+            SQL_INSTRUMENTOS_AGENDA + " WHERE id = ?", (calibracao['instrumento_id'],)
+        ).fetchone()
+
+    agenda = agenda if agenda is not None else _agenda
+    if agenda is not None:
+        # A revisão da agenda não avança: alterações de outros processos anteriores a
+        # esta ainda serão lidas na próxima sincronização
+        agenda.definir(instrumento['id'], vencimento_instrumento(instrumento), instrumento['criticidade'],
+                       instrumento['setor_id'])
+    return vencimento
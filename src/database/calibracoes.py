@@ -0,0 +1,255 @@
+"""
+Persistência de calibrações, pontos de calibração e fontes de incerteza
+Grava uma calibração completa em uma única transação (com inserções em lote)
+e a lê de volta com um número fixo de consultas, independente da quantidade
+de pontos e fontes
+"""
+
+import math
+from contextlib import contextmanager
+
+from database.conexao import obter_conexao, transacao
+from models.orcamento_incremental import OrcamentoIncremental
+from utils.metricas import cronometrar
+
+CAMPOS_CALIBRACAO = (
+    'numero', 'instrumento_id', 'procedimento_id', 'responsavel', 'data_inicio', 'data_fim',
+    'temperatura', 'umidade', 'pressao', 'status', 'resultado', 'observacoes'
+)
+
+CAMPOS_PONTO = (
+    'sequencia', 'valor_referencia', 'valor_lido', 'erro', 'incerteza_padrao',
+    'incerteza_expandida', 'fator_k', 'conforme', 'erro_maximo_permitido', 'observacoes'
+)
+
+# Somas parciais do orçamento e impressão digital das fontes (ver database.recalculo_incremental)
+CAMPOS_ORCAMENTO = ('soma_quadratica', 'soma_welch_satterthwaite', 'impressao_digital')
+
+CAMPOS_FONTE = (
+    'descricao', 'tipo', 'distribuicao', 'valor', 'divisor', 'graus_liberdade',
+    'coeficiente_sensibilidade', 'contribuicao', 'padrao_id'
+)
+
+SQL_INSERIR_CALIBRACAO = (
+    "INSERT INTO calibracoes (numero, instrumento_id, procedimento_id, responsavel, data_inicio, "
+    "data_fim, temperatura, umidade, pressao, status, resultado, observacoes) "
+    "VALUES (:numero, :instrumento_id, :procedimento_id, :responsavel, :data_inicio, :data_fim, "
+    ":temperatura, :umidade, :pressao, :status, :resultado, :observacoes)"
+)
+
+SQL_INSERIR_PONTO = (
+    "INSERT INTO pontos_calibracao (calibracao_id, sequencia, valor_referencia, valor_lido, erro, "
+    "incerteza_padrao, incerteza_expandida, fator_k, conforme, erro_maximo_permitido, observacoes, "
+    "soma_quadratica, soma_welch_satterthwaite, impressao_digital) "
+    "VALUES (:calibracao_id, :sequencia, :valor_referencia, :valor_lido, :erro, :incerteza_padrao, "
+    ":incerteza_expandida, :fator_k, :conforme, :erro_maximo_permitido, :observacoes, :soma_quadratica, "
+    ":soma_welch_satterthwaite, :impressao_digital)"
+)
+
+SQL_IDS_PONTOS = "SELECT id, sequencia FROM pontos_calibracao WHERE calibracao_id = ?"
+
+SQL_INSERIR_FONTE = (
+    "INSERT INTO fontes_incerteza (ponto_calibracao_id, descricao, tipo, distribuicao, valor, "
+    "divisor, graus_liberdade, coeficiente_sensibilidade, contribuicao, padrao_id) "
+    "VALUES (:ponto_calibracao_id, :descricao, :tipo, :distribuicao, :valor, :divisor, "
+    ":graus_liberdade, :coeficiente_sensibilidade, :contribuicao, :padrao_id)"
+)
+
+SQL_INCREMENTAR_VERSAO = (
+    "UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP WHERE id IN ({})"
+)
+
+SQL_SELECIONAR_CALIBRACAO = "SELECT * FROM calibracoes WHERE id = ?"
+
+SQL_SELECIONAR_PONTOS = "SELECT * FROM pontos_calibracao WHERE calibracao_id = ? ORDER BY sequencia, id"
+
+SQL_SELECIONAR_FONTES = (
+    "SELECT f.* FROM fontes_incerteza f "
+    "JOIN pontos_calibracao p ON p.id = f.ponto_calibracao_id "
+    "WHERE p.calibracao_id = ? ORDER BY f.ponto_calibracao_id, f.id"
+)
+
+
+def _valor_banco(valor):
+    """Converte valores numéricos (inclusive escalares NumPy) para tipos aceitos pelo SQLite"""
+    if valor is None or isinstance(valor, (str, bytes)):
+        return valor
+    if isinstance(valor, bool):
+        return int(valor)
+    if hasattr(valor, 'item'):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        # Graus de liberdade infinitos e valores indefinidos são gravados como NULL
+        return None
+    return valor
+
+
+def _linha(registro, campos, **extras):
+    """Monta o dicionário de parâmetros de um INSERT a partir de um registro"""
+    linha = {campo: _valor_banco(registro.get(campo)) for campo in campos}
+    linha.update(extras)
+    return linha
+
+
+def _colunas_orcamento(ponto):
+    """Somas parciais e impressão digital das fontes de um ponto (NULL se o ponto não tem fontes)"""
+    fontes = ponto.get('fontes')
+    if not fontes:
+        return dict.fromkeys(CAMPOS_ORCAMENTO)
+    return dict(zip(CAMPOS_ORCAMENTO, OrcamentoIncremental.de_fontes(fontes).colunas_banco()))
+
+
+@contextmanager
+def versao_dados_em_lote(conexao, calibracao_ids):
+    """
+    Suspende os gatilhos de versão por linha dos pontos e das fontes durante uma
+    gravação em lote e, ao final, incrementa uma única vez a versão das calibrações
+
+    Deve ser usado dentro de uma transação aberta: a suspensão (linha em
+    versao_dados_suspensa, ver a migração 0009) é desfeita antes do COMMIT e nunca
+    é vista por outras conexões.
+
+    Args:
+        conexao: Conexão com a transação aberta
+        calibracao_ids: Conjunto das calibrações gravadas (pode ser preenchido dentro do bloco)
+    """
+    conexao.execute("INSERT INTO versao_dados_suspensa (id) VALUES (1)")
+    try:
+        yield
+    finally:
+        conexao.execute("DELETE FROM versao_dados_suspensa")
+    ids = list(calibracao_ids)
+    for inicio in range(0, len(ids), 500):
+        bloco = ids[inicio:inicio + 500]
+        conexao.execute(SQL_INCREMENTAR_VERSAO.format(', '.join('?' * len(bloco))), bloco)
+
+
+@cronometrar('calibra_banco_segundos', operacao='salvar_calibracao')
+def salvar_calibracao(calibracao, pontos, conexao=None):
+    """
+    Grava uma calibração com todos os seus pontos e fontes de incerteza
+
+    Tudo é gravado em uma única transação: se qualquer inserção falhar, nada é gravado.
+
+    Args:
+        calibracao: Dicionário com os campos da tabela calibracoes
+            (numero e data_inicio obrigatórios)
+        pontos: Lista de dicionários com os campos de pontos_calibracao
+            (sequencia, valor_referencia e valor_lido obrigatórios) e, opcionalmente,
+            'fontes': lista de dicionários com os campos de fontes_incerteza
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Id da calibração gravada
+    """
+    conexao = conexao or obter_conexao()
+    dados_calibracao = _linha(calibracao, CAMPOS_CALIBRACAO)
+    if dados_calibracao['status'] is None:
+        dados_calibracao['status'] = 'em_andamento'
+
+    sequencias = [ponto['sequencia'] for ponto in pontos]
+    if len(set(sequencias)) != len(sequencias):
+        raise ValueError("Os pontos de uma calibração devem ter sequências distintas")
+
+    with transacao(conexao):
+        calibracao_id = conexao.execute(SQL_INSERIR_CALIBRACAO, dados_calibracao).lastrowid
+
+        # A versão dos dados é incrementada uma vez, e não a cada ponto e fonte
+        with versao_dados_em_lote(conexao, [calibracao_id]):
+            conexao.executemany(
+                SQL_INSERIR_PONTO,
+                (
+                    _linha(ponto, CAMPOS_PONTO, calibracao_id=calibracao_id, **_colunas_orcamento(ponto))
+                    for ponto in pontos
+                )
+            )
+
+            # Uma única consulta recupera os ids de todos os pontos recém-inseridos
+            ids_por_sequencia = dict(
+                (sequencia, ponto_id) for ponto_id, sequencia in conexao.execute(SQL_IDS_PONTOS, (calibracao_id,))
+            )
+
+            conexao.executemany(
+                SQL_INSERIR_FONTE,
+                (
+                    _linha(fonte, CAMPOS_FONTE, ponto_calibracao_id=ids_por_sequencia[ponto['sequencia']])
+                    for ponto in pontos
+                    for fonte in ponto.get('fontes', ())
+                )
+            )
+
+    return calibracao_id
+
+
+@cronometrar('calibra_banco_segundos', operacao='carregar_calibracao')
+def carregar_calibracao(calibracao_id, conexao=None):
+    """
+    Lê uma calibração com todos os seus pontos e fontes de incerteza
+
+    São executadas exatamente três consultas, qualquer que seja o número de pontos.
+
+    Args:
+        calibracao_id: Id da calibração
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Dicionário com os campos da calibração e a chave 'pontos' (cada ponto com a
+        chave 'fontes'), ou None se a calibração não existir
+    """
+    conexao = conexao or obter_conexao()
+
+    linha = conexao.execute(SQL_SELECIONAR_CALIBRACAO, (calibracao_id,)).fetchone()
+    if linha is None:
+        return None
+
+    calibracao = dict(linha)
+    pontos = [dict(ponto, fontes=[]) for ponto in conexao.execute(SQL_SELECIONAR_PONTOS, (calibracao_id,))]
+    pontos_por_id = {ponto['id']: ponto for ponto in pontos}
+
+    for fonte in conexao.execute(SQL_SELECIONAR_FONTES, (calibracao_id,)):
+        pontos_por_id[fonte['ponto_calibracao_id']]['fontes'].append(dict(fonte))
+
+    calibracao['pontos'] = pontos
+    return calibracao
+
+
+def fontes_de_resultado(resultado):
+    """
+    Converte o resultado de CalculoMetrologico.calcular_incerteza_completa nas
+    linhas de fontes_incerteza de um ponto
+
+    Args:
+        resultado: Dicionário retornado por calcular_incerteza_completa
+
+    Returns:
+        Lista de dicionários com os campos de fontes_incerteza (a componente
+        Tipo A primeiro, seguida das fontes Tipo B)
+    """
+    incerteza_a = resultado['incerteza_tipo_a']
+    fontes = []
+
+    if incerteza_a['graus_liberdade'] > 0:
+        fontes.append({
+            'descricao': 'Repetibilidade',
+            'tipo': 'A',
+            'distribuicao': 'normal',
+            'valor': incerteza_a['incerteza_padrao'],
+            'divisor': 1.0,
+            'graus_liberdade': incerteza_a['graus_liberdade'],
+            'coeficiente_sensibilidade': 1.0,
+            'contribuicao': incerteza_a['incerteza_padrao']
+        })
+
+    for fonte in resultado['incerteza_tipo_b']['fontes']:
+        fontes.append({
+            'descricao': fonte['fonte'],
+            'tipo': 'B',
+            'distribuicao': fonte['distribuicao'],
+            'valor': fonte['valor'],
+            'divisor': fonte['divisor'],
+            'graus_liberdade': fonte['graus_liberdade'],
+            'coeficiente_sensibilidade': fonte['coeficiente_sensibilidade'],
+            'contribuicao': fonte['contribuicao']
+        })
+
+    return fontes
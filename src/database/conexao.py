@@ -0,0 +1,191 @@
+"""
+Conexões com o banco de dados SQLite do Sistema de Gestão de Calibração
+Mantém uma conexão por thread (reaproveitada entre requisições do mesmo worker),
+configurada em modo WAL para permitir leituras concorrentes às escritas. A
+primeira conexão de cada processo com um banco cria o schema, se necessário, e
+aplica as migrações pendentes.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from database.migracao import aplicar_migracoes, comandos_sql
+
+DIRETORIO_BANCO = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho do banco (pode ser alterado pela variável de ambiente CALIBRA_DB_PATH)
+CAMINHO_BANCO = os.environ.get('CALIBRA_DB_PATH', os.path.join(DIRETORIO_BANCO, 'calibracao.db'))
+
+CAMINHO_SCHEMA = os.path.join(DIRETORIO_BANCO, 'schema_sqlite.sql')
+
+# Quantidade de comandos preparados mantidos em cache por conexão
+COMANDOS_EM_CACHE = 256
+
+# Espera máxima por uma escrita de outra conexão (milissegundos)
+ESPERA_BLOQUEIO_MS = 5000
+
+# Espera máxima na inicialização, enquanto outro processo cria o schema ou aplica migrações
+ESPERA_INICIALIZACAO_MS = 120000
+
+_local = threading.local()
+_conexoes_abertas = []
+_trava = threading.Lock()
+
+# Incrementada a cada fechar_conexoes(), invalidando as conexões das demais threads
+_geracao = 0
+
+# Bancos já inicializados por este processo (ver obter_conexao)
+_bancos_inicializados = set()
+
+
+def _configurar_conexao(conexao):
+    """Aplica as configurações de desempenho e integridade a uma nova conexão"""
+    conexao.row_factory = sqlite3.Row
+    conexao.execute('PRAGMA journal_mode = WAL')
+    conexao.execute('PRAGMA synchronous = NORMAL')
+    conexao.execute('PRAGMA foreign_keys = ON')
+    conexao.execute(f'PRAGMA busy_timeout = {ESPERA_BLOQUEIO_MS}')
+    conexao.execute('PRAGMA cache_size = -16000')
+    conexao.execute('PRAGMA temp_store = MEMORY')
+
+
+def criar_conexao(caminho=None):
+    """
+    Abre uma nova conexão configurada com o banco de dados
+
+    Args:
+        caminho: Caminho do arquivo do banco (opcional, padrão: CAMINHO_BANCO)
+
+    Returns:
+        Conexão sqlite3 em modo de autocommit; as transações são abertas
+        explicitamente por transacao()
+    """
+    conexao = sqlite3.connect(
+        caminho or CAMINHO_BANCO,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=COMANDOS_EM_CACHE
+    )
+    _configurar_conexao(conexao)
+    return conexao
+
+
+def obter_conexao():
+    """
+    Retorna a conexão da thread atual, abrindo-a no primeiro uso
+
+    A conexão é associada ao processo que a abriu: após um fork (como nos
+    workers do gunicorn) uma nova conexão é criada no processo filho. A primeira
+    conexão do processo com cada banco o inicializa (ver inicializar_banco).
+
+    Returns:
+        Conexão sqlite3 da thread atual
+    """
+    conexao = getattr(_local, 'conexao', None)
+    if conexao is None or _local.pid != os.getpid() or _local.geracao != _geracao:
+        caminho = CAMINHO_BANCO
+        conexao = criar_conexao(caminho)
+        if caminho not in _bancos_inicializados:
+            try:
+                inicializar_banco(conexao)
+            except BaseException:
+                conexao.close()
+                raise
+            _bancos_inicializados.add(caminho)
+        _local.conexao = conexao
+        _local.pid = os.getpid()
+        _local.geracao = _geracao
+        with _trava:
+            _conexoes_abertas.append((os.getpid(), conexao))
+    return conexao
+
+
+def fechar_conexoes():
+    """Fecha todas as conexões abertas pelo processo atual"""
+    global _geracao
+    with _trava:
+        _geracao += 1
+        while _conexoes_abertas:
+            pid, conexao = _conexoes_abertas.pop()
+            # Conexões herdadas do processo pai por fork não devem ser usadas no filho
+            if pid != os.getpid():
+                continue
+            try:
+                conexao.close()
+            except sqlite3.Error:
+                pass
+
+
+def configurar_banco(caminho):
+    """
+    Altera o banco de dados usado pelas próximas conexões
+
+    Args:
+        caminho: Caminho do arquivo do banco
+    """
+    global CAMINHO_BANCO
+    fechar_conexoes()
+    CAMINHO_BANCO = caminho
+
+
+@contextmanager
+def transacao(conexao=None, imediata=True):
+    """
+    Executa um bloco de comandos em uma única transação
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        imediata: Se True, reserva a escrita no início (BEGIN IMMEDIATE), evitando
+            falhas de concorrência no meio da transação
+
+    Yields:
+        Conexão com a transação aberta
+    """
+    conexao = conexao or obter_conexao()
+    conexao.execute('BEGIN IMMEDIATE' if imediata else 'BEGIN')
+    try:
+        yield conexao
+    except BaseException:
+        conexao.execute('ROLLBACK')
+        raise
+    else:
+        conexao.execute('COMMIT')
+
+
+def inicializar_banco(conexao=None):
+    """
+    Cria as tabelas do sistema, caso o banco ainda esteja vazio, e aplica as
+    migrações pendentes
+
+    A verificação e a criação do schema são feitas na mesma transação de escrita
+    (BEGIN IMMEDIATE): com vários processos iniciando juntos, apenas o primeiro cria
+    o schema e os demais aguardam até ESPERA_INICIALIZACAO_MS.
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        True se o schema foi criado por esta chamada, False se o banco já estava inicializado
+    """
+    conexao = conexao or obter_conexao()
+    sql_existe = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'calibracoes'"
+
+    conexao.execute(f'PRAGMA busy_timeout = {ESPERA_INICIALIZACAO_MS}')
+    try:
+        criado = False
+        if not conexao.execute(sql_existe).fetchone():
+            with open(CAMINHO_SCHEMA, encoding='utf-8') as arquivo:
+                comandos = comandos_sql(arquivo.read())
+            with transacao(conexao):
+                # Relida na transação: outro processo pode ter criado o schema
+                if not conexao.execute(sql_existe).fetchone():
+                    for comando in comandos:
+                        conexao.execute(comando)
+                    criado = True
+
+        aplicar_migracoes(conexao)
+    finally:
+        conexao.execute(f'PRAGMA busy_timeout = {ESPERA_BLOQUEIO_MS}')
+    return criado
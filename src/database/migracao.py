@@ -0,0 +1,113 @@
+"""
+Migrações versionadas do banco de dados
+Cada arquivo NNNN_descricao.sql em database/migracoes é aplicado uma única vez,
+em ordem, registrando a versão atual do schema em PRAGMA user_version
+
+Cada migração é aplicada em uma transação de escrita (BEGIN IMMEDIATE) que relê a
+versão do schema antes de executá-la: com vários processos iniciando ao mesmo
+tempo (workers web e trabalhadores da fila), apenas o primeiro aplica cada
+migração e os demais aguardam e a encontram já aplicada.
+"""
+
+import os
+import re
+import sqlite3
+
+DIRETORIO_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migracoes')
+
+_PADRAO_ARQUIVO = re.compile(r'^(\d{4})_[\w-]+\.sql$')
+
+
+def listar_migracoes(diretorio=DIRETORIO_MIGRACOES):
+    """
+    Lista as migrações disponíveis, em ordem de versão
+
+    Args:
+        diretorio: Diretório com os arquivos de migração
+
+    Returns:
+        Lista de tuplas (versao, caminho_arquivo)
+    """
+    migracoes = []
+    for nome in os.listdir(diretorio):
+        correspondencia = _PADRAO_ARQUIVO.match(nome)
+        if correspondencia:
+            migracoes.append((int(correspondencia.group(1)), os.path.join(diretorio, nome)))
+    migracoes.sort()
+
+    versoes = [versao for versao, _ in migracoes]
+    if len(set(versoes)) != len(versoes):
+        raise ValueError(f"Há migrações com a mesma versão em {diretorio}")
+
+    return migracoes
+
+
+def comandos_sql(script):
+    """
+    Divide um script SQL em comandos completos, a executar um por vez
+
+    Ao contrário de executescript, que confirma a transação pendente, os comandos
+    podem ser executados dentro de uma transação aberta pelo chamador.
+
+    Args:
+        script: Texto com um ou mais comandos SQL (inclusive gatilhos BEGIN ... END)
+
+    Returns:
+        Lista de comandos
+    """
+    comandos, atual = [], ''
+    for linha in script.splitlines(keepends=True):
+        atual += linha
+        if sqlite3.complete_statement(atual):
+            comandos.append(atual.strip())
+            atual = ''
+    if any(texto.strip() and not texto.strip().startswith('--') for texto in atual.splitlines()):
+        raise ValueError(f"Comando SQL incompleto no fim do script: {atual.strip()[:80]}")
+    return comandos
+
+
+def versao_atual(conexao):
+    """Retorna a versão do schema registrada no banco"""
+    return conexao.execute('PRAGMA user_version').fetchone()[0]
+
+
+def aplicar_migracoes(conexao, diretorio=DIRETORIO_MIGRACOES):
+    """
+    Aplica, cada uma em sua própria transação, as migrações ainda não aplicadas
+
+    Args:
+        conexao: Conexão com o banco de dados (em modo de autocommit, sem transação aberta)
+        diretorio: Diretório com os arquivos de migração
+
+    Returns:
+        Lista com as versões aplicadas nesta chamada
+    """
+    aplicadas = []
+    migracoes = listar_migracoes(diretorio)
+
+    # Banco já atualizado: nenhuma transação de escrita
+    if not migracoes or versao_atual(conexao) >= migracoes[-1][0]:
+        return aplicadas
+
+    for numero, caminho in migracoes:
+        with open(caminho, encoding='utf-8') as arquivo:
+            comandos = comandos_sql(arquivo.read())
+
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            # Relida dentro da transação: outro processo pode ter aplicado a migração
+            if versao_atual(conexao) >= numero:
+                conexao.execute('ROLLBACK')
+                continue
+            for comando in comandos:
+                conexao.execute(comando)
+            conexao.execute(f'PRAGMA user_version = {numero}')
+            conexao.execute('COMMIT')
+        except BaseException:
+            if conexao.in_transaction:
+                conexao.execute('ROLLBACK')
+            raise
+
+        aplicadas.append(numero)
+
+    return aplicadas
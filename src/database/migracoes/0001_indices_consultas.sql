@@ -0,0 +1,22 @@
+-- Índices para as consultas de calibrações vencidas, histórico de instrumentos
+-- e leitura de calibrações com seus pontos, fontes de incerteza e certificados
+
+-- Calibrações vencidas/a vencer (geral e por setor)
+CREATE INDEX IF NOT EXISTS idx_instrumentos_proxima_calibracao
+    ON instrumentos (data_proxima_calibracao);
+CREATE INDEX IF NOT EXISTS idx_instrumentos_setor_proxima_calibracao
+    ON instrumentos (setor_id, data_proxima_calibracao);
+
+-- Histórico do instrumento
+CREATE INDEX IF NOT EXISTS idx_historico_instrumentos_instrumento
+    ON historico_instrumentos (instrumento_id, data_evento);
+CREATE INDEX IF NOT EXISTS idx_calibracoes_instrumento
+    ON calibracoes (instrumento_id, data_inicio);
+
+-- Pontos, fontes de incerteza e certificados de uma calibração
+CREATE INDEX IF NOT EXISTS idx_pontos_calibracao_calibracao
+    ON pontos_calibracao (calibracao_id, sequencia);
+CREATE INDEX IF NOT EXISTS idx_fontes_incerteza_ponto
+    ON fontes_incerteza (ponto_calibracao_id);
+CREATE INDEX IF NOT EXISTS idx_certificados_calibracao
+    ON certificados (calibracao_id);
@@ -0,0 +1,28 @@
+-- Recálculo de calibrações quando o certificado de um padrão é atualizado
+
+-- Fonte de incerteza cujo valor vem de um padrão de referência (incerteza e fator k
+-- do certificado do padrão)
+ALTER TABLE fontes_incerteza ADD COLUMN padrao_id INTEGER REFERENCES padroes(id);
+
+-- Calibrações afetadas por um padrão
+CREATE INDEX IF NOT EXISTS idx_calibracao_padroes_padrao
+    ON calibracao_padroes (padrao_id, calibracao_id);
+
+-- Execuções do recálculo, com a última calibração gravada para retomar execuções interrompidas
+CREATE TABLE IF NOT EXISTS recalculos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    padrao_id INTEGER NOT NULL,
+    incerteza_padrao REAL,
+    fator_k REAL,
+    status TEXT NOT NULL DEFAULT 'em_andamento',
+    total_pontos INTEGER,
+    pontos_processados INTEGER NOT NULL DEFAULT 0,
+    ultima_calibracao_id INTEGER NOT NULL DEFAULT 0,
+    data_inicio TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data_atualizacao TIMESTAMP,
+    data_fim TIMESTAMP,
+    FOREIGN KEY (padrao_id) REFERENCES padroes(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recalculos_padrao_status
+    ON recalculos (padrao_id, status);
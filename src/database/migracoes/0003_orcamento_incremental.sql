@@ -0,0 +1,11 @@
+-- Somas parciais do orçamento de incerteza e impressão digital das entradas de cada
+-- ponto, para recalcular um ponto em tempo constante quando uma fonte é alterada
+
+-- Σ cᵢ² das fontes do ponto (quadrado da incerteza combinada)
+ALTER TABLE pontos_calibracao ADD COLUMN soma_quadratica REAL;
+
+-- Σ cᵢ⁴/νᵢ das fontes com graus de liberdade finitos (denominador de Welch-Satterthwaite)
+ALTER TABLE pontos_calibracao ADD COLUMN soma_welch_satterthwaite REAL;
+
+-- Soma (módulo 2⁶⁴) dos hashes das entradas de cada fonte; NULL até o primeiro cálculo
+ALTER TABLE pontos_calibracao ADD COLUMN impressao_digital INTEGER;
@@ -0,0 +1,59 @@
+-- Modelos de orçamento de incerteza por tipo de instrumento e procedimento
+
+-- Modelo de orçamento; procedimento_id NULL vale para todos os procedimentos do tipo
+-- de instrumento. A revisão é incrementada sempre que as fontes do modelo mudam e,
+-- junto com a versão do procedimento, invalida o modelo compilado em cache
+CREATE TABLE IF NOT EXISTS modelos_orcamento (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo_instrumento_id INTEGER NOT NULL,
+    procedimento_id INTEGER,
+    nome TEXT NOT NULL,
+    revisao INTEGER NOT NULL DEFAULT 1,
+    ativo INTEGER NOT NULL DEFAULT 1,
+    data_criacao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data_atualizacao TIMESTAMP,
+    FOREIGN KEY (tipo_instrumento_id) REFERENCES tipos_instrumentos(id),
+    FOREIGN KEY (procedimento_id) REFERENCES procedimentos(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_modelos_orcamento_tipo_procedimento
+    ON modelos_orcamento (tipo_instrumento_id, procedimento_id);
+
+-- Fontes Tipo B do modelo, na ordem do orçamento; valor_padrao é usado quando o
+-- ponto não informa o valor da fonte
+CREATE TABLE IF NOT EXISTS modelos_orcamento_fontes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    modelo_id INTEGER NOT NULL,
+    ordem INTEGER NOT NULL,
+    descricao TEXT NOT NULL,
+    distribuicao TEXT NOT NULL DEFAULT 'normal',
+    divisor REAL,
+    coeficiente_sensibilidade REAL,
+    graus_liberdade REAL,
+    valor_padrao REAL,
+    FOREIGN KEY (modelo_id) REFERENCES modelos_orcamento(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_modelos_orcamento_fontes_modelo
+    ON modelos_orcamento_fontes (modelo_id, ordem);
+
+CREATE TRIGGER IF NOT EXISTS trg_modelos_orcamento_fontes_insercao
+AFTER INSERT ON modelos_orcamento_fontes
+BEGIN
+    UPDATE modelos_orcamento SET revisao = revisao + 1, data_atualizacao = CURRENT_TIMESTAMP
+    WHERE id = NEW.modelo_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_modelos_orcamento_fontes_alteracao
+AFTER UPDATE ON modelos_orcamento_fontes
+BEGIN
+    UPDATE modelos_orcamento SET revisao = revisao + 1, data_atualizacao = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.modelo_id, NEW.modelo_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_modelos_orcamento_fontes_exclusao
+AFTER DELETE ON modelos_orcamento_fontes
+BEGIN
+    UPDATE modelos_orcamento SET revisao = revisao + 1, data_atualizacao = CURRENT_TIMESTAMP
+    WHERE id = OLD.modelo_id;
+END;
@@ -0,0 +1,24 @@
+-- Revisão dos dados de agendamento dos instrumentos
+-- Cada inserção ou alteração de um campo que afeta o vencimento da calibração
+-- recebe uma revisão crescente; a agenda em memória de cada processo lê apenas
+-- os instrumentos com revisão maior que a última incorporada
+
+ALTER TABLE instrumentos ADD COLUMN revisao_agenda INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_instrumentos_revisao_agenda
+    ON instrumentos (revisao_agenda);
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_agenda_insercao
+AFTER INSERT ON instrumentos
+BEGIN
+    UPDATE instrumentos SET revisao_agenda = (SELECT MAX(revisao_agenda) + 1 FROM instrumentos)
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_agenda_alteracao
+AFTER UPDATE OF setor_id, status, ativo, criticidade, periodicidade_calibracao,
+    data_ultima_calibracao, data_proxima_calibracao ON instrumentos
+BEGIN
+    UPDATE instrumentos SET revisao_agenda = (SELECT MAX(revisao_agenda) + 1 FROM instrumentos)
+    WHERE id = NEW.id;
+END;
@@ -0,0 +1,34 @@
+-- Fila de trabalhos em segundo plano (cálculos em lote, gráficos, certificados e
+-- recálculos), executados por jobs/trabalhador.py fora dos workers web
+
+-- disponivel_em e expira_em são instantes Unix (segundos): o trabalho só pode ser
+-- reservado a partir de disponivel_em (novas tentativas aguardam um intervalo
+-- crescente) e, enquanto em execução, volta à fila se o trabalhador não o concluir
+-- até expira_em
+CREATE TABLE IF NOT EXISTS trabalhos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pendente',
+    prioridade INTEGER NOT NULL DEFAULT 0,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    max_tentativas INTEGER NOT NULL DEFAULT 3,
+    disponivel_em REAL NOT NULL,
+    expira_em REAL,
+    trabalhador TEXT,
+    resultado TEXT,
+    erro TEXT,
+    data_criacao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data_inicio TIMESTAMP,
+    data_fim TIMESTAMP
+);
+
+-- Próximo trabalho pendente, por prioridade e ordem de chegada
+CREATE INDEX IF NOT EXISTS idx_trabalhos_fila
+    ON trabalhos (status, prioridade DESC, id);
+
+-- Trabalhos em execução por tipo (limites de concorrência) e por prazo (trabalhos abandonados)
+CREATE INDEX IF NOT EXISTS idx_trabalhos_status_tipo
+    ON trabalhos (status, tipo);
+CREATE INDEX IF NOT EXISTS idx_trabalhos_status_expiracao
+    ON trabalhos (status, expira_em);
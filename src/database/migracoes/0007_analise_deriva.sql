@@ -0,0 +1,21 @@
+-- Análise de deriva dos instrumentos e recomendação de periodicidade de calibração
+-- (ver jobs/analisar_deriva.py)
+
+-- Erro máximo permitido (EMP) de cada ponto calibrado; pontos sem EMP usam o do instrumento
+ALTER TABLE pontos_calibracao ADD COLUMN erro_maximo_permitido REAL;
+ALTER TABLE instrumentos ADD COLUMN erro_maximo_permitido REAL;
+
+-- Última recomendação de cada instrumento, gravada por cada execução da análise
+-- (dias_ate_limite e periodicidades em dias; deriva_critica em unidade do erro por dia)
+CREATE TABLE IF NOT EXISTS recomendacoes_periodicidade (
+    instrumento_id INTEGER PRIMARY KEY,
+    periodicidade_atual INTEGER,
+    periodicidade_recomendada INTEGER NOT NULL,
+    dias_ate_limite REAL,
+    referencia_critica REAL,
+    deriva_critica REAL,
+    pontos_avaliados INTEGER NOT NULL,
+    aplicada INTEGER NOT NULL DEFAULT 0,
+    data_analise TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (instrumento_id) REFERENCES instrumentos(id)
+);
@@ -0,0 +1,76 @@
+-- Versão dos dados de cada calibração, usada como chave dos resultados e artefatos
+-- em cache (ver utils.cache) e nos cabeçalhos ETag/Last-Modified da API
+-- Qualquer alteração da calibração, dos seus pontos, das fontes de incerteza dos
+-- pontos, dos seus certificados ou dos dados exibidos do instrumento incrementa
+-- versao_dados e registra o instante em data_versao
+
+ALTER TABLE calibracoes ADD COLUMN versao_dados INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE calibracoes ADD COLUMN data_versao TIMESTAMP;
+
+CREATE TRIGGER IF NOT EXISTS trg_calibracoes_versao_alteracao
+AFTER UPDATE ON calibracoes
+WHEN NEW.versao_dados = OLD.versao_dados
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_insercao
+AFTER INSERT ON pontos_calibracao
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = NEW.calibracao_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_alteracao
+AFTER UPDATE ON pontos_calibracao
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.calibracao_id, NEW.calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_exclusao
+AFTER DELETE ON pontos_calibracao
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = OLD.calibracao_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_insercao
+AFTER INSERT ON fontes_incerteza
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = (SELECT calibracao_id FROM pontos_calibracao WHERE id = NEW.ponto_calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_alteracao
+AFTER UPDATE ON fontes_incerteza
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (
+        SELECT calibracao_id FROM pontos_calibracao WHERE id IN (OLD.ponto_calibracao_id, NEW.ponto_calibracao_id)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_exclusao
+AFTER DELETE ON fontes_incerteza
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = (SELECT calibracao_id FROM pontos_calibracao WHERE id = OLD.ponto_calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_certificados_versao_alteracao
+AFTER UPDATE OF numero, calibracao_id, data_emissao, emitido_por, aprovado_por, status, observacoes
+    ON certificados
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.calibracao_id, NEW.calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_versao_calibracoes
+AFTER UPDATE OF codigo, descricao, tipo_id, fabricante, modelo, numero_serie, resolucao, faixa_minima,
+    faixa_maxima, unidade, localizacao, setor_id, erro_maximo_permitido ON instrumentos
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE instrumento_id = NEW.id;
+END;
@@ -0,0 +1,131 @@
+-- Versão dos dados das calibrações (continuação da migração 0008)
+-- Os certificados também exibem dados de outras tabelas: os padrões utilizados
+-- (calibracao_padroes e padroes), o procedimento e o setor e o tipo do
+-- instrumento. A alteração desses dados incrementa a versão das calibrações que
+-- os exibem.
+--
+-- Gravações em lote (importação de pontos) suspendem os gatilhos por linha dos
+-- pontos e das fontes com uma linha em versao_dados_suspensa, incluída e removida
+-- na mesma transação (nunca visível a outras conexões), e incrementam a versão
+-- uma única vez por calibração (ver database.calibracoes.versao_dados_em_lote)
+
+CREATE TABLE IF NOT EXISTS versao_dados_suspensa (
+    id INTEGER PRIMARY KEY CHECK (id = 1)
+);
+
+-- Gatilhos dos pontos e das fontes da migração 0008, agora suspensos em lote
+DROP TRIGGER IF EXISTS trg_pontos_calibracao_versao_insercao;
+DROP TRIGGER IF EXISTS trg_pontos_calibracao_versao_alteracao;
+DROP TRIGGER IF EXISTS trg_pontos_calibracao_versao_exclusao;
+DROP TRIGGER IF EXISTS trg_fontes_incerteza_versao_insercao;
+DROP TRIGGER IF EXISTS trg_fontes_incerteza_versao_alteracao;
+DROP TRIGGER IF EXISTS trg_fontes_incerteza_versao_exclusao;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_insercao
+AFTER INSERT ON pontos_calibracao
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = NEW.calibracao_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_alteracao
+AFTER UPDATE ON pontos_calibracao
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.calibracao_id, NEW.calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pontos_calibracao_versao_exclusao
+AFTER DELETE ON pontos_calibracao
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = OLD.calibracao_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_insercao
+AFTER INSERT ON fontes_incerteza
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = (SELECT calibracao_id FROM pontos_calibracao WHERE id = NEW.ponto_calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_alteracao
+AFTER UPDATE ON fontes_incerteza
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (
+        SELECT calibracao_id FROM pontos_calibracao WHERE id IN (OLD.ponto_calibracao_id, NEW.ponto_calibracao_id)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fontes_incerteza_versao_exclusao
+AFTER DELETE ON fontes_incerteza
+WHEN NOT EXISTS (SELECT 1 FROM versao_dados_suspensa)
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = (SELECT calibracao_id FROM pontos_calibracao WHERE id = OLD.ponto_calibracao_id);
+END;
+
+-- Padrões utilizados em cada calibração
+CREATE TRIGGER IF NOT EXISTS trg_calibracao_padroes_versao_insercao
+AFTER INSERT ON calibracao_padroes
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = NEW.calibracao_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calibracao_padroes_versao_alteracao
+AFTER UPDATE ON calibracao_padroes
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (OLD.calibracao_id, NEW.calibracao_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calibracao_padroes_versao_exclusao
+AFTER DELETE ON calibracao_padroes
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id = OLD.calibracao_id;
+END;
+
+-- Dados exibidos do padrão (ex.: novo certificado)
+CREATE TRIGGER IF NOT EXISTS trg_padroes_versao_calibracoes
+AFTER UPDATE OF codigo, descricao, certificado_numero, certificado_validade, rastreabilidade ON padroes
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE id IN (SELECT calibracao_id FROM calibracao_padroes WHERE padrao_id = NEW.id);
+END;
+
+-- Dados exibidos do procedimento
+CREATE INDEX IF NOT EXISTS idx_calibracoes_procedimento
+    ON calibracoes (procedimento_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_procedimentos_versao_calibracoes
+AFTER UPDATE OF codigo, versao, descricao ON procedimentos
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE procedimento_id = NEW.id;
+END;
+
+-- Nome do setor e do tipo do instrumento
+CREATE INDEX IF NOT EXISTS idx_instrumentos_tipo
+    ON instrumentos (tipo_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_setores_versao_calibracoes
+AFTER UPDATE OF nome ON setores
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE instrumento_id IN (SELECT id FROM instrumentos WHERE setor_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tipos_instrumentos_versao_calibracoes
+AFTER UPDATE OF nome ON tipos_instrumentos
+BEGIN
+    UPDATE calibracoes SET versao_dados = versao_dados + 1, data_versao = CURRENT_TIMESTAMP
+    WHERE instrumento_id IN (SELECT id FROM instrumentos WHERE tipo_id = NEW.id);
+END;
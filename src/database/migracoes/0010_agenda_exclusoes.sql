@@ -0,0 +1,56 @@
+-- Exclusão de instrumentos na agenda de calibrações (continuação da migração 0005)
+-- A exclusão de um instrumento grava uma marca em instrumentos_excluidos_agenda
+-- com uma revisão da mesma sequência de instrumentos.revisao_agenda; a agenda em
+-- memória de cada processo lê as marcas com revisão maior que a última
+-- incorporada e retira esses instrumentos (ver database.agenda_calibracoes).
+--
+-- A próxima revisão passa a considerar também as marcas: sem isso, excluir o
+-- instrumento de maior revisão faria a sequência voltar atrás e uma alteração
+-- posterior poderia receber uma revisão já incorporada pelas agendas.
+
+CREATE TABLE IF NOT EXISTS instrumentos_excluidos_agenda (
+    instrumento_id INTEGER PRIMARY KEY,
+    revisao_agenda INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_instrumentos_excluidos_agenda_revisao
+    ON instrumentos_excluidos_agenda (revisao_agenda);
+
+DROP TRIGGER IF EXISTS trg_instrumentos_agenda_insercao;
+DROP TRIGGER IF EXISTS trg_instrumentos_agenda_alteracao;
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_agenda_insercao
+AFTER INSERT ON instrumentos
+BEGIN
+    UPDATE instrumentos SET revisao_agenda = (
+        SELECT MAX(revisao) + 1 FROM (
+            SELECT MAX(revisao_agenda) AS revisao FROM instrumentos
+            UNION ALL SELECT MAX(revisao_agenda) FROM instrumentos_excluidos_agenda
+        )
+    )
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_agenda_alteracao
+AFTER UPDATE OF setor_id, status, ativo, criticidade, periodicidade_calibracao,
+    data_ultima_calibracao, data_proxima_calibracao ON instrumentos
+BEGIN
+    UPDATE instrumentos SET revisao_agenda = (
+        SELECT MAX(revisao) + 1 FROM (
+            SELECT MAX(revisao_agenda) AS revisao FROM instrumentos
+            UNION ALL SELECT MAX(revisao_agenda) FROM instrumentos_excluidos_agenda
+        )
+    )
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_instrumentos_agenda_exclusao
+AFTER DELETE ON instrumentos
+BEGIN
+    INSERT OR REPLACE INTO instrumentos_excluidos_agenda (instrumento_id, revisao_agenda)
+    SELECT OLD.id, MAX(revisao) + 1 FROM (
+        SELECT MAX(revisao_agenda) AS revisao FROM instrumentos
+        UNION ALL SELECT MAX(revisao_agenda) FROM instrumentos_excluidos_agenda
+        UNION ALL SELECT OLD.revisao_agenda
+    );
+END;
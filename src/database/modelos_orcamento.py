@@ -0,0 +1,159 @@
+"""
+Persistência e cache dos modelos de orçamento de incerteza
+Cada modelo (tabelas modelos_orcamento e modelos_orcamento_fontes) é compilado
+uma única vez em um ModeloOrcamento e mantido em um cache LRU. A cada consulta,
+uma única leitura indexada obtém a revisão do modelo e a versão do procedimento;
+se qualquer uma mudou, o modelo é recompilado.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from database.conexao import obter_conexao, transacao
+from models.orcamento_modelo import ModeloOrcamento
+
+# Número máximo de modelos compilados mantidos em memória
+CAPACIDADE_CACHE = int(os.environ.get('CALIBRA_CACHE_MODELOS', '128'))
+
+# Modelo do procedimento, ou o modelo genérico do tipo de instrumento (procedimento_id NULL)
+SQL_VERSAO_MODELO = (
+    "SELECT m.id, m.revisao, p.versao FROM modelos_orcamento m "
+    "LEFT JOIN procedimentos p ON p.id = m.procedimento_id "
+    "WHERE m.tipo_instrumento_id = ? AND (m.procedimento_id = ? OR m.procedimento_id IS NULL) "
+    "AND m.ativo = 1 ORDER BY m.procedimento_id IS NULL, m.id DESC LIMIT 1"
+)
+
+SQL_FONTES_MODELO = (
+    "SELECT descricao, distribuicao, divisor, coeficiente_sensibilidade, graus_liberdade, valor_padrao "
+    "FROM modelos_orcamento_fontes WHERE modelo_id = ? ORDER BY ordem, id"
+)
+
+SQL_INSERIR_MODELO = (
+    "INSERT INTO modelos_orcamento (tipo_instrumento_id, procedimento_id, nome) VALUES (?, ?, ?)"
+)
+
+SQL_INSERIR_FONTE = (
+    "INSERT INTO modelos_orcamento_fontes (modelo_id, ordem, descricao, distribuicao, divisor, "
+    "coeficiente_sensibilidade, graus_liberdade, valor_padrao) "
+    "VALUES (:modelo_id, :ordem, :descricao, :distribuicao, :divisor, :coeficiente_sensibilidade, "
+    ":graus_liberdade, :valor_padrao)"
+)
+
+
+class CacheModelos:
+    """Cache LRU de modelos compilados, indexado pelo id do modelo"""
+
+    def __init__(self, capacidade=CAPACIDADE_CACHE):
+        """
+        Args:
+            capacidade: Número máximo de modelos mantidos
+        """
+        self.capacidade = capacidade
+        self._modelos = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.compilacoes = 0
+
+    def obter(self, modelo_id, versao, compilar):
+        """
+        Retorna o modelo compilado, compilando-o se não estiver no cache ou se a versão mudou
+
+        Args:
+            modelo_id: Id do modelo
+            versao: Versão atual (revisão do modelo e versão do procedimento)
+            compilar: Função sem argumentos que retorna o ModeloOrcamento compilado
+        """
+        with self._trava:
+            entrada = self._modelos.get(modelo_id)
+            if entrada is not None and entrada[0] == versao:
+                self._modelos.move_to_end(modelo_id)
+                self.acertos += 1
+                return entrada[1]
+
+        modelo = compilar()
+        with self._trava:
+            self.compilacoes += 1
+            self._modelos[modelo_id] = (versao, modelo)
+            self._modelos.move_to_end(modelo_id)
+            while len(self._modelos) > self.capacidade:
+                self._modelos.popitem(last=False)
+        return modelo
+
+    def invalidar(self, modelo_id=None):
+        """Descarta um modelo (ou todos, se modelo_id for None)"""
+        with self._trava:
+            if modelo_id is None:
+                self._modelos.clear()
+            else:
+                self._modelos.pop(modelo_id, None)
+
+    def __len__(self):
+        return len(self._modelos)
+
+
+cache_modelos = CacheModelos()
+
+
+def obter_modelo(tipo_instrumento_id, procedimento_id=None, conexao=None, cache=None):
+    """
+    Retorna o modelo de orçamento compilado de um tipo de instrumento e procedimento
+
+    O modelo específico do procedimento tem prioridade sobre o modelo genérico do
+    tipo de instrumento.
+
+    Args:
+        tipo_instrumento_id: Id do tipo de instrumento
+        procedimento_id: Id do procedimento (opcional)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        cache: CacheModelos a usar (opcional, padrão: cache compartilhado do módulo)
+
+    Returns:
+        ModeloOrcamento, ou None se não houver modelo ativo
+    """
+    conexao = conexao or obter_conexao()
+    cache = cache if cache is not None else cache_modelos
+
+    linha = conexao.execute(SQL_VERSAO_MODELO, (tipo_instrumento_id, procedimento_id)).fetchone()
+    if linha is None:
+        return None
+    modelo_id, revisao, versao_procedimento = linha
+
+    def compilar():
+        return ModeloOrcamento([dict(fonte) for fonte in conexao.execute(SQL_FONTES_MODELO, (modelo_id,))])
+
+    return cache.obter(modelo_id, (revisao, versao_procedimento), compilar)
+
+
+def salvar_modelo(tipo_instrumento_id, nome, fontes, procedimento_id=None, conexao=None):
+    """
+    Grava um modelo de orçamento com as suas fontes, em uma única transação
+
+    Args:
+        tipo_instrumento_id: Id do tipo de instrumento
+        nome: Nome do modelo
+        fontes: Lista de dicionários, na ordem do orçamento, com descricao e, opcionalmente,
+            distribuicao, divisor, coeficiente_sensibilidade, graus_liberdade e valor_padrao
+        procedimento_id: Id do procedimento (opcional; None vale para todos os procedimentos)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Id do modelo gravado
+    """
+    conexao = conexao or obter_conexao()
+    with transacao(conexao):
+        modelo_id = conexao.execute(SQL_INSERIR_MODELO, (tipo_instrumento_id, procedimento_id, nome)).lastrowid
+        conexao.executemany(SQL_INSERIR_FONTE, (
+            {
+                'modelo_id': modelo_id,
+                'ordem': ordem,
+                'descricao': fonte['descricao'],
+                'distribuicao': fonte.get('distribuicao') or 'normal',
+                'divisor': fonte.get('divisor'),
+                'coeficiente_sensibilidade': fonte.get('coeficiente_sensibilidade'),
+                'graus_liberdade': fonte.get('graus_liberdade'),
+                'valor_padrao': fonte.get('valor_padrao')
+            }
+            for ordem, fonte in enumerate(fontes, 1)
+        ))
+    return modelo_id
@@ -0,0 +1,344 @@
+"""
+Recálculo incremental de pontos de calibração
+Cada ponto guarda as somas parciais do seu orçamento de incerteza e a impressão
+digital das entradas (ver models.orcamento_incremental). Ao alterar, incluir ou
+remover uma fonte, ou ao corrigir as leituras de um ponto, apenas aquele ponto é
+recalculado, a partir das somas gravadas e sem reler as demais fontes; a fonte e
+o ponto são gravados na mesma transação.
+
+Pontos gravados antes das somas existirem (ou alterados por fora destas funções)
+são detectados pela impressão digital e recalculados por sincronizar_calibracao.
+
+A conformidade do ponto é reavaliada junto com a incerteza (regra de decisão
+padrão de models.conformidade) quando o ponto tem erro e erro máximo permitido;
+sem eles, fica nula (não avaliada).
+"""
+
+from database.conexao import obter_conexao, transacao
+from models.calculo_metrologico import CalculoMetrologico
+from models.conformidade import avaliar_conformidade_lote
+from models.orcamento_incremental import OrcamentoIncremental, de_inteiro_banco
+
+# Campos de fontes_incerteza que podem ser alterados por atualizar_fonte
+CAMPOS_EDITAVEIS = (
+    'descricao', 'distribuicao', 'valor', 'divisor', 'graus_liberdade', 'coeficiente_sensibilidade'
+)
+
+SQL_FONTE = (
+    "SELECT f.*, p.soma_quadratica, p.soma_welch_satterthwaite, p.impressao_digital "
+    "FROM fontes_incerteza f JOIN pontos_calibracao p ON p.id = f.ponto_calibracao_id "
+    "WHERE f.id = ?"
+)
+
+SQL_PONTO = "SELECT * FROM pontos_calibracao WHERE id = ?"
+
+SQL_ERRO_PONTO = "SELECT erro, erro_maximo_permitido FROM pontos_calibracao WHERE id = ?"
+
+SQL_FONTES_PONTO = "SELECT * FROM fontes_incerteza WHERE ponto_calibracao_id = ? ORDER BY id"
+
+SQL_FONTE_TIPO_A = (
+    "SELECT * FROM fontes_incerteza WHERE ponto_calibracao_id = ? AND tipo = 'A' ORDER BY id LIMIT 1"
+)
+
+SQL_ATUALIZAR_FONTE = (
+    "UPDATE fontes_incerteza SET descricao = :descricao, distribuicao = :distribuicao, valor = :valor, "
+    "divisor = :divisor, graus_liberdade = :graus_liberdade, "
+    "coeficiente_sensibilidade = :coeficiente_sensibilidade, contribuicao = :contribuicao, "
+    "data_atualizacao = CURRENT_TIMESTAMP WHERE id = :id"
+)
+
+SQL_INSERIR_FONTE = (
+    "INSERT INTO fontes_incerteza (ponto_calibracao_id, descricao, tipo, distribuicao, valor, "
+    "divisor, graus_liberdade, coeficiente_sensibilidade, contribuicao, padrao_id) "
+    "VALUES (:ponto_calibracao_id, :descricao, :tipo, :distribuicao, :valor, :divisor, "
+    ":graus_liberdade, :coeficiente_sensibilidade, :contribuicao, :padrao_id)"
+)
+
+SQL_ATUALIZAR_PONTO = (
+    "UPDATE pontos_calibracao SET incerteza_padrao = ?, incerteza_expandida = ?, fator_k = ?, conforme = ?, "
+    "soma_quadratica = ?, soma_welch_satterthwaite = ?, impressao_digital = ?, "
+    "data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?"
+)
+
+SQL_PONTOS_CALIBRACAO = "SELECT * FROM pontos_calibracao WHERE calibracao_id = ? ORDER BY sequencia, id"
+
+SQL_FONTES_CALIBRACAO = (
+    "SELECT f.* FROM fontes_incerteza f "
+    "JOIN pontos_calibracao p ON p.id = f.ponto_calibracao_id "
+    "WHERE p.calibracao_id = ? ORDER BY f.ponto_calibracao_id, f.id"
+)
+
+
+def nivel_confianca_configurado(conexao=None):
+    """Nível de confiança configurado (configuração em %, padrão 95%)"""
+    conexao = conexao or obter_conexao()
+    linha = conexao.execute("SELECT valor FROM configuracoes WHERE chave = 'nivel_confianca_padrao'").fetchone()
+    return float(linha[0]) / 100 if linha and linha[0] else 0.95
+
+
+def conformidade_pontos(erros, incertezas_expandidas, fatores_k, erros_maximos):
+    """
+    Reavalia a conformidade de pontos recalculados
+
+    Args:
+        erros: Erros de medição dos pontos (None onde não há erro)
+        incertezas_expandidas: Incertezas expandidas recalculadas
+        fatores_k: Fatores de abrangência recalculados
+        erros_maximos: Erros máximos permitidos (None onde não há EMP)
+
+    Returns:
+        Lista com o valor da coluna conforme de cada ponto: 1, 0 ou None (não avaliado)
+    """
+    avaliaveis = [i for i, (erro, emp) in enumerate(zip(erros, erros_maximos))
+                  if erro is not None and emp is not None]
+    conformes = [None] * len(erros)
+    if avaliaveis:
+        avaliacao = avaliar_conformidade_lote(
+            [erros[i] for i in avaliaveis], [incertezas_expandidas[i] for i in avaliaveis],
+            [erros_maximos[i] for i in avaliaveis], fator_k=[fatores_k[i] for i in avaliaveis]
+        )
+        for i, conforme in zip(avaliaveis, avaliacao['conforme'].tolist()):
+            conformes[i] = int(conforme)
+    return conformes
+
+
+def _calculo(conexao, calc):
+    return calc if calc is not None else CalculoMetrologico(nivel_confianca=nivel_confianca_configurado(conexao))
+
+
+def _contribuicao(fonte, calc):
+    """Contribuição de uma fonte (valor / divisor × coeficiente de sensibilidade)"""
+    divisor = fonte.get('divisor')
+    if divisor is None:
+        divisor = calc._divisor_distribuicao(fonte.get('distribuicao') or 'normal')
+    coeficiente = fonte.get('coeficiente_sensibilidade')
+    return fonte['valor'] / divisor * (1.0 if coeficiente is None else coeficiente)
+
+
+def _orcamento_gravado(conexao, ponto_id, linha):
+    """
+    Orçamento do ponto a partir das somas gravadas em linha, ou reconstruído a partir
+    das fontes se o ponto ainda não tem somas
+    """
+    if linha['soma_quadratica'] is None or linha['impressao_digital'] is None:
+        return OrcamentoIncremental.de_fontes(map(dict, conexao.execute(SQL_FONTES_PONTO, (ponto_id,))))
+    return OrcamentoIncremental(
+        linha['soma_quadratica'],
+        linha['soma_welch_satterthwaite'] or 0.0,
+        de_inteiro_banco(linha['impressao_digital'])
+    )
+
+
+def _gravar_ponto(conexao, ponto_id, orcamento, calc):
+    """
+    Grava os resultados, a conformidade reavaliada e as somas parciais do ponto,
+    reconstruindo as somas se perderam precisão
+    """
+    if orcamento.impreciso:
+        orcamento = OrcamentoIncremental.de_fontes(map(dict, conexao.execute(SQL_FONTES_PONTO, (ponto_id,))))
+
+    resultado = orcamento.resultado(calc)
+    erro, erro_maximo = conexao.execute(SQL_ERRO_PONTO, (ponto_id,)).fetchone()
+    resultado['conforme'], = conformidade_pontos(
+        [erro], [resultado['incerteza_expandida']], [resultado['fator_k']], [erro_maximo]
+    )
+    conexao.execute(SQL_ATUALIZAR_PONTO, (
+        resultado['incerteza_combinada'], resultado['incerteza_expandida'], resultado['fator_k'],
+        resultado['conforme'], *orcamento.colunas_banco(), ponto_id
+    ))
+    resultado['ponto_id'] = ponto_id
+    return resultado
+
+
+def atualizar_fonte(fonte_id, alteracoes, conexao=None, calc=None):
+    """
+    Altera uma fonte de incerteza e recalcula apenas o ponto a que ela pertence
+
+    Args:
+        fonte_id: Id da fonte
+        alteracoes: Dicionário com os novos valores (campos de CAMPOS_EDITAVEIS)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        calc: Instância de CalculoMetrologico (opcional, padrão: nível de confiança configurado)
+
+    Returns:
+        Dicionário com ponto_id, incerteza_combinada, graus_liberdade_efetivos, fator_k,
+        incerteza_expandida e conforme do ponto recalculado
+    """
+    invalidos = set(alteracoes) - set(CAMPOS_EDITAVEIS)
+    if invalidos:
+        raise ValueError(f"Campos não editáveis: {', '.join(sorted(invalidos))}")
+
+    conexao = conexao or obter_conexao()
+    calc = _calculo(conexao, calc)
+
+    with transacao(conexao):
+        linha = conexao.execute(SQL_FONTE, (fonte_id,)).fetchone()
+        if linha is None:
+            raise ValueError(f"Fonte de incerteza não encontrada: {fonte_id}")
+
+        antiga = dict(linha)
+        nova = dict(antiga, **alteracoes)
+        nova['contribuicao'] = _contribuicao(nova, calc)
+        ponto_id = antiga['ponto_calibracao_id']
+
+        # Somas lidas (ou reconstruídas) antes do UPDATE: ainda incluem a fonte antiga
+        orcamento = _orcamento_gravado(conexao, ponto_id, linha)
+        conexao.execute(SQL_ATUALIZAR_FONTE, nova)
+        return _gravar_ponto(conexao, ponto_id, orcamento.substituir_fonte(antiga, nova), calc)
+
+
+def adicionar_fonte(ponto_id, fonte, conexao=None, calc=None):
+    """
+    Inclui uma fonte de incerteza em um ponto e recalcula apenas esse ponto
+
+    Args:
+        ponto_id: Id do ponto de calibração
+        fonte: Dicionário com os campos de fontes_incerteza (descricao, tipo e valor obrigatórios)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        calc: Instância de CalculoMetrologico (opcional)
+
+    Returns:
+        Dicionário com os resultados do ponto (como atualizar_fonte) e o fonte_id criado
+    """
+    conexao = conexao or obter_conexao()
+    calc = _calculo(conexao, calc)
+
+    with transacao(conexao):
+        linha = conexao.execute(SQL_PONTO, (ponto_id,)).fetchone()
+        if linha is None:
+            raise ValueError(f"Ponto de calibração não encontrado: {ponto_id}")
+
+        orcamento = _orcamento_gravado(conexao, ponto_id, linha)
+        nova = {campo: fonte.get(campo) for campo in CAMPOS_EDITAVEIS + ('tipo', 'padrao_id')}
+        nova['ponto_calibracao_id'] = ponto_id
+        nova['contribuicao'] = _contribuicao(nova, calc)
+        fonte_id = conexao.execute(SQL_INSERIR_FONTE, nova).lastrowid
+
+        resultado = _gravar_ponto(conexao, ponto_id, orcamento.adicionar_fonte(nova), calc)
+        resultado['fonte_id'] = fonte_id
+        return resultado
+
+
+def remover_fonte(fonte_id, conexao=None, calc=None):
+    """
+    Remove uma fonte de incerteza e recalcula apenas o ponto a que ela pertencia
+
+    Returns:
+        Dicionário com os resultados do ponto (como atualizar_fonte)
+    """
+    conexao = conexao or obter_conexao()
+    calc = _calculo(conexao, calc)
+
+    with transacao(conexao):
+        linha = conexao.execute(SQL_FONTE, (fonte_id,)).fetchone()
+        if linha is None:
+            raise ValueError(f"Fonte de incerteza não encontrada: {fonte_id}")
+
+        ponto_id = linha['ponto_calibracao_id']
+        orcamento = _orcamento_gravado(conexao, ponto_id, linha)
+        conexao.execute("DELETE FROM fontes_incerteza WHERE id = ?", (fonte_id,))
+        return _gravar_ponto(conexao, ponto_id, orcamento.remover_fonte(dict(linha)), calc)
+
+
+def atualizar_leituras(ponto_id, valores_medidos, conexao=None, calc=None):
+    """
+    Substitui as leituras de um ponto: atualiza o valor lido, o erro e a fonte de
+    repetibilidade (Tipo A) e recalcula apenas esse ponto
+
+    Args:
+        ponto_id: Id do ponto de calibração
+        valores_medidos: Novas leituras do ponto
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        calc: Instância de CalculoMetrologico (opcional)
+
+    Returns:
+        Dicionário com os resultados do ponto (como atualizar_fonte), valor_lido e erro
+    """
+    if len(valores_medidos) == 0:
+        raise ValueError("Informe ao menos uma leitura")
+
+    conexao = conexao or obter_conexao()
+    calc = _calculo(conexao, calc)
+    incerteza_a = calc.calcular_incerteza_tipo_a(valores_medidos)
+
+    with transacao(conexao):
+        linha = conexao.execute(SQL_PONTO, (ponto_id,)).fetchone()
+        if linha is None:
+            raise ValueError(f"Ponto de calibração não encontrado: {ponto_id}")
+
+        valor_lido = incerteza_a['media'] if len(valores_medidos) > 1 else float(valores_medidos[0])
+        erro = calc.calcular_erro(valor_lido, linha['valor_referencia'])
+        conexao.execute(
+            "UPDATE pontos_calibracao SET valor_lido = ?, erro = ? WHERE id = ?", (valor_lido, erro, ponto_id)
+        )
+
+        orcamento = _orcamento_gravado(conexao, ponto_id, linha)
+        antiga = conexao.execute(SQL_FONTE_TIPO_A, (ponto_id,)).fetchone()
+        tem_repetibilidade = incerteza_a['graus_liberdade'] > 0
+
+        if antiga is not None:
+            orcamento.remover_fonte(dict(antiga))
+            if tem_repetibilidade:
+                nova = dict(antiga, valor=incerteza_a['incerteza_padrao'], divisor=1.0,
+                            graus_liberdade=incerteza_a['graus_liberdade'], coeficiente_sensibilidade=1.0)
+                nova['contribuicao'] = nova['valor']
+                conexao.execute(SQL_ATUALIZAR_FONTE, nova)
+                orcamento.adicionar_fonte(nova)
+            else:
+                conexao.execute("DELETE FROM fontes_incerteza WHERE id = ?", (antiga['id'],))
+        elif tem_repetibilidade:
+            nova = {
+                'ponto_calibracao_id': ponto_id,
+                'descricao': 'Repetibilidade',
+                'tipo': 'A',
+                'distribuicao': 'normal',
+                'valor': incerteza_a['incerteza_padrao'],
+                'divisor': 1.0,
+                'graus_liberdade': incerteza_a['graus_liberdade'],
+                'coeficiente_sensibilidade': 1.0,
+                'contribuicao': incerteza_a['incerteza_padrao'],
+                'padrao_id': None
+            }
+            conexao.execute(SQL_INSERIR_FONTE, nova)
+            orcamento.adicionar_fonte(nova)
+
+        resultado = _gravar_ponto(conexao, ponto_id, orcamento, calc)
+        resultado['valor_lido'] = valor_lido
+        resultado['erro'] = erro
+        return resultado
+
+
+def sincronizar_calibracao(calibracao_id, conexao=None, calc=None):
+    """
+    Recalcula os pontos de uma calibração cujas fontes não correspondem mais à
+    impressão digital gravada (pontos antigos, sem somas, ou alterados diretamente
+    no banco); os demais pontos não são regravados
+
+    Args:
+        calibracao_id: Id da calibração
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        calc: Instância de CalculoMetrologico (opcional)
+
+    Returns:
+        Lista com os ids dos pontos recalculados
+    """
+    conexao = conexao or obter_conexao()
+    calc = _calculo(conexao, calc)
+
+    with transacao(conexao):
+        pontos = conexao.execute(SQL_PONTOS_CALIBRACAO, (calibracao_id,)).fetchall()
+        orcamentos = {ponto['id']: OrcamentoIncremental() for ponto in pontos}
+        for fonte in conexao.execute(SQL_FONTES_CALIBRACAO, (calibracao_id,)):
+            orcamentos[fonte['ponto_calibracao_id']].adicionar_fonte(dict(fonte))
+
+        recalculados = []
+        for ponto in pontos:
+            orcamento = orcamentos[ponto['id']]
+            gravada = ponto['impressao_digital']
+            if gravada is not None and de_inteiro_banco(gravada) == orcamento.impressao \
+               and ponto['soma_quadratica'] is not None:
+                continue
+            _gravar_ponto(conexao, ponto['id'], orcamento, calc)
+            recalculados.append(ponto['id'])
+
+    return recalculados
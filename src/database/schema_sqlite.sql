@@ -229,7 +229,7 @@ CREATE TABLE IF NOT EXISTS configuracoes (
 );
 
 -- Inserir configurações iniciais
-INSERT INTO configuracoes (chave, valor, descricao) VALUES
+INSERT OR IGNORE INTO configuracoes (chave, valor, descricao) VALUES
 ('nome_empresa', 'Empresa de Calibração', 'Nome da empresa'),
 ('logo_empresa', 'logo.png', 'Caminho para o logo da empresa'),
 ('endereco_empresa', 'Rua Exemplo, 123', 'Endereço da empresa'),
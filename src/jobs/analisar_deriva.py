@@ -0,0 +1,221 @@
+"""
+Análise de deriva da frota e recomendação de periodicidade de calibração
+Lê de uma só vez o histórico de erros de todas as calibrações concluídas dos
+instrumentos ativos (pontos_calibracao com a data da calibração), ajusta a
+deriva de cada instrumento e ponto (ver models.analise_deriva) e grava a
+periodicidade recomendada de cada instrumento em recomendacoes_periodicidade.
+As recomendações só alteram instrumentos.periodicidade_calibracao quando
+aplicadas (--aplicar ou aplicar_recomendacoes), após revisão.
+
+O histórico é lido por uma única consulta e convertido direto em vetores NumPy,
+sem consulta nem objeto Python por instrumento.
+
+Uso (a partir do diretório src):
+    python jobs/analisar_deriva.py
+    python jobs/analisar_deriva.py --min-calibracoes 4 --fracao-seguranca 0.7
+    python jobs/analisar_deriva.py --aplicar
+"""
+
+import os
+import sys
+import time
+from itertools import chain
+
+# Permitir a execução direta do script (python jobs/analisar_deriva.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from database.conexao import obter_conexao, transacao
+from models.analise_deriva import (
+    FRACAO_SEGURANCA, MIN_CALIBRACOES, ajustar_derivas, recomendar_periodicidades
+)
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas na primeira análise
+np = importar_tardio('numpy')
+
+# EMP e periodicidade ausentes são lidos como -1 e convertidos em NaN
+SQL_HISTORICO_ERROS = (
+    "SELECT c.instrumento_id, julianday(COALESCE(c.data_fim, c.data_inicio)), p.valor_referencia, "
+    "COALESCE(p.erro, p.valor_lido - p.valor_referencia), IFNULL(p.incerteza_expandida, 0), "
+    "IFNULL(COALESCE(p.erro_maximo_permitido, i.erro_maximo_permitido), -1), p.sequencia "
+    "FROM pontos_calibracao p "
+    "JOIN calibracoes c ON c.id = p.calibracao_id "
+    "JOIN instrumentos i ON i.id = c.instrumento_id "
+    "WHERE c.status = 'concluida' AND i.ativo = 1 AND COALESCE(i.status, 'ativo') = 'ativo' "
+    "AND julianday(COALESCE(c.data_fim, c.data_inicio)) IS NOT NULL"
+)
+
+SQL_INSTRUMENTOS = (
+    "SELECT id, IFNULL(periodicidade_calibracao, -1) FROM instrumentos "
+    "WHERE ativo = 1 AND COALESCE(status, 'ativo') = 'ativo' ORDER BY id"
+)
+
+SQL_GRAVAR_RECOMENDACAO = (
+    "INSERT INTO recomendacoes_periodicidade (instrumento_id, periodicidade_atual, periodicidade_recomendada, "
+    "dias_ate_limite, referencia_critica, deriva_critica, pontos_avaliados) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+SQL_APLICAR = (
+    "UPDATE instrumentos SET periodicidade_calibracao = ("
+    "SELECT periodicidade_recomendada FROM recomendacoes_periodicidade r WHERE r.instrumento_id = instrumentos.id"
+    "), data_atualizacao = CURRENT_TIMESTAMP "
+    "WHERE id IN (SELECT instrumento_id FROM recomendacoes_periodicidade WHERE aplicada = 0 {filtro})"
+)
+
+
+def _vetores(conexao, sql, colunas):
+    """Executa uma consulta numérica e devolve as colunas como vetores float"""
+    cursor = conexao.cursor()
+    cursor.row_factory = None
+    dados = np.fromiter(chain.from_iterable(cursor.execute(sql)), dtype=float)
+    return dados.reshape(-1, colunas).T
+
+
+def carregar_historico_erros(conexao=None):
+    """
+    Histórico de erros de todas as calibrações concluídas dos instrumentos ativos
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Dicionário de vetores com um elemento por ponto calibrado: instrumento, tempo
+        (dia juliano da calibração), referencia, erro, incerteza_expandida,
+        erro_maximo_permitido (NaN se não definido) e ponto (sequência do ponto na calibração)
+    """
+    conexao = conexao or obter_conexao()
+    instrumento, tempo, referencia, erro, incerteza, emp, ponto = _vetores(conexao, SQL_HISTORICO_ERROS, 7)
+    return {
+        'instrumento': instrumento.astype(np.int64),
+        'tempo': tempo,
+        'referencia': referencia,
+        'erro': erro,
+        'incerteza_expandida': incerteza,
+        'erro_maximo_permitido': np.where(emp < 0, np.nan, emp),
+        'ponto': ponto.astype(np.int64)
+    }
+
+
+def analisar_deriva(conexao=None, gravar=True, min_calibracoes=MIN_CALIBRACOES,
+                    fracao_seguranca=FRACAO_SEGURANCA, fator_incerteza_deriva=1.0):
+    """
+    Analisa a deriva de todos os instrumentos ativos e recomenda as periodicidades
+
+    Args:
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        gravar: Se True, substitui as recomendações gravadas pelas desta análise
+        min_calibracoes: Calibrações mínimas de um ponto para estimar a deriva
+        fracao_seguranca: Fração do prazo previsto até o limite adotada como periodicidade
+        fator_incerteza_deriva: Múltiplos da incerteza da deriva somados à deriva estimada
+
+    Returns:
+        Dicionário com as recomendações (vetores de recomendar_periodicidades) e o resumo:
+        instrumentos, pontos_avaliados, recomendacoes, reduzir, aumentar e tempo (s)
+    """
+    conexao = conexao or obter_conexao()
+    inicio = time.perf_counter()
+
+    historico = carregar_historico_erros(conexao)
+    ids, periodicidade = _vetores(conexao, SQL_INSTRUMENTOS, 2)
+    derivas = ajustar_derivas(
+        historico['instrumento'], historico['tempo'], historico['referencia'], historico['erro'],
+        historico['incerteza_expandida'], historico['erro_maximo_permitido'],
+        min_calibracoes=min_calibracoes, fator_incerteza_deriva=fator_incerteza_deriva,
+        ponto=historico['ponto']
+    )
+    recomendacoes = recomendar_periodicidades(
+        derivas, ids.astype(np.int64), np.where(periodicidade < 0, np.nan, periodicidade),
+        fracao_seguranca=fracao_seguranca
+    )
+
+    com_recomendacao = ~np.isnan(recomendacoes['periodicidade_recomendada'])
+    if gravar:
+        _gravar_recomendacoes(conexao, recomendacoes, com_recomendacao)
+
+    atual = recomendacoes['periodicidade_atual']
+    recomendada = recomendacoes['periodicidade_recomendada']
+    with np.errstate(invalid='ignore'):
+        reduzir = int(np.sum(recomendada < atual))
+        aumentar = int(np.sum(recomendada > atual))
+    return {
+        'recomendacoes': recomendacoes,
+        'resumo': {
+            'instrumentos': len(ids),
+            'pontos_avaliados': int(np.sum(~np.isnan(derivas['dias_ate_limite']))),
+            'recomendacoes': int(np.sum(com_recomendacao)),
+            'reduzir': reduzir,
+            'aumentar': aumentar,
+            'tempo': time.perf_counter() - inicio
+        }
+    }
+
+
+def _nulo(vetor):
+    """Vetor como lista Python, com NaN e infinito como None (NULL)"""
+    return [valor if np.isfinite(valor) else None for valor in vetor.tolist()]
+
+
+def _gravar_recomendacoes(conexao, recomendacoes, selecao):
+    linhas = zip(
+        recomendacoes['instrumento'][selecao].tolist(),
+        [int(v) if v is not None else None for v in _nulo(recomendacoes['periodicidade_atual'][selecao])],
+        recomendacoes['periodicidade_recomendada'][selecao].astype(int).tolist(),
+        _nulo(recomendacoes['dias_ate_limite'][selecao]),
+        _nulo(recomendacoes['referencia_critica'][selecao]),
+        _nulo(recomendacoes['deriva_critica'][selecao]),
+        recomendacoes['pontos_avaliados'][selecao].tolist()
+    )
+    with transacao(conexao):
+        conexao.execute("DELETE FROM recomendacoes_periodicidade")
+        conexao.executemany(SQL_GRAVAR_RECOMENDACAO, linhas)
+
+
+def aplicar_recomendacoes(instrumento_ids=None, conexao=None):
+    """
+    Aplica as recomendações gravadas à periodicidade dos instrumentos
+
+    O vencimento já agendado não muda: a nova periodicidade vale a partir da próxima
+    calibração concluída.
+
+    Args:
+        instrumento_ids: Instrumentos a atualizar (opcional, padrão: todas as recomendações pendentes)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Número de instrumentos atualizados
+    """
+    conexao = conexao or obter_conexao()
+    filtro, parametros = '', []
+    if instrumento_ids is not None:
+        ids = list(instrumento_ids)
+        if not ids:
+            return 0
+        filtro = f"AND instrumento_id IN ({', '.join('?' * len(ids))})"
+        parametros = ids
+
+    with transacao(conexao):
+        atualizados = conexao.execute(SQL_APLICAR.format(filtro=filtro), parametros).rowcount
+        conexao.execute(
+            f"UPDATE recomendacoes_periodicidade SET aplicada = 1 WHERE aplicada = 0 {filtro}", parametros
+        )
+    return atualizados
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recomenda a periodicidade de calibração pela deriva dos instrumentos')
+    parser.add_argument('--min-calibracoes', type=int, default=MIN_CALIBRACOES)
+    parser.add_argument('--fracao-seguranca', type=float, default=FRACAO_SEGURANCA)
+    parser.add_argument('--aplicar', action='store_true', help='Atualizar a periodicidade dos instrumentos')
+    args = parser.parse_args()
+
+    banco.inicializar_banco()
+    resumo = analisar_deriva(min_calibracoes=args.min_calibracoes, fracao_seguranca=args.fracao_seguranca)['resumo']
+    print(f"{resumo['instrumentos']} instrumentos e {resumo['pontos_avaliados']} pontos avaliados em "
+          f"{resumo['tempo']:.1f}s: {resumo['recomendacoes']} recomendações "
+          f"({resumo['reduzir']} reduzem e {resumo['aumentar']} aumentam a periodicidade)")
+    if args.aplicar:
+        print(f"{aplicar_recomendacoes()} instrumentos atualizados")
@@ -0,0 +1,261 @@
+"""
+Fila de trabalhos em segundo plano persistida no SQLite (tabela trabalhos)
+Os workers web apenas enfileiram o trabalho e respondem com o seu id; um ou mais
+processos de jobs/trabalhador.py reservam os trabalhos pendentes, executam-nos em
+um pool de processos e gravam o resultado (JSON) ou o erro.
+
+A reserva é feita em uma transação imediata (BEGIN IMMEDIATE), de modo que dois
+trabalhadores nunca reservam o mesmo trabalho. Trabalhos que falham voltam à fila
+com espera exponencial até max_tentativas (os de parâmetros inválidos falham de
+imediato); trabalhos cujo trabalhador morreu são recuperados quando o prazo de
+execução expira.
+"""
+
+import json
+import os
+import time
+
+from database.conexao import obter_conexao, transacao
+
+PENDENTE, EXECUTANDO, CONCLUIDO, FALHOU, CANCELADO = 'pendente', 'executando', 'concluido', 'falhou', 'cancelado'
+
+# Número padrão de tentativas de cada trabalho
+MAX_TENTATIVAS = int(os.environ.get('CALIBRA_FILA_TENTATIVAS', '3'))
+
+# Espera antes da 1ª nova tentativa, dobrada a cada falha seguinte (segundos)
+ESPERA_BASE = float(os.environ.get('CALIBRA_FILA_ESPERA', '5'))
+
+# Tempo máximo de execução de um trabalho antes de ser considerado abandonado (segundos)
+TEMPO_LIMITE = float(os.environ.get('CALIBRA_FILA_TEMPO_LIMITE', '3600'))
+
+
+def _limites_configurados():
+    """Limites de trabalhos simultâneos por tipo (CALIBRA_FILA_LIMITES='certificados=1,graficos=2')"""
+    limites = {'certificados': 1, 'recalculo_padrao': 1, 'analise_deriva': 1}
+    for item in os.environ.get('CALIBRA_FILA_LIMITES', '').split(','):
+        if '=' in item:
+            tipo, limite = item.split('=', 1)
+            limites[tipo.strip()] = int(limite)
+    return limites
+
+
+# Máximo de trabalhos de cada tipo em execução ao mesmo tempo, somando todos os trabalhadores
+LIMITES_POR_TIPO = _limites_configurados()
+
+SQL_INSERIR = (
+    "INSERT INTO trabalhos (tipo, parametros, prioridade, max_tentativas, disponivel_em) VALUES (?, ?, ?, ?, ?)"
+)
+
+SQL_EM_EXECUCAO_POR_TIPO = "SELECT tipo, COUNT(*) FROM trabalhos WHERE status = 'executando' GROUP BY tipo"
+
+SQL_PROXIMO = (
+    "SELECT id FROM trabalhos WHERE status = 'pendente' AND disponivel_em <= ? {filtro} "
+    "ORDER BY prioridade DESC, id LIMIT 1"
+)
+
+SQL_RESULTADO = "SELECT status, erro, resultado FROM trabalhos WHERE id = ?"
+
+SQL_RESERVAR = (
+    "UPDATE trabalhos SET status = 'executando', tentativas = tentativas + 1, trabalhador = ?, "
+    "expira_em = ?, data_inicio = CURRENT_TIMESTAMP WHERE id = ?"
+)
+
+SQL_CONCLUIR = (
+    "UPDATE trabalhos SET status = 'concluido', resultado = ?, erro = NULL, expira_em = NULL, "
+    "data_fim = CURRENT_TIMESTAMP WHERE id = ? AND status = 'executando'"
+)
+
+SQL_REAGENDAR = (
+    "UPDATE trabalhos SET status = 'pendente', erro = ?, disponivel_em = ?, expira_em = NULL, "
+    "trabalhador = NULL WHERE id = ?"
+)
+
+SQL_FALHAR = (
+    "UPDATE trabalhos SET status = 'falhou', erro = ?, expira_em = NULL, data_fim = CURRENT_TIMESTAMP "
+    "WHERE id = ?"
+)
+
+SQL_EXPIRADOS = "SELECT id FROM trabalhos WHERE status = 'executando' AND expira_em < ?"
+
+
+def enfileirar(tipo, parametros, prioridade=0, max_tentativas=None, conexao=None):
+    """
+    Inclui um trabalho na fila
+
+    Args:
+        tipo: Tipo do trabalho (ver jobs.tarefas.TAREFAS)
+        parametros: Dicionário de parâmetros (serializável em JSON)
+        prioridade: Trabalhos de maior prioridade são executados primeiro
+        max_tentativas: Número máximo de execuções em caso de falha (padrão: MAX_TENTATIVAS)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Id do trabalho
+    """
+    conexao = conexao or obter_conexao()
+    with transacao(conexao):
+        return conexao.execute(SQL_INSERIR, (
+            tipo, json.dumps(parametros, separators=(',', ':')), prioridade,
+            max_tentativas or MAX_TENTATIVAS, time.time()
+        )).lastrowid
+
+
+def obter_trabalho(trabalho_id, conexao=None):
+    """
+    Lê a situação de um trabalho (sem os parâmetros e o resultado)
+
+    Args:
+        trabalho_id: Id do trabalho
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Dicionário com os campos do trabalho, ou None se não existir
+    """
+    conexao = conexao or obter_conexao()
+    linha = conexao.execute(
+        "SELECT id, tipo, status, prioridade, tentativas, max_tentativas, trabalhador, erro, "
+        "data_criacao, data_inicio, data_fim FROM trabalhos WHERE id = ?", (trabalho_id,)
+    ).fetchone()
+    return dict(linha) if linha is not None else None
+
+
+def obter_resultado(trabalho_id, conexao=None):
+    """
+    Lê o resultado de um trabalho como o texto JSON gravado, sem decodificá-lo
+
+    Os resultados de lotes grandes podem ter muitos megabytes; o texto é
+    devolvido como está para ser enviado diretamente ao cliente.
+
+    Args:
+        trabalho_id: Id do trabalho
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Dicionário com status, erro e resultado (texto JSON ou None), ou None se
+        o trabalho não existir
+    """
+    conexao = conexao or obter_conexao()
+    linha = conexao.execute(SQL_RESULTADO, (trabalho_id,)).fetchone()
+    return dict(linha) if linha is not None else None
+
+
+def reservar(trabalhador, tipos=None, conexao=None, limites=None):
+    """
+    Reserva o próximo trabalho pendente que respeita os limites de concorrência
+
+    Args:
+        trabalhador: Identificação do trabalhador (gravada no trabalho)
+        tipos: Tipos aceitos por este trabalhador (opcional, padrão: todos)
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        limites: Limites de trabalhos simultâneos por tipo (opcional, padrão: LIMITES_POR_TIPO)
+
+    Returns:
+        Dicionário com id, tipo, parametros (decodificados) e tentativas, ou None se
+        não houver trabalho disponível
+    """
+    conexao = conexao or obter_conexao()
+    limites = LIMITES_POR_TIPO if limites is None else limites
+    agora = time.time()
+
+    with transacao(conexao):
+        em_execucao = dict(conexao.execute(SQL_EM_EXECUCAO_POR_TIPO).fetchall())
+        saturados = [tipo for tipo, limite in limites.items() if em_execucao.get(tipo, 0) >= limite]
+
+        filtro, parametros = '', [agora]
+        if saturados:
+            filtro += f"AND tipo NOT IN ({', '.join('?' * len(saturados))}) "
+            parametros += saturados
+        if tipos is not None:
+            filtro += f"AND tipo IN ({', '.join('?' * len(tipos))}) "
+            parametros += list(tipos)
+
+        linha = conexao.execute(SQL_PROXIMO.format(filtro=filtro), parametros).fetchone()
+        if linha is None:
+            return None
+        conexao.execute(SQL_RESERVAR, (trabalhador, agora + TEMPO_LIMITE, linha['id']))
+        trabalho = conexao.execute(
+            "SELECT id, tipo, parametros, tentativas FROM trabalhos WHERE id = ?", (linha['id'],)
+        ).fetchone()
+
+    return dict(trabalho, parametros=json.loads(trabalho['parametros']))
+
+
+def concluir(trabalho_id, resultado, conexao=None):
+    """Grava o resultado (serializável em JSON) de um trabalho em execução"""
+    conexao = conexao or obter_conexao()
+    with transacao(conexao):
+        conexao.execute(SQL_CONCLUIR, (json.dumps(resultado, separators=(',', ':')), trabalho_id))
+
+
+def _registrar_falha(conexao, trabalho_id, erro, expirado_antes=None, definitivo=False):
+    """Reagenda ou finaliza um trabalho em execução (opcionalmente, só se o prazo expirou)"""
+    condicao, parametros = "id = ? AND status = 'executando'", [trabalho_id]
+    if expirado_antes is not None:
+        condicao += " AND expira_em < ?"
+        parametros.append(expirado_antes)
+
+    with transacao(conexao):
+        linha = conexao.execute(
+            f"SELECT tentativas, max_tentativas FROM trabalhos WHERE {condicao}", parametros
+        ).fetchone()
+        if linha is None:
+            return None
+        if not definitivo and linha['tentativas'] < linha['max_tentativas']:
+            espera = ESPERA_BASE * 2 ** (linha['tentativas'] - 1)
+            conexao.execute(SQL_REAGENDAR, (str(erro), time.time() + espera, trabalho_id))
+            return PENDENTE
+        conexao.execute(SQL_FALHAR, (str(erro), trabalho_id))
+        return FALHOU
+
+
+def falhar(trabalho_id, erro, conexao=None, definitivo=False):
+    """
+    Registra a falha de um trabalho em execução
+
+    O trabalho volta à fila após ESPERA_BASE × 2^(tentativas - 1) segundos, ou é
+    marcado como falho se já atingiu max_tentativas.
+
+    Args:
+        definitivo: Se True, marca o trabalho como falho sem novas tentativas (falhas
+            que se repetiriam, como parâmetros inválidos)
+
+    Returns:
+        Novo status do trabalho ('pendente' ou 'falhou'), ou None se não estava em execução
+    """
+    return _registrar_falha(conexao or obter_conexao(), trabalho_id, erro, definitivo=definitivo)
+
+
+def cancelar(trabalho_id, conexao=None):
+    """
+    Cancela um trabalho ainda pendente
+
+    Returns:
+        True se o trabalho foi cancelado, False se já estava em execução ou finalizado
+    """
+    conexao = conexao or obter_conexao()
+    with transacao(conexao):
+        cursor = conexao.execute(
+            "UPDATE trabalhos SET status = 'cancelado', data_fim = CURRENT_TIMESTAMP "
+            "WHERE id = ? AND status = 'pendente'",
+            (trabalho_id,)
+        )
+    return cursor.rowcount == 1
+
+
+def recuperar_expirados(conexao=None):
+    """
+    Devolve à fila (ou marca como falhos) os trabalhos cujo prazo de execução expirou,
+    como os de um trabalhador encerrado no meio da execução
+
+    Returns:
+        Número de trabalhos recuperados
+    """
+    conexao = conexao or obter_conexao()
+    agora = time.time()
+    expirados = [linha[0] for linha in conexao.execute(SQL_EXPIRADOS, (agora,))]
+    recuperados = 0
+    for trabalho_id in expirados:
+        # O prazo é conferido de novo na transação: o trabalho pode ter sido concluído nesse meio tempo
+        if _registrar_falha(conexao, trabalho_id, "prazo de execução expirado (trabalhador interrompido?)", agora):
+            recuperados += 1
+    return recuperados
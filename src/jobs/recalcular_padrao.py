@@ -0,0 +1,335 @@
+"""
+Recálculo em lote das calibrações afetadas pela atualização de um padrão
+Quando o certificado de um padrão de referência é atualizado (incerteza_padrao,
+fator_k), as fontes de incerteza vinculadas a ele (fontes_incerteza.padrao_id)
+recebem os novos valores e os pontos das calibrações que usaram o padrão
+(calibracao_padroes) têm a incerteza combinada, o fator k e a incerteza
+expandida recalculados, e a conformidade reavaliada (nula se o ponto não tem
+erro máximo permitido). Apenas os pontos com ao menos uma fonte vinculada ao
+padrão são recalculados; os demais (ex.: pontos importados sem o orçamento)
+mantêm os resultados gravados.
+
+As calibrações são processadas em blocos, em ordem de id, por um pool de
+processos; cada bloco é gravado em uma transação própria junto com o checkpoint
+da execução (tabela recalculos), de modo que uma calibração nunca fica gravada
+pela metade e uma execução interrompida continua do último bloco gravado.
+
+Uso (a partir do diretório src):
+    python jobs/recalcular_padrao.py 12
+    python jobs/recalcular_padrao.py 12 --tamanho-bloco 200 --processos 4
+    python jobs/recalcular_padrao.py 12 --reiniciar
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Permitir a execução direta do script (python jobs/recalcular_padrao.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from database.recalculo_incremental import conformidade_pontos, nivel_confianca_configurado
+from models.calculo_metrologico import CalculoMetrologico
+from models.orcamento_incremental import OrcamentoIncremental
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro bloco recalculado
+np = importar_tardio('numpy')
+
+# Calibrações por bloco (cada bloco é uma tarefa do pool e uma transação de gravação)
+TAMANHO_BLOCO = 100
+
+SQL_CALIBRACOES_AFETADAS = (
+    "SELECT DISTINCT calibracao_id FROM calibracao_padroes "
+    "WHERE padrao_id = ? AND calibracao_id > ? ORDER BY calibracao_id LIMIT ?"
+)
+
+SQL_TOTAL_PONTOS = (
+    "SELECT COUNT(DISTINCT p.id) FROM pontos_calibracao p "
+    "JOIN fontes_incerteza f ON f.ponto_calibracao_id = p.id AND f.padrao_id = ?1 "
+    "WHERE p.calibracao_id IN (SELECT calibracao_id FROM calibracao_padroes WHERE padrao_id = ?1)"
+)
+
+# Pontos do bloco com alguma fonte vinculada ao padrão (com os dados da conformidade)
+SQL_PONTOS_BLOCO = (
+    "SELECT DISTINCT p.id, p.erro, p.erro_maximo_permitido FROM pontos_calibracao p "
+    "JOIN fontes_incerteza f ON f.ponto_calibracao_id = p.id "
+    "WHERE p.calibracao_id IN ({}) AND f.padrao_id = ? ORDER BY p.id"
+)
+
+# Todas as fontes desses pontos (o orçamento completo é recalculado)
+SQL_FONTES_BLOCO = (
+    "SELECT f.ponto_calibracao_id, f.id, f.distribuicao, f.valor, f.divisor, "
+    "f.coeficiente_sensibilidade, f.graus_liberdade, f.padrao_id "
+    "FROM fontes_incerteza f JOIN pontos_calibracao p ON p.id = f.ponto_calibracao_id "
+    "WHERE p.calibracao_id IN ({}) AND EXISTS (SELECT 1 FROM fontes_incerteza fp "
+    "WHERE fp.ponto_calibracao_id = f.ponto_calibracao_id AND fp.padrao_id = ?) "
+    "ORDER BY f.ponto_calibracao_id, f.id"
+)
+
+SQL_ATUALIZAR_FONTE = "UPDATE fontes_incerteza SET valor = ?, divisor = ?, contribuicao = ?, " \
+                      "data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?"
+
+SQL_ATUALIZAR_PONTO = "UPDATE pontos_calibracao SET incerteza_padrao = ?, incerteza_expandida = ?, " \
+                      "fator_k = ?, conforme = ?, soma_quadratica = ?, soma_welch_satterthwaite = ?, " \
+                      "impressao_digital = ?, data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?"
+
+
+def recalcular_bloco(pontos_bloco, fontes, padrao, nivel_confianca):
+    """
+    Recalcula a incerteza de um bloco de pontos a partir das fontes gravadas
+
+    Todas as fontes gravadas do ponto (inclusive a de repetibilidade, Tipo A) entram
+    no orçamento; as vinculadas ao padrão recebem a incerteza e o fator k do seu
+    certificado atual.
+
+    Args:
+        pontos_bloco: Linhas (ponto_id, erro, erro_maximo_permitido) dos pontos com
+            fonte vinculada ao padrão, em ordem de id
+        fontes: Linhas (ponto_id, fonte_id, distribuicao, valor, divisor,
+            coeficiente_sensibilidade, graus_liberdade, padrao_id) das fontes dos pontos
+        padrao: Tupla (padrao_id, incerteza_padrao, fator_k) do padrão atualizado
+        nivel_confianca: Nível de confiança do fator de abrangência
+
+    Returns:
+        Tupla (fontes, pontos) com os parâmetros de SQL_ATUALIZAR_FONTE e
+        SQL_ATUALIZAR_PONTO
+    """
+    if not pontos_bloco:
+        return [], []
+    pontos_ids = [ponto[0] for ponto in pontos_bloco]
+    calc = CalculoMetrologico(nivel_confianca=nivel_confianca)
+    padrao_id, incerteza_padrao, fator_k = padrao
+
+    linha_ponto = {ponto_id: i for i, ponto_id in enumerate(pontos_ids)}
+    fontes_por_ponto = [0] * len(pontos_ids)
+    for fonte in fontes:
+        fontes_por_ponto[linha_ponto[fonte[0]]] += 1
+    n_fontes = max(fontes_por_ponto, default=0)
+
+    valores = np.zeros((len(pontos_ids), n_fontes))
+    divisores = np.ones((len(pontos_ids), n_fontes))
+    coeficientes = np.ones((len(pontos_ids), n_fontes))
+    graus_liberdade = np.full((len(pontos_ids), n_fontes), np.inf)
+
+    fontes_atualizadas = []
+    coluna = [0] * len(pontos_ids)
+    orcamentos = [OrcamentoIncremental() for _ in pontos_ids]
+    for ponto_id, fonte_id, distribuicao, valor, divisor, coeficiente, gl, fonte_padrao in fontes:
+        if divisor is None:
+            divisor = calc._divisor_distribuicao(distribuicao or 'normal')
+        if coeficiente is None:
+            coeficiente = 1.0
+        if fonte_padrao == padrao_id:
+            valor = incerteza_padrao
+            divisor = fator_k or divisor
+            fontes_atualizadas.append((valor, divisor, valor / divisor * coeficiente, fonte_id))
+
+        i = linha_ponto[ponto_id]
+        j = coluna[i]
+        coluna[i] += 1
+        valores[i, j] = valor
+        divisores[i, j] = divisor
+        coeficientes[i, j] = coeficiente
+        if gl is not None:
+            graus_liberdade[i, j] = gl
+        orcamentos[i].adicionar_entradas(valor, divisor, coeficiente, np.inf if gl is None else gl)
+
+    # Todas as fontes gravadas entram como orçamento; a componente Tipo A já está entre elas
+    incerteza_b = calc.calcular_incerteza_tipo_b_lote(
+        valores, divisores=divisores, coeficientes_sensibilidade=coeficientes, graus_liberdade=graus_liberdade
+    )
+    sem_tipo_a = {'incerteza_padrao': np.zeros(len(pontos_ids)), 'graus_liberdade': np.zeros(len(pontos_ids))}
+    incerteza_comb = calc.calcular_incerteza_combinada_lote(sem_tipo_a, incerteza_b)
+    fator_abrangencia = calc.calcular_fator_abrangencia_lote(incerteza_comb['graus_liberdade_efetivos'])
+    incerteza_expandida = incerteza_comb['incerteza_combinada'] * fator_abrangencia
+    conformes = conformidade_pontos(
+        [ponto[1] for ponto in pontos_bloco], incerteza_expandida, fator_abrangencia,
+        [ponto[2] for ponto in pontos_bloco]
+    )
+
+    # Somas parciais e impressão digital gravadas junto, para o recálculo incremental dos pontos
+    pontos = [
+        (u_c, u_exp, k, conforme, *orcamento.colunas_banco(), ponto_id)
+        for u_c, u_exp, k, conforme, orcamento, ponto_id in zip(
+            incerteza_comb['incerteza_combinada'].tolist(),
+            incerteza_expandida.tolist(),
+            fator_abrangencia.tolist(),
+            conformes,
+            orcamentos,
+            pontos_ids
+        )
+    ]
+    return fontes_atualizadas, pontos
+
+
+def _iniciar_execucao(conexao, padrao, reiniciar):
+    """
+    Retoma a execução interrompida do padrão ou inicia uma nova
+
+    Uma execução interrompida só é retomada se o certificado do padrão não mudou
+    desde o seu início; caso contrário, os pontos já gravados usariam valores antigos.
+
+    Returns:
+        Linha da tabela recalculos
+    """
+    padrao_id, incerteza_padrao, fator_k = padrao
+    with banco.transacao(conexao):
+        anterior = conexao.execute(
+            "SELECT * FROM recalculos WHERE padrao_id = ? AND status = 'em_andamento' ORDER BY id DESC LIMIT 1",
+            (padrao_id,)
+        ).fetchone()
+        if anterior is not None:
+            if not reiniciar and (anterior['incerteza_padrao'], anterior['fator_k']) == (incerteza_padrao, fator_k):
+                return anterior
+            conexao.execute(
+                "UPDATE recalculos SET status = 'substituido', data_fim = CURRENT_TIMESTAMP "
+                "WHERE padrao_id = ? AND status = 'em_andamento'",
+                (padrao_id,)
+            )
+
+        total = conexao.execute(SQL_TOTAL_PONTOS, (padrao_id,)).fetchone()[0]
+        execucao_id = conexao.execute(
+            "INSERT INTO recalculos (padrao_id, incerteza_padrao, fator_k, total_pontos) VALUES (?, ?, ?, ?)",
+            (padrao_id, incerteza_padrao, fator_k, total)
+        ).lastrowid
+        return conexao.execute("SELECT * FROM recalculos WHERE id = ?", (execucao_id,)).fetchone()
+
+
+def _blocos(conexao, padrao_id, ultima_calibracao_id, tamanho_bloco):
+    """Gera os blocos (calibracao_ids, pontos, fontes) de calibrações afetadas a partir do checkpoint"""
+    while True:
+        calibracao_ids = [linha[0] for linha in conexao.execute(
+            SQL_CALIBRACOES_AFETADAS, (padrao_id, ultima_calibracao_id, tamanho_bloco)
+        )]
+        if not calibracao_ids:
+            return
+        marcadores = ', '.join('?' * len(calibracao_ids))
+        parametros = calibracao_ids + [padrao_id]
+        pontos = [tuple(linha) for linha in conexao.execute(SQL_PONTOS_BLOCO.format(marcadores), parametros)]
+        fontes = [tuple(linha) for linha in conexao.execute(SQL_FONTES_BLOCO.format(marcadores), parametros)]
+        yield calibracao_ids, pontos, fontes
+        ultima_calibracao_id = calibracao_ids[-1]
+
+
+def recalcular_padrao(padrao_id, conexao=None, tamanho_bloco=TAMANHO_BLOCO, processos=None,
+                      reiniciar=False, progresso=None):
+    """
+    Recalcula os pontos de todas as calibrações que usaram um padrão
+
+    Args:
+        padrao_id: Id do padrão cujo certificado foi atualizado
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        tamanho_bloco: Calibrações por bloco
+        processos: Número de processos (padrão: número de CPUs; 1 executa no próprio processo)
+        reiniciar: Se True, ignora uma execução interrompida e recomeça do início
+        progresso: Função chamada após cada bloco gravado com o dicionário de andamento
+            (opcional)
+
+    Returns:
+        Dicionário com o id da execução, os pontos processados, o tempo e a taxa obtida
+    """
+    conexao = conexao or banco.obter_conexao()
+    padrao = conexao.execute("SELECT id, incerteza_padrao, fator_k FROM padroes WHERE id = ?", (padrao_id,)).fetchone()
+    if padrao is None:
+        raise ValueError(f"Padrão não encontrado: {padrao_id}")
+    if padrao['incerteza_padrao'] is None:
+        raise ValueError(f"O padrão {padrao_id} não tem incerteza cadastrada")
+    padrao = tuple(padrao)
+
+    nivel_confianca = nivel_confianca_configurado(conexao)
+    execucao = _iniciar_execucao(conexao, padrao, reiniciar)
+    execucao_id, total = execucao['id'], execucao['total_pontos']
+    processados = execucao['pontos_processados']
+    processados_nesta_execucao = 0
+    inicio = time.perf_counter()
+
+    def gravar(calibracao_ids, pontos_bloco, resultado):
+        nonlocal processados, processados_nesta_execucao
+        fontes_atualizadas, pontos = resultado
+        processados += len(pontos_bloco)
+        processados_nesta_execucao += len(pontos_bloco)
+
+        # Resultados e checkpoint na mesma transação: um bloco é gravado por inteiro ou não é gravado
+        with banco.transacao(conexao):
+            conexao.executemany(SQL_ATUALIZAR_FONTE, fontes_atualizadas)
+            conexao.executemany(SQL_ATUALIZAR_PONTO, pontos)
+            conexao.execute(
+                "UPDATE recalculos SET ultima_calibracao_id = ?, pontos_processados = ?, "
+                "data_atualizacao = CURRENT_TIMESTAMP WHERE id = ?",
+                (calibracao_ids[-1], processados, execucao_id)
+            )
+
+        if progresso is not None:
+            duracao = time.perf_counter() - inicio
+            taxa = processados_nesta_execucao / duracao if duracao > 0 else float('inf')
+            progresso({
+                'processados': processados,
+                'total': total,
+                'pontos_por_segundo': taxa,
+                'restante': (total - processados) / taxa if taxa > 0 else None
+            })
+
+    blocos = _blocos(conexao, padrao_id, execucao['ultima_calibracao_id'], tamanho_bloco)
+    processos = processos or os.cpu_count() or 1
+
+    if processos == 1:
+        for calibracao_ids, pontos_bloco, fontes in blocos:
+            gravar(calibracao_ids, pontos_bloco, recalcular_bloco(pontos_bloco, fontes, padrao, nivel_confianca))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            # Blocos gravados na ordem de envio (o checkpoint só avança sobre blocos
+            # contíguos), com no máximo dois blocos por processo em andamento
+            pendentes = deque()
+            for calibracao_ids, pontos_bloco, fontes in blocos:
+                futuro = executor.submit(recalcular_bloco, pontos_bloco, fontes, padrao, nivel_confianca)
+                pendentes.append((calibracao_ids, pontos_bloco, futuro))
+                if len(pendentes) >= 2 * processos:
+                    calibracao_ids, pontos_bloco, futuro = pendentes.popleft()
+                    gravar(calibracao_ids, pontos_bloco, futuro.result())
+            while pendentes:
+                calibracao_ids, pontos_bloco, futuro = pendentes.popleft()
+                gravar(calibracao_ids, pontos_bloco, futuro.result())
+
+    with banco.transacao(conexao):
+        conexao.execute(
+            "UPDATE recalculos SET status = 'concluido', data_fim = CURRENT_TIMESTAMP WHERE id = ?",
+            (execucao_id,)
+        )
+
+    duracao = time.perf_counter() - inicio
+    return {
+        'execucao_id': execucao_id,
+        'pontos': processados,
+        'pontos_nesta_execucao': processados_nesta_execucao,
+        'tempo': duracao,
+        'pontos_por_segundo': processados_nesta_execucao / duracao if duracao > 0 else float('inf')
+    }
+
+
+def _exibir_progresso(andamento):
+    restante = andamento['restante']
+    texto_restante = f", restam {restante:.0f}s" if restante is not None else ''
+    percentual = 100 * andamento['processados'] / andamento['total'] if andamento['total'] else 100
+    print(f"{andamento['processados']}/{andamento['total']} pontos ({percentual:.1f}%) - "
+          f"{andamento['pontos_por_segundo']:.0f} pontos/s{texto_restante}", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recalcula as calibrações que usaram um padrão atualizado')
+    parser.add_argument('padrao_id', type=int, help='Id do padrão cujo certificado foi atualizado')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO)
+    parser.add_argument('--processos', type=int)
+    parser.add_argument('--reiniciar', action='store_true', help='Ignorar uma execução interrompida')
+    args = parser.parse_args()
+
+    banco.inicializar_banco()
+    resultado = recalcular_padrao(args.padrao_id, tamanho_bloco=args.tamanho_bloco, processos=args.processos,
+                                  reiniciar=args.reiniciar, progresso=_exibir_progresso)
+    print(f"{resultado['pontos_nesta_execucao']} pontos recalculados em {resultado['tempo']:.1f}s "
+          f"({resultado['pontos_por_segundo']:.0f} pontos/s)")
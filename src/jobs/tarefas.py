@@ -0,0 +1,255 @@
+"""
+Tarefas executadas pela fila de trabalhos em segundo plano
+Cada tarefa recebe os parâmetros do trabalho (dicionário decodificado do JSON) e
+o id do trabalho, e retorna um resultado serializável em JSON. As dependências
+pesadas são importadas dentro de cada tarefa, apenas nos processos do trabalhador.
+
+validar_parametros é chamado ao enfileirar, no worker web, e de novo na execução
+(trabalhos incluídos diretamente com jobs.fila.enfileirar): parâmetros inválidos
+levantam ParametrosInvalidos e o trabalho falha sem novas tentativas, já que o
+resultado seria o mesmo. Os dados de cada ponto são validados na execução.
+"""
+
+import math
+import os
+
+from database import conexao as banco
+
+# Diretório dos arquivos gerados pelos trabalhos (certificados)
+DIRETORIO_RESULTADOS = os.environ.get(
+    'CALIBRA_DIRETORIO_TRABALHOS', os.path.join(os.path.dirname(banco.CAMINHO_BANCO), 'trabalhos')
+)
+
+# Pontos por trabalho de cálculo em lote
+MAX_PONTOS_TRABALHO = int(os.environ.get('CALIBRA_FILA_MAX_PONTOS', 1_000_000))
+
+# Endereço público dos gráficos gerados (servidos de static/img)
+URL_GRAFICOS = '/static/img/'
+
+# Parâmetros aceitos de cada gráfico: (listas obrigatórias, de mesmo tamanho; opcionais).
+# O diretório de saída, a resolução e o formato nunca vêm da requisição.
+CAMPOS_GRAFICOS = {
+    'erros': (('pontos_nominais', 'erros', 'incertezas'), ('erro_maximo', 'unidade')),
+    'contribuicoes': (('fontes', 'contribuicoes'), ('unidade',))
+}
+
+
+class ParametrosInvalidos(ValueError):
+    """Parâmetros de trabalho inválidos: o trabalho falha sem novas tentativas"""
+
+
+def calcular_lote(parametros, trabalho_id):
+    """
+    Calcula um lote de pontos com a mesma validação e o mesmo formato de resultado
+    de POST /api/calculos
+
+    Args:
+        parametros: {'pontos': [...], 'fontes_incerteza': [...] (opcional), 'nivel_confianca': 0.95}
+
+    Returns:
+        {'resultados': [linha de cada ponto, na ordem dos pontos]}
+    """
+    from api.calculos import TAMANHO_BLOCO, calcular_pontos, validar_ponto
+    from models.calculo_metrologico import CalculoMetrologico
+
+    calc = CalculoMetrologico(nivel_confianca=parametros.get('nivel_confianca', 0.95))
+    fontes_padrao = parametros.get('fontes_incerteza')
+    pontos = parametros['pontos']
+
+    linhas = []
+    for inicio in range(0, len(pontos), TAMANHO_BLOCO):
+        validos = []
+        for indice in range(inicio, min(inicio + TAMANHO_BLOCO, len(pontos))):
+            ponto = pontos[indice]
+            falha = validar_ponto(ponto, fontes_padrao)
+            if falha:
+                linhas.append({'indice': indice, 'erro_validacao': falha})
+                continue
+            if 'fontes_incerteza' not in ponto:
+                ponto = dict(ponto, fontes_incerteza=fontes_padrao)
+            validos.append((indice, ponto))
+            linhas.append(None)
+
+        if validos:
+            for (indice, ponto), resultado in zip(validos, calcular_pontos(calc, [p for _, p in validos])):
+                linha = {'indice': indice}
+                if 'id' in ponto:
+                    linha['id'] = ponto['id']
+                linha.update(resultado)
+                linhas[indice] = linha
+
+    return {'resultados': linhas}
+
+
+def gerar_graficos(parametros, trabalho_id):
+    """
+    Gera gráficos de erros e de contribuições
+
+    Args:
+        parametros: {'tarefas': [[tipo, parâmetros], ...]} como em gerar_graficos_lote
+
+    Returns:
+        {'arquivos': [endereço de cada gráfico em /static/img, na ordem das tarefas]}
+    """
+    from utils.gerar_graficos import gerar_graficos_lote
+
+    # Apenas os dados do gráfico são repassados (ver CAMPOS_GRAFICOS)
+    tarefas = []
+    for tipo, dados in parametros['tarefas']:
+        obrigatorios, opcionais = CAMPOS_GRAFICOS[tipo]
+        tarefas.append((tipo, {campo: dados[campo] for campo in obrigatorios + opcionais if campo in dados}))
+
+    # A concorrência é controlada pela fila: um processo por trabalho
+    caminhos = gerar_graficos_lote(tarefas, processos=1)
+    return {'arquivos': [URL_GRAFICOS + os.path.basename(caminho) for caminho in caminhos]}
+
+
+def gerar_certificados(parametros, trabalho_id):
+    """
+    Gera um lote de certificados em um arquivo zip no diretório de resultados
+
+    Args:
+        parametros: {'certificado_ids': [...], 'saida': 'html' ou 'pdf', 'formato': ... (opcional)}
+
+    Returns:
+        Resumo de gerar_certificados_lote com o caminho do zip em 'arquivo'
+    """
+    from utils.gerar_certificados import gerar_certificados_lote
+
+    os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+    destino = os.path.join(DIRETORIO_RESULTADOS, f"certificados_{trabalho_id}.zip")
+    resumo = gerar_certificados_lote(
+        parametros['certificado_ids'], destino, saida=parametros.get('saida', 'html'),
+        formato=parametros.get('formato'), processos=1
+    )
+    return dict(resumo, arquivo=destino)
+
+
+def recalcular_padrao(parametros, trabalho_id):
+    """
+    Recalcula as calibrações que usaram um padrão atualizado (ver jobs.recalcular_padrao)
+
+    Args:
+        parametros: {'padrao_id': ..., 'reiniciar': False}
+    """
+    from jobs.recalcular_padrao import recalcular_padrao as recalcular
+
+    # Uma execução interrompida é retomada do último bloco gravado na nova tentativa
+    return recalcular(parametros['padrao_id'], processos=1, reiniciar=parametros.get('reiniciar', False))
+
+
+def analisar_deriva(parametros, trabalho_id):
+    """
+    Analisa a deriva da frota e grava as periodicidades recomendadas (ver jobs.analisar_deriva)
+
+    Args:
+        parametros: {'min_calibracoes': ..., 'fracao_seguranca': ...} (opcionais)
+
+    Returns:
+        Resumo da análise
+    """
+    from jobs.analisar_deriva import analisar_deriva as analisar
+
+    return analisar(**parametros)['resumo']
+
+
+TAREFAS = {
+    'calculo_lote': calcular_lote,
+    'graficos': gerar_graficos,
+    'certificados': gerar_certificados,
+    'recalculo_padrao': recalcular_padrao,
+    'analise_deriva': analisar_deriva
+}
+
+
+def _lista(valor):
+    return isinstance(valor, list) and len(valor) > 0
+
+
+def _numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+
+
+def _validar_grafico(indice, tipo, dados):
+    """Confere os parâmetros de uma tarefa de gráfico (ver CAMPOS_GRAFICOS)"""
+    obrigatorios, opcionais = CAMPOS_GRAFICOS[tipo]
+    desconhecidos = sorted(set(dados) - set(obrigatorios) - set(opcionais))
+    if desconhecidos:
+        return f"tarefa {indice}: parâmetros não aceitos: {', '.join(desconhecidos)}"
+    for campo in obrigatorios:
+        if not _lista(dados.get(campo)):
+            return f"tarefa {indice}: '{campo}' deve ser uma lista não vazia"
+        if campo != 'fontes' and not all(_numero(v) for v in dados[campo]):
+            return f"tarefa {indice}: '{campo}' deve conter apenas números"
+    if len({len(dados[campo]) for campo in obrigatorios}) > 1:
+        return f"tarefa {indice}: {', '.join(obrigatorios)} devem ter o mesmo tamanho"
+    if dados.get('erro_maximo') is not None and not _numero(dados['erro_maximo']):
+        return f"tarefa {indice}: 'erro_maximo' deve ser um número"
+    if 'unidade' in dados and not isinstance(dados['unidade'], str):
+        return f"tarefa {indice}: 'unidade' deve ser um texto"
+    return None
+
+
+def validar_parametros(tipo, parametros):
+    """
+    Confere o tipo do trabalho e a forma dos seus parâmetros
+
+    Returns:
+        Mensagem de erro, ou None se o trabalho puder ser enfileirado
+    """
+    if tipo not in TAREFAS:
+        return f"'tipo' deve ser um de {', '.join(TAREFAS)}"
+    if not isinstance(parametros, dict):
+        return "'parametros' deve ser um objeto"
+
+    if tipo == 'calculo_lote':
+        from api.calculos import validar_fontes
+
+        if not _lista(parametros.get('pontos')):
+            return "'pontos' deve ser uma lista não vazia"
+        if len(parametros['pontos']) > MAX_PONTOS_TRABALHO:
+            return f"máximo de {MAX_PONTOS_TRABALHO} pontos por trabalho"
+        nivel_confianca = parametros.get('nivel_confianca', 0.95)
+        if not (_numero(nivel_confianca) and 0 < nivel_confianca < 1):
+            return "'nivel_confianca' deve estar entre 0 e 1"
+        if parametros.get('fontes_incerteza') is not None:
+            return validar_fontes(parametros['fontes_incerteza'])
+    elif tipo == 'graficos':
+        tarefas = parametros.get('tarefas')
+        if not _lista(tarefas) or not all(
+            isinstance(t, list) and len(t) == 2 and t[0] in CAMPOS_GRAFICOS and isinstance(t[1], dict)
+            for t in tarefas
+        ):
+            return "'tarefas' deve ser uma lista de pares [tipo ('erros' ou 'contribuicoes'), parâmetros]"
+        for indice, (tipo_grafico, dados) in enumerate(tarefas):
+            falha = _validar_grafico(indice, tipo_grafico, dados)
+            if falha:
+                return falha
+    elif tipo == 'certificados':
+        ids = parametros.get('certificado_ids')
+        if not _lista(ids) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return "'certificado_ids' deve ser uma lista de ids"
+        if parametros.get('saida', 'html') not in ('html', 'pdf'):
+            return "'saida' deve ser 'html' ou 'pdf'"
+    elif tipo == 'recalculo_padrao':
+        if not isinstance(parametros.get('padrao_id'), int) or isinstance(parametros.get('padrao_id'), bool):
+            return "'padrao_id' deve ser um id"
+    elif tipo == 'analise_deriva':
+        if set(parametros) - {'min_calibracoes', 'fracao_seguranca'}:
+            return "parâmetros aceitos: 'min_calibracoes' e 'fracao_seguranca'"
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in parametros.values()):
+            return "'min_calibracoes' e 'fracao_seguranca' devem ser números"
+    return None
+
+
+def executar_tarefa(tipo, parametros, trabalho_id):
+    """
+    Executa uma tarefa (função enviada aos processos do pool do trabalhador)
+
+    Raises:
+        ParametrosInvalidos: Se os parâmetros não passam em validar_parametros
+    """
+    falha = validar_parametros(tipo, parametros)
+    if falha:
+        raise ParametrosInvalidos(falha)
+    return TAREFAS[tipo](parametros, trabalho_id)
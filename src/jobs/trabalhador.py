@@ -0,0 +1,150 @@
+"""
+Trabalhador da fila de trabalhos em segundo plano
+Reserva trabalhos da tabela trabalhos (ver jobs.fila) e executa-os em um pool de
+processos, com no máximo --processos trabalhos simultâneos por trabalhador (e os
+limites por tipo de jobs.fila.LIMITES_POR_TIPO, somando todos os trabalhadores).
+Ao receber SIGTERM/SIGINT, deixa de reservar trabalhos e aguarda os que estão em
+execução.
+
+Uso (a partir do diretório src):
+    python jobs/trabalhador.py
+    python jobs/trabalhador.py --processos 4 --tipos calculo_lote graficos
+    python jobs/trabalhador.py --ate-esvaziar     # encerra quando a fila ficar vazia
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Permitir a execução direta do script (python jobs/trabalhador.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from jobs import fila
+from jobs.tarefas import ParametrosInvalidos, executar_tarefa
+
+# Trabalhos simultâneos por trabalhador
+PROCESSOS = int(os.environ.get('CALIBRA_FILA_PROCESSOS', os.cpu_count() or 1))
+
+# Intervalo de consulta da fila quando não há trabalho disponível (segundos)
+INTERVALO = float(os.environ.get('CALIBRA_FILA_INTERVALO', '1.0'))
+
+# Intervalo entre as verificações de trabalhos abandonados (segundos)
+INTERVALO_RECUPERACAO = 60.0
+
+
+class Trabalhador:
+    """Laço de reserva e execução de trabalhos com um pool de processos"""
+
+    def __init__(self, processos=PROCESSOS, tipos=None, intervalo=INTERVALO, limites=None):
+        """
+        Args:
+            processos: Número máximo de trabalhos em execução ao mesmo tempo
+            tipos: Tipos de trabalho aceitos (opcional, padrão: todos)
+            intervalo: Espera entre consultas à fila vazia, em segundos
+            limites: Limites por tipo (opcional, padrão: jobs.fila.LIMITES_POR_TIPO)
+        """
+        self.processos = processos
+        self.tipos = tipos
+        self.intervalo = intervalo
+        self.limites = limites
+        self.identificacao = f"{socket.gethostname()}:{os.getpid()}"
+        self.executados = 0
+        self._parar = False
+
+    def parar(self, *_):
+        """Deixa de reservar trabalhos; o laço termina após os trabalhos em execução"""
+        self._parar = True
+
+    def _registrar(self, trabalho_id, futuro):
+        try:
+            resultado = futuro.result()
+        except BrokenProcessPool:
+            fila.falhar(trabalho_id, "processo do trabalhador encerrado durante a execução")
+            raise
+        except ParametrosInvalidos as erro:
+            fila.falhar(trabalho_id, f"parâmetros inválidos: {erro}", definitivo=True)
+        except Exception:
+            fila.falhar(trabalho_id, traceback.format_exc(limit=20))
+        else:
+            fila.concluir(trabalho_id, resultado)
+        self.executados += 1
+
+    def executar(self, ate_esvaziar=False):
+        """
+        Executa o laço do trabalhador
+
+        Args:
+            ate_esvaziar: Se True, encerra quando não houver trabalho disponível nem em execução
+
+        Returns:
+            Número de trabalhos executados (concluídos ou com falha)
+        """
+        executor = ProcessPoolExecutor(max_workers=self.processos)
+        em_execucao = {}
+        ultima_recuperacao = 0.0
+        try:
+            while True:
+                if time.monotonic() - ultima_recuperacao > INTERVALO_RECUPERACAO:
+                    fila.recuperar_expirados()
+                    ultima_recuperacao = time.monotonic()
+
+                while not self._parar and len(em_execucao) < self.processos:
+                    trabalho = fila.reservar(self.identificacao, self.tipos, limites=self.limites)
+                    if trabalho is None:
+                        break
+                    futuro = executor.submit(executar_tarefa, trabalho['tipo'], trabalho['parametros'], trabalho['id'])
+                    em_execucao[futuro] = trabalho['id']
+
+                if not em_execucao:
+                    if self._parar or ate_esvaziar:
+                        break
+                    time.sleep(self.intervalo)
+                    continue
+
+                prontos, _ = wait(em_execucao, timeout=self.intervalo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    try:
+                        self._registrar(em_execucao.pop(futuro), futuro)
+                    except BrokenProcessPool:
+                        # Um processo do pool morreu (ex.: falta de memória): os demais
+                        # trabalhos do pool também falham e um novo pool é criado
+                        for trabalho_id in em_execucao.values():
+                            fila.falhar(trabalho_id, "processo do trabalhador encerrado durante a execução")
+                        em_execucao.clear()
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = ProcessPoolExecutor(max_workers=self.processos)
+                        break
+        finally:
+            executor.shutdown(wait=True)
+        return self.executados
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Executa os trabalhos da fila em segundo plano')
+    parser.add_argument('--processos', type=int, default=PROCESSOS, help='Trabalhos simultâneos')
+    parser.add_argument('--tipos', nargs='*', help='Tipos de trabalho aceitos (padrão: todos)')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO, help='Espera com a fila vazia (s)')
+    parser.add_argument('--ate-esvaziar', action='store_true', help='Encerrar quando a fila ficar vazia')
+    args = parser.parse_args()
+
+    banco.inicializar_banco()
+    trabalhador = Trabalhador(args.processos, args.tipos, args.intervalo)
+    signal.signal(signal.SIGTERM, trabalhador.parar)
+    signal.signal(signal.SIGINT, trabalhador.parar)
+
+    print(f"Trabalhador {trabalhador.identificacao} iniciado com {args.processos} processo(s)", flush=True)
+    executados = trabalhador.executar(ate_esvaziar=args.ate_esvaziar)
+    print(f"Trabalhador encerrado após {executados} trabalho(s)", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Agenda de calibrações em memória
+Mantém os instrumentos ativos em filas de prioridade indexadas (uma geral e uma
+por setor), ordenadas pela data de vencimento da calibração e, no mesmo dia,
+pela criticidade. Cada alteração de um instrumento custa O(log n), sem
+reordenar a frota, e as listas de vencimento são lidas em ordem percorrendo
+apenas os instrumentos que entram na lista.
+"""
+
+import datetime
+import heapq
+
+# Peso de cada criticidade no desempate entre vencimentos do mesmo dia (menor primeiro)
+PESOS_CRITICIDADE = {'alta': 0, 'media': 1, 'média': 1, 'baixa': 2}
+PESO_SEM_CRITICIDADE = 3
+
+
+def para_data(valor):
+    """Converte datas ISO (AAAA-MM-DD[ hh:mm:ss]) e datetimes em date (None permanece None)"""
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    return datetime.date.fromisoformat(str(valor)[:10])
+
+
+class HeapIndexado:
+    """
+    Heap binário de mínimo com índice chave -> posição
+
+    Permite alterar a prioridade ou remover qualquer chave em O(log n), além de
+    percorrer as chaves em ordem de prioridade sem alterar o heap.
+    """
+
+    __slots__ = ('_itens', '_posicoes')
+
+    def __init__(self, itens=()):
+        """
+        Args:
+            itens: Pares (prioridade, chave) iniciais, com chaves distintas (construção em O(n))
+        """
+        self._itens = list(itens)
+        heapq.heapify(self._itens)
+        self._posicoes = {chave: i for i, (_, chave) in enumerate(self._itens)}
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, chave):
+        return chave in self._posicoes
+
+    def prioridade(self, chave):
+        """Prioridade atual de uma chave"""
+        return self._itens[self._posicoes[chave]][0]
+
+    def definir(self, chave, prioridade):
+        """Insere a chave ou altera a sua prioridade"""
+        posicao = self._posicoes.get(chave)
+        if posicao is None:
+            self._itens.append((prioridade, chave))
+            self._posicoes[chave] = len(self._itens) - 1
+            self._subir(len(self._itens) - 1)
+            return
+        anterior = self._itens[posicao][0]
+        self._itens[posicao] = (prioridade, chave)
+        if prioridade < anterior:
+            self._subir(posicao)
+        else:
+            self._descer(posicao)
+
+    def remover(self, chave):
+        """Remove a chave (sem efeito se não estiver no heap)"""
+        posicao = self._posicoes.pop(chave, None)
+        if posicao is None:
+            return
+        ultimo = self._itens.pop()
+        if posicao < len(self._itens):
+            self._itens[posicao] = ultimo
+            self._posicoes[ultimo[1]] = posicao
+            self._subir(posicao)
+            self._descer(self._posicoes[ultimo[1]])
+
+    def topo(self):
+        """Par (prioridade, chave) de menor prioridade, ou None se o heap estiver vazio"""
+        return self._itens[0] if self._itens else None
+
+    def em_ordem(self):
+        """
+        Percorre os pares (prioridade, chave) em ordem crescente de prioridade, sem alterar o heap
+
+        Usa uma fronteira auxiliar com os filhos dos nós já visitados: obter os k
+        primeiros custa O(k log k), qualquer que seja o tamanho do heap.
+        """
+        itens = self._itens
+        if not itens:
+            return
+        fronteira = [(itens[0], 0)]
+        while fronteira:
+            item, posicao = heapq.heappop(fronteira)
+            yield item
+            for filho in (2 * posicao + 1, 2 * posicao + 2):
+                if filho < len(itens):
+                    heapq.heappush(fronteira, (itens[filho], filho))
+
+    def _subir(self, posicao):
+        itens, posicoes = self._itens, self._posicoes
+        item = itens[posicao]
+        while posicao > 0:
+            pai = (posicao - 1) >> 1
+            if not item < itens[pai]:
+                break
+            itens[posicao] = itens[pai]
+            posicoes[itens[posicao][1]] = posicao
+            posicao = pai
+        itens[posicao] = item
+        posicoes[item[1]] = posicao
+
+    def _descer(self, posicao):
+        itens, posicoes = self._itens, self._posicoes
+        tamanho = len(itens)
+        item = itens[posicao]
+        while True:
+            filho = 2 * posicao + 1
+            if filho >= tamanho:
+                break
+            if filho + 1 < tamanho and itens[filho + 1] < itens[filho]:
+                filho += 1
+            if not itens[filho] < item:
+                break
+            itens[posicao] = itens[filho]
+            posicoes[itens[posicao][1]] = posicao
+            posicao = filho
+        itens[posicao] = item
+        posicoes[item[1]] = posicao
+
+
+class AgendaCalibracoes:
+    """Filas de vencimento de calibração de toda a frota e de cada setor"""
+
+    def __init__(self, instrumentos=()):
+        """
+        Monta a agenda de uma só vez (O(n))
+
+        Args:
+            instrumentos: Tuplas (instrumento_id, setor_id, data_vencimento, criticidade);
+                instrumentos sem data de vencimento não são agendados
+        """
+        self._instrumentos = {}
+        pares_setor = {}
+        for instrumento_id, setor_id, vencimento, criticidade in instrumentos:
+            vencimento = para_data(vencimento)
+            if vencimento is None:
+                continue
+            self._instrumentos[instrumento_id] = (setor_id, vencimento, criticidade)
+            pares_setor.setdefault(setor_id, []).append(
+                (self._prioridade(instrumento_id, vencimento, criticidade), instrumento_id)
+            )
+
+        self._geral = HeapIndexado(par for pares in pares_setor.values() for par in pares)
+        self._por_setor = {setor_id: HeapIndexado(pares) for setor_id, pares in pares_setor.items()}
+
+        # Última revisão de instrumentos incorporada (ver database.agenda_calibracoes)
+        self.revisao = 0
+
+    @staticmethod
+    def _prioridade(instrumento_id, vencimento, criticidade):
+        return (vencimento.toordinal(), PESOS_CRITICIDADE.get(criticidade, PESO_SEM_CRITICIDADE), instrumento_id)
+
+    def __len__(self):
+        return len(self._instrumentos)
+
+    def __contains__(self, instrumento_id):
+        return instrumento_id in self._instrumentos
+
+    def setores(self):
+        """Setores com ao menos um instrumento agendado"""
+        return [setor_id for setor_id, heap in self._por_setor.items() if len(heap)]
+
+    def vencimento(self, instrumento_id):
+        """Data de vencimento agendada do instrumento (None se não estiver agendado)"""
+        registro = self._instrumentos.get(instrumento_id)
+        return registro[1] if registro else None
+
+    def definir(self, instrumento_id, vencimento, criticidade=None, setor_id=None):
+        """
+        Agenda um instrumento ou altera o seu vencimento, criticidade ou setor
+
+        Args:
+            instrumento_id: Id do instrumento
+            vencimento: Data de vencimento (None remove o instrumento da agenda)
+            criticidade: 'alta', 'media' ou 'baixa' (opcional)
+            setor_id: Setor do instrumento (opcional)
+        """
+        vencimento = para_data(vencimento)
+        if vencimento is None:
+            self.remover(instrumento_id)
+            return
+
+        anterior = self._instrumentos.get(instrumento_id)
+        if anterior is not None and anterior[0] != setor_id:
+            self._por_setor[anterior[0]].remover(instrumento_id)
+
+        prioridade = self._prioridade(instrumento_id, vencimento, criticidade)
+        self._instrumentos[instrumento_id] = (setor_id, vencimento, criticidade)
+        self._geral.definir(instrumento_id, prioridade)
+        heap_setor = self._por_setor.get(setor_id)
+        if heap_setor is None:
+            heap_setor = self._por_setor[setor_id] = HeapIndexado()
+        heap_setor.definir(instrumento_id, prioridade)
+
+    def remover(self, instrumento_id):
+        """Retira um instrumento da agenda (sem efeito se não estiver agendado)"""
+        registro = self._instrumentos.pop(instrumento_id, None)
+        if registro is None:
+            return
+        self._geral.remover(instrumento_id)
+        self._por_setor[registro[0]].remover(instrumento_id)
+
+    def concluir_calibracao(self, instrumento_id, data_calibracao, periodicidade_dias):
+        """
+        Reagenda um instrumento após a conclusão de uma calibração
+
+        Args:
+            instrumento_id: Id do instrumento (deve estar agendado)
+            data_calibracao: Data de conclusão da calibração
+            periodicidade_dias: Periodicidade de calibração em dias
+
+        Returns:
+            Nova data de vencimento
+        """
+        setor_id, _, criticidade = self._instrumentos[instrumento_id]
+        vencimento = para_data(data_calibracao) + datetime.timedelta(days=periodicidade_dias)
+        self.definir(instrumento_id, vencimento, criticidade, setor_id)
+        return vencimento
+
+    def proximo(self, setor_id=None):
+        """Instrumento de maior prioridade (geral ou do setor), ou None se não houver"""
+        heap = self._geral if setor_id is None else self._por_setor.get(setor_id)
+        topo = heap.topo() if heap is not None else None
+        return self._registro(topo[1], topo[0][0], None) if topo else None
+
+    def vencimentos(self, ate, setor_id=None, limite=None, hoje=None):
+        """
+        Lista, em ordem de prioridade, os instrumentos com vencimento até uma data
+
+        Args:
+            ate: Data limite (inclusive)
+            setor_id: Restringe a lista ao setor (opcional, padrão: toda a frota)
+            limite: Número máximo de instrumentos (opcional)
+            hoje: Data de referência dos dias de atraso (opcional, padrão: data atual)
+
+        Returns:
+            Lista de dicionários com instrumento_id, setor_id, data_vencimento,
+            criticidade e dias_atraso (negativo para vencimentos futuros)
+        """
+        heap = self._geral if setor_id is None else self._por_setor.get(setor_id)
+        if heap is None:
+            return []
+        ate = para_data(ate).toordinal()
+        hoje = (para_data(hoje) or datetime.date.today()).toordinal()
+
+        lista = []
+        for (ordinal, _, _), instrumento_id in heap.em_ordem():
+            if ordinal > ate or (limite is not None and len(lista) >= limite):
+                break
+            lista.append(self._registro(instrumento_id, ordinal, hoje))
+        return lista
+
+    def vencidos(self, hoje=None, setor_id=None, limite=None):
+        """Instrumentos com calibração vencida (vencimento anterior a hoje), em ordem de prioridade"""
+        hoje = para_data(hoje) or datetime.date.today()
+        return self.vencimentos(hoje - datetime.timedelta(days=1), setor_id, limite, hoje)
+
+    def resumo_por_setor(self, hoje=None, dias=30):
+        """
+        Conta, por setor, os instrumentos vencidos e os que vencem nos próximos dias
+
+        Returns:
+            Dicionário setor_id -> {'vencidos': n, 'a_vencer': n}
+        """
+        hoje = (para_data(hoje) or datetime.date.today()).toordinal()
+        resumo = {}
+        for setor_id, heap in self._por_setor.items():
+            vencidos = a_vencer = 0
+            for (ordinal, _, _), _ in heap.em_ordem():
+                if ordinal >= hoje + dias:
+                    break
+                if ordinal < hoje:
+                    vencidos += 1
+                else:
+                    a_vencer += 1
+            if vencidos or a_vencer:
+                resumo[setor_id] = {'vencidos': vencidos, 'a_vencer': a_vencer}
+        return resumo
+
+    def _registro(self, instrumento_id, ordinal, hoje):
+        setor_id, vencimento, criticidade = self._instrumentos[instrumento_id]
+        return {
+            'instrumento_id': instrumento_id,
+            'setor_id': setor_id,
+            'data_vencimento': vencimento.isoformat(),
+            'criticidade': criticidade,
+            'dias_atraso': None if hoje is None else hoje - ordinal
+        }
@@ -0,0 +1,206 @@
+"""
+Ajuste da curva de correção de uma calibração
+Ajusta, por mínimos quadrados (ponderados pela incerteza de cada ponto), um
+polinômio de correção em função da indicação do instrumento, com a matriz de
+covariância dos coeficientes. A correção e a sua incerteza são avaliadas de forma
+vetorizada, em blocos, para qualquer quantidade de leituras.
+"""
+
+from models.quantis import tabela_padrao
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro ajuste
+np = importar_tardio('numpy')
+
+# Leituras avaliadas por bloco em avaliar/incerteza (limita a memória da matriz de Vandermonde)
+TAMANHO_BLOCO = 1 << 20
+
+
+def _vandermonde(t, n_coeficientes):
+    """Matriz [1, t, t², ...] com n_coeficientes colunas"""
+    return np.vander(t, n_coeficientes, increasing=True)
+
+
+class CurvaCalibracao:
+    """
+    Curva de correção ajustada: correção(x) = Σ cⱼ tʲ, com t = (x - centro) / escala
+
+    A variável é normalizada para o intervalo [-1, 1] das indicações ajustadas, o
+    que mantém o sistema bem condicionado em polinômios de grau mais alto; os
+    coeficientes na variável original são obtidos por coeficientes_polinomio().
+    """
+
+    __slots__ = ('coeficientes', 'covariancia', 'centro', 'escala', 'graus_liberdade',
+                 'qui_quadrado', 'fator_k', 'ponderado')
+
+    def __init__(self, coeficientes, covariancia, centro, escala, graus_liberdade, qui_quadrado,
+                 fator_k, ponderado):
+        self.coeficientes = coeficientes
+        self.covariancia = covariancia
+        self.centro = centro
+        self.escala = escala
+        self.graus_liberdade = graus_liberdade
+        self.qui_quadrado = qui_quadrado
+        self.fator_k = fator_k
+        self.ponderado = ponderado
+
+    @property
+    def grau(self):
+        return len(self.coeficientes) - 1
+
+    def _normalizar(self, x):
+        return (np.asarray(x, dtype=float) - self.centro) / self.escala
+
+    def avaliar(self, x):
+        """
+        Calcula a correção em cada valor (esquema de Horner, sem montar a matriz de Vandermonde)
+
+        Args:
+            x: Indicações do instrumento (escalar ou array de qualquer forma)
+
+        Returns:
+            Array de correções com a forma de x
+        """
+        t = self._normalizar(x)
+        correcao = np.full(t.shape, self.coeficientes[-1])
+        for coeficiente in self.coeficientes[-2::-1]:
+            correcao *= t
+            correcao += coeficiente
+        return correcao
+
+    def incerteza(self, x):
+        """
+        Calcula a incerteza padrão da correção em cada valor, u(x)² = v(x)ᵀ C v(x)
+
+        Considera apenas a incerteza dos coeficientes ajustados (a incerteza da
+        própria leitura corrigida deve ser combinada à parte).
+
+        Args:
+            x: Indicações do instrumento (escalar ou array de qualquer forma)
+
+        Returns:
+            Array de incertezas padrão com a forma de x
+        """
+        t = self._normalizar(x)
+        plano = t.reshape(-1)
+        variancia = np.empty(plano.shape)
+        for inicio in range(0, len(plano), TAMANHO_BLOCO):
+            bloco = slice(inicio, inicio + TAMANHO_BLOCO)
+            v = _vandermonde(plano[bloco], len(self.coeficientes))
+            variancia[bloco] = np.einsum('ij,jk,ik->i', v, self.covariancia, v, optimize=True)
+        return np.sqrt(np.clip(variancia, 0.0, None)).reshape(t.shape)
+
+    def corrigir(self, leituras):
+        """
+        Aplica a correção a um conjunto de leituras
+
+        Args:
+            leituras: Indicações do instrumento (escalar ou array de qualquer forma)
+
+        Returns:
+            Dicionário com os arrays 'valores_corrigidos', 'correcao', 'incerteza_padrao'
+            e 'incerteza_expandida' da correção
+        """
+        leituras = np.asarray(leituras, dtype=float)
+        correcao = self.avaliar(leituras)
+        incerteza_padrao = self.incerteza(leituras)
+        return {
+            'valores_corrigidos': leituras + correcao,
+            'correcao': correcao,
+            'incerteza_padrao': incerteza_padrao,
+            'incerteza_expandida': incerteza_padrao * self.fator_k
+        }
+
+    def coeficientes_polinomio(self):
+        """Coeficientes a₀, a₁, ... da correção na indicação original: correção(x) = Σ aⱼ xʲ"""
+        polinomio = np.polynomial.Polynomial(
+            self.coeficientes, domain=[self.centro - self.escala, self.centro + self.escala], window=[-1, 1]
+        )
+        return polinomio.convert().coef
+
+    def para_dict(self):
+        """Representação em tipos nativos do Python (para JSON)"""
+        return {
+            'grau': self.grau,
+            'coeficientes': self.coeficientes_polinomio().tolist(),
+            'graus_liberdade': self.graus_liberdade,
+            'qui_quadrado': self.qui_quadrado,
+            'fator_k': self.fator_k,
+            'ponderado': self.ponderado
+        }
+
+    def __repr__(self):
+        return f"CurvaCalibracao(grau={self.grau}, coeficientes={self.coeficientes_polinomio().tolist()!r})"
+
+
+def ajustar_curva(indicacoes, correcoes, grau=1, incertezas=None, escalar_covariancia=None, tabela_quantis=None,
+                  nivel_confianca=0.95):
+    """
+    Ajusta um polinômio de correção por mínimos quadrados
+
+    Args:
+        indicacoes: Indicações do instrumento em cada ponto (valor_lido)
+        correcoes: Correção em cada ponto (valor_referencia - valor_lido)
+        grau: Grau do polinômio
+        incertezas: Incerteza padrão de cada ponto (opcional). Se informada, cada ponto
+            tem peso 1 / u² e a covariância usa as incertezas como absolutas
+        escalar_covariancia: Se True, multiplica a covariância pelo qui-quadrado reduzido
+            (padrão: True sem incertezas, False com incertezas)
+        tabela_quantis: Tabela de quantis para o fator de abrangência (opcional)
+        nivel_confianca: Nível de confiança do fator de abrangência
+
+    Returns:
+        CurvaCalibracao
+    """
+    x = np.asarray(indicacoes, dtype=float)
+    y = np.asarray(correcoes, dtype=float)
+    n_coeficientes = grau + 1
+    if x.ndim != 1 or x.shape != y.shape:
+        raise ValueError("Indicações e correções devem ser vetores do mesmo tamanho")
+    if grau < 0 or len(x) < n_coeficientes:
+        raise ValueError(f"São necessários ao menos {n_coeficientes} pontos para um ajuste de grau {grau}")
+
+    ponderado = incertezas is not None
+    if ponderado:
+        u = np.asarray(incertezas, dtype=float)
+        if u.shape != x.shape or not np.all(u > 0):
+            raise ValueError("As incertezas devem ser positivas, uma por ponto")
+    else:
+        u = np.ones_like(x)
+    if escalar_covariancia is None:
+        escalar_covariancia = not ponderado
+
+    # Normalização das indicações para [-1, 1]
+    minimo, maximo = x.min(), x.max()
+    centro = (maximo + minimo) / 2
+    escala = (maximo - minimo) / 2 or 1.0
+
+    # Sistema ponderado A/u · c = y/u resolvido por QR (sem formar AᵀA)
+    a = _vandermonde((x - centro) / escala, n_coeficientes) / u[:, None]
+    b = y / u
+    q, r = np.linalg.qr(a)
+    if np.any(np.abs(np.diag(r)) <= np.finfo(float).eps * np.abs(r).max() * len(x)):
+        raise ValueError("Indicações insuficientes para o grau do ajuste (pontos repetidos)")
+    coeficientes = np.linalg.solve(r, q.T @ b)
+
+    residuos = b - a @ coeficientes
+    qui_quadrado = float(residuos @ residuos)
+    graus_liberdade = len(x) - n_coeficientes
+
+    r_inversa = np.linalg.inv(r)
+    covariancia = r_inversa @ r_inversa.T
+    if escalar_covariancia:
+        if graus_liberdade == 0:
+            raise ValueError("Sem graus de liberdade para estimar a dispersão do ajuste")
+        covariancia *= qui_quadrado / graus_liberdade
+
+    # Covariância estimada dos resíduos: t de Student; incertezas absolutas: normal
+    tabela = tabela_quantis if tabela_quantis is not None else tabela_padrao
+    probabilidade = (1 + nivel_confianca) / 2
+    if escalar_covariancia:
+        fator_k = tabela.quantil_t(probabilidade, graus_liberdade)
+    else:
+        fator_k = tabela.quantil_normal(probabilidade)
+
+    return CurvaCalibracao(coeficientes, covariancia, float(centro), float(escala), graus_liberdade,
+                           qui_quadrado, float(fator_k), ponderado)
@@ -0,0 +1,212 @@
+"""
+Análise de deriva dos instrumentos e otimização da periodicidade de calibração
+A partir do histórico de erros de todas as calibrações (um registro por ponto
+calibrado), ajusta por mínimos quadrados uma reta erro × tempo para cada par
+(instrumento, ponto de calibração) e estima em quantos dias, a partir da última
+calibração, o erro previsto somado à incerteza expandida atinge o erro máximo
+permitido. A periodicidade recomendada de cada instrumento é uma fração desse
+prazo no seu ponto mais crítico, limitada a uma variação gradual da atual.
+
+Todos os ajustes são feitos de uma vez, com somas por grupo (np.bincount) sobre
+vetores da frota inteira, sem laço em Python por instrumento ou por ponto.
+
+O ponto de calibração é identificado pela sua sequência (pontos_calibracao.sequencia)
+e não pelo valor de referência, que é o valor medido no padrão e varia um pouco de
+uma calibração para outra (ex.: 99,98 e 100,01 no ponto de 100).
+"""
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas na primeira análise
+np = importar_tardio('numpy')
+
+# Calibrações mínimas de um ponto para estimar a sua deriva
+MIN_CALIBRACOES = 3
+
+# Fração do prazo previsto até o limite adotada como periodicidade
+FRACAO_SEGURANCA = 0.8
+
+# Variação máxima da periodicidade em uma revisão (metade a dobro da atual)
+FATOR_REDUCAO_MAXIMA = 0.5
+FATOR_AUMENTO_MAXIMO = 2.0
+
+# Limites absolutos da periodicidade recomendada (dias)
+PERIODICIDADE_MINIMA = 30
+PERIODICIDADE_MAXIMA = 1095
+
+
+def _grupos(*chaves):
+    """
+    Índice de grupo de cada registro, com os registros já ordenados pelas chaves
+
+    Returns:
+        (grupo, inicios): índice do grupo de cada registro e posição do início de cada grupo
+    """
+    novo = np.zeros(len(chaves[0]), dtype=bool)
+    novo[:1] = True
+    for chave in chaves:
+        novo[1:] |= chave[1:] != chave[:-1]
+    return np.cumsum(novo) - 1, np.flatnonzero(novo)
+
+
+def ajustar_derivas(instrumento, tempo, referencia, erro, incerteza_expandida, erro_maximo_permitido,
+                    min_calibracoes=MIN_CALIBRACOES, fator_incerteza_deriva=1.0, ponto=None):
+    """
+    Ajusta a deriva de cada par (instrumento, ponto de calibração)
+
+    Args:
+        instrumento: Id do instrumento de cada registro
+        tempo: Data de cada calibração, em dias (ex.: dia juliano)
+        referencia: Valor de referência de cada ponto
+        erro: Erro de indicação de cada ponto
+        incerteza_expandida: Incerteza expandida de cada ponto (NaN ou 0 se desconhecida)
+        erro_maximo_permitido: Erro máximo permitido de cada ponto (NaN se não definido)
+        min_calibracoes: Calibrações mínimas de um ponto para estimar a deriva
+        fator_incerteza_deriva: Múltiplos da incerteza da inclinação somados à deriva
+            estimada no cálculo do prazo (0 usa apenas a inclinação ajustada)
+        ponto: Identificação do ponto em cada calibração, ex.: a sequência (opcional,
+            padrão: o próprio valor de referência, que então deve ser idêntico em
+            todas as calibrações)
+
+    Returns:
+        Dicionário de vetores, um elemento por par (instrumento, ponto), ordenados
+        por instrumento e ponto: instrumento, ponto, referencia (a da calibração mais
+        recente), calibracoes, deriva
+        (unidade do erro por dia), incerteza_deriva, erro_previsto (na última calibração),
+        ultima_calibracao, limite (EMP menos a incerteza da última calibração) e
+        dias_ate_limite (inf se o ponto não deriva; NaN se o ponto não pode ser avaliado)
+    """
+    instrumento = np.asarray(instrumento)
+    tempo = np.asarray(tempo, dtype=float)
+    referencia = np.asarray(referencia, dtype=float)
+    erro = np.asarray(erro, dtype=float)
+    incerteza_expandida = np.nan_to_num(np.asarray(incerteza_expandida, dtype=float))
+    erro_maximo_permitido = np.asarray(erro_maximo_permitido, dtype=float)
+    ponto = referencia if ponto is None else np.asarray(ponto)
+
+    # Ordem por grupo e, dentro do grupo, por data: o último registro de cada grupo
+    # é a calibração mais recente
+    ordem = np.lexsort((tempo, ponto, instrumento))
+    instrumento, tempo, referencia, ponto = instrumento[ordem], tempo[ordem], referencia[ordem], ponto[ordem]
+    erro, incerteza_expandida, erro_maximo_permitido = (
+        erro[ordem], incerteza_expandida[ordem], erro_maximo_permitido[ordem]
+    )
+    grupo, inicios = _grupos(instrumento, ponto)
+    finais = np.append(inicios[1:], len(grupo)).astype(int) - 1 if len(inicios) else inicios
+    n_grupos = len(inicios)
+
+    # Tempo centrado na média do grupo: evita o cancelamento numérico das somas com
+    # datas em dias julianos (~2,46 milhões)
+    n = np.bincount(grupo, minlength=n_grupos).astype(float)
+    t_medio = np.bincount(grupo, tempo, n_grupos) / n
+    e_medio = np.bincount(grupo, erro, n_grupos) / n
+    dt = tempo - t_medio[grupo]
+    de = erro - e_medio[grupo]
+    s_tt = np.bincount(grupo, dt * dt, n_grupos)
+    s_te = np.bincount(grupo, dt * de, n_grupos)
+
+    avaliavel = (n >= min_calibracoes) & (s_tt > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deriva = np.where(avaliavel, s_te / s_tt, np.nan)
+        residuos = de - np.nan_to_num(deriva)[grupo] * dt
+        variancia = np.bincount(grupo, residuos * residuos, n_grupos) / (n - 2)
+        incerteza_deriva = np.where(avaliavel & (n > 2), np.sqrt(variancia / s_tt), 0.0)
+
+    ultima_calibracao = tempo[finais]
+    erro_previsto = e_medio + np.nan_to_num(deriva) * (ultima_calibracao - t_medio)
+    limite = np.abs(erro_maximo_permitido[finais]) - incerteza_expandida[finais]
+
+    # Deriva conservadora, no sentido da inclinação ajustada; o limite é atingido em
+    # +limite (deriva positiva) ou em -limite (deriva negativa)
+    taxa = np.abs(deriva) + fator_incerteza_deriva * incerteza_deriva
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alvo = np.where(deriva >= 0, limite, -limite)
+        dias = np.where(taxa > 0, (alvo - erro_previsto) / np.where(deriva >= 0, taxa, -taxa), np.inf)
+    dias = np.where(np.abs(erro_previsto) >= limite, 0.0, np.maximum(dias, 0.0))
+    dias = np.where(avaliavel & np.isfinite(limite), dias, np.nan)
+
+    return {
+        'instrumento': instrumento[inicios],
+        'ponto': ponto[inicios],
+        'referencia': referencia[finais],
+        'calibracoes': n.astype(int),
+        'deriva': deriva,
+        'incerteza_deriva': incerteza_deriva,
+        'erro_previsto': erro_previsto,
+        'ultima_calibracao': ultima_calibracao,
+        'limite': limite,
+        'dias_ate_limite': dias
+    }
+
+
+def recomendar_periodicidades(derivas, instrumentos, periodicidade_atual, fracao_seguranca=FRACAO_SEGURANCA,
+                              minima=PERIODICIDADE_MINIMA, maxima=PERIODICIDADE_MAXIMA):
+    """
+    Periodicidade recomendada de cada instrumento a partir das derivas ajustadas
+
+    O prazo de cada instrumento é o do seu ponto mais crítico (menor prazo até o
+    limite). A recomendação é fracao_seguranca × prazo, limitada entre metade e o
+    dobro da periodicidade atual e entre minima e maxima. Pontos sem deriva (prazo
+    infinito) permitem dobrar a periodicidade; instrumentos sem nenhum ponto
+    avaliável mantêm a atual.
+
+    Args:
+        derivas: Resultado de ajustar_derivas
+        instrumentos: Ids dos instrumentos a avaliar
+        periodicidade_atual: Periodicidade atual de cada instrumento, em dias (NaN ou 0 se ausente)
+        fracao_seguranca: Fração do prazo previsto adotada como periodicidade
+        minima: Periodicidade mínima recomendada (dias)
+        maxima: Periodicidade máxima recomendada (dias)
+
+    Returns:
+        Dicionário de vetores na ordem de instrumentos: instrumento, periodicidade_atual,
+        periodicidade_recomendada (NaN se não houver recomendação), dias_ate_limite,
+        referencia_critica, deriva_critica e pontos_avaliados
+    """
+    instrumentos = np.asarray(instrumentos)
+    atual = np.nan_to_num(np.asarray(periodicidade_atual, dtype=float))
+
+    # Pontos avaliáveis, ordenados por instrumento e prazo: o primeiro de cada
+    # instrumento é o seu ponto crítico
+    validos = ~np.isnan(derivas['dias_ate_limite'])
+    instrumento_ponto = derivas['instrumento'][validos]
+    dias_ponto = derivas['dias_ate_limite'][validos]
+    ordem = np.lexsort((dias_ponto, instrumento_ponto))
+    _, inicios = _grupos(instrumento_ponto[ordem])
+    chaves = instrumento_ponto[ordem][inicios]
+    criticos = ordem[inicios]
+    avaliados = np.diff(np.append(inicios, len(ordem)))
+
+    dias = np.full(len(instrumentos), np.nan)
+    referencia = np.full(len(instrumentos), np.nan)
+    deriva = np.full(len(instrumentos), np.nan)
+    pontos = np.zeros(len(instrumentos), dtype=int)
+    encontrado = np.zeros(len(instrumentos), dtype=bool)
+    if len(chaves):
+        # Ponto crítico de cada instrumento pedido, por busca binária nos instrumentos avaliados
+        posicao = np.minimum(np.searchsorted(chaves, instrumentos), len(chaves) - 1)
+        encontrado = chaves[posicao] == instrumentos
+        critico = criticos[posicao[encontrado]]
+        dias[encontrado] = dias_ponto[critico]
+        referencia[encontrado] = derivas['referencia'][validos][critico]
+        deriva[encontrado] = derivas['deriva'][validos][critico]
+        pontos[encontrado] = avaliados[posicao[encontrado]]
+
+    proposta = np.floor(fracao_seguranca * dias)
+    com_atual = atual > 0
+    inferior = np.where(com_atual, np.maximum(minima, np.ceil(FATOR_REDUCAO_MAXIMA * atual)), minima)
+    superior = np.where(com_atual, np.minimum(maxima, np.floor(FATOR_AUMENTO_MAXIMO * atual)), maxima)
+    # A atual pode estar fora de [minima, maxima]: o intervalo permitido nunca fica vazio
+    superior = np.maximum(superior, inferior)
+    with np.errstate(invalid='ignore'):
+        recomendada = np.where(encontrado, np.clip(proposta, inferior, superior), np.nan)
+
+    return {
+        'instrumento': instrumentos,
+        'periodicidade_atual': np.where(com_atual, atual, np.nan),
+        'periodicidade_recomendada': recomendada,
+        'dias_ate_limite': dias,
+        'referencia_critica': referencia,
+        'deriva_critica': deriva,
+        'pontos_avaliados': pontos
+    }
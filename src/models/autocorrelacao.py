@@ -0,0 +1,88 @@
+"""
+Correção da incerteza Tipo A para séries autocorrelacionadas
+Calcula, com FFTs em lote sobre vários pontos de uma vez, a função de
+autocorrelação de cada série e o número efetivo de observações independentes
+n_ef = n / (1 + 2 Σ (1 - k/n) ρ_k), com a soma truncada na primeira defasagem
+em que a autocorrelação deixa de ser positiva
+"""
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro cálculo
+np = importar_tardio('numpy')
+
+# Número máximo de elementos de cada bloco de FFT (limita a memória em lotes grandes)
+ELEMENTOS_POR_BLOCO = 1 << 22
+
+
+def _tamanho_fft(n):
+    """Menor potência de 2 que evita a sobreposição circular da autocorrelação de n amostras"""
+    return 1 << (2 * n - 1).bit_length()
+
+
+def autocorrelacao_lote(valores, max_defasagem=None):
+    """
+    Calcula a função de autocorrelação amostral de vários pontos de uma vez
+
+    Args:
+        valores: Matriz pontos × leituras (NaN para leituras ausentes, que não
+            contribuem para nenhum produto)
+        max_defasagem: Maior defasagem calculada (opcional, padrão: leituras - 1)
+
+    Returns:
+        Matriz pontos × (max_defasagem + 1) com ρ_0 = 1, ρ_1, ..., ρ_max
+        (séries constantes têm autocorrelação nula fora de ρ_0)
+    """
+    valores = np.atleast_2d(np.asarray(valores, dtype=float))
+    n_pontos, n_leituras = valores.shape
+    if max_defasagem is None:
+        max_defasagem = max(n_leituras - 1, 0)
+
+    validos = ~np.isnan(valores)
+    n = validos.sum(axis=1)
+    media = np.where(validos, valores, 0.0).sum(axis=1) / np.maximum(n, 1)
+
+    tamanho = _tamanho_fft(max(n_leituras, 1))
+    linhas_por_bloco = max(1, ELEMENTOS_POR_BLOCO // tamanho)
+    rho = np.empty((n_pontos, max_defasagem + 1))
+
+    for inicio in range(0, n_pontos, linhas_por_bloco):
+        bloco = slice(inicio, inicio + linhas_por_bloco)
+        desvios = np.where(validos[bloco], valores[bloco] - media[bloco, None], 0.0)
+
+        # Autocovariância pelo teorema de Wiener-Khinchin: |FFT|² e FFT inversa
+        espectro = np.fft.rfft(desvios, n=tamanho, axis=1)
+        autocovariancia = np.fft.irfft(espectro.real ** 2 + espectro.imag ** 2, n=tamanho, axis=1)
+        autocovariancia = autocovariancia[:, :max_defasagem + 1]
+
+        variancia = autocovariancia[:, :1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rho[bloco] = np.where(variancia > 0, autocovariancia / variancia, 0.0)
+        rho[bloco, 0] = 1.0
+
+    return rho
+
+
+def n_efetivo_lote(valores, max_defasagem=None):
+    """
+    Calcula o número efetivo de observações independentes de vários pontos
+
+    Args:
+        valores: Matriz pontos × leituras (NaN para leituras ausentes)
+        max_defasagem: Maior defasagem considerada (opcional)
+
+    Returns:
+        Array com n_ef de cada ponto, limitado ao intervalo [1, n]
+    """
+    valores = np.atleast_2d(np.asarray(valores, dtype=float))
+    n = (~np.isnan(valores)).sum(axis=1)
+    rho = autocorrelacao_lote(valores, max_defasagem)[:, 1:]
+
+    # Somar apenas a sequência inicial de autocorrelações positivas
+    positivas = np.cumprod(rho > 0, axis=1, dtype=bool)
+    defasagens = np.arange(1, rho.shape[1] + 1)
+    pesos = np.clip(1 - defasagens / np.maximum(n, 1)[:, None], 0.0, None)
+    soma = (pesos * np.where(positivas, rho, 0.0)).sum(axis=1)
+
+    n_efetivo = n / (1 + 2 * soma)
+    return np.clip(n_efetivo, 1, np.maximum(n, 1))
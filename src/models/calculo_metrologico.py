@@ -3,19 +3,34 @@ Módulo de cálculos metrológicos para o Sistema de Gestão de Calibração
 Implementa funções para cálculo de erro de medição e incerteza conforme normas técnicas
 """
 
-import numpy as np
-from scipy import stats
 import math
+import warnings
+
+from models.quantis import tabela_padrao
+from models.resultados import (
+    ResultadoTipoA, OrcamentoTipoB, ResultadoCombinada, ResultadoIncerteza
+)
+from utils.importacao_tardia import importar_tardio
+from utils.metricas import cronometrar
+
+# NumPy é carregado apenas no primeiro cálculo
+np = importar_tardio('numpy')
+
+# Histograma das etapas do cálculo (ver utils.metricas; desligado por padrão)
+METRICA_CALCULO = 'calibra_calculo_segundos'
 
 class CalculoMetrologico:
-    def __init__(self, nivel_confianca=0.95):
+    def __init__(self, nivel_confianca=0.95, tabela_quantis=None):
         """
         Inicializa a classe de cálculos metrológicos
         
         Args:
             nivel_confianca: Nível de confiança para cálculos de incerteza (padrão: 0.95 ou 95%)
+            tabela_quantis: Tabela de quantis t/normal (opcional, padrão: tabela compartilhada
+                do módulo models.quantis)
         """
         self.nivel_confianca = nivel_confianca
+        self.tabela_quantis = tabela_quantis if tabela_quantis is not None else tabela_padrao
     
     def calcular_erro(self, valor_lido, valor_referencia):
         """
@@ -30,49 +45,80 @@ class CalculoMetrologico:
         """
         return valor_lido - valor_referencia
     
-    def calcular_incerteza_tipo_a(self, valores):
+    @cronometrar(METRICA_CALCULO, etapa='tipo_a', modo='ponto')
+    def calcular_incerteza_tipo_a(self, valores, autocorrelacao=False):
         """
         Calcula a incerteza Tipo A baseada em análise estatística de série de observações
         
         Args:
             valores: Lista de valores medidos
+            autocorrelacao: Se True, corrige a incerteza e os graus de liberdade pelo
+                número efetivo de observações independentes (séries de registradores
+                autocorrelacionadas; ver models.autocorrelacao)
             
         Returns:
-            Dicionário com resultados do cálculo de incerteza Tipo A
+            ResultadoTipoA (acessível também como dicionário)
         """
+        if autocorrelacao and len(valores) >= 2:
+            lote = self.calcular_incerteza_tipo_a_lote([valores], autocorrelacao=True)
+            return ResultadoTipoA(**{chave: lote[chave][0].item() for chave in lote})
+        
         if len(valores) < 2:
-            return {
-                'desvio_padrao': 0,
-                'desvio_padrao_media': 0,
-                'graus_liberdade': 0,
-                'fator_t': 0,
-                'incerteza_padrao': 0
-            }
+            return ResultadoTipoA(
+                media=None,
+                desvio_padrao=0,
+                desvio_padrao_media=0,
+                graus_liberdade=0,
+                fator_t=0,
+                incerteza_padrao=0
+            )
         
         # Média dos valores
-        media = np.mean(valores)
+        media = float(np.mean(valores))
         
         # Desvio padrão experimental
-        desvio_padrao = np.std(valores, ddof=1)
+        desvio_padrao = float(np.std(valores, ddof=1))
         
         # Desvio padrão da média (incerteza padrão Tipo A)
-        desvio_padrao_media = desvio_padrao / np.sqrt(len(valores))
+        desvio_padrao_media = desvio_padrao / math.sqrt(len(valores))
         
         # Graus de liberdade
         graus_liberdade = len(valores) - 1
         
         # Fator t de Student para o nível de confiança
-        fator_t = stats.t.ppf((1 + self.nivel_confianca) / 2, graus_liberdade)
+        fator_t = self.tabela_quantis.quantil_t((1 + self.nivel_confianca) / 2, graus_liberdade)
+        
+        return ResultadoTipoA(
+            media=media,
+            desvio_padrao=desvio_padrao,
+            desvio_padrao_media=desvio_padrao_media,
+            graus_liberdade=graus_liberdade,
+            fator_t=fator_t,
+            incerteza_padrao=desvio_padrao_media
+        )
+    
+    def calcular_incerteza_tipo_a_serie(self, serie, tamanho_bloco=None):
+        """
+        Calcula a incerteza Tipo A de uma série longa em uma única passagem
         
-        return {
-            'media': media,
-            'desvio_padrao': desvio_padrao,
-            'desvio_padrao_media': desvio_padrao_media,
-            'graus_liberdade': graus_liberdade,
-            'fator_t': fator_t,
-            'incerteza_padrao': desvio_padrao_media
-        }
+        Diferente de calcular_incerteza_tipo_a, não exige a série inteira em memória:
+        aceita um gerador de leituras ou de blocos de leituras (ver
+        models.estatistica_incremental.AcumuladorTipoA).
+        
+        Args:
+            serie: Array, iterável de leituras ou iterável de blocos de leituras
+            tamanho_bloco: Leituras agrupadas por bloco quando a série é fornecida
+                valor a valor (opcional)
+            
+        Returns:
+            ResultadoTipoA (acessível também como dicionário)
+        """
+        from models.estatistica_incremental import AcumuladorTipoA, TAMANHO_BLOCO
+        
+        acumulador = AcumuladorTipoA().consumir(serie, tamanho_bloco or TAMANHO_BLOCO)
+        return acumulador.resultado(self.nivel_confianca, self.tabela_quantis)
     
+    @cronometrar(METRICA_CALCULO, etapa='tipo_b', modo='ponto')
     def calcular_incerteza_tipo_b(self, fontes_incerteza):
         """
         Calcula a incerteza Tipo B baseada em outras fontes que não a análise estatística
@@ -87,26 +133,23 @@ class CalculoMetrologico:
                 - graus_liberdade: Graus de liberdade (opcional)
                 
         Returns:
-            Dicionário com resultados do cálculo de incerteza Tipo B
+            OrcamentoTipoB com as fontes em um array estruturado (acessível também
+            como dicionário)
         """
-        incertezas = []
-        graus_liberdade = []
+        descricoes = []
+        distribuicoes = []
+        registros = []
         
         for fonte in fontes_incerteza:
-            valor = fonte['valor']
+            valor = float(fonte['valor'])
             distribuicao = fonte.get('distribuicao', 'normal')
-            coef_sensibilidade = fonte.get('coeficiente_sensibilidade', 1.0)
+            coef_sensibilidade = float(fonte.get('coeficiente_sensibilidade', 1.0))
             
             # Determinar divisor com base na distribuição
             if 'divisor' in fonte:
-                divisor = fonte['divisor']
+                divisor = float(fonte['divisor'])
             else:
-                if distribuicao == 'retangular':
-                    divisor = np.sqrt(3)
-                elif distribuicao == 'triangular':
-                    divisor = np.sqrt(6)
-                else:  # normal ou outras
-                    divisor = 1.0
+                divisor = self._divisor_distribuicao(distribuicao)
             
             # Calcular incerteza padrão
             incerteza_padrao = valor / divisor
@@ -115,67 +158,71 @@ class CalculoMetrologico:
             contribuicao = incerteza_padrao * coef_sensibilidade
             
             # Graus de liberdade (infinito para Tipo B se não especificado)
-            gl = fonte.get('graus_liberdade', float('inf'))
-            
-            incertezas.append({
-                'fonte': fonte.get('descricao', f"Fonte {len(incertezas) + 1}"),
-                'valor': valor,
-                'distribuicao': distribuicao,
-                'divisor': divisor,
-                'incerteza_padrao': incerteza_padrao,
-                'coeficiente_sensibilidade': coef_sensibilidade,
-                'contribuicao': contribuicao,
-                'contribuicao_quadratica': contribuicao ** 2,
-                'graus_liberdade': gl
-            })
+            gl = float(fonte.get('graus_liberdade', float('inf')))
             
-            graus_liberdade.append(gl)
+            descricoes.append(fonte.get('descricao', f"Fonte {len(descricoes) + 1}"))
+            distribuicoes.append(distribuicao)
+            registros.append((valor, divisor, incerteza_padrao, coef_sensibilidade,
+                              contribuicao, contribuicao ** 2, gl))
+        
+        # Um único array estruturado com todas as fontes do orçamento
+        dados = np.array(registros, dtype=OrcamentoTipoB.tipo_registro())
         
         # Incerteza combinada (raiz quadrada da soma dos quadrados)
-        soma_quadratica = sum(inc['contribuicao_quadratica'] for inc in incertezas)
-        incerteza_combinada = np.sqrt(soma_quadratica)
+        soma_quadratica = sum(registro[5] for registro in registros)
+        incerteza_combinada = math.sqrt(soma_quadratica)
         
-        return {
-            'fontes': incertezas,
-            'incerteza_combinada': incerteza_combinada,
-            'graus_liberdade': graus_liberdade
-        }
+        return OrcamentoTipoB(dados, descricoes, distribuicoes, incerteza_combinada)
     
-    def calcular_incerteza_combinada(self, incerteza_tipo_a, incerteza_tipo_b):
+    @cronometrar(METRICA_CALCULO, etapa='combinada', modo='ponto')
+    def calcular_incerteza_combinada(self, incerteza_tipo_a, incerteza_tipo_b, correlacao=None):
         """
         Calcula a incerteza combinada a partir das incertezas Tipo A e Tipo B
         
         Args:
             incerteza_tipo_a: Resultado do cálculo de incerteza Tipo A
             incerteza_tipo_b: Resultado do cálculo de incerteza Tipo B
+            correlacao: Matriz de correlação entre as fontes Tipo B (opcional, padrão:
+                fontes não correlacionadas; ver models.propagacao)
             
         Returns:
-            Dicionário com resultados do cálculo de incerteza combinada
+            ResultadoCombinada (acessível também como dicionário)
         """
         u_a = incerteza_tipo_a['incerteza_padrao']
         u_b = incerteza_tipo_b['incerteza_combinada']
         
+        if correlacao is not None:
+            from models.propagacao import combinar
+            
+            # u_b² = gᵀ R g, com g as contribuições (com sinal) das fontes Tipo B
+            contribuicoes = [fonte['contribuicao'] for fonte in incerteza_tipo_b['fontes']]
+            u_b = float(combinar([contribuicoes], correlacao)[0])
+        
         # Incerteza combinada (raiz quadrada da soma dos quadrados)
-        incerteza_combinada = np.sqrt(u_a**2 + u_b**2)
+        incerteza_combinada = math.sqrt(u_a**2 + u_b**2)
         
         # Cálculo dos graus de liberdade efetivos (fórmula de Welch-Satterthwaite)
         gl_a = incerteza_tipo_a['graus_liberdade']
-        gl_b_list = incerteza_tipo_b['graus_liberdade']
         
         # Contribuições para o denominador da fórmula
         if u_a > 0 and gl_a > 0:
             termo_a = (u_a**4) / gl_a
         else:
             termo_a = 0
-            
-        termos_b = []
-        for i, gl in enumerate(gl_b_list):
-            if gl < float('inf') and incerteza_tipo_b['fontes'][i]['contribuicao'] > 0:
-                u_bi = incerteza_tipo_b['fontes'][i]['contribuicao']
-                termos_b.append((u_bi**4) / gl)
+        
+        if isinstance(incerteza_tipo_b, OrcamentoTipoB):
+            termo_b = incerteza_tipo_b.termo_welch_satterthwaite()
+        else:
+            # Orçamento informado como dicionário (formato anterior)
+            termos_b = []
+            for i, gl in enumerate(incerteza_tipo_b['graus_liberdade']):
+                if gl < float('inf') and incerteza_tipo_b['fontes'][i]['contribuicao'] > 0:
+                    u_bi = incerteza_tipo_b['fontes'][i]['contribuicao']
+                    termos_b.append((u_bi**4) / gl)
+            termo_b = sum(termos_b)
         
         # Cálculo dos graus de liberdade efetivos
-        denominador = termo_a + sum(termos_b)
+        denominador = termo_a + termo_b
         
         if incerteza_combinada > 0 and denominador > 0:
             graus_liberdade_efetivos = (incerteza_combinada**4) / denominador
@@ -186,13 +233,14 @@ class CalculoMetrologico:
         if graus_liberdade_efetivos < float('inf'):
             graus_liberdade_efetivos = math.floor(graus_liberdade_efetivos)
         
-        return {
-            'incerteza_tipo_a': u_a,
-            'incerteza_tipo_b': u_b,
-            'incerteza_combinada': incerteza_combinada,
-            'graus_liberdade_efetivos': graus_liberdade_efetivos
-        }
+        return ResultadoCombinada(
+            incerteza_tipo_a=u_a,
+            incerteza_tipo_b=u_b,
+            incerteza_combinada=incerteza_combinada,
+            graus_liberdade_efetivos=graus_liberdade_efetivos
+        )
     
+    @cronometrar(METRICA_CALCULO, etapa='fator_k', modo='ponto')
     def calcular_fator_abrangencia(self, graus_liberdade_efetivos):
         """
         Calcula o fator de abrangência k com base nos graus de liberdade efetivos
@@ -205,11 +253,12 @@ class CalculoMetrologico:
         """
         # Se graus de liberdade for infinito, usar distribuição normal
         if graus_liberdade_efetivos == float('inf'):
-            return stats.norm.ppf((1 + self.nivel_confianca) / 2)
+            return self.tabela_quantis.quantil_normal((1 + self.nivel_confianca) / 2)
         
         # Caso contrário, usar distribuição t de Student
-        return stats.t.ppf((1 + self.nivel_confianca) / 2, graus_liberdade_efetivos)
+        return self.tabela_quantis.quantil_t((1 + self.nivel_confianca) / 2, graus_liberdade_efetivos)
     
+    @cronometrar(METRICA_CALCULO, etapa='expandida', modo='ponto')
     def calcular_incerteza_expandida(self, incerteza_combinada, fator_k=None, graus_liberdade_efetivos=None):
         """
         Calcula a incerteza expandida
@@ -231,25 +280,36 @@ class CalculoMetrologico:
         
         return incerteza_combinada * fator_k
     
-    def calcular_incerteza_completa(self, valores_medidos, fontes_incerteza_b):
+    @cronometrar(METRICA_CALCULO, etapa='completa', modo='ponto')
+    def calcular_incerteza_completa(self, valores_medidos, fontes_incerteza_b, autocorrelacao=False,
+                                    correlacao=None):
         """
         Realiza o cálculo completo de incerteza
         
         Args:
             valores_medidos: Lista de valores medidos para cálculo da incerteza Tipo A
-            fontes_incerteza_b: Lista de fontes de incerteza para cálculo da incerteza Tipo B
+            fontes_incerteza_b: Lista de fontes de incerteza para cálculo da incerteza Tipo B,
+                ou OrcamentoTipoB já montado (por exemplo, por um modelo de orçamento;
+                ver models.orcamento_modelo)
+            autocorrelacao: Se True, corrige a incerteza Tipo A para leituras
+                autocorrelacionadas (ver calcular_incerteza_tipo_a)
+            correlacao: Matriz de correlação entre as fontes Tipo B (opcional)
             
         Returns:
-            Dicionário com todos os resultados do cálculo de incerteza
+            ResultadoIncerteza com todos os resultados do cálculo de incerteza
+            (acessível também como dicionário; ver models.resultados)
         """
         # Calcular incerteza Tipo A
-        incerteza_a = self.calcular_incerteza_tipo_a(valores_medidos)
+        incerteza_a = self.calcular_incerteza_tipo_a(valores_medidos, autocorrelacao)
         
         # Calcular incerteza Tipo B
-        incerteza_b = self.calcular_incerteza_tipo_b(fontes_incerteza_b)
+        if isinstance(fontes_incerteza_b, OrcamentoTipoB):
+            incerteza_b = fontes_incerteza_b
+        else:
+            incerteza_b = self.calcular_incerteza_tipo_b(fontes_incerteza_b)
         
         # Calcular incerteza combinada
-        incerteza_comb = self.calcular_incerteza_combinada(incerteza_a, incerteza_b)
+        incerteza_comb = self.calcular_incerteza_combinada(incerteza_a, incerteza_b, correlacao)
         
         # Calcular fator de abrangência
         fator_k = self.calcular_fator_abrangencia(incerteza_comb['graus_liberdade_efetivos'])
@@ -260,15 +320,70 @@ class CalculoMetrologico:
             fator_k
         )
         
-        return {
-            'incerteza_tipo_a': incerteza_a,
-            'incerteza_tipo_b': incerteza_b,
-            'incerteza_combinada': incerteza_comb,
-            'fator_k': fator_k,
-            'incerteza_expandida': incerteza_expandida,
-            'nivel_confianca': self.nivel_confianca
-        }
+        return ResultadoIncerteza(
+            incerteza_tipo_a=incerteza_a,
+            incerteza_tipo_b=incerteza_b,
+            incerteza_combinada=incerteza_comb,
+            fator_k=fator_k,
+            incerteza_expandida=incerteza_expandida,
+            nivel_confianca=self.nivel_confianca
+        )
     
+    @cronometrar(METRICA_CALCULO, etapa='monte_carlo', modo='ponto')
+    def calcular_incerteza_monte_carlo(self, valores_medidos, fontes_incerteza_b, modelo=None, **opcoes):
+        """
+        Realiza o cálculo de incerteza pelo método de Monte Carlo (GUM Suplemento 1)
+        
+        Alternativa a calcular_incerteza_completa para modelos não lineares ou
+        orçamentos dominados por distribuições não normais.
+        
+        Args:
+            valores_medidos: Lista de valores medidos (componente Tipo A)
+            fontes_incerteza_b: Lista de fontes de incerteza Tipo B
+            modelo: Função vetorizada do modelo de medição (opcional, padrão: soma
+                das contribuições)
+            **opcoes: Parâmetros de SimulacaoMonteCarlo (tamanho_bloco, processos,
+                digitos_significativos, max_ensaios, semente); por padrão, a simulação
+                é feita no próprio processo
+            
+        Returns:
+            Dicionário com os resultados da simulação (ver SimulacaoMonteCarlo.simular)
+        """
+        from models.monte_carlo import SimulacaoMonteCarlo
+        
+        simulacao = SimulacaoMonteCarlo(nivel_confianca=self.nivel_confianca, **opcoes)
+        return simulacao.simular(fontes_incerteza_b, valores_medidos=valores_medidos, modelo=modelo)
+    
+    def ajustar_curva_calibracao(self, pontos, grau=1, ponderado=True):
+        """
+        Ajusta a curva de correção (valor_referencia - valor_lido) em função da
+        indicação, sobre todos os pontos de uma calibração
+        
+        Args:
+            pontos: Lista de pontos de calibração (dicionários com valor_referencia,
+                valor_lido e, para o ajuste ponderado, incerteza_expandida e fator_k)
+            grau: Grau do polinômio de correção (1 = reta)
+            ponderado: Se True, pondera cada ponto pelo inverso do quadrado da sua
+                incerteza padrão (U / k)
+            
+        Returns:
+            CurvaCalibracao (ver models.ajuste_curva), que avalia a correção e a sua
+            incerteza em qualquer conjunto de leituras
+        """
+        from models.ajuste_curva import ajustar_curva
+        
+        indicacoes = np.array([ponto['valor_lido'] for ponto in pontos], dtype=float)
+        referencias = np.array([ponto['valor_referencia'] for ponto in pontos], dtype=float)
+        correcoes = -self.calcular_erro(indicacoes, referencias)
+        
+        incertezas = None
+        if ponderado:
+            incertezas = np.array([ponto['incerteza_expandida'] / (ponto.get('fator_k') or 2.0) for ponto in pontos])
+        
+        return ajustar_curva(indicacoes, correcoes, grau=grau, incertezas=incertezas,
+                             tabela_quantis=self.tabela_quantis, nivel_confianca=self.nivel_confianca)
+    
+    @cronometrar(METRICA_CALCULO, etapa='conformidade', modo='ponto')
     def avaliar_conformidade(self, erro, incerteza_expandida, erro_maximo_permitido):
         """
         Avalia a conformidade do instrumento com base no erro e na incerteza
@@ -297,3 +412,388 @@ class CalculoMetrologico:
             'erro_maximo_permitido': erro_maximo_permitido,
             'razao_erro': razao_erro
         }
+    
+    def preparar_fontes_lote(self, fontes_por_ponto):
+        """
+        Converte listas de fontes de incerteza Tipo B (uma lista por ponto) nas
+        matrizes pontos × fontes utilizadas pelos cálculos em lote
+        
+        Pontos com menos fontes são completados com fontes de valor zero, que não
+        alteram a soma quadrática nem os graus de liberdade efetivos.
+        
+        Args:
+            fontes_por_ponto: Lista (um item por ponto) de listas de fontes no mesmo
+                formato aceito por calcular_incerteza_tipo_b
+                
+        Returns:
+            Dicionário com as matrizes 'valores', 'divisores', 'coeficientes_sensibilidade'
+            e 'graus_liberdade', prontas para calcular_incerteza_tipo_b_lote
+        """
+        n_pontos = len(fontes_por_ponto)
+        n_fontes = max((len(fontes) for fontes in fontes_por_ponto), default=0)
+        
+        valores = np.zeros((n_pontos, n_fontes))
+        divisores = np.ones((n_pontos, n_fontes))
+        coeficientes = np.ones((n_pontos, n_fontes))
+        graus_liberdade = np.full((n_pontos, n_fontes), np.inf)
+        
+        for i, fontes in enumerate(fontes_por_ponto):
+            for j, fonte in enumerate(fontes):
+                valores[i, j] = fonte['valor']
+                if 'divisor' in fonte:
+                    divisores[i, j] = fonte['divisor']
+                else:
+                    divisores[i, j] = self._divisor_distribuicao(fonte.get('distribuicao', 'normal'))
+                coeficientes[i, j] = fonte.get('coeficiente_sensibilidade', 1.0)
+                graus_liberdade[i, j] = fonte.get('graus_liberdade', float('inf'))
+        
+        return {
+            'valores': valores,
+            'divisores': divisores,
+            'coeficientes_sensibilidade': coeficientes,
+            'graus_liberdade': graus_liberdade
+        }
+    
+    def _divisor_distribuicao(self, distribuicao):
+        """Retorna o divisor padrão associado a uma distribuição de probabilidade"""
+        if distribuicao == 'retangular':
+            return math.sqrt(3)
+        if distribuicao == 'triangular':
+            return math.sqrt(6)
+        return 1.0
+    
+    @cronometrar(METRICA_CALCULO, etapa='tipo_a', modo='lote')
+    def calcular_incerteza_tipo_a_lote(self, valores, autocorrelacao=False):
+        """
+        Calcula a incerteza Tipo A de vários pontos de calibração de uma só vez
+        
+        Args:
+            valores: Matriz pontos × repetições com as leituras de cada ponto.
+                Leituras ausentes podem ser indicadas com NaN.
+            autocorrelacao: Se True, usa o número efetivo de observações independentes
+                de cada ponto (calculado com FFTs em lote) no lugar de n
+                
+        Returns:
+            Dicionário com as mesmas chaves de calcular_incerteza_tipo_a, onde cada
+            valor é um array com um elemento por ponto (com 'n_efetivo' quando
+            autocorrelacao=True)
+        """
+        valores = np.atleast_2d(np.asarray(valores, dtype=float))
+        
+        ausentes = np.isnan(valores)
+        if ausentes.any():
+            n = (~ausentes).sum(axis=1)
+            # Pontos sem leituras suficientes geram avisos do NumPy, tratados abaixo
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                media = np.nanmean(valores, axis=1)
+                desvio_padrao = np.nanstd(valores, axis=1, ddof=1)
+        else:
+            n = np.full(valores.shape[0], valores.shape[1])
+            media = np.mean(valores, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                desvio_padrao = np.std(valores, axis=1, ddof=1)
+        
+        # Pontos com menos de duas leituras não têm avaliação Tipo A
+        suficientes = n >= 2
+        desvio_padrao = np.where(suficientes, desvio_padrao, 0.0)
+        if autocorrelacao:
+            from models.autocorrelacao import n_efetivo_lote
+            
+            n_efetivo = np.where(suficientes, n_efetivo_lote(valores), n)
+            # ν = n_ef - 1, arredondado para baixo como os graus de liberdade efetivos (mínimo 1)
+            graus_liberdade = np.where(suficientes, np.maximum(np.floor(n_efetivo) - 1, 1), 0).astype(int)
+        else:
+            n_efetivo = n
+            graus_liberdade = np.where(suficientes, n - 1, 0)
+        desvio_padrao_media = np.where(suficientes, desvio_padrao / np.sqrt(np.maximum(n_efetivo, 1)), 0.0)
+        
+        fator_t = np.zeros(valores.shape[0])
+        if suficientes.any():
+            fator_t[suficientes] = self.tabela_quantis.quantis_t(
+                (1 + self.nivel_confianca) / 2, graus_liberdade[suficientes]
+            )
+        
+        resultado = {
+            'media': media,
+            'desvio_padrao': desvio_padrao,
+            'desvio_padrao_media': desvio_padrao_media,
+            'graus_liberdade': graus_liberdade,
+            'fator_t': fator_t,
+            'incerteza_padrao': desvio_padrao_media
+        }
+        if autocorrelacao:
+            resultado['n_efetivo'] = n_efetivo
+        return resultado
+    
+    @cronometrar(METRICA_CALCULO, etapa='tipo_b', modo='lote')
+    def calcular_incerteza_tipo_b_lote(self, valores, distribuicoes=None, divisores=None,
+                                       coeficientes_sensibilidade=None, graus_liberdade=None):
+        """
+        Calcula a incerteza Tipo B de vários pontos de calibração de uma só vez
+        
+        Args:
+            valores: Matriz pontos × fontes com o valor de cada fonte de incerteza
+            distribuicoes: Distribuição de cada fonte ('normal', 'retangular', 'triangular'),
+                por fonte ou por ponto e fonte (opcional, padrão: 'normal')
+            divisores: Divisores explícitos (opcional). Posições com NaN usam o divisor
+                da distribuição correspondente
+            coeficientes_sensibilidade: Coeficientes de sensibilidade (opcional, padrão: 1.0)
+            graus_liberdade: Graus de liberdade de cada fonte (opcional, padrão: infinito)
+            
+        Todos os argumentos opcionais são combinados com valores por broadcasting,
+        de modo que um vetor com um elemento por fonte vale para todos os pontos.
+                
+        Returns:
+            Dicionário com as matrizes por fonte ('divisor', 'incerteza_padrao',
+            'contribuicao', 'contribuicao_quadratica', 'graus_liberdade') e o vetor
+            'incerteza_combinada' com um elemento por ponto
+        """
+        valores = np.atleast_2d(np.asarray(valores, dtype=float))
+        
+        # Divisor de cada fonte a partir da distribuição
+        divisor_distribuicao = np.ones(valores.shape)
+        if distribuicoes is not None:
+            distribuicoes = np.broadcast_to(np.asarray(distribuicoes), valores.shape)
+            divisor_distribuicao = np.where(distribuicoes == 'retangular', np.sqrt(3), divisor_distribuicao)
+            divisor_distribuicao = np.where(distribuicoes == 'triangular', np.sqrt(6), divisor_distribuicao)
+        
+        if divisores is None:
+            divisor = divisor_distribuicao
+        else:
+            divisores = np.broadcast_to(np.asarray(divisores, dtype=float), valores.shape)
+            divisor = np.where(np.isnan(divisores), divisor_distribuicao, divisores)
+        
+        if coeficientes_sensibilidade is None:
+            coeficientes = np.ones(valores.shape)
+        else:
+            coeficientes = np.broadcast_to(np.asarray(coeficientes_sensibilidade, dtype=float), valores.shape)
+        
+        if graus_liberdade is None:
+            gl = np.full(valores.shape, np.inf)
+        else:
+            gl = np.broadcast_to(np.asarray(graus_liberdade, dtype=float), valores.shape)
+        
+        incerteza_padrao = valores / divisor
+        contribuicao = incerteza_padrao * coeficientes
+        contribuicao_quadratica = contribuicao ** 2
+        
+        return {
+            'divisor': divisor,
+            'incerteza_padrao': incerteza_padrao,
+            'coeficiente_sensibilidade': coeficientes,
+            'contribuicao': contribuicao,
+            'contribuicao_quadratica': contribuicao_quadratica,
+            'graus_liberdade': gl,
+            'incerteza_combinada': np.sqrt(contribuicao_quadratica.sum(axis=1))
+        }
+    
+    @cronometrar(METRICA_CALCULO, etapa='combinada', modo='lote')
+    def calcular_incerteza_combinada_lote(self, incerteza_tipo_a, incerteza_tipo_b, correlacao=None):
+        """
+        Calcula a incerteza combinada e os graus de liberdade efetivos de vários pontos
+        
+        Args:
+            incerteza_tipo_a: Resultado de calcular_incerteza_tipo_a_lote (ou dicionário
+                com arrays 'incerteza_padrao' e 'graus_liberdade')
+            incerteza_tipo_b: Resultado de calcular_incerteza_tipo_b_lote
+            correlacao: Matriz de correlação entre as fontes Tipo B, uma para todos os
+                pontos ou uma por ponto (opcional, padrão: fontes não correlacionadas)
+            
+        Returns:
+            Dicionário com as mesmas chaves de calcular_incerteza_combinada, onde cada
+            valor é um array com um elemento por ponto
+        """
+        u_a = np.asarray(incerteza_tipo_a['incerteza_padrao'], dtype=float)
+        gl_a = np.asarray(incerteza_tipo_a['graus_liberdade'], dtype=float)
+        u_b = np.asarray(incerteza_tipo_b['incerteza_combinada'], dtype=float)
+        
+        if correlacao is not None:
+            from models.propagacao import combinar
+            u_b = combinar(incerteza_tipo_b['contribuicao'], correlacao)
+        
+        incerteza_combinada = np.sqrt(u_a**2 + u_b**2)
+        
+        # Fórmula de Welch-Satterthwaite, com os mesmos critérios do cálculo por ponto
+        with np.errstate(divide='ignore', invalid='ignore'):
+            termo_a = np.where((u_a > 0) & (gl_a > 0), u_a**4 / gl_a, 0.0)
+            
+            contribuicao = incerteza_tipo_b['contribuicao']
+            gl_b = incerteza_tipo_b['graus_liberdade']
+            termos_b = np.where(np.isfinite(gl_b) & (contribuicao > 0), contribuicao**4 / gl_b, 0.0)
+            
+            denominador = termo_a + termos_b.sum(axis=1)
+            
+            graus_liberdade_efetivos = np.where(
+                (incerteza_combinada > 0) & (denominador > 0),
+                incerteza_combinada**4 / denominador,
+                np.inf
+            )
+        
+        # Arredondar para o inteiro inferior (mais conservador)
+        graus_liberdade_efetivos = np.floor(graus_liberdade_efetivos)
+        
+        return {
+            'incerteza_tipo_a': u_a,
+            'incerteza_tipo_b': u_b,
+            'incerteza_combinada': incerteza_combinada,
+            'graus_liberdade_efetivos': graus_liberdade_efetivos
+        }
+    
+    @cronometrar(METRICA_CALCULO, etapa='fator_k', modo='lote')
+    def calcular_fator_abrangencia_lote(self, graus_liberdade_efetivos):
+        """
+        Calcula o fator de abrangência k para um array de graus de liberdade efetivos
+        
+        Args:
+            graus_liberdade_efetivos: Array de graus de liberdade efetivos (infinito permitido)
+            
+        Returns:
+            Array com o fator de abrangência k de cada ponto
+        """
+        return self.tabela_quantis.quantis_t((1 + self.nivel_confianca) / 2, graus_liberdade_efetivos)
+    
+    @cronometrar(METRICA_CALCULO, etapa='completa', modo='lote')
+    def calcular_incerteza_completa_lote(self, valores_medidos, fontes_incerteza_b, autocorrelacao=False,
+                                         correlacao=None):
+        """
+        Realiza o cálculo completo de incerteza para todos os pontos de uma calibração
+        
+        Equivale a chamar calcular_incerteza_completa ponto a ponto, mas processa
+        todos os pontos em uma única passagem vetorizada.
+        
+        Args:
+            valores_medidos: Matriz pontos × repetições com as leituras de cada ponto
+                (NaN para leituras ausentes)
+            fontes_incerteza_b: Orçamento Tipo B em forma matricial (dicionário com
+                'valores' e, opcionalmente, 'distribuicoes', 'divisores',
+                'coeficientes_sensibilidade' e 'graus_liberdade', como retornado por
+                preparar_fontes_lote) ou lista de listas de fontes, uma por ponto
+            autocorrelacao: Se True, corrige a incerteza Tipo A para leituras
+                autocorrelacionadas (ver calcular_incerteza_tipo_a_lote)
+            correlacao: Matriz de correlação entre as fontes Tipo B (opcional; ver
+                calcular_incerteza_combinada_lote)
+            
+        Returns:
+            Dicionário com a mesma estrutura de calcular_incerteza_completa, onde cada
+            resultado numérico é um array com um elemento por ponto
+        """
+        if not isinstance(fontes_incerteza_b, dict):
+            fontes_incerteza_b = self.preparar_fontes_lote(fontes_incerteza_b)
+        
+        # Calcular incerteza Tipo A
+        incerteza_a = self.calcular_incerteza_tipo_a_lote(valores_medidos, autocorrelacao)
+        
+        # Calcular incerteza Tipo B
+        valores_b = fontes_incerteza_b['valores']
+        if np.size(valores_b) == 0:
+            valores_b = np.zeros((len(incerteza_a['incerteza_padrao']), 0))
+        incerteza_b = self.calcular_incerteza_tipo_b_lote(
+            valores_b,
+            distribuicoes=fontes_incerteza_b.get('distribuicoes'),
+            divisores=fontes_incerteza_b.get('divisores'),
+            coeficientes_sensibilidade=fontes_incerteza_b.get('coeficientes_sensibilidade'),
+            graus_liberdade=fontes_incerteza_b.get('graus_liberdade')
+        )
+        
+        # Calcular incerteza combinada
+        incerteza_comb = self.calcular_incerteza_combinada_lote(incerteza_a, incerteza_b, correlacao)
+        
+        # Calcular fator de abrangência
+        fator_k = self.calcular_fator_abrangencia_lote(incerteza_comb['graus_liberdade_efetivos'])
+        
+        # Calcular incerteza expandida
+        incerteza_expandida = incerteza_comb['incerteza_combinada'] * fator_k
+        
+        return {
+            'incerteza_tipo_a': incerteza_a,
+            'incerteza_tipo_b': incerteza_b,
+            'incerteza_combinada': incerteza_comb,
+            'fator_k': fator_k,
+            'incerteza_expandida': incerteza_expandida,
+            'nivel_confianca': self.nivel_confianca
+        }
+    
+    def calcular_incerteza_modelo_lote(self, modelo, estimativas, incertezas, correlacao=None,
+                                       graus_liberdade=None):
+        """
+        Propaga a incerteza de vários pontos por um modelo de medição y = f(x₁, ..., x_N)
+        
+        Os coeficientes de sensibilidade são obtidos por diferenças finitas do próprio
+        modelo, para todos os pontos de uma vez, e a combinação é u_c² = cᵀ (D R D) c.
+        
+        Args:
+            modelo: Função vetorizada que recebe a matriz linhas × entradas e retorna
+                um array com um resultado por linha
+            estimativas: Matriz pontos × entradas com as estimativas das entradas
+            incertezas: Incertezas padrão das entradas (matriz pontos × entradas ou
+                vetor com um elemento por entrada)
+            correlacao: Matriz de correlação entre as entradas, uma para todos os
+                pontos ou uma por ponto (opcional, padrão: entradas não correlacionadas)
+            graus_liberdade: Graus de liberdade de cada entrada (opcional, padrão: infinito)
+            
+        Returns:
+            Dicionário de arrays com 'estimativa', 'coeficientes_sensibilidade' e
+            'contribuicao' (pontos × entradas), 'incerteza_combinada',
+            'graus_liberdade_efetivos', 'fator_k' e 'incerteza_expandida'
+        """
+        from models.propagacao import coeficientes_sensibilidade_lote, combinar
+        
+        x = np.atleast_2d(np.asarray(estimativas, dtype=float))
+        u = np.broadcast_to(np.asarray(incertezas, dtype=float), x.shape)
+        
+        estimativa = np.asarray(modelo(x), dtype=float)
+        coeficientes = coeficientes_sensibilidade_lote(modelo, x, u)
+        contribuicao = coeficientes * u
+        incerteza_combinada = combinar(contribuicao, correlacao)
+        
+        # Welch-Satterthwaite sobre as contribuições |cᵢ u(xᵢ)| (com correlação, é a
+        # aproximação usual; o GUM não define νef para entradas correlacionadas)
+        if graus_liberdade is None:
+            gl = np.full(x.shape, np.inf)
+        else:
+            gl = np.broadcast_to(np.asarray(graus_liberdade, dtype=float), x.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            termos = np.where(np.isfinite(gl) & (contribuicao != 0), contribuicao**4 / gl, 0.0)
+            denominador = termos.sum(axis=1)
+            graus_liberdade_efetivos = np.floor(np.where(
+                (incerteza_combinada > 0) & (denominador > 0),
+                incerteza_combinada**4 / denominador,
+                np.inf
+            ))
+        
+        fator_k = self.calcular_fator_abrangencia_lote(graus_liberdade_efetivos)
+        
+        return {
+            'estimativa': estimativa,
+            'coeficientes_sensibilidade': coeficientes,
+            'contribuicao': contribuicao,
+            'incerteza_combinada': incerteza_combinada,
+            'graus_liberdade_efetivos': graus_liberdade_efetivos,
+            'fator_k': fator_k,
+            'incerteza_expandida': incerteza_combinada * fator_k,
+            'nivel_confianca': self.nivel_confianca
+        }
+    
+    def calcular_incerteza_modelo(self, modelo, estimativas, incertezas, correlacao=None, graus_liberdade=None):
+        """
+        Propaga a incerteza de um ponto por um modelo de medição (ver calcular_incerteza_modelo_lote)
+        
+        Args:
+            modelo: Função vetorizada que recebe a matriz linhas × entradas
+            estimativas: Estimativas das entradas
+            incertezas: Incertezas padrão das entradas
+            correlacao: Matriz de correlação entre as entradas (opcional)
+            graus_liberdade: Graus de liberdade de cada entrada (opcional)
+            
+        Returns:
+            Dicionário com os mesmos resultados, como valores Python (listas por entrada)
+        """
+        lote = self.calcular_incerteza_modelo_lote(
+            modelo, [estimativas], [incertezas], correlacao,
+            None if graus_liberdade is None else [graus_liberdade]
+        )
+        return {
+            chave: valor if chave == 'nivel_confianca' else valor[0].tolist()
+            for chave, valor in lote.items()
+        }
@@ -0,0 +1,161 @@
+"""
+Decisão de conformidade em lote
+Avalia de uma só vez a conformidade de todos os pontos de uma calibração (ou de
+todo o parque de instrumentos) segundo uma regra de decisão, com a probabilidade
+de o erro verdadeiro estar fora do erro máximo permitido, e resume o resultado
+por instrumento
+"""
+
+import math
+
+from models.quantis import SEM_SCIPY
+from utils.importacao_tardia import importar_tardio
+from utils.metricas import cronometrar
+
+# NumPy é carregado apenas na primeira avaliação
+np = importar_tardio('numpy')
+
+# Regras de decisão disponíveis:
+#   aceitacao_simples: |e| <= EMP (a incerteza não é considerada)
+#   banda_guarda: |e| <= EMP - w, com banda de guarda w = fator_banda × U
+#       (com fator_banda = 1, a regra |e| + U <= EMP de avaliar_conformidade)
+#   risco_compartilhado: conforme se a probabilidade de aceitação falsa (probabilidade
+#       de o erro verdadeiro estar fora de ±EMP) não passar de risco_maximo
+REGRAS = ('aceitacao_simples', 'banda_guarda', 'risco_compartilhado')
+
+# Probabilidade máxima de aceitação falsa padrão da regra risco_compartilhado
+RISCO_MAXIMO = 0.025
+
+
+def _cdf_normal(z):
+    """Função de distribuição acumulada da normal padrão, elemento a elemento"""
+    if not SEM_SCIPY:
+        from scipy.special import ndtr
+        return ndtr(z)
+    erfc = np.frompyfunc(math.erfc, 1, 1)
+    return 0.5 * erfc(-np.asarray(z, dtype=float) / math.sqrt(2)).astype(float)
+
+
+def probabilidade_nao_conformidade(erro, incerteza_padrao, erro_maximo_permitido):
+    """
+    Calcula a probabilidade de o erro verdadeiro estar fora do intervalo ±EMP,
+    supondo distribuição normal centrada no erro medido
+
+    Args:
+        erro: Array de erros de medição
+        incerteza_padrao: Array (ou escalar) de incertezas padrão combinadas
+        erro_maximo_permitido: Array (ou escalar) de erros máximos permitidos
+
+    Returns:
+        Array de probabilidades (0 ou 1 onde a incerteza é nula)
+    """
+    erro = np.asarray(erro, dtype=float)
+    u = np.broadcast_to(np.asarray(incerteza_padrao, dtype=float), erro.shape)
+    emp = np.abs(np.asarray(erro_maximo_permitido, dtype=float))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        abaixo = _cdf_normal((-emp - erro) / u)
+        acima = _cdf_normal((erro - emp) / u)
+    probabilidade = abaixo + acima
+    return np.where(u > 0, probabilidade, np.where(np.abs(erro) <= emp, 0.0, 1.0))
+
+
+@cronometrar('calibra_calculo_segundos', etapa='conformidade', modo='lote')
+def avaliar_conformidade_lote(erro, incerteza_expandida, erro_maximo_permitido, regra='banda_guarda',
+                              fator_k=2.0, fator_banda=1.0, risco_maximo=RISCO_MAXIMO):
+    """
+    Avalia a conformidade de vários pontos de uma vez
+
+    Args:
+        erro: Array de erros de medição
+        incerteza_expandida: Array (ou escalar) de incertezas expandidas
+        erro_maximo_permitido: Array (ou escalar) de erros máximos permitidos
+        regra: Regra de decisão (ver REGRAS)
+        fator_k: Array (ou escalar) de fatores de abrangência, para obter a incerteza
+            padrão usada na probabilidade de não conformidade
+        fator_banda: Banda de guarda em múltiplos de U (regra banda_guarda)
+        risco_maximo: Probabilidade máxima de aceitação falsa (regra risco_compartilhado)
+
+    Returns:
+        Dicionário com os arrays 'conforme' (bool; False onde erro ou EMP são NaN),
+        'avaliado' (bool; False onde erro ou EMP são NaN, isto é, pontos sem
+        avaliação de conformidade), 'razao_erro' (|e| / EMP em %) e
+        'probabilidade_nao_conformidade'
+    """
+    if regra not in REGRAS:
+        raise ValueError(f"Regra de decisão inválida: {regra} (use {', '.join(REGRAS)})")
+
+    erro = np.asarray(erro, dtype=float)
+    incerteza_expandida = np.asarray(incerteza_expandida, dtype=float)
+    emp = np.broadcast_to(np.abs(np.asarray(erro_maximo_permitido, dtype=float)), erro.shape)
+    erro_absoluto = np.abs(erro)
+    avaliado = ~np.isnan(erro) & ~np.isnan(emp)
+
+    risco = probabilidade_nao_conformidade(erro, incerteza_expandida / np.asarray(fator_k, dtype=float), emp)
+
+    # Comparações com NaN resultam em False: pontos sem erro ou sem EMP não são conformes (nem avaliados)
+    if regra == 'aceitacao_simples':
+        conforme = erro_absoluto <= emp
+    elif regra == 'banda_guarda':
+        conforme = erro_absoluto + fator_banda * incerteza_expandida <= emp
+    else:
+        conforme = risco <= risco_maximo
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        razao_erro = np.where(emp != 0, erro_absoluto / emp * 100, np.inf)
+
+    return {
+        'conforme': conforme,
+        'avaliado': avaliado,
+        'razao_erro': razao_erro,
+        'probabilidade_nao_conformidade': risco
+    }
+
+
+def resumo_por_instrumento(instrumento_ids, avaliacao):
+    """
+    Resume a avaliação de conformidade por instrumento
+
+    Args:
+        instrumento_ids: Array com o id do instrumento de cada ponto
+        avaliacao: Dicionário retornado por avaliar_conformidade_lote
+
+    Pontos não avaliados (sem erro ou sem EMP) não são contados como não
+    conformes: um instrumento é reprovado se tem algum ponto avaliado não
+    conforme, e aprovado apenas se todos os pontos foram avaliados e são
+    conformes. Sem pontos não conformes, mas com pontos não avaliados, o
+    instrumento não é aprovado nem reprovado.
+
+    Returns:
+        Dicionário de arrays alinhados por instrumento: 'instrumento_id', 'pontos',
+        'nao_conformes', 'nao_avaliados', 'aprovado', 'reprovado',
+        'razao_erro_maxima' e 'probabilidade_nao_conformidade_maxima'
+    """
+    instrumento_ids = np.asarray(instrumento_ids)
+
+    # Uma única ordenação por instrumento; cada instrumento vira um trecho contíguo
+    ordem = np.argsort(instrumento_ids, kind='stable')
+    ordenados = instrumento_ids[ordem]
+    inicios = np.flatnonzero(np.concatenate(([len(ordenados) > 0], ordenados[1:] != ordenados[:-1])))
+    ids = ordenados[inicios]
+    pontos = np.diff(np.append(inicios, len(ordenados)))
+
+    def reduzir(operacao, valores, tipo):
+        if not len(ids):
+            return np.empty(0, dtype=tipo)
+        return operacao.reduceat(np.asarray(valores, dtype=tipo)[ordem], inicios)
+
+    avaliado = np.asarray(avaliacao['avaliado'])
+    nao_conformes = reduzir(np.add, avaliado & ~np.asarray(avaliacao['conforme']), np.int64)
+    nao_avaliados = reduzir(np.add, ~avaliado, np.int64)
+
+    return {
+        'instrumento_id': ids,
+        'pontos': pontos,
+        'nao_conformes': nao_conformes,
+        'nao_avaliados': nao_avaliados,
+        'aprovado': (nao_conformes == 0) & (nao_avaliados == 0),
+        'reprovado': nao_conformes > 0,
+        'razao_erro_maxima': reduzir(np.fmax, avaliacao['razao_erro'], float),
+        'probabilidade_nao_conformidade_maxima': reduzir(np.fmax, avaliacao['probabilidade_nao_conformidade'], float)
+    }
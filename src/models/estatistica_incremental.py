@@ -0,0 +1,202 @@
+"""
+Estatística incremental para a incerteza Tipo A de séries longas
+Acumula média e soma dos quadrados dos desvios em uma única passagem, bloco a
+bloco (algoritmos de Welford e de Chan), com memória constante em relação ao
+tamanho da série. Acumuladores parciais, calculados em processos diferentes,
+podem ser combinados sem perda de precisão.
+"""
+
+import itertools
+import math
+
+from models.quantis import tabela_padrao
+from models.resultados import ResultadoTipoA
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro bloco acumulado
+np = importar_tardio('numpy')
+
+# Quantidade de leituras agrupadas por bloco quando a série é fornecida valor a valor
+TAMANHO_BLOCO = 65536
+
+
+class AcumuladorTipoA:
+    """
+    Acumulador das estatísticas de uma série de leituras
+
+    Mantém apenas o número de leituras, a média e a soma dos quadrados dos
+    desvios em relação à média (M2). Leituras NaN são tratadas como ausentes,
+    como no cálculo em lote.
+    """
+
+    __slots__ = ('n', 'media', 'm2')
+
+    def __init__(self, n=0, media=0.0, m2=0.0):
+        """
+        Args:
+            n: Número de leituras já acumuladas
+            media: Média das leituras acumuladas
+            m2: Soma dos quadrados dos desvios em relação à média
+        """
+        self.n = n
+        self.media = media
+        self.m2 = m2
+
+    def __repr__(self):
+        return f"AcumuladorTipoA(n={self.n}, media={self.media!r}, m2={self.m2!r})"
+
+    def _mesclar(self, n, media, m2):
+        """Incorpora as estatísticas de outra parte da série (fórmula de Chan)"""
+        if n == 0:
+            return
+        if self.n == 0:
+            self.n, self.media, self.m2 = n, media, m2
+            return
+
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def adicionar(self, valor):
+        """
+        Acumula uma única leitura (algoritmo de Welford)
+
+        Args:
+            valor: Leitura
+
+        Returns:
+            O próprio acumulador
+        """
+        valor = float(valor)
+        if math.isnan(valor):
+            return self
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        return self
+
+    def adicionar_bloco(self, valores):
+        """
+        Acumula um bloco de leituras de forma vetorizada
+
+        Args:
+            valores: Array ou lista de leituras
+
+        Returns:
+            O próprio acumulador
+        """
+        bloco = np.asarray(valores, dtype=float).ravel()
+        ausentes = np.isnan(bloco)
+        if ausentes.any():
+            bloco = bloco[~ausentes]
+        if bloco.size == 0:
+            return self
+
+        media = float(bloco.mean())
+        m2 = float(np.square(bloco - media).sum())
+        self._mesclar(int(bloco.size), media, m2)
+        return self
+
+    def consumir(self, serie, tamanho_bloco=TAMANHO_BLOCO):
+        """
+        Acumula uma série inteira, fornecida como array, iterável de leituras
+        ou iterável de blocos (por exemplo, um gerador que lê o arquivo do registrador)
+
+        Args:
+            serie: Leituras ou blocos de leituras
+            tamanho_bloco: Leituras agrupadas por bloco quando a série é fornecida
+                valor a valor
+
+        Returns:
+            O próprio acumulador
+        """
+        if isinstance(serie, np.ndarray):
+            return self.adicionar_bloco(serie)
+
+        iterador = iter(serie)
+        for item in iterador:
+            if np.ndim(item) == 0:
+                # Leituras avulsas são agrupadas em blocos para o cálculo vetorizado
+                self.adicionar_bloco(np.fromiter(
+                    itertools.chain((item,), itertools.islice(iterador, tamanho_bloco - 1)), dtype=float
+                ))
+            else:
+                self.adicionar_bloco(item)
+        return self
+
+    def combinar(self, outro):
+        """
+        Incorpora um acumulador parcial (por exemplo, calculado em outro processo)
+
+        Args:
+            outro: AcumuladorTipoA
+
+        Returns:
+            O próprio acumulador
+        """
+        self._mesclar(outro.n, outro.media, outro.m2)
+        return self
+
+    @classmethod
+    def combinar_todos(cls, acumuladores):
+        """
+        Combina vários acumuladores parciais em um novo acumulador
+
+        Args:
+            acumuladores: Iterável de AcumuladorTipoA
+
+        Returns:
+            AcumuladorTipoA com as estatísticas da série completa
+        """
+        total = cls()
+        for acumulador in acumuladores:
+            total.combinar(acumulador)
+        return total
+
+    @property
+    def variancia(self):
+        """Variância experimental (com n - 1 no denominador)"""
+        return self.m2 / (self.n - 1) if self.n >= 2 else 0.0
+
+    @property
+    def desvio_padrao(self):
+        """Desvio padrão experimental"""
+        return math.sqrt(self.variancia)
+
+    def resultado(self, nivel_confianca=0.95, tabela_quantis=None):
+        """
+        Calcula a incerteza Tipo A das leituras acumuladas
+
+        Args:
+            nivel_confianca: Nível de confiança do fator t
+            tabela_quantis: Tabela de quantis (opcional, padrão: tabela compartilhada)
+
+        Returns:
+            ResultadoTipoA, equivalente ao de CalculoMetrologico.calcular_incerteza_tipo_a
+        """
+        if self.n < 2:
+            return ResultadoTipoA(
+                media=None,
+                desvio_padrao=0,
+                desvio_padrao_media=0,
+                graus_liberdade=0,
+                fator_t=0,
+                incerteza_padrao=0
+            )
+
+        tabela_quantis = tabela_quantis if tabela_quantis is not None else tabela_padrao
+        desvio_padrao = self.desvio_padrao
+        desvio_padrao_media = desvio_padrao / math.sqrt(self.n)
+        graus_liberdade = self.n - 1
+
+        return ResultadoTipoA(
+            media=self.media,
+            desvio_padrao=desvio_padrao,
+            desvio_padrao_media=desvio_padrao_media,
+            graus_liberdade=graus_liberdade,
+            fator_t=tabela_quantis.quantil_t((1 + nivel_confianca) / 2, graus_liberdade),
+            incerteza_padrao=desvio_padrao_media
+        )
@@ -0,0 +1,282 @@
+"""
+Propagação de incerteza pelo método de Monte Carlo (GUM Suplemento 1)
+Implementa o procedimento adaptativo do JCGM 101:2008 (seção 7.9), com as
+amostras geradas em blocos de tamanho fixo, no próprio processo ou, se
+solicitado, distribuídos entre os processos de um pool
+"""
+
+import math
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas na primeira simulação
+np = importar_tardio('numpy')
+
+# Distribuições suportadas (mesmos nomes de calcular_incerteza_tipo_b)
+DISTRIBUICOES = ('normal', 'retangular', 'triangular')
+
+
+def _preparar_entradas(fontes_incerteza, valores_medidos=None):
+    """
+    Converte as fontes de incerteza em parâmetros de amostragem
+
+    Cada fonte vira uma grandeza de entrada com estimativa 'estimativa' (padrão: 0)
+    e incerteza padrão valor / divisor, como em calcular_incerteza_tipo_b.
+    As leituras, se informadas, viram uma grandeza de entrada com distribuição
+    t de Student escalonada (JCGM 101, 6.4.9).
+
+    Returns:
+        Lista de tuplas (distribuicao, estimativa, escala, graus_liberdade, coeficiente)
+    """
+    entradas = []
+
+    if valores_medidos is not None and len(valores_medidos) >= 2:
+        n = len(valores_medidos)
+        media = math.fsum(valores_medidos) / n
+        desvio_padrao = math.sqrt(math.fsum((v - media) ** 2 for v in valores_medidos) / (n - 1))
+        entradas.append(('t', media, desvio_padrao / math.sqrt(n), n - 1, 1.0))
+    elif valores_medidos is not None and len(valores_medidos) == 1:
+        entradas.append(('constante', float(valores_medidos[0]), 0.0, 0, 1.0))
+
+    for fonte in fontes_incerteza:
+        distribuicao = fonte.get('distribuicao', 'normal')
+        if distribuicao not in DISTRIBUICOES:
+            raise ValueError(f"Distribuição não suportada na simulação de Monte Carlo: {distribuicao}")
+
+        if 'divisor' in fonte:
+            divisor = fonte['divisor']
+        elif distribuicao == 'retangular':
+            divisor = math.sqrt(3)
+        elif distribuicao == 'triangular':
+            divisor = math.sqrt(6)
+        else:
+            divisor = 1.0
+
+        incerteza_padrao = fonte['valor'] / divisor
+
+        # Escala: desvio padrão (normal) ou semiamplitude (retangular e triangular)
+        if distribuicao == 'retangular':
+            escala = incerteza_padrao * math.sqrt(3)
+        elif distribuicao == 'triangular':
+            escala = incerteza_padrao * math.sqrt(6)
+        else:
+            escala = incerteza_padrao
+
+        entradas.append((
+            distribuicao,
+            fonte.get('estimativa', 0.0),
+            escala,
+            fonte.get('graus_liberdade', float('inf')),
+            fonte.get('coeficiente_sensibilidade', 1.0)
+        ))
+
+    return entradas
+
+
+def _amostrar(rng, entradas, n_ensaios):
+    """Gera a matriz n_ensaios × n_entradas com as amostras das grandezas de entrada"""
+    amostras = np.empty((n_ensaios, len(entradas)))
+    for j, (distribuicao, estimativa, escala, graus_liberdade, _) in enumerate(entradas):
+        if distribuicao == 'normal':
+            amostras[:, j] = rng.normal(estimativa, escala, n_ensaios)
+        elif distribuicao == 'retangular':
+            amostras[:, j] = rng.uniform(estimativa - escala, estimativa + escala, n_ensaios)
+        elif distribuicao == 'triangular':
+            # Soma de duas uniformes: triangular simétrica em [-1, 1]
+            amostras[:, j] = estimativa + escala * (rng.random(n_ensaios) + rng.random(n_ensaios) - 1)
+        elif distribuicao == 't':
+            amostras[:, j] = estimativa + escala * rng.standard_t(graus_liberdade, n_ensaios)
+        else:
+            amostras[:, j] = estimativa
+    return amostras
+
+
+def _simular_bloco(entradas, modelo, n_ensaios, semente, probabilidades):
+    """
+    Executa um bloco de ensaios de Monte Carlo (função de nível de módulo para
+    poder ser enviada aos processos do pool)
+
+    Returns:
+        Dicionário com o tamanho do bloco, média, soma dos quadrados dos desvios
+        e extremos do intervalo de abrangência do bloco
+    """
+    rng = np.random.default_rng(semente)
+    amostras = _amostrar(rng, entradas, n_ensaios)
+
+    if modelo is None:
+        # Modelo aditivo: Y = soma dos c_i * X_i
+        coeficientes = np.array([entrada[4] for entrada in entradas])
+        y = amostras @ coeficientes
+    else:
+        y = np.asarray(modelo(amostras), dtype=float)
+
+    media = float(y.mean())
+    inferior, superior = np.quantile(y, probabilidades)
+
+    return {
+        'n': n_ensaios,
+        'media': media,
+        'm2': float(((y - media) ** 2).sum()),
+        'inferior': float(inferior),
+        'superior': float(superior)
+    }
+
+
+def _tolerancia_numerica(incerteza_padrao, digitos_significativos):
+    """Tolerância numérica δ do JCGM 101 (7.9.2) para o número de dígitos significativos"""
+    if incerteza_padrao <= 0:
+        return 0.0
+    expoente = math.floor(math.log10(incerteza_padrao)) - digitos_significativos + 1
+    return 0.5 * 10 ** expoente
+
+
+class SimulacaoMonteCarlo:
+    """
+    Simulação de Monte Carlo adaptativa para propagação de distribuições
+
+    Os ensaios são gerados em blocos de tamanho fixo; cada bloco é resumido
+    (média, variância e extremos do intervalo) e descartado, de modo que a
+    memória usada não depende do número total de ensaios. A simulação termina
+    quando as estimativas dos blocos se estabilizam dentro da tolerância
+    numérica do JCGM 101, 7.9.
+    """
+
+    def __init__(self, nivel_confianca=0.95, tamanho_bloco=None, processos=1,
+                 digitos_significativos=2, max_ensaios=10_000_000, semente=None):
+        """
+        Inicializa a simulação
+
+        Args:
+            nivel_confianca: Probabilidade de abrangência (padrão: 0.95)
+            tamanho_bloco: Ensaios por bloco (padrão: max(100 / (1 - p), 10^5))
+            processos: Número de processos (padrão: 1, no próprio processo, sem criar
+                um pool a cada simulação; None usa um pool com todos os CPUs)
+            digitos_significativos: Dígitos significativos exigidos para a incerteza padrão
+            max_ensaios: Limite de ensaios, mesmo sem estabilização
+            semente: Semente do gerador para resultados reprodutíveis (opcional)
+        """
+        self.nivel_confianca = nivel_confianca
+        self.tamanho_bloco = tamanho_bloco or max(math.ceil(100 / (1 - nivel_confianca)), 100_000)
+        self.processos = processos or os.cpu_count() or 1
+        self.digitos_significativos = digitos_significativos
+        self.max_ensaios = max_ensaios
+        self.semente = semente
+
+    def _convergiu(self, blocos):
+        """Verifica o critério de estabilização do JCGM 101 (7.9.4)"""
+        h = len(blocos)
+        if h < 2:
+            return False
+
+        incertezas = [math.sqrt(b['m2'] / (b['n'] - 1)) for b in blocos]
+        delta = _tolerancia_numerica(sum(incertezas) / h, self.digitos_significativos)
+
+        for valores in (
+            [b['media'] for b in blocos],
+            incertezas,
+            [b['inferior'] for b in blocos],
+            [b['superior'] for b in blocos]
+        ):
+            media = sum(valores) / h
+            desvio = math.sqrt(sum((v - media) ** 2 for v in valores) / (h - 1))
+            if 2 * desvio / math.sqrt(h) > delta:
+                return False
+        return True
+
+    def _combinar(self, blocos):
+        """Combina os resumos dos blocos nas estimativas finais"""
+        n_total = sum(b['n'] for b in blocos)
+        media = sum(b['n'] * b['media'] for b in blocos) / n_total
+
+        # Fórmula de Chan para combinar as somas de quadrados dos blocos
+        m2 = sum(b['m2'] + b['n'] * (b['media'] - media) ** 2 for b in blocos)
+        incerteza_padrao = math.sqrt(m2 / (n_total - 1))
+
+        inferior = sum(b['inferior'] for b in blocos) / len(blocos)
+        superior = sum(b['superior'] for b in blocos) / len(blocos)
+
+        return n_total, media, incerteza_padrao, inferior, superior
+
+    def simular(self, fontes_incerteza, valores_medidos=None, modelo=None):
+        """
+        Propaga as distribuições das grandezas de entrada pelo modelo de medição
+
+        Args:
+            fontes_incerteza: Lista de fontes no formato de calcular_incerteza_tipo_b.
+                Cada fonte pode ter ainda 'estimativa' (valor esperado, padrão: 0)
+            valores_medidos: Leituras para a componente Tipo A (opcional). Entram
+                como a primeira grandeza de entrada
+            modelo: Função vetorizada que recebe a matriz ensaios × entradas e
+                retorna um array de ensaios (opcional, padrão: soma ponderada pelos
+                coeficientes de sensibilidade). Com mais de um processo, deve ser
+                uma função de nível de módulo (não pode ser uma lambda)
+
+        Returns:
+            Dicionário com a estimativa, a incerteza padrão, o intervalo de
+            abrangência, a incerteza expandida, o fator k equivalente e as
+            estatísticas de desempenho da simulação
+        """
+        entradas = _preparar_entradas(fontes_incerteza, valores_medidos)
+        if not entradas:
+            raise ValueError("A simulação de Monte Carlo precisa de ao menos uma grandeza de entrada")
+        if self.processos > 1 and modelo is not None:
+            try:
+                pickle.dumps(modelo)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                raise ValueError("Com mais de um processo, o modelo deve ser uma função de nível de "
+                                 "módulo (use processos=1 para lambdas e funções locais)")
+
+        probabilidades = [(1 - self.nivel_confianca) / 2, (1 + self.nivel_confianca) / 2]
+        max_blocos = max(2, math.ceil(self.max_ensaios / self.tamanho_bloco))
+        sementes = np.random.SeedSequence(self.semente)
+
+        blocos = []
+        inicio = time.perf_counter()
+
+        if self.processos == 1:
+            while len(blocos) < max_blocos and not self._convergiu(blocos):
+                blocos.append(_simular_bloco(
+                    entradas, modelo, self.tamanho_bloco, sementes.spawn(1)[0], probabilidades
+                ))
+        else:
+            # Mantém no máximo um bloco por processo em execução, para memória constante
+            with ProcessPoolExecutor(max_workers=self.processos) as executor:
+                pendentes = set()
+                enviados = 0
+                while True:
+                    while len(pendentes) < self.processos and enviados < max_blocos:
+                        pendentes.add(executor.submit(
+                            _simular_bloco, entradas, modelo, self.tamanho_bloco,
+                            sementes.spawn(1)[0], probabilidades
+                        ))
+                        enviados += 1
+
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    blocos.extend(futuro.result() for futuro in concluidos)
+
+                    if self._convergiu(blocos) or (not pendentes and enviados >= max_blocos):
+                        for futuro in pendentes:
+                            futuro.cancel()
+                        break
+
+        duracao = time.perf_counter() - inicio
+        n_total, estimativa, incerteza_padrao, inferior, superior = self._combinar(blocos)
+        incerteza_expandida = (superior - inferior) / 2
+
+        return {
+            'estimativa': estimativa,
+            'incerteza_padrao': incerteza_padrao,
+            'intervalo_abrangencia': (inferior, superior),
+            'incerteza_expandida': incerteza_expandida,
+            'fator_k': incerteza_expandida / incerteza_padrao if incerteza_padrao > 0 else float('nan'),
+            'nivel_confianca': self.nivel_confianca,
+            'ensaios': n_total,
+            'blocos': len(blocos),
+            'convergiu': self._convergiu(blocos),
+            'tempo': duracao,
+            'ensaios_por_segundo': n_total / duracao if duracao > 0 else float('inf')
+        }
@@ -0,0 +1,175 @@
+"""
+Orçamento de incerteza incremental
+Mantém as somas parciais do orçamento de um ponto (Σ cᵢ² e Σ cᵢ⁴/νᵢ) e uma
+impressão digital das entradas, de modo que a alteração, inclusão ou remoção de
+uma fonte atualize a incerteza combinada, os graus de liberdade efetivos, o fator
+k e a incerteza expandida em tempo constante, sem percorrer as demais fontes
+"""
+
+import hashlib
+import math
+
+# A impressão digital é a soma, módulo 2⁶⁴, dos hashes de cada fonte: independe da
+# ordem das fontes e pode ser atualizada subtraindo o hash antigo e somando o novo
+MODULO_IMPRESSAO = 1 << 64
+
+# Abaixo desta fração do maior termo removido, a soma é considerada imprecisa
+# (cancelamento numérico) e o orçamento deve ser reconstruído a partir das fontes
+TOLERANCIA_CANCELAMENTO = 1e-9
+
+# Divisores padrão por distribuição (como em CalculoMetrologico)
+DIVISORES = {
+    'retangular': math.sqrt(3),
+    'triangular': math.sqrt(6)
+}
+
+
+def entradas_fonte(fonte):
+    """
+    Extrai as entradas numéricas de uma fonte (linha de fontes_incerteza ou dicionário
+    no formato de calcular_incerteza_tipo_b)
+
+    Returns:
+        Tupla (valor, divisor, coeficiente_sensibilidade, graus_liberdade), com o divisor
+        resolvido pela distribuição e graus de liberdade ausentes como infinito
+    """
+    divisor = fonte.get('divisor')
+    if divisor is None:
+        divisor = DIVISORES.get(fonte.get('distribuicao') or 'normal', 1.0)
+    coeficiente = fonte.get('coeficiente_sensibilidade')
+    graus_liberdade = fonte.get('graus_liberdade')
+    return (
+        float(fonte['valor']),
+        float(divisor),
+        1.0 if coeficiente is None else float(coeficiente),
+        math.inf if graus_liberdade is None else float(graus_liberdade)
+    )
+
+
+def termos_entradas(valor, divisor, coeficiente, graus_liberdade):
+    """
+    Calcula os termos de uma fonte nas somas do orçamento
+
+    Returns:
+        Tupla (contribuicao, contribuicao², termo de Welch-Satterthwaite)
+    """
+    contribuicao = valor / divisor * coeficiente
+    if math.isfinite(graus_liberdade) and graus_liberdade > 0 and contribuicao > 0:
+        termo_ws = contribuicao ** 4 / graus_liberdade
+    else:
+        termo_ws = 0.0
+    return contribuicao, contribuicao ** 2, termo_ws
+
+
+def hash_entradas(valor, divisor, coeficiente, graus_liberdade):
+    """Hash de 64 bits das entradas numéricas de uma fonte"""
+    chave = repr((float(valor), float(divisor), float(coeficiente), float(graus_liberdade)))
+    resumo = hashlib.blake2b(chave.encode('ascii'), digest_size=8).digest()
+    return int.from_bytes(resumo, 'little')
+
+
+def para_inteiro_banco(impressao):
+    """Converte a impressão digital (0 a 2⁶⁴ - 1) para o INTEGER com sinal do SQLite"""
+    return impressao - MODULO_IMPRESSAO if impressao >= MODULO_IMPRESSAO // 2 else impressao
+
+
+def de_inteiro_banco(valor):
+    """Converte o INTEGER com sinal do SQLite de volta para a impressão digital"""
+    return valor % MODULO_IMPRESSAO
+
+
+class OrcamentoIncremental:
+    """Somas parciais e impressão digital do orçamento de incerteza de um ponto"""
+
+    __slots__ = ('soma_quadratica', 'soma_welch_satterthwaite', 'impressao', 'impreciso')
+
+    def __init__(self, soma_quadratica=0.0, soma_welch_satterthwaite=0.0, impressao=0):
+        """
+        Args:
+            soma_quadratica: Σ cᵢ² das fontes
+            soma_welch_satterthwaite: Σ cᵢ⁴/νᵢ das fontes com graus de liberdade finitos
+            impressao: Soma (módulo 2⁶⁴) dos hashes das fontes
+        """
+        self.soma_quadratica = soma_quadratica
+        self.soma_welch_satterthwaite = soma_welch_satterthwaite
+        self.impressao = impressao
+        self.impreciso = False
+
+    @classmethod
+    def de_fontes(cls, fontes):
+        """
+        Monta o orçamento a partir de todas as fontes de um ponto
+
+        Args:
+            fontes: Iterável de fontes (linhas de fontes_incerteza ou dicionários)
+
+        Returns:
+            OrcamentoIncremental
+        """
+        orcamento = cls()
+        for fonte in fontes:
+            orcamento.adicionar_fonte(fonte)
+        return orcamento
+
+    def adicionar_entradas(self, valor, divisor, coeficiente, graus_liberdade):
+        """Inclui uma fonte, dada pelas suas entradas já resolvidas (ver entradas_fonte)"""
+        _, quadrado, termo_ws = termos_entradas(valor, divisor, coeficiente, graus_liberdade)
+        self.soma_quadratica += quadrado
+        self.soma_welch_satterthwaite += termo_ws
+        self.impressao = (self.impressao + hash_entradas(valor, divisor, coeficiente, graus_liberdade)) \
+            % MODULO_IMPRESSAO
+        return self
+
+    def adicionar_fonte(self, fonte):
+        """Inclui uma fonte no orçamento"""
+        return self.adicionar_entradas(*entradas_fonte(fonte))
+
+    def remover_fonte(self, fonte):
+        """Retira uma fonte (com as entradas que tinha ao ser incluída) do orçamento"""
+        entradas = entradas_fonte(fonte)
+        _, quadrado, termo_ws = termos_entradas(*entradas)
+        self.soma_quadratica -= quadrado
+        self.soma_welch_satterthwaite -= termo_ws
+        self.impressao = (self.impressao - hash_entradas(*entradas)) % MODULO_IMPRESSAO
+
+        # Subtrair um termo dominante deixa na soma apenas o erro de arredondamento
+        if self.soma_quadratica < quadrado * TOLERANCIA_CANCELAMENTO or \
+           self.soma_welch_satterthwaite < termo_ws * TOLERANCIA_CANCELAMENTO:
+            self.impreciso = True
+        self.soma_quadratica = max(self.soma_quadratica, 0.0)
+        self.soma_welch_satterthwaite = max(self.soma_welch_satterthwaite, 0.0)
+        return self
+
+    def substituir_fonte(self, antiga, nova):
+        """Troca as entradas de uma fonte já incluída no orçamento"""
+        return self.remover_fonte(antiga).adicionar_fonte(nova)
+
+    def colunas_banco(self):
+        """Valores das colunas soma_quadratica, soma_welch_satterthwaite e impressao_digital"""
+        return self.soma_quadratica, self.soma_welch_satterthwaite, para_inteiro_banco(self.impressao)
+
+    def resultado(self, calc):
+        """
+        Calcula os resultados do ponto a partir das somas parciais
+
+        Args:
+            calc: Instância de CalculoMetrologico (nível de confiança e quantis)
+
+        Returns:
+            Dicionário com incerteza_combinada, graus_liberdade_efetivos, fator_k e
+            incerteza_expandida
+        """
+        incerteza_combinada = math.sqrt(self.soma_quadratica)
+
+        if incerteza_combinada > 0 and self.soma_welch_satterthwaite > 0:
+            graus_liberdade_efetivos = math.floor(incerteza_combinada ** 4 / self.soma_welch_satterthwaite)
+        else:
+            graus_liberdade_efetivos = math.inf
+
+        fator_k = calc.calcular_fator_abrangencia(graus_liberdade_efetivos)
+        return {
+            'incerteza_combinada': incerteza_combinada,
+            'graus_liberdade_efetivos': graus_liberdade_efetivos,
+            'fator_k': fator_k,
+            'incerteza_expandida': incerteza_combinada * fator_k
+        }
@@ -0,0 +1,154 @@
+"""
+Modelos de orçamento de incerteza compilados
+Um modelo reúne as fontes Tipo B que se repetem em todos os pontos de um tipo de
+instrumento e procedimento (resolução, padrão, temperatura...). Divisores,
+coeficientes de sensibilidade e graus de liberdade são resolvidos uma única vez
+na compilação; para cada ponto resta apenas informar os valores das fontes.
+"""
+
+import math
+from collections.abc import Mapping
+
+from models.orcamento_incremental import DIVISORES
+from models.resultados import OrcamentoTipoB
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro orçamento montado
+np = importar_tardio('numpy')
+
+
+class ModeloOrcamento:
+    """Orçamento Tipo B compilado, com os parâmetros de cada fonte já resolvidos"""
+
+    __slots__ = ('descricoes', 'distribuicoes', 'valores_padrao', '_parametros', '_tipo_registro', '_vetores')
+
+    def __init__(self, fontes):
+        """
+        Compila as fontes de um modelo
+
+        Args:
+            fontes: Lista de dicionários, na ordem do orçamento, com descricao e,
+                opcionalmente, distribuicao, divisor, coeficiente_sensibilidade,
+                graus_liberdade e valor_padrao (valor usado quando o ponto não
+                informa o da fonte)
+        """
+        self.descricoes = tuple(fonte['descricao'] for fonte in fontes)
+        self.distribuicoes = tuple(fonte.get('distribuicao') or 'normal' for fonte in fontes)
+        self.valores_padrao = tuple(
+            None if fonte.get('valor_padrao') is None else float(fonte['valor_padrao']) for fonte in fontes
+        )
+
+        # (divisor, coeficiente de sensibilidade, graus de liberdade) de cada fonte
+        parametros = []
+        for fonte, distribuicao in zip(fontes, self.distribuicoes):
+            divisor = fonte.get('divisor')
+            coeficiente = fonte.get('coeficiente_sensibilidade')
+            graus_liberdade = fonte.get('graus_liberdade')
+            parametros.append((
+                DIVISORES.get(distribuicao, 1.0) if divisor is None else float(divisor),
+                1.0 if coeficiente is None else float(coeficiente),
+                float('inf') if graus_liberdade is None else float(graus_liberdade)
+            ))
+        self._parametros = tuple(parametros)
+        self._tipo_registro = None
+        self._vetores = None
+
+    def __len__(self):
+        return len(self.descricoes)
+
+    def _valores(self, valores):
+        """Valores das fontes na ordem do modelo, completados pelos valores padrão"""
+        if valores is None:
+            valores = self.valores_padrao
+        elif isinstance(valores, Mapping):
+            desconhecidas = set(valores) - set(self.descricoes)
+            if desconhecidas:
+                raise ValueError(f"Fontes fora do modelo: {', '.join(sorted(desconhecidas))}")
+            valores = [valores.get(descricao, padrao) for descricao, padrao in zip(self.descricoes, self.valores_padrao)]
+        elif len(valores) != len(self.descricoes):
+            raise ValueError(f"O modelo tem {len(self.descricoes)} fontes; foram informados {len(valores)} valores")
+        else:
+            valores = [padrao if valor is None else valor for valor, padrao in zip(valores, self.valores_padrao)]
+
+        faltantes = [descricao for descricao, valor in zip(self.descricoes, valores) if valor is None]
+        if faltantes:
+            raise ValueError(f"Fontes sem valor: {', '.join(faltantes)}")
+        return valores
+
+    def orcamento(self, valores=None):
+        """
+        Monta o orçamento Tipo B de um ponto
+
+        Args:
+            valores: Valores das fontes, em lista na ordem do modelo ou em dicionário
+                por descrição (opcional; fontes omitidas usam o valor padrão)
+
+        Returns:
+            OrcamentoTipoB, como retornado por CalculoMetrologico.calcular_incerteza_tipo_b
+        """
+        registros = []
+        soma_quadratica = 0.0
+        for valor, (divisor, coeficiente, graus_liberdade) in zip(self._valores(valores), self._parametros):
+            valor = float(valor)
+            incerteza_padrao = valor / divisor
+            contribuicao = incerteza_padrao * coeficiente
+            registros.append((valor, divisor, incerteza_padrao, coeficiente,
+                              contribuicao, contribuicao ** 2, graus_liberdade))
+            soma_quadratica += contribuicao ** 2
+
+        if self._tipo_registro is None:
+            self._tipo_registro = OrcamentoTipoB.tipo_registro()
+        dados = np.array(registros, dtype=self._tipo_registro)
+        return OrcamentoTipoB(dados, list(self.descricoes), list(self.distribuicoes), math.sqrt(soma_quadratica))
+
+    def fontes(self, valores=None):
+        """
+        Lista de fontes de um ponto no formato aceito por calcular_incerteza_tipo_b
+
+        Args:
+            valores: Valores das fontes (como em orcamento)
+        """
+        return [
+            {
+                'descricao': descricao,
+                'valor': float(valor),
+                'distribuicao': distribuicao,
+                'divisor': divisor,
+                'coeficiente_sensibilidade': coeficiente,
+                'graus_liberdade': graus_liberdade
+            }
+            for descricao, distribuicao, valor, (divisor, coeficiente, graus_liberdade)
+            in zip(self.descricoes, self.distribuicoes, self._valores(valores), self._parametros)
+        ]
+
+    def fontes_lote(self, valores):
+        """
+        Orçamento Tipo B de vários pontos em forma matricial
+
+        Args:
+            valores: Matriz pontos × fontes do modelo (NaN usa o valor padrão da fonte)
+
+        Returns:
+            Dicionário aceito por calcular_incerteza_completa_lote, com os divisores,
+            coeficientes e graus de liberdade como vetores compilados de uma fonte cada
+        """
+        if self._vetores is None:
+            # Vetores compilados na primeira chamada e reaproveitados em todos os lotes
+            divisores, coeficientes, graus_liberdade = np.array(self._parametros, dtype=float).reshape(-1, 3).T
+            padrao = np.array([np.nan if valor is None else valor for valor in self.valores_padrao], dtype=float)
+            self._vetores = (divisores, coeficientes, graus_liberdade, padrao)
+        divisores, coeficientes, graus_liberdade, padrao = self._vetores
+
+        valores = np.atleast_2d(np.asarray(valores, dtype=float))
+        if valores.shape[1] != len(self.descricoes):
+            raise ValueError(f"O modelo tem {len(self.descricoes)} fontes; a matriz tem {valores.shape[1]} colunas")
+        valores = np.where(np.isnan(valores), padrao, valores)
+        if np.isnan(valores).any():
+            raise ValueError("Há fontes sem valor e sem valor padrão")
+
+        return {
+            'valores': valores,
+            'divisores': divisores,
+            'coeficientes_sensibilidade': coeficientes,
+            'graus_liberdade': graus_liberdade
+        }
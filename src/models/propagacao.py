@@ -0,0 +1,126 @@
+"""
+Propagação de incerteza com grandezas de entrada correlacionadas
+Implementa a lei de propagação do GUM (5.2) para vários pontos de uma vez:
+coeficientes de sensibilidade obtidos por diferenças finitas centrais de um
+modelo de medição vetorizado (uma única chamada do modelo por bloco de pontos)
+e combinação u_c² = cᵀ (D R D) c, com D = diag(u) e R a matriz de correlação
+"""
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas no primeiro cálculo
+np = importar_tardio('numpy')
+
+# Número máximo de elementos da matriz de entradas perturbadas de cada bloco
+ELEMENTOS_POR_BLOCO = 1 << 22
+
+# Passo relativo das diferenças centrais para entradas sem incerteza (raiz cúbica do épsilon)
+PASSO_RELATIVO = 2.0 ** (-52 / 3)
+
+
+def validar_correlacao(correlacao, n_entradas):
+    """
+    Verifica uma matriz de correlação (uma para todos os pontos ou uma por ponto)
+
+    Args:
+        correlacao: Matriz entradas × entradas ou array pontos × entradas × entradas
+        n_entradas: Número de grandezas de entrada
+
+    Returns:
+        A matriz como array de floats
+
+    Raises:
+        ValueError: Se a matriz não for simétrica, com diagonal unitária, coeficientes
+            em [-1, 1] e semidefinida positiva
+    """
+    correlacao = np.asarray(correlacao, dtype=float)
+    if correlacao.shape[-2:] != (n_entradas, n_entradas) or correlacao.ndim not in (2, 3):
+        raise ValueError(f"A matriz de correlação deve ser {n_entradas} × {n_entradas}")
+    if not np.allclose(correlacao, np.swapaxes(correlacao, -1, -2)):
+        raise ValueError("A matriz de correlação deve ser simétrica")
+    if not np.allclose(np.diagonal(correlacao, axis1=-2, axis2=-1), 1.0):
+        raise ValueError("A diagonal da matriz de correlação deve ser 1")
+    if np.any(np.abs(correlacao) > 1):
+        raise ValueError("Os coeficientes de correlação devem estar entre -1 e 1")
+    if n_entradas and np.linalg.eigvalsh(correlacao).min() < -1e-10:
+        raise ValueError("A matriz de correlação deve ser semidefinida positiva")
+    return correlacao
+
+
+def combinar(contribuicoes, correlacao=None):
+    """
+    Combina as contribuições cᵢ·u(xᵢ) de cada ponto, u_c² = gᵀ R g
+
+    Args:
+        contribuicoes: Matriz pontos × entradas de contribuições (com sinal)
+        correlacao: Matriz de correlação entre as entradas, uma para todos os pontos
+            ou uma por ponto (opcional, padrão: entradas não correlacionadas)
+
+    Returns:
+        Array com a incerteza combinada de cada ponto
+    """
+    g = np.atleast_2d(np.asarray(contribuicoes, dtype=float))
+    if correlacao is None:
+        variancia = np.einsum('ij,ij->i', g, g)
+    else:
+        correlacao = validar_correlacao(correlacao, g.shape[1])
+        if correlacao.ndim == 2:
+            variancia = np.einsum('ij,ij->i', g @ correlacao, g)
+        else:
+            variancia = np.einsum('ij,ijk,ik->i', g, correlacao, g)
+
+    # Correlações negativas podem levar a variâncias ligeiramente negativas por arredondamento
+    return np.sqrt(np.clip(variancia, 0.0, None))
+
+
+def coeficientes_sensibilidade_lote(modelo, estimativas, incertezas=None):
+    """
+    Calcula os coeficientes de sensibilidade ∂f/∂xᵢ de vários pontos por diferenças
+    finitas centrais
+
+    Para cada bloco de pontos, todas as entradas perturbadas (+h e -h em cada entrada)
+    são montadas em uma única matriz e o modelo é chamado uma única vez.
+
+    Args:
+        modelo: Função vetorizada que recebe a matriz linhas × entradas e retorna um
+            array com um resultado por linha (mesma convenção da simulação de Monte Carlo)
+        estimativas: Matriz pontos × entradas com as estimativas das grandezas de entrada
+        incertezas: Matriz (ou vetor por entrada) de incertezas padrão, usadas como passo
+            de cada entrada (opcional; sem incerteza, o passo é relativo à estimativa)
+
+    Returns:
+        Matriz pontos × entradas de coeficientes de sensibilidade
+    """
+    x = np.atleast_2d(np.asarray(estimativas, dtype=float))
+    n_pontos, n_entradas = x.shape
+
+    # Passo igual à incerteza padrão de cada entrada (como no método de Kragten): as
+    # diferenças centrais capturam a variação do modelo na escala em que a incerteza é
+    # propagada e não sofrem cancelamento quando a saída é grande em relação à variação.
+    # Entradas sem incerteza usam um passo relativo à estimativa
+    passo = PASSO_RELATIVO * np.where(x != 0, np.abs(x), 1.0)
+    if incertezas is not None:
+        u = np.broadcast_to(np.abs(np.asarray(incertezas, dtype=float)), x.shape)
+        passo = np.where(u > 0, u, passo)
+
+    coeficientes = np.empty((n_pontos, n_entradas))
+    pontos_por_bloco = max(1, ELEMENTOS_POR_BLOCO // max(2 * n_entradas * n_entradas, 1))
+    entradas = np.arange(n_entradas)
+
+    for inicio in range(0, n_pontos, pontos_por_bloco):
+        bloco = slice(inicio, inicio + pontos_por_bloco)
+        x_bloco, h = x[bloco], passo[bloco]
+
+        # perturbadas[sentido, entrada perturbada, ponto, entrada]
+        perturbadas = np.broadcast_to(x_bloco, (2, n_entradas) + x_bloco.shape).copy()
+        perturbadas[0, entradas, :, entradas] += h.T
+        perturbadas[1, entradas, :, entradas] -= h.T
+
+        # Passo efetivamente representável em ponto flutuante
+        h_efetivo = perturbadas[0, entradas, :, entradas] - perturbadas[1, entradas, :, entradas]
+
+        y = np.asarray(modelo(perturbadas.reshape(-1, n_entradas)), dtype=float)
+        y = y.reshape(2, n_entradas, len(x_bloco))
+        coeficientes[bloco] = ((y[0] - y[1]) / h_efetivo).T
+
+    return coeficientes
@@ -0,0 +1,280 @@
+"""
+Tabela de quantis das distribuições t de Student e normal
+Mantém em memória os fatores t e k já calculados para cada nível de confiança,
+evitando chamadas repetidas a scipy.stats nos recálculos em massa
+"""
+
+import math
+import os
+import threading
+from statistics import NormalDist
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas quando uma tabela é construída ou consultada em lote
+np = importar_tardio('numpy')
+
+# Graus de liberdade inteiros pré-calculados em cada tabela (1 a N)
+GRAUS_LIBERDADE_TABELADOS = 200
+
+# Modo sem SciPy: os quantis exatos são obtidos por implementação própria
+SEM_SCIPY = os.environ.get('CALIBRA_SEM_SCIPY', '0').lower() in ('1', 'true', 'sim')
+
+
+def _beta_incompleta_regularizada(x, a, b):
+    """
+    Calcula a função beta incompleta regularizada I_x(a, b) por fração contínua
+    (algoritmo de Lentz modificado)
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+
+    # A fração contínua converge rapidamente para x < (a + 1) / (a + b + 2)
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _beta_incompleta_regularizada(1.0 - x, b, a)
+
+    log_frente = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                  + a * math.log(x) + b * math.log1p(-x))
+
+    minimo = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    if abs(d) < minimo:
+        d = minimo
+    d = 1.0 / d
+    resultado = d
+
+    for m in range(1, 500):
+        m2 = 2 * m
+
+        # Termo par
+        coef = m * (b - m) * x / ((a + m2 - 1) * (a + m2))
+        d = 1.0 + coef * d
+        d = minimo if abs(d) < minimo else d
+        c = 1.0 + coef / c
+        c = minimo if abs(c) < minimo else c
+        d = 1.0 / d
+        resultado *= d * c
+
+        # Termo ímpar
+        coef = -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1))
+        d = 1.0 + coef * d
+        d = minimo if abs(d) < minimo else d
+        c = 1.0 + coef / c
+        c = minimo if abs(c) < minimo else c
+        d = 1.0 / d
+        delta = d * c
+        resultado *= delta
+
+        if abs(delta - 1.0) < 1e-15:
+            break
+
+    return math.exp(log_frente) * resultado / a
+
+
+def _cdf_t(t, graus_liberdade):
+    """Função de distribuição acumulada da t de Student"""
+    x = graus_liberdade / (graus_liberdade + t * t)
+    cauda = 0.5 * _beta_incompleta_regularizada(x, graus_liberdade / 2, 0.5)
+    return 1.0 - cauda if t > 0 else cauda
+
+
+def _pdf_t(t, graus_liberdade):
+    """Função densidade de probabilidade da t de Student"""
+    log_constante = (math.lgamma((graus_liberdade + 1) / 2) - math.lgamma(graus_liberdade / 2)
+                     - 0.5 * math.log(graus_liberdade * math.pi))
+    return math.exp(log_constante - (graus_liberdade + 1) / 2 * math.log1p(t * t / graus_liberdade))
+
+
+def quantil_t_exato(probabilidade, graus_liberdade):
+    """
+    Calcula o quantil da distribuição t de Student sem depender do SciPy
+
+    Args:
+        probabilidade: Probabilidade acumulada (0 < p < 1)
+        graus_liberdade: Graus de liberdade (> 0, não precisa ser inteiro)
+
+    Returns:
+        Quantil t tal que P(T <= t) = probabilidade
+    """
+    if graus_liberdade == float('inf'):
+        return NormalDist().inv_cdf(probabilidade)
+    if probabilidade == 0.5:
+        return 0.0
+    if probabilidade < 0.5:
+        return -quantil_t_exato(1 - probabilidade, graus_liberdade)
+
+    # Formas fechadas para 1 e 2 graus de liberdade
+    if graus_liberdade == 1:
+        return math.tan(math.pi * (probabilidade - 0.5))
+    if graus_liberdade == 2:
+        return (2 * probabilidade - 1) / math.sqrt(2 * probabilidade * (1 - probabilidade))
+
+    # Estimativa inicial pela expansão de Cornish-Fisher a partir do quantil normal
+    z = NormalDist().inv_cdf(probabilidade)
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    t = z + g1 / graus_liberdade + g2 / graus_liberdade**2 + g3 / graus_liberdade**3
+
+    # Refinamento por Newton-Raphson, mantendo um intervalo de segurança
+    inferior, superior = 0.0, max(2 * t, 1.0)
+    while _cdf_t(superior, graus_liberdade) < probabilidade:
+        superior *= 2
+
+    for _ in range(100):
+        if not inferior < t < superior:
+            t = (inferior + superior) / 2
+
+        diferenca = _cdf_t(t, graus_liberdade) - probabilidade
+        if diferenca > 0:
+            superior = t
+        else:
+            inferior = t
+
+        passo = diferenca / _pdf_t(t, graus_liberdade)
+        t -= passo
+        if abs(passo) <= 1e-15 * abs(t):
+            break
+
+    return t
+
+
+class TabelaQuantis:
+    """
+    Tabela memorizada de quantis t de Student e normal por nível de confiança
+
+    Para cada nível de confiança solicitado, os quantis de 1 a
+    GRAUS_LIBERDADE_TABELADOS graus de liberdade são calculados de uma só vez
+    no primeiro uso. Graus de liberdade fora da tabela (não inteiros ou muito
+    altos) são calculados de forma exata e guardados para as próximas consultas.
+    """
+
+    def __init__(self, sem_scipy=None, graus_liberdade_tabelados=GRAUS_LIBERDADE_TABELADOS):
+        """
+        Inicializa a tabela de quantis
+
+        Args:
+            sem_scipy: Se True, calcula os quantis sem importar o SciPy
+                (padrão: variável de ambiente CALIBRA_SEM_SCIPY)
+            graus_liberdade_tabelados: Quantidade de graus de liberdade inteiros
+                pré-calculados por nível de confiança
+        """
+        self.sem_scipy = SEM_SCIPY if sem_scipy is None else sem_scipy
+        self.graus_liberdade_tabelados = graus_liberdade_tabelados
+        self._tabelas = {}
+        self._normal = {}
+        self._avulsos = {}
+        self._trava = threading.Lock()
+
+    def _tabela(self, probabilidade):
+        """Retorna (construindo se necessário) a tabela de quantis t de uma probabilidade"""
+        tabela = self._tabelas.get(probabilidade)
+        if tabela is not None:
+            return tabela
+
+        with self._trava:
+            tabela = self._tabelas.get(probabilidade)
+            if tabela is None:
+                graus_liberdade = np.arange(1, self.graus_liberdade_tabelados + 1)
+                if self.sem_scipy:
+                    tabela = np.array([quantil_t_exato(probabilidade, gl) for gl in graus_liberdade])
+                else:
+                    from scipy import stats
+                    tabela = stats.t.ppf(probabilidade, graus_liberdade)
+                tabela.setflags(write=False)
+                self._tabelas[probabilidade] = tabela
+
+        return tabela
+
+    def _quantil_exato(self, probabilidade, graus_liberdade):
+        """Calcula um quantil t fora da tabela e o guarda para consultas futuras"""
+        chave = (probabilidade, graus_liberdade)
+        quantil = self._avulsos.get(chave)
+        if quantil is None:
+            if self.sem_scipy:
+                quantil = quantil_t_exato(probabilidade, graus_liberdade)
+            else:
+                from scipy import stats
+                quantil = float(stats.t.ppf(probabilidade, graus_liberdade))
+            self._avulsos[chave] = quantil
+        return quantil
+
+    def quantil_normal(self, probabilidade):
+        """
+        Retorna o quantil da distribuição normal padrão
+
+        Args:
+            probabilidade: Probabilidade acumulada
+
+        Returns:
+            Quantil z tal que P(Z <= z) = probabilidade
+        """
+        quantil = self._normal.get(probabilidade)
+        if quantil is None:
+            if self.sem_scipy:
+                quantil = NormalDist().inv_cdf(probabilidade)
+            else:
+                from scipy import stats
+                quantil = float(stats.norm.ppf(probabilidade))
+            self._normal[probabilidade] = quantil
+        return quantil
+
+    def quantil_t(self, probabilidade, graus_liberdade):
+        """
+        Retorna o quantil da distribuição t de Student
+
+        Args:
+            probabilidade: Probabilidade acumulada
+            graus_liberdade: Graus de liberdade (infinito usa a distribuição normal)
+
+        Returns:
+            Quantil t tal que P(T <= t) = probabilidade
+        """
+        if graus_liberdade == float('inf'):
+            return self.quantil_normal(probabilidade)
+        if graus_liberdade <= 0 or graus_liberdade != graus_liberdade:
+            return float('nan')
+
+        if graus_liberdade == int(graus_liberdade) and graus_liberdade <= self.graus_liberdade_tabelados:
+            return float(self._tabela(probabilidade)[int(graus_liberdade) - 1])
+
+        return self._quantil_exato(probabilidade, float(graus_liberdade))
+
+    def quantis_t(self, probabilidade, graus_liberdade):
+        """
+        Versão vetorizada de quantil_t para arrays de graus de liberdade
+
+        Args:
+            probabilidade: Probabilidade acumulada
+            graus_liberdade: Array de graus de liberdade (infinito usa a distribuição normal)
+
+        Returns:
+            Array de quantis com o mesmo formato de graus_liberdade
+        """
+        graus_liberdade = np.asarray(graus_liberdade, dtype=float)
+        quantis = np.full(graus_liberdade.shape, np.nan)
+
+        infinitos = np.isinf(graus_liberdade) & (graus_liberdade > 0)
+        if infinitos.any():
+            quantis[infinitos] = self.quantil_normal(probabilidade)
+
+        tabelados = ((graus_liberdade >= 1) & (graus_liberdade <= self.graus_liberdade_tabelados)
+                     & (graus_liberdade == np.floor(graus_liberdade)))
+        if tabelados.any():
+            tabela = self._tabela(probabilidade)
+            quantis[tabelados] = tabela[graus_liberdade[tabelados].astype(np.intp) - 1]
+
+        avulsos = (graus_liberdade > 0) & ~infinitos & ~tabelados
+        if avulsos.any():
+            valores, posicoes = np.unique(graus_liberdade[avulsos], return_inverse=True)
+            calculados = np.array([self._quantil_exato(probabilidade, float(gl)) for gl in valores])
+            quantis[avulsos] = calculados[posicoes]
+
+        return quantis
+
+
+# Tabela compartilhada pelas instâncias de CalculoMetrologico
+tabela_padrao = TabelaQuantis()
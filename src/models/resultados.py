@@ -0,0 +1,272 @@
+"""
+Tipos de resultado dos cálculos metrológicos
+Substituem os dicionários aninhados retornados por CalculoMetrologico por objetos
+compactos (dataclasses com __slots__ e um orçamento Tipo B armazenado em um único
+array estruturado do NumPy), mantendo o acesso por chave dos dicionários para
+o código existente
+"""
+
+import math
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, fields
+from typing import ClassVar
+
+from utils.importacao_tardia import importar_tardio
+
+# NumPy é carregado apenas quando o primeiro orçamento é montado
+np = importar_tardio('numpy')
+
+# Campos numéricos de cada fonte de incerteza no array estruturado
+CAMPOS_FONTE = (
+    'valor', 'divisor', 'incerteza_padrao', 'coeficiente_sensibilidade',
+    'contribuicao', 'contribuicao_quadratica', 'graus_liberdade'
+)
+
+
+def _para_python(valor):
+    """Converte resultados (inclusive aninhados) em tipos nativos do Python"""
+    if isinstance(valor, _ResultadoMapeavel):
+        return valor.para_dict()
+    if isinstance(valor, Mapping):
+        return {chave: _para_python(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple, Sequence)) and not isinstance(valor, str):
+        return [_para_python(v) for v in valor]
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return valor
+
+
+class _ResultadoMapeavel(Mapping):
+    """
+    Base dos resultados: expõe os campos da dataclass como chaves de dicionário,
+    para compatibilidade com o código que consome os resultados como dict
+    """
+
+    __slots__ = ()
+
+    _CHAVES: ClassVar[tuple] = ()
+
+    def _chaves(self):
+        return self._CHAVES
+
+    def __getitem__(self, chave):
+        if chave not in self._chaves():
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def __iter__(self):
+        return iter(self._chaves())
+
+    def __len__(self):
+        return len(self._chaves())
+
+    def para_dict(self):
+        """
+        Converte o resultado em dicionários e listas com tipos nativos do Python
+        (adequado para serialização em JSON)
+        """
+        return {chave: _para_python(self[chave]) for chave in self._chaves()}
+
+
+def _registrar_chaves(classe):
+    """Define as chaves de dicionário de um resultado a partir dos campos da dataclass"""
+    classe._CHAVES = tuple(campo.name for campo in fields(classe))
+    return classe
+
+
+@_registrar_chaves
+@dataclass(slots=True, eq=False)
+class ResultadoTipoA(_ResultadoMapeavel):
+    """Resultado do cálculo de incerteza Tipo A"""
+
+    media: float
+    desvio_padrao: float
+    desvio_padrao_media: float
+    graus_liberdade: int
+    fator_t: float
+    incerteza_padrao: float
+    n_efetivo: float = None
+
+    def _chaves(self):
+        # Campos opcionais só aparecem quando calculados: a média exige leituras suficientes
+        # e o número efetivo de observações só existe com a correção de autocorrelação
+        return tuple(chave for chave in self._CHAVES
+                     if chave not in ('media', 'n_efetivo') or getattr(self, chave) is not None)
+
+
+class FonteIncerteza(_ResultadoMapeavel):
+    """Visão (sem cópia) de uma fonte do orçamento Tipo B, acessível como dicionário"""
+
+    __slots__ = ('_orcamento', '_indice')
+
+    _CHAVES = ('fonte', 'valor', 'distribuicao', 'divisor', 'incerteza_padrao',
+               'coeficiente_sensibilidade', 'contribuicao', 'contribuicao_quadratica', 'graus_liberdade')
+
+    def __init__(self, orcamento, indice):
+        self._orcamento = orcamento
+        self._indice = indice
+
+    def __getitem__(self, chave):
+        if chave == 'fonte':
+            return self._orcamento.descricoes[self._indice]
+        if chave == 'distribuicao':
+            return self._orcamento.distribuicoes[self._indice]
+        if chave not in CAMPOS_FONTE:
+            raise KeyError(chave)
+        return self._orcamento.dados[chave][self._indice].item()
+
+    def __repr__(self):
+        return f"FonteIncerteza({dict(self)!r})"
+
+
+class _ListaFontes(Sequence):
+    """Sequência de visões das fontes de um orçamento Tipo B"""
+
+    __slots__ = ('_orcamento',)
+
+    def __init__(self, orcamento):
+        self._orcamento = orcamento
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        return FonteIncerteza(self._orcamento, indice)
+
+    def __len__(self):
+        return len(self._orcamento.descricoes)
+
+
+class OrcamentoTipoB(_ResultadoMapeavel):
+    """
+    Resultado do cálculo de incerteza Tipo B com as fontes em um array estruturado
+
+    Os valores numéricos de todas as fontes ficam em um único array estruturado
+    (um registro por fonte); descrições e distribuições ficam em listas à parte.
+    O acesso por chave reproduz o dicionário original ('fontes',
+    'incerteza_combinada', 'graus_liberdade').
+    """
+
+    __slots__ = ('dados', 'descricoes', 'distribuicoes', 'incerteza_combinada')
+
+    _CHAVES = ('fontes', 'incerteza_combinada', 'graus_liberdade')
+
+    def __init__(self, dados, descricoes, distribuicoes, incerteza_combinada):
+        """
+        Args:
+            dados: Array estruturado com os campos de CAMPOS_FONTE
+            descricoes: Descrição de cada fonte
+            distribuicoes: Distribuição de cada fonte
+            incerteza_combinada: Raiz da soma quadrática das contribuições
+        """
+        self.dados = dados
+        self.descricoes = descricoes
+        self.distribuicoes = distribuicoes
+        self.incerteza_combinada = incerteza_combinada
+
+    @staticmethod
+    def tipo_registro():
+        """Tipo (dtype) do array estruturado das fontes"""
+        return np.dtype([(campo, np.float64) for campo in CAMPOS_FONTE])
+
+    def __getitem__(self, chave):
+        if chave == 'fontes':
+            return self.fontes
+        if chave == 'incerteza_combinada':
+            return self.incerteza_combinada
+        if chave == 'graus_liberdade':
+            return self.dados['graus_liberdade'].tolist()
+        raise KeyError(chave)
+
+    @property
+    def fontes(self):
+        """Fontes de incerteza como sequência de visões acessíveis por chave"""
+        return _ListaFontes(self)
+
+    def termo_welch_satterthwaite(self):
+        """
+        Soma dos termos u_i^4 / ν_i das fontes com graus de liberdade finitos e
+        contribuição positiva (denominador da fórmula de Welch-Satterthwaite)
+        """
+        contribuicao = self.dados['contribuicao']
+        graus_liberdade = self.dados['graus_liberdade']
+        selecionadas = np.isfinite(graus_liberdade) & (contribuicao > 0)
+        if not selecionadas.any():
+            return 0
+        return sum((contribuicao[selecionadas] ** 4 / graus_liberdade[selecionadas]).tolist())
+
+    def para_array_estruturado(self):
+        """
+        Retorna o array estruturado das fontes, sem cópia
+
+        Returns:
+            Array estruturado com um registro por fonte e os campos de CAMPOS_FONTE
+        """
+        return self.dados
+
+    def __repr__(self):
+        return (f"OrcamentoTipoB(fontes={len(self.descricoes)}, "
+                f"incerteza_combinada={self.incerteza_combinada!r})")
+
+
+@_registrar_chaves
+@dataclass(slots=True, eq=False)
+class ResultadoCombinada(_ResultadoMapeavel):
+    """Resultado do cálculo de incerteza combinada"""
+
+    incerteza_tipo_a: float
+    incerteza_tipo_b: float
+    incerteza_combinada: float
+    graus_liberdade_efetivos: float
+
+
+@_registrar_chaves
+@dataclass(slots=True, eq=False)
+class ResultadoIncerteza(_ResultadoMapeavel):
+    """Resultado do cálculo completo de incerteza de um ponto de calibração"""
+
+    incerteza_tipo_a: ResultadoTipoA
+    incerteza_tipo_b: OrcamentoTipoB
+    incerteza_combinada: ResultadoCombinada
+    fator_k: float
+    incerteza_expandida: float
+    nivel_confianca: float
+
+
+# Campos do array estruturado de resumo de vários pontos
+CAMPOS_RESUMO = (
+    'media', 'incerteza_tipo_a', 'graus_liberdade_tipo_a', 'incerteza_tipo_b',
+    'incerteza_combinada', 'graus_liberdade_efetivos', 'fator_k', 'incerteza_expandida'
+)
+
+
+def resultados_para_array(resultados):
+    """
+    Reúne os resultados de vários pontos em um array estruturado (um registro por ponto)
+
+    Args:
+        resultados: Sequência de ResultadoIncerteza
+
+    Returns:
+        Array estruturado com os campos de CAMPOS_RESUMO
+    """
+    tipo = np.dtype([(campo, np.float64) for campo in CAMPOS_RESUMO])
+    return np.fromiter(
+        (
+            (
+                math.nan if r.incerteza_tipo_a.media is None else r.incerteza_tipo_a.media,
+                r.incerteza_tipo_a.incerteza_padrao,
+                r.incerteza_tipo_a.graus_liberdade,
+                r.incerteza_tipo_b.incerteza_combinada,
+                r.incerteza_combinada.incerteza_combinada,
+                r.incerteza_combinada.graus_liberdade_efetivos,
+                r.fator_k,
+                r.incerteza_expandida
+            )
+            for r in resultados
+        ),
+        dtype=tipo
+    )
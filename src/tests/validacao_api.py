@@ -0,0 +1,428 @@
+"""
+Script para validação da API JSON de cálculos
+Envia um ponto e um lote para /api/calculos e compara com o cálculo por ponto
+"""
+
+import io
+import sys
+import os
+import json
+import tempfile
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api.calibracoes
+import api.metricas
+from app import app
+from database import conexao
+from database.calibracoes import salvar_calibracao
+from jobs import fila
+from jobs.tarefas import DIRETORIO_RESULTADOS
+from jobs.trabalhador import Trabalhador
+from models.calculo_metrologico import CalculoMetrologico
+from utils import metricas
+from utils import gerar_graficos
+from utils.cache import CacheArtefatos
+
+FONTES = [
+    {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+    {'descricao': 'Incerteza do padrão', 'valor': 0.005, 'divisor': 2.0, 'graus_liberdade': 10}
+]
+
+def validar_calculo_lote():
+    """Valida o cálculo de um lote de pontos com NDJSON na resposta"""
+    print("=== VALIDAÇÃO DA API DE CÁLCULOS ===")
+
+    cliente = app.test_client()
+    calc = CalculoMetrologico()
+
+    # Exemplo: 2000 pontos com orçamento comum, um deles inválido
+    pontos = [
+        {
+            'id': f"P{i}",
+            'valores_medidos': [10.0 + 0.01 * (i % 3), 10.02, 10.01 + 0.001 * (i % 7)],
+            'valor_referencia': 10.0,
+            'erro_maximo_permitido': 0.05
+        }
+        for i in range(2000)
+    ]
+    pontos[5]['valores_medidos'] = ['dez']
+
+    resposta = cliente.post('/api/calculos', json={'fontes_incerteza': FONTES, 'pontos': pontos})
+    linhas = [json.loads(linha) for linha in resposta.data.decode('utf-8').splitlines()]
+
+    # Um ponto isolado é respondido com um objeto JSON
+    isolado = cliente.post('/api/calculos', json=dict(pontos[0], fontes_incerteza=FONTES)).get_json()
+
+    esperado = calc.calcular_incerteza_completa(pontos[10]['valores_medidos'], FONTES)
+    conformidade = calc.avaliar_conformidade(
+        calc.calcular_erro(esperado['incerteza_tipo_a']['media'], 10.0), esperado['incerteza_expandida'], 0.05
+    )
+
+    print(f"Status: {resposta.status_code} ({resposta.mimetype})")
+    print(f"Linhas recebidas: {len(linhas)}")
+    print(f"Ponto inválido: {linhas[5]}")
+    print(f"U do ponto 10: {linhas[10]['incerteza_expandida']} (esperado: {esperado['incerteza_expandida']})")
+
+    # Verificar se os resultados estão corretos
+    if resposta.status_code == 200 and len(linhas) == 2000 and \
+       [linha['indice'] for linha in linhas] == list(range(2000)) and \
+       'erro_validacao' in linhas[5] and linhas[10]['id'] == 'P10' and \
+       abs(linhas[10]['incerteza_expandida'] - esperado['incerteza_expandida']) < 1e-12 and \
+       linhas[10]['conforme'] == conformidade['conforme'] and \
+       abs(isolado['incerteza_expandida'] - linhas[0]['incerteza_expandida']) < 1e-12:
+        print("✓ API de cálculos validada com sucesso!")
+    else:
+        print("✗ Falha na validação da API de cálculos!")
+
+def validar_limites():
+    """Valida a rejeição de requisições inválidas ou acima dos limites"""
+    print("=== VALIDAÇÃO DOS LIMITES DA API ===")
+
+    cliente = app.test_client()
+
+    sem_json = cliente.post('/api/calculos', data='texto', content_type='text/plain')
+    nivel_invalido = cliente.post('/api/calculos', json={'nivel_confianca': 2, 'pontos': []})
+
+    limite_original = app.config['MAX_CONTENT_LENGTH']
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+    muito_grande = cliente.post('/api/calculos', json={'pontos': [{'valores_medidos': [1.0] * 500}]})
+    # Corpo enviado em partes, sem Content-Length (como o servidor WSGI repassa um envio chunked)
+    corpo = json.dumps({'valores_medidos': [1.0] * 5000, 'valor_referencia': 1.0}).encode('utf-8')
+    em_partes = {
+        'input_stream': io.BytesIO(corpo),
+        'content_type': 'application/json',
+        'headers': {'Transfer-Encoding': 'chunked'},
+        'environ_overrides': {'wsgi.input_terminated': True},
+    }
+    chunked = cliente.post('/api/calculos', **em_partes)
+    em_partes['input_stream'] = io.BytesIO(corpo)
+    chunked_trabalho = cliente.post('/api/trabalhos', **em_partes)
+    app.config['MAX_CONTENT_LENGTH'] = limite_original
+
+    print(f"Corpo sem JSON: {sem_json.status_code}")
+    print(f"Nível de confiança inválido: {nivel_invalido.status_code}")
+    print(f"Corpo acima do limite: {muito_grande.status_code}")
+    print(f"Corpo em partes acima do limite: {chunked.status_code} (cálculos), {chunked_trabalho.status_code} (trabalhos)")
+
+    # Verificar se os resultados estão corretos
+    status = (sem_json.status_code, nivel_invalido.status_code, muito_grande.status_code,
+              chunked.status_code, chunked_trabalho.status_code)
+    if status == (400, 400, 413, 413, 413):
+        print("✓ Limites da API validados com sucesso!")
+    else:
+        print("✗ Falha na validação dos limites da API!")
+
+def validar_metricas():
+    """Valida os histogramas de /metrics e o controle do profiler por amostragem"""
+    print("=== VALIDAÇÃO DAS MÉTRICAS DE DESEMPENHO ===")
+
+    cliente = app.test_client()
+    pontos = [{'valores_medidos': [10.01, 10.02, 10.03], 'valor_referencia': 10.0} for _ in range(1500)]
+
+    # Com a coleta desligada, nenhuma observação é registrada
+    metricas.registro.limpar()
+    cliente.post('/api/calculos', json={'fontes_incerteza': FONTES, 'pontos': pontos})
+    vazio = cliente.get('/metrics').data.decode('utf-8')
+
+    # Sem token: profiler indisponível e /metrics restrito a clientes locais
+    api.metricas.TOKEN = None
+    sem_token = cliente.post('/metrics/profiler?acao=iniciar').status_code
+    remoto = cliente.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}).status_code
+    local = cliente.get('/metrics').status_code
+
+    api.metricas.TOKEN = 'segredo'
+    cabecalhos = {'Authorization': 'Bearer segredo'}
+    metricas.ativar()
+    try:
+        token_errado = cliente.post('/metrics/profiler?acao=iniciar',
+                                    headers={'Authorization': 'Bearer outro'}).status_code
+        cliente.post('/metrics/profiler?acao=iniciar', headers=cabecalhos)
+        cliente.post('/api/calculos', json={'fontes_incerteza': FONTES, 'pontos': pontos}).get_data()
+        CalculoMetrologico().calcular_incerteza_completa([10.01, 10.02, 10.03], FONTES)
+        estado = cliente.post('/metrics/profiler?acao=parar', headers=cabecalhos).get_json()
+        acao_invalida = cliente.post('/metrics/profiler?acao=reiniciar', headers=cabecalhos)
+        resposta = cliente.get('/metrics', headers=cabecalhos)
+        pilhas = cliente.get('/metrics/profiler', headers=cabecalhos).data.decode('utf-8')
+    finally:
+        api.metricas.TOKEN = None
+        metricas.ativar(False)
+        metricas.profiler.limpar()
+    texto = resposta.data.decode('utf-8')
+
+    contagem_lote = 'calibra_calculo_segundos_count{etapa="tipo_a",modo="lote"} 2'
+    contagem_ponto = 'calibra_calculo_segundos_count{etapa="tipo_a",modo="ponto"} 1'
+    requisicao = 'calibra_requisicao_segundos_count{metodo="POST",rota="/api/calculos",status="200"} 1'
+    infinito = 'calibra_calculo_segundos_bucket{etapa="completa",modo="lote",le="+Inf"} 2'
+
+    print(f"Tipo de conteúdo: {resposta.content_type}")
+    print(f"Linhas exportadas: {len(texto.splitlines())}")
+    print(f"Amostras do profiler: {estado['amostras']} ({len(pilhas.splitlines())} pilhas distintas)")
+    print(f"Sem token: profiler {sem_token}, /metrics remoto {remoto}, local {local}")
+
+    # Verificar se os resultados estão corretos
+    if vazio == '' and resposta.status_code == 200 and resposta.content_type.startswith('text/plain') and \
+       contagem_lote in texto and contagem_ponto in texto and requisicao in texto and infinito in texto and \
+       '# TYPE calibra_calculo_segundos histogram' in texto and \
+       not estado['ativo'] and acao_invalida.status_code == 400 and \
+       (sem_token, remoto, local, token_errado) == (404, 401, 200, 401) and \
+       all(linha.rsplit(' ', 1)[1].isdigit() for linha in pilhas.splitlines()):
+        print("✓ Métricas de desempenho validadas com sucesso!")
+    else:
+        print("✗ Falha na validação das métricas de desempenho!")
+
+def validar_fila_trabalhos():
+    """Valida a fila de trabalhos em segundo plano: enfileiramento, execução, novas tentativas e limites"""
+    print("=== VALIDAÇÃO DA FILA DE TRABALHOS ===")
+
+    fila.ESPERA_BASE = 0.0
+
+    cliente = app.test_client()
+    pontos = [
+        {'id': i, 'valores_medidos': [10.0 + 0.001 * i, 10.002 + 0.001 * i, 10.001 + 0.001 * i], 'valor_referencia': 10.0}
+        for i in range(300)
+    ]
+
+    # Banco novo sem inicialização explícita: criado na primeira conexão do processo
+    conexao.configurar_banco(os.path.join(tempfile.mkdtemp(prefix='calibracao_'), 'novo.db'))
+    banco_novo = cliente.post('/api/trabalhos', json={'tipo': 'analise_deriva', 'parametros': {}})
+    calibracao_banco_novo = cliente.get('/api/calibracoes/1')
+    conexao.configurar_banco(os.path.join(tempfile.mkdtemp(prefix='calibracao_'), 'validacao.db'))
+
+    # Lote assíncrono pela API de cálculos, trabalho com falha (padrão inexistente, 2 tentativas)
+    # e trabalho com parâmetros inválidos incluído diretamente na fila (falha sem novas tentativas)
+    enfileirado = cliente.post('/api/calculos', json={'fontes_incerteza': FONTES, 'pontos': pontos, 'assincrono': True})
+    trabalho_id = enfileirado.get_json()['id']
+    pendente = cliente.get(f'/api/trabalhos/{trabalho_id}/resultado')
+    falho_id = fila.enfileirar('recalculo_padrao', {'padrao_id': 999}, max_tentativas=2)
+    invalido_id = fila.enfileirar('calculo_lote', {'pontos': pontos[:1], 'nivel_confianca': 2}, max_tentativas=3)
+    invalido = cliente.post('/api/trabalhos', json={'tipo': 'desconhecido', 'parametros': {}})
+    nivel_invalido = cliente.post('/api/trabalhos', json={
+        'tipo': 'calculo_lote', 'parametros': {'pontos': pontos[:1], 'nivel_confianca': 2}
+    })
+    grafico = {'pontos_nominais': [0, 10], 'erros': [0.01, 0.02], 'incertezas': [0.01, 0.01]}
+    grafico_diretorio = cliente.post('/api/trabalhos', json={
+        'tipo': 'graficos', 'parametros': {'tarefas': [['erros', dict(grafico, diretorio=tempfile.gettempdir())]]}
+    })
+    grafico_tamanhos = cliente.post('/api/trabalhos', json={
+        'tipo': 'graficos', 'parametros': {'tarefas': [['erros', dict(grafico, erros=[0.01])]]}
+    })
+
+    executados = Trabalhador(processos=2, intervalo=0.05).executar(ate_esvaziar=True)
+
+    resposta_resultado = cliente.get(f'/api/trabalhos/{trabalho_id}/resultado')
+    resultado = resposta_resultado.get_json()['resultados']
+    sincrono = [
+        json.loads(linha) for linha in
+        cliente.post('/api/calculos', json={'fontes_incerteza': FONTES, 'pontos': pontos}).data.decode('utf-8').splitlines()
+    ]
+    falho = cliente.get(f'/api/trabalhos/{falho_id}').get_json()
+    falho_invalido = cliente.get(f'/api/trabalhos/{invalido_id}').get_json()
+    resultado_falho = cliente.get(f'/api/trabalhos/{falho_id}/resultado')
+    cancelar_concluido = cliente.delete(f'/api/trabalhos/{trabalho_id}')
+
+    # Resultado com arquivo gerado: enviado apenas com ?arquivo=1
+    os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+    caminho_arquivo = os.path.join(DIRETORIO_RESULTADOS, 'validacao_resultado.txt')
+    with open(caminho_arquivo, 'w') as arquivo:
+        arquivo.write('conteúdo gerado')
+    fila.enfileirar('graficos', {'tarefas': []})
+    com_arquivo = fila.reservar('validacao')
+    fila.concluir(com_arquivo['id'], {'arquivo': caminho_arquivo})
+    resultado_arquivo = cliente.get(f"/api/trabalhos/{com_arquivo['id']}/resultado").get_json()
+    download = cliente.get(f"/api/trabalhos/{com_arquivo['id']}/resultado?arquivo=1").data.decode('utf-8')
+    os.remove(caminho_arquivo)
+
+    # Limite por tipo: com um trabalho 'certificados' em execução, o próximo não é reservado
+    fila.enfileirar('certificados', {'certificado_ids': [1]}, prioridade=1)
+    fila.enfileirar('certificados', {'certificado_ids': [2]}, prioridade=1)
+    fila.enfileirar('graficos', {'tarefas': []})
+    reservados = [fila.reservar('validacao', limites={'certificados': 1}) for _ in range(3)]
+    tipos_reservados = [t['tipo'] if t else None for t in reservados]
+    cancelado = cliente.delete(f'/api/trabalhos/{fila.enfileirar("graficos", {"tarefas": []})}')
+
+    print(f"Trabalhos executados: {executados} (com novas tentativas)")
+    print(f"Tentativas do trabalho com falha: {falho['tentativas']} ({falho['status']}); "
+          f"com parâmetros inválidos: {falho_invalido['tentativas']} ({falho_invalido['status']})")
+    print(f"Reservas com limite por tipo: {tipos_reservados}")
+
+    # Verificar se os resultados estão corretos
+    if enfileirado.status_code == 202 and enfileirado.headers['Location'].endswith(f'/api/trabalhos/{trabalho_id}') and \
+       banco_novo.status_code == 202 and calibracao_banco_novo.status_code == 404 and \
+       pendente.status_code == 202 and 'Retry-After' in pendente.headers and invalido.status_code == 400 and \
+       nivel_invalido.status_code == 400 and grafico_diretorio.status_code == 400 and \
+       grafico_tamanhos.status_code == 400 and executados == 4 and resultado == sincrono and \
+       resposta_resultado.mimetype == 'application/json' and \
+       resultado_arquivo == {'arquivo': caminho_arquivo} and download == 'conteúdo gerado' and \
+       falho['status'] == 'falhou' and falho['tentativas'] == 2 and 'Padrão não encontrado' in falho['erro'] and \
+       falho_invalido['status'] == 'falhou' and falho_invalido['tentativas'] == 1 and \
+       'nivel_confianca' in falho_invalido['erro'] and \
+       resultado_falho.status_code == 409 and cancelar_concluido.status_code == 409 and \
+       tipos_reservados == ['certificados', 'graficos', None] and cancelado.status_code == 200:
+        print("✓ Fila de trabalhos validada com sucesso!")
+    else:
+        print("✗ Falha na validação da fila de trabalhos!")
+
+def validar_cache_artefatos():
+    """Valida o cache de resultados e certificados com ETag, Last-Modified e invalidação por versão"""
+    print("=== VALIDAÇÃO DO CACHE DE RESULTADOS E CERTIFICADOS ===")
+
+    diretorio = tempfile.mkdtemp(prefix='calibracao_')
+    conexao.configurar_banco(os.path.join(diretorio, 'validacao.db'))
+    conexao.inicializar_banco()
+    api.calibracoes.cache_artefatos = cache = CacheArtefatos(diretorio=os.path.join(diretorio, 'cache'))
+
+    # Exemplo: certificado de um paquímetro com 20 pontos
+    banco = conexao.obter_conexao()
+    instrumento_id = banco.execute(
+        "INSERT INTO instrumentos (codigo, descricao, resolucao, unidade) VALUES ('PAQ-C1', 'Paquímetro', 0.01, 'mm')"
+    ).lastrowid
+    banco.commit()
+    pontos = [
+        {'sequencia': i, 'valor_referencia': 10.0 * i, 'valor_lido': 10.0 * i + 0.01, 'erro': 0.01,
+         'incerteza_expandida': 0.02, 'fator_k': 2.0,
+         'fontes': [{'descricao': 'Resolução', 'tipo': 'B', 'valor': 0.01, 'contribuicao': 0.0029}]}
+        for i in range(1, 21)
+    ]
+    calibracao_id = salvar_calibracao(
+        {'numero': 'CACHE-0001', 'instrumento_id': instrumento_id, 'data_inicio': '2024-01-10 08:00:00'}, pontos
+    )
+    certificado_id = banco.execute(
+        "INSERT INTO certificados (numero, calibracao_id, data_emissao) VALUES ('CERT-CACHE-1', ?, '2024-01-11')",
+        (calibracao_id,)
+    ).lastrowid
+    padrao_id = banco.execute(
+        "INSERT INTO padroes (codigo, descricao, certificado_numero) VALUES ('BP-CACHE', 'Blocos padrão', 'RBC-0001')"
+    ).lastrowid
+    banco.execute("INSERT INTO calibracao_padroes (calibracao_id, padrao_id) VALUES (?, ?)", (calibracao_id, padrao_id))
+    banco.commit()
+
+    cliente = app.test_client()
+    url = f'/api/certificados/{certificado_id}'
+    primeira = cliente.get(url)
+    etag = primeira.headers['ETag']
+    revalidada = cliente.get(url, headers={'If-None-Match': etag})
+    por_data = cliente.get(url, headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    repetida = cliente.get(url)
+    geracoes_antes = cache.geracoes
+
+    # Alteração de uma fonte de incerteza: nova versão, novo ETag e nova renderização
+    banco.execute(
+        "UPDATE fontes_incerteza SET valor = 0.02 WHERE ponto_calibracao_id = "
+        "(SELECT id FROM pontos_calibracao WHERE calibracao_id = ? AND sequencia = 1)", (calibracao_id,)
+    )
+    banco.commit()
+    alterada = cliente.get(url, headers={'If-None-Match': etag})
+
+    resultado = cliente.get(f'/api/calibracoes/{calibracao_id}')
+    resultado_revalidado = cliente.get(f'/api/calibracoes/{calibracao_id}',
+                                       headers={'If-None-Match': resultado.headers['ETag']})
+    grafico_invalido = cliente.get(f'/api/calibracoes/{calibracao_id}/graficos/pizza')
+
+    # Outro processo (novo cache em memória) lê o certificado do nível em disco
+    outro_processo = CacheArtefatos(diretorio=cache.diretorio)
+    api.calibracoes.cache_artefatos = outro_processo
+    do_disco = cliente.get(url)
+    geracoes_outro_processo = outro_processo.geracoes
+
+    # Novo certificado do padrão utilizado: o certificado da calibração é renderizado de novo
+    banco.execute("UPDATE padroes SET certificado_numero = 'RBC-0002' WHERE id = ?", (padrao_id,))
+    banco.commit()
+    recertificado = cliente.get(url, headers={'If-None-Match': do_disco.headers['ETag']})
+
+    print(f"Respostas: {primeira.status_code}, {revalidada.status_code}, {por_data.status_code}, "
+          f"{repetida.status_code}, após alteração {alterada.status_code}")
+    print(f"Renderizações: {geracoes_antes} antes e {cache.geracoes} após a alteração "
+          f"(acertos em memória: {cache.acertos}; em disco no outro processo: {outro_processo.acertos_disco})")
+
+    # Verificar se os resultados estão corretos
+    if primeira.status_code == 200 and b'CERT-CACHE-1' in primeira.data and \
+       revalidada.status_code == 304 and por_data.status_code == 304 and not revalidada.data and \
+       repetida.status_code == 200 and repetida.data == primeira.data and geracoes_antes == 1 and \
+       alterada.status_code == 200 and alterada.headers['ETag'] != etag and cache.geracoes == 3 and \
+       len(resultado.get_json()['pontos']) == 20 and resultado_revalidado.status_code == 304 and \
+       grafico_invalido.status_code == 404 and \
+       do_disco.data == alterada.data and outro_processo.acertos_disco == 1 and geracoes_outro_processo == 0 and \
+       recertificado.status_code == 200 and b'RBC-0002' in recertificado.data:
+        print("✓ Cache de resultados e certificados validado com sucesso!")
+    else:
+        print("✗ Falha na validação do cache de resultados e certificados!")
+
+def validar_graficos_calibracao():
+    """Valida os gráficos de calibrações sem dados de erro e com erros e incertezas nulos"""
+    print("=== VALIDAÇÃO DOS GRÁFICOS DE CALIBRAÇÕES ===")
+
+    diretorio = tempfile.mkdtemp(prefix='calibracao_')
+    conexao.configurar_banco(os.path.join(diretorio, 'validacao.db'))
+    conexao.inicializar_banco()
+    gerar_graficos.output_dir = os.path.join(diretorio, 'img')
+    api.calibracoes.cache_artefatos = CacheArtefatos()
+
+    # Exemplo: calibração importada sem erro nem incerteza e calibração com erros e incertezas nulos
+    sem_dados = salvar_calibracao({'numero': 'GRAF-0001', 'data_inicio': '2024-03-01 08:00:00'}, [
+        {'sequencia': 1, 'valor_referencia': 10.0, 'valor_lido': 10.0}
+    ])
+    nulos = salvar_calibracao({'numero': 'GRAF-0002', 'data_inicio': '2024-03-01 08:00:00'}, [
+        {'sequencia': i, 'valor_referencia': 10.0 * i, 'valor_lido': 10.0 * i, 'erro': 0.0,
+         'incerteza_expandida': 0.0, 'fator_k': 2.0}
+        for i in range(1, 4)
+    ])
+
+    cliente = app.test_client()
+    sem_erros = cliente.get(f'/api/calibracoes/{sem_dados}/graficos/erros')
+    sem_contribuicoes = cliente.get(f'/api/calibracoes/{nulos}/graficos/contribuicoes')
+    com_nulos = cliente.get(f'/api/calibracoes/{nulos}/graficos/erros')
+
+    try:
+        gerar_graficos.gerar_grafico_erros(pontos_nominais=[], erros=[], incertezas=[])
+        vazio_rejeitado = False
+    except ValueError:
+        vazio_rejeitado = True
+
+    # Limite do cache de gráficos: os usados há mais tempo são removidos, os demais arquivos são mantidos
+    cache = os.path.join(diretorio, 'cache')
+    os.makedirs(cache)
+    with open(os.path.join(cache, 'logo.png'), 'wb') as arquivo:
+        arquivo.write(b'logo')
+    graficos = [gerar_graficos.gerar_grafico_erros([0, 10], [0.01, 0.01 * i], [0.01, 0.01], diretorio=cache)
+                for i in range(3)]
+    reutilizado = gerar_graficos.gerar_grafico_erros([0, 10], [0.01, 0.0], [0.01, 0.01], diretorio=cache)
+    removidos = gerar_graficos._limitar_cache(
+        cache, sum(os.path.getsize(c) for c in (graficos[0], graficos[2]))
+    )
+    restantes_lru = sorted(os.listdir(cache))
+    capacidade_original = gerar_graficos.CAPACIDADE_BYTES
+    gerar_graficos.CAPACIDADE_BYTES = 0
+    try:
+        ultimo = gerar_graficos.gerar_grafico_contribuicoes(['A', 'B'], [0.01, 0.02], diretorio=cache)
+    finally:
+        gerar_graficos.CAPACIDADE_BYTES = capacidade_original
+
+    print(f"Sem erros: {sem_erros.status_code}; sem fontes: {sem_contribuicoes.status_code}; "
+          f"erros nulos: {com_nulos.status_code} ({com_nulos.mimetype})")
+    print(f"Cache de gráficos: {removidos} removido(s) por LRU, restantes {sorted(os.listdir(cache))}")
+
+    # Verificar se os resultados estão corretos
+    if sem_erros.status_code == 404 and sem_contribuicoes.status_code == 404 and \
+       com_nulos.status_code == 200 and com_nulos.data.startswith(b'\x89PNG') and vazio_rejeitado and \
+       reutilizado == graficos[0] and removidos == 1 and \
+       restantes_lru == sorted(['logo.png', os.path.basename(graficos[0]), os.path.basename(graficos[2])]) and \
+       sorted(os.listdir(cache)) == sorted(['logo.png', os.path.basename(ultimo)]):
+        print("✓ Gráficos de calibrações validados com sucesso!")
+    else:
+        print("✗ Falha na validação dos gráficos de calibrações!")
+
+if __name__ == "__main__":
+    print("VALIDAÇÃO DA API DE CÁLCULOS")
+    print("============================")
+
+    # Executar validações
+    validar_calculo_lote()
+    validar_limites()
+    validar_metricas()
+    validar_fila_trabalhos()
+    validar_cache_artefatos()
+    validar_graficos_calibracao()
+
+    print("Todos os testes de validação foram concluídos!")
@@ -0,0 +1,787 @@
+"""
+Script para validação da camada de persistência em SQLite
+Grava e lê calibrações em um banco temporário e verifica os resultados
+"""
+
+import sys
+import os
+import datetime
+import json
+import multiprocessing
+import random
+import tempfile
+import time
+
+import numpy as np
+
+# Adicionar o diretório pai ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao
+from database.migracao import aplicar_migracoes, listar_migracoes, versao_atual
+from database.calibracoes import salvar_calibracao, carregar_calibracao, fontes_de_resultado
+from models.calculo_metrologico import CalculoMetrologico
+from database.modelos_orcamento import CacheModelos, obter_modelo, salvar_modelo
+from database.recalculo_incremental import atualizar_fonte, atualizar_leituras, sincronizar_calibracao
+from jobs.recalcular_padrao import recalcular_padrao
+from database.agenda_calibracoes import carregar_agenda, concluir_calibracao, sincronizar_agenda
+from models.agenda import AgendaCalibracoes
+from models.analise_deriva import ajustar_derivas, recomendar_periodicidades
+from jobs.analisar_deriva import analisar_deriva, aplicar_recomendacoes
+from utils.transferencia_dados import _Referencias, exportar, importar
+from utils.gerar_certificados import carregar_dados_certificados, gerar_certificados_lote, renderizar_certificado
+
+def preparar_banco_temporario():
+    """Cria um banco de dados vazio em um diretório temporário"""
+    diretorio = tempfile.mkdtemp(prefix='calibracao_')
+    conexao.configurar_banco(os.path.join(diretorio, 'validacao.db'))
+    conexao.inicializar_banco()
+    return diretorio
+
+def validar_gravacao_leitura():
+    """Valida a gravação e a leitura de uma calibração completa"""
+    print("=== VALIDAÇÃO DA GRAVAÇÃO E LEITURA DE CALIBRAÇÕES ===")
+
+    calc = CalculoMetrologico()
+
+    # Exemplo: calibração de um paquímetro com 50 pontos
+    pontos = []
+    for i in range(50):
+        valor_referencia = 10.0 * (i + 1)
+        valores_medidos = [valor_referencia + 0.02, valor_referencia + 0.03, valor_referencia + 0.01]
+        fontes = [
+            {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+            {'descricao': 'Incerteza do padrão', 'valor': 0.001, 'divisor': 2.0, 'graus_liberdade': 10}
+        ]
+        resultado = calc.calcular_incerteza_completa(valores_medidos, fontes)
+        media = resultado['incerteza_tipo_a']['media']
+        pontos.append({
+            'sequencia': i + 1,
+            'valor_referencia': valor_referencia,
+            'valor_lido': media,
+            'erro': calc.calcular_erro(media, valor_referencia),
+            'incerteza_padrao': resultado['incerteza_combinada']['incerteza_combinada'],
+            'incerteza_expandida': resultado['incerteza_expandida'],
+            'fator_k': resultado['fator_k'],
+            'conforme': True,
+            'fontes': fontes_de_resultado(resultado)
+        })
+
+    calibracao_id = salvar_calibracao({'numero': 'VAL-0001', 'data_inicio': '2024-01-10 08:00:00'}, pontos)
+
+    # Contar as consultas executadas na leitura
+    consultas = []
+    conexao.obter_conexao().set_trace_callback(consultas.append)
+    calibracao = carregar_calibracao(calibracao_id)
+    conexao.obter_conexao().set_trace_callback(None)
+
+    print(f"Calibração gravada: id = {calibracao_id}, número = {calibracao['numero']}")
+    print(f"Pontos lidos: {len(calibracao['pontos'])}")
+    print(f"Fontes do primeiro ponto: {[f['descricao'] for f in calibracao['pontos'][0]['fontes']]}")
+    print(f"Consultas executadas na leitura: {len(consultas)}")
+
+    # Uma gravação inválida (número duplicado) não deve deixar pontos órfãos
+    try:
+        salvar_calibracao({'numero': 'VAL-0001', 'data_inicio': '2024-01-11 08:00:00'}, pontos)
+        duplicada_rejeitada = False
+    except Exception:
+        duplicada_rejeitada = True
+    total_pontos = conexao.obter_conexao().execute("SELECT COUNT(*) FROM pontos_calibracao").fetchone()[0]
+    print(f"Calibração duplicada rejeitada: {duplicada_rejeitada} (pontos no banco: {total_pontos})")
+
+    # Verificar se os resultados estão corretos
+    if len(calibracao['pontos']) == 50 and \
+       all(len(p['fontes']) == 3 for p in calibracao['pontos']) and \
+       abs(calibracao['pontos'][9]['incerteza_expandida'] - pontos[9]['incerteza_expandida']) < 1e-12 and \
+       len(consultas) == 3 and duplicada_rejeitada and total_pontos == 50:
+        print("✓ Gravação e leitura de calibrações validadas com sucesso!")
+    else:
+        print("✗ Falha na validação da gravação e leitura de calibrações!")
+
+def validar_recalculo_padrao():
+    """Valida o recálculo das calibrações após a atualização do certificado de um padrão"""
+    print("=== VALIDAÇÃO DO RECÁLCULO POR PADRÃO ===")
+
+    calc = CalculoMetrologico()
+    banco = conexao.obter_conexao()
+    padrao_id = banco.execute(
+        "INSERT INTO padroes (codigo, descricao, incerteza_padrao, fator_k) VALUES ('BP-001', 'Blocos padrão', 0.001, 2.0)"
+    ).lastrowid
+
+    # Exemplo: 30 calibrações de 10 pontos, metade delas feitas com o padrão; com EMP
+    # de 0,039 os pontos deixam de ser conformes com o novo certificado (|e| + U > EMP)
+    # e o último ponto, sem EMP, passa a não avaliado
+    valores_medidos = [10.02, 10.03, 10.01]
+    fontes = [
+        {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+        {'descricao': 'Incerteza do padrão', 'valor': 0.001, 'divisor': 2.0, 'graus_liberdade': 10}
+    ]
+    resultado = calc.calcular_incerteza_completa(valores_medidos, fontes)
+    fontes_ponto = fontes_de_resultado(resultado)
+    fontes_ponto[-1]['padrao_id'] = padrao_id
+
+    for c in range(30):
+        pontos = [{
+            'sequencia': i + 1,
+            'valor_referencia': 10.0,
+            'valor_lido': resultado['incerteza_tipo_a']['media'],
+            'erro': resultado['incerteza_tipo_a']['media'] - 10.0,
+            'incerteza_padrao': resultado['incerteza_combinada']['incerteza_combinada'],
+            'incerteza_expandida': resultado['incerteza_expandida'],
+            'fator_k': resultado['fator_k'],
+            'conforme': 1,
+            'erro_maximo_permitido': 0.039 if i < 9 else None,
+            'fontes': fontes_ponto
+        } for i in range(10)]
+        calibracao_id = salvar_calibracao({'numero': f'REC-{c:04d}', 'data_inicio': '2024-02-01 08:00:00'}, pontos)
+        if c % 2 == 0:
+            banco.execute("INSERT INTO calibracao_padroes (calibracao_id, padrao_id) VALUES (?, ?)",
+                          (calibracao_id, padrao_id))
+
+    # Calibração com o padrão cujo ponto foi importado sem as fontes: não é recalculada
+    importada_id = salvar_calibracao({'numero': 'REC-IMP', 'data_inicio': '2024-02-01 08:00:00'}, [
+        {'sequencia': 1, 'valor_referencia': 10.0, 'valor_lido': 10.01, 'incerteza_expandida': 0.015, 'fator_k': 2.0}
+    ])
+    banco.execute("INSERT INTO calibracao_padroes (calibracao_id, padrao_id) VALUES (?, ?)", (importada_id, padrao_id))
+
+    # Novo certificado do padrão; a primeira execução é interrompida após dois blocos
+    banco.execute("UPDATE padroes SET incerteza_padrao = 0.004 WHERE id = ?", (padrao_id,))
+
+    blocos = []
+    def interromper(andamento):
+        blocos.append(andamento)
+        if len(blocos) == 2:
+            raise KeyboardInterrupt
+    try:
+        recalcular_padrao(padrao_id, tamanho_bloco=4, processos=1, progresso=interromper)
+    except KeyboardInterrupt:
+        pass
+    retomada = recalcular_padrao(padrao_id, tamanho_bloco=4, processos=1)
+
+    fontes[1]['valor'] = 0.004
+    esperado = calc.calcular_incerteza_completa(valores_medidos, fontes)['incerteza_expandida']
+    afetado = carregar_calibracao(banco.execute("SELECT id FROM calibracoes WHERE numero = 'REC-0000'").fetchone()[0])
+    nao_afetado = carregar_calibracao(banco.execute("SELECT id FROM calibracoes WHERE numero = 'REC-0001'").fetchone()[0])
+    importada = carregar_calibracao(importada_id)['pontos'][0]
+
+    print(f"Pontos processados antes da interrupção: {blocos[-1]['processados']}")
+    print(f"Pontos processados na retomada: {retomada['pontos_nesta_execucao']} de {retomada['pontos']}")
+    print(f"U recalculado: {afetado['pontos'][0]['incerteza_expandida']} (esperado: {esperado})")
+    print(f"Conformidade recalculada: {afetado['pontos'][0]['conforme']} (sem EMP: {afetado['pontos'][9]['conforme']})")
+
+    # Verificar se os resultados estão corretos
+    if blocos[-1]['processados'] == 80 and retomada['pontos_nesta_execucao'] == 70 and retomada['pontos'] == 150 and \
+       abs(afetado['pontos'][0]['incerteza_expandida'] - esperado) < 1e-12 and \
+       afetado['pontos'][9]['fontes'][-1]['valor'] == 0.004 and \
+       nao_afetado['pontos'][0]['incerteza_expandida'] == resultado['incerteza_expandida'] and \
+       afetado['pontos'][0]['conforme'] == 0 and afetado['pontos'][9]['conforme'] is None and \
+       nao_afetado['pontos'][0]['conforme'] == 1 and \
+       importada['incerteza_expandida'] == 0.015 and importada['fator_k'] == 2.0:
+        print("✓ Recálculo por padrão validado com sucesso!")
+    else:
+        print("✗ Falha na validação do recálculo por padrão!")
+
+def validar_recalculo_incremental():
+    """Valida o recálculo incremental de um ponto após a edição de uma fonte ou das leituras"""
+    print("=== VALIDAÇÃO DO RECÁLCULO INCREMENTAL ===")
+
+    calc = CalculoMetrologico()
+    banco = conexao.obter_conexao()
+
+    # Exemplo: calibração de 300 pontos com repetibilidade e duas fontes Tipo B, conformes
+    # com EMP de 0,055 (|e| + U = 0,053)
+    valores_medidos = [20.02, 20.05, 20.01, 20.03]
+    fontes = [
+        {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+        {'descricao': 'Incerteza do padrão', 'valor': 0.005, 'divisor': 2.0, 'graus_liberdade': 12}
+    ]
+    resultado = calc.calcular_incerteza_completa(valores_medidos, fontes)
+    pontos = [{
+        'sequencia': i + 1,
+        'valor_referencia': 20.0,
+        'valor_lido': resultado['incerteza_tipo_a']['media'],
+        'erro': resultado['incerteza_tipo_a']['media'] - 20.0,
+        'incerteza_padrao': resultado['incerteza_combinada']['incerteza_combinada'],
+        'incerteza_expandida': resultado['incerteza_expandida'],
+        'fator_k': resultado['fator_k'],
+        'conforme': 1,
+        'erro_maximo_permitido': 0.055,
+        'fontes': fontes_de_resultado(resultado)
+    } for i in range(300)]
+    calibracao_id = salvar_calibracao({'numero': 'INC-0001', 'data_inicio': '2024-03-01 08:00:00'}, pontos)
+    calibracao = carregar_calibracao(calibracao_id)
+    ponto = calibracao['pontos'][150]
+
+    # Editar a fonte do padrão de um único ponto
+    inicio = time.perf_counter()
+    editado = atualizar_fonte(ponto['fontes'][-1]['id'], {'valor': 0.02})
+    tempo_fonte = time.perf_counter() - inicio
+
+    fontes[1]['valor'] = 0.02
+    esperado_fonte = calc.calcular_incerteza_completa(valores_medidos, fontes)['incerteza_expandida']
+
+    # Corrigir as leituras do mesmo ponto
+    novas_leituras = [20.02, 20.08, 19.99, 20.04, 20.03]
+    inicio = time.perf_counter()
+    corrigido = atualizar_leituras(ponto['id'], novas_leituras)
+    tempo_leituras = time.perf_counter() - inicio
+    esperado_leituras = calc.calcular_incerteza_completa(novas_leituras, fontes)['incerteza_expandida']
+
+    recarregada = carregar_calibracao(calibracao_id)
+    inalterados = all(
+        p['incerteza_expandida'] == resultado['incerteza_expandida'] and p['data_atualizacao'] is None
+        for i, p in enumerate(recarregada['pontos']) if i != 150
+    )
+
+    # Alteração feita diretamente no banco: só o ponto alterado deixa de corresponder à impressão digital
+    em_dia = sincronizar_calibracao(calibracao_id)
+    banco.execute("UPDATE fontes_incerteza SET valor = 0.03 WHERE id = ?", (calibracao['pontos'][10]['fontes'][1]['id'],))
+    desatualizados = sincronizar_calibracao(calibracao_id)
+
+    print(f"Edição de uma fonte: {tempo_fonte * 1000:.2f} ms (U = {editado['incerteza_expandida']:.6f}, "
+          f"esperado {esperado_fonte:.6f}, conforme: {editado['conforme']})")
+    print(f"Correção das leituras: {tempo_leituras * 1000:.2f} ms (U = {corrigido['incerteza_expandida']:.6f}, "
+          f"esperado {esperado_leituras:.6f})")
+    print(f"Pontos ressincronizados: {len(em_dia)} antes e {len(desatualizados)} após a alteração direta")
+
+    # Verificar se os resultados estão corretos
+    if abs(editado['incerteza_expandida'] - esperado_fonte) < 1e-12 and \
+       abs(corrigido['incerteza_expandida'] - esperado_leituras) < 1e-12 and \
+       abs(recarregada['pontos'][150]['valor_lido'] - 20.032) < 1e-12 and \
+       editado['conforme'] == 0 and corrigido['conforme'] == 0 and recarregada['pontos'][150]['conforme'] == 0 and \
+       recarregada['pontos'][149]['conforme'] == 1 and \
+       inalterados and em_dia == [] and desatualizados == [calibracao['pontos'][10]['id']]:
+        print("✓ Recálculo incremental validado com sucesso!")
+    else:
+        print("✗ Falha na validação do recálculo incremental!")
+
+def validar_modelos_orcamento():
+    """Valida os modelos de orçamento compilados e a invalidação do cache"""
+    print("=== VALIDAÇÃO DOS MODELOS DE ORÇAMENTO ===")
+
+    calc = CalculoMetrologico()
+    banco = conexao.obter_conexao()
+    cache = CacheModelos(capacidade=4)
+
+    tipo_id = banco.execute("INSERT INTO tipos_instrumentos (nome) VALUES ('Paquímetro')").lastrowid
+    procedimento_id = banco.execute(
+        "INSERT INTO procedimentos (codigo, nome, versao, tipo_instrumento_id) VALUES ('PC-001', 'Paquímetros', '1', ?)",
+        (tipo_id,)
+    ).lastrowid
+
+    # Exemplo: modelo genérico do tipo de instrumento e modelo específico do procedimento
+    fontes = [
+        {'descricao': 'Resolução do instrumento', 'distribuicao': 'retangular', 'valor_padrao': 0.01},
+        {'descricao': 'Incerteza do padrão', 'divisor': 2.0, 'graus_liberdade': 10},
+        {'descricao': 'Temperatura', 'distribuicao': 'triangular', 'coeficiente_sensibilidade': 0.5, 'valor_padrao': 0.002}
+    ]
+    salvar_modelo(tipo_id, 'Genérico', fontes[:1])
+    modelo_id = salvar_modelo(tipo_id, 'Paquímetros PC-001', fontes, procedimento_id=procedimento_id)
+
+    modelo = obter_modelo(tipo_id, procedimento_id, cache=cache)
+    generico = obter_modelo(tipo_id, None, cache=cache)
+    mesmo = obter_modelo(tipo_id, procedimento_id, cache=cache)
+
+    # Resultado com o modelo igual ao obtido com as fontes informadas ponto a ponto
+    valores_medidos = [10.02, 10.03, 10.01]
+    com_modelo = calc.calcular_incerteza_completa(valores_medidos, modelo.orcamento({'Incerteza do padrão': 0.004}))
+    fontes_ponto = [dict(fontes[0], valor=0.01), dict(fontes[1], valor=0.004), dict(fontes[2], valor=0.002)]
+    esperado = calc.calcular_incerteza_completa(valores_medidos, fontes_ponto)
+
+    lote = calc.calcular_incerteza_completa_lote(
+        np.tile(valores_medidos, (1000, 1)), modelo.fontes_lote(np.tile([np.nan, 0.004, np.nan], (1000, 1)))
+    )
+
+    # Nova versão do procedimento e alteração de uma fonte invalidam o modelo compilado
+    banco.execute("UPDATE procedimentos SET versao = '2' WHERE id = ?", (procedimento_id,))
+    nova_versao = obter_modelo(tipo_id, procedimento_id, cache=cache)
+    banco.execute("UPDATE modelos_orcamento_fontes SET divisor = 2.5 WHERE modelo_id = ? AND ordem = 2", (modelo_id,))
+    alterado = obter_modelo(tipo_id, procedimento_id, cache=cache)
+
+    print(f"Fontes do modelo do procedimento: {list(modelo.descricoes)}")
+    print(f"Fontes do modelo genérico: {list(generico.descricoes)}")
+    print(f"U com modelo: {com_modelo['incerteza_expandida']} (esperado: {esperado['incerteza_expandida']})")
+    print(f"Compilações: {cache.compilacoes}, acertos do cache: {cache.acertos}")
+
+    # Verificar se os resultados estão corretos
+    if mesmo is modelo and len(generico) == 1 and \
+       com_modelo['incerteza_expandida'] == esperado['incerteza_expandida'] and \
+       np.allclose(lote['incerteza_expandida'], esperado['incerteza_expandida'], rtol=1e-14) and \
+       nova_versao is not modelo and alterado is not nova_versao and \
+       alterado.fontes([0.01, 0.004, 0.002])[1]['divisor'] == 2.5 and cache.compilacoes == 4:
+        print("✓ Modelos de orçamento validados com sucesso!")
+    else:
+        print("✗ Falha na validação dos modelos de orçamento!")
+
+def validar_agenda_calibracoes():
+    """Valida a agenda de vencimentos em memória e a sua atualização incremental"""
+    print("=== VALIDAÇÃO DA AGENDA DE CALIBRAÇÕES ===")
+
+    # Exemplo: frota sintética de 200 mil instrumentos em 50 setores
+    random.seed(1)
+    hoje = datetime.date(2024, 6, 1)
+    criticidades = ['alta', 'media', 'baixa', None]
+    frota = [
+        (i, random.randint(1, 50), hoje + datetime.timedelta(days=random.randint(-120, 365)),
+         random.choice(criticidades))
+        for i in range(1, 200_001)
+    ]
+
+    inicio = time.perf_counter()
+    agenda = AgendaCalibracoes(frota)
+    tempo_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vencidos_setores = {setor: agenda.vencidos(hoje, setor) for setor in range(1, 51)}
+    tempo_setor = (time.perf_counter() - inicio) / 50 * 1000
+
+    # Conclusão de 1000 calibrações vencidas (reagendamento incremental)
+    inicio = time.perf_counter()
+    for registro in agenda.vencidos(hoje, limite=1000):
+        agenda.concluir_calibracao(registro['instrumento_id'], hoje, 365)
+    tempo_conclusao = (time.perf_counter() - inicio) * 1000
+
+    # Referência: ordenação completa do setor 7 após as conclusões
+    pesos = {'alta': 0, 'media': 1, 'baixa': 2}
+    setor_7 = sorted(
+        (agenda.vencimento(i), pesos.get(c, 3), i) for i, s, _, c in frota if s == 7 and agenda.vencimento(i) < hoje
+    )
+    lista_setor_7 = [registro['instrumento_id'] for registro in agenda.vencidos(hoje, 7)]
+
+    # Banco: conclusão de uma calibração e sincronização de outro processo
+    banco = conexao.obter_conexao()
+    setor_id = banco.execute("INSERT INTO setores (nome) VALUES ('Metrologia')").lastrowid
+    banco.executemany(
+        "INSERT INTO instrumentos (codigo, descricao, setor_id, criticidade, periodicidade_calibracao, "
+        "data_proxima_calibracao) VALUES (?, ?, ?, ?, 180, ?)",
+        [(f"AGE-{i}", f"Instrumento {i}", setor_id, 'alta' if i % 2 else 'baixa', f"2024-05-{i:02d}")
+         for i in range(1, 11)]
+    )
+    instrumento_id = banco.execute("SELECT id FROM instrumentos WHERE codigo = 'AGE-1'").fetchone()[0]
+    calibracao_id = banco.execute(
+        "INSERT INTO calibracoes (numero, instrumento_id, data_inicio) VALUES ('AGE-CAL-1', ?, '2024-06-01')",
+        (instrumento_id,)
+    ).lastrowid
+    agenda_banco = carregar_agenda()
+    outro_processo = carregar_agenda()
+    antes = [r['instrumento_id'] for r in agenda_banco.vencidos(hoje, setor_id)]
+
+    vencimento = concluir_calibracao(calibracao_id, '2024-06-01', agenda=agenda_banco)
+    depois = [r['instrumento_id'] for r in agenda_banco.vencidos(hoje, setor_id)]
+    sincronizados = sincronizar_agenda(outro_processo)
+    sem_alteracoes = sincronizar_agenda(outro_processo)
+    banco.execute("UPDATE instrumentos SET ativo = 0 WHERE codigo = 'AGE-2'")
+    desativados = sincronizar_agenda(outro_processo)
+    status = banco.execute("SELECT status FROM calibracoes WHERE id = ?", (calibracao_id,)).fetchone()[0]
+    mesma_agenda = outro_processo.vencimentos('2024-12-31', setor_id) == \
+        agenda_banco.vencimentos('2024-12-31', setor_id)[1:]
+
+    # Exclusão do instrumento de maior revisão seguida da alteração de outro instrumento
+    ids = dict(banco.execute("SELECT codigo, id FROM instrumentos WHERE codigo LIKE 'AGE-%'"))
+    banco.execute("UPDATE instrumentos SET criticidade = 'media' WHERE codigo = 'AGE-3'")
+    sincronizar_agenda(outro_processo)
+    banco.execute("DELETE FROM instrumentos WHERE codigo = 'AGE-3'")
+    banco.execute("UPDATE instrumentos SET data_proxima_calibracao = '2024-05-20' WHERE codigo = 'AGE-5'")
+    excluidos = sincronizar_agenda(outro_processo)
+    recarregada = carregar_agenda()
+    apos_carga = sincronizar_agenda(recarregada)
+
+    print(f"Carga de {len(agenda)} instrumentos: {tempo_carga * 1000:.0f} ms")
+    print(f"Lista de vencidos por setor: {tempo_setor:.2f} ms (média de 50 setores)")
+    print(f"Conclusão de 1000 calibrações: {tempo_conclusao:.1f} ms")
+    print(f"Vencidos do setor antes/depois da conclusão: {len(antes)}/{len(depois)} (novo vencimento: {vencimento})")
+    print(f"Sincronização após exclusão e alteração: {excluidos} instrumentos")
+
+    # Verificar se os resultados estão corretos
+    if lista_setor_7 == [i for _, _, i in setor_7] and \
+       all(vencidos_setores[s][0]['dias_atraso'] >= vencidos_setores[s][-1]['dias_atraso'] for s in vencidos_setores) and \
+       antes[0] == instrumento_id and instrumento_id not in depois and len(depois) == 9 and \
+       vencimento == datetime.date(2024, 11, 28) and status == 'concluida' and \
+       sincronizados == 1 and sem_alteracoes == 0 and desativados == 1 and mesma_agenda and \
+       excluidos == 2 and ids['AGE-3'] not in outro_processo and \
+       outro_processo.vencimento(ids['AGE-5']) == datetime.date(2024, 5, 20) and \
+       recarregada.revisao == outro_processo.revisao and apos_carga == 0 and \
+       outro_processo.vencimentos('2024-12-31', setor_id) == recarregada.vencimentos('2024-12-31', setor_id) \
+       and tempo_setor < 50:
+        print("✓ Agenda de calibrações validada com sucesso!")
+    else:
+        print("✗ Falha na validação da agenda de calibrações!")
+
+def validar_analise_deriva():
+    """Valida o ajuste vetorizado da deriva e a recomendação de periodicidade de calibração"""
+    print("=== VALIDAÇÃO DA ANÁLISE DE DERIVA ===")
+
+    # Exemplo: frota sintética de 200 mil instrumentos, 5 calibrações anuais de 3 pontos,
+    # EMP de 0,5 e U de 0,05 (limite de 0,45); o instrumento 0 não tem ruído
+    rng = np.random.default_rng(3)
+    n_instrumentos, n_calibracoes, referencias = 200_000, 5, np.array([10.0, 50.0, 100.0])
+    deriva_real = rng.normal(0, 2e-4, (n_instrumentos, 1, 1)) * referencias / 50
+    deriva_real[0] = np.array([1e-4, 2e-4, 4e-4])[None, :]
+    tempo = 2_450_000.0 + 365.0 * np.arange(n_calibracoes)[None, :, None] + np.zeros((n_instrumentos, 1, 3))
+    ruido = rng.normal(0, 0.005, tempo.shape)
+    ruido[0] = 0
+    erro = deriva_real * (tempo - tempo[:, :1]) + ruido
+    instrumento = np.broadcast_to(np.arange(n_instrumentos)[:, None, None], tempo.shape)
+
+    inicio = time.perf_counter()
+    derivas = ajustar_derivas(
+        instrumento.ravel(), tempo.ravel(), np.broadcast_to(referencias, tempo.shape).ravel(), erro.ravel(),
+        np.full(erro.size, 0.05), np.full(erro.size, 0.5)
+    )
+    recomendacoes = recomendar_periodicidades(derivas, np.arange(n_instrumentos), np.full(n_instrumentos, 365.0))
+    tempo_analise = time.perf_counter() - inicio
+
+    # Instrumento 0: ponto crítico em 100 (deriva 4e-4/dia, erro de 0,584 na última
+    # calibração, já acima do limite) -> redução à metade da periodicidade
+    # Referência de um ponto ruidoso: reta por np.polyfit
+    indice = 3 * 12345 + 1
+    esperado = np.polyfit(tempo[12345, :, 1], erro[12345, :, 1], 1)[0]
+
+    # Banco: 2000 instrumentos com 4 calibrações concluídas; metade deriva rápido. O valor
+    # de referência, medido no padrão, varia entre as calibrações (ex.: 19,98 e 20,01)
+    banco = conexao.obter_conexao()
+    banco.executemany(
+        "INSERT INTO instrumentos (codigo, descricao, periodicidade_calibracao, erro_maximo_permitido) "
+        "VALUES (?, ?, 365, 0.2)",
+        [(f"DER-{i}", f"Instrumento {i}") for i in range(2000)]
+    )
+    ids = [linha[0] for linha in banco.execute("SELECT id FROM instrumentos WHERE codigo LIKE 'DER-%' ORDER BY id")]
+    calibracoes = [
+        (f"DER-CAL-{i}-{c}", instrumento_id, f"{2020 + c}-03-01")
+        for i, instrumento_id in enumerate(ids) for c in range(4)
+    ]
+    banco.executemany(
+        "INSERT INTO calibracoes (numero, instrumento_id, data_inicio, data_fim, status) "
+        "VALUES (?, ?, ?, ?3, 'concluida')", calibracoes
+    )
+    numeros = {linha[0]: linha[1] for linha in banco.execute("SELECT numero, id FROM calibracoes WHERE numero LIKE 'DER-%'")}
+    banco.executemany(
+        "INSERT INTO pontos_calibracao (calibracao_id, sequencia, valor_referencia, valor_lido, erro, "
+        "incerteza_expandida) VALUES (?, ?, ?, ?, ?, 0.02)",
+        [
+            (numeros[f"DER-CAL-{i}-{c}"], p, r, r + e, e)
+            for i in range(2000) for c in range(4) for p in (1, 2)
+            for e in [(0.05 if i % 2 else 0.005) * c * p / 2]
+            for r in [10.0 * p + 0.01 * ((i + c) % 5 - 2)]
+        ]
+    )
+    banco.commit()
+
+    analise = analisar_deriva()
+    resumo = analise['resumo']
+    gravadas = dict(banco.execute(
+        "SELECT instrumento_id, periodicidade_recomendada FROM recomendacoes_periodicidade "
+        "WHERE instrumento_id IN (?, ?)", (ids[0], ids[1])
+    ).fetchall())
+    # Referência do ponto crítico de ids[0]: a da calibração mais recente (c = 3)
+    referencia_critica = analise['recomendacoes']['referencia_critica'][
+        analise['recomendacoes']['instrumento'] == ids[0]
+    ][0]
+    aplicadas = aplicar_recomendacoes([ids[0], ids[1]])
+    periodicidades = dict(banco.execute(
+        "SELECT id, periodicidade_calibracao FROM instrumentos WHERE id IN (?, ?)", (ids[0], ids[1])
+    ).fetchall())
+
+    print(f"Análise de {erro.size} registros ({n_instrumentos} instrumentos): {tempo_analise:.2f}s")
+    print(f"Instrumento 0: prazo {recomendacoes['dias_ate_limite'][0]:.0f} dias, "
+          f"periodicidade recomendada {recomendacoes['periodicidade_recomendada'][0]:.0f}")
+    print(f"Banco: {resumo['instrumentos']} instrumentos em {resumo['tempo']:.2f}s, "
+          f"{resumo['reduzir']} reduzem e {resumo['aumentar']} aumentam a periodicidade")
+    print(f"Recomendações gravadas: {gravadas}")
+
+    # Verificar se os resultados estão corretos
+    # ids[0]: deriva de 0,005/ano no ponto 20 (erro de 0,015 em 2023) -> prazo de ~6,4 anos, dobra
+    # ids[1]: deriva de 0,05/ano no ponto 20 (erro de 0,15 em 2023, limite de 0,18) -> ~219 dias,
+    # 80% = 175, limitado à metade da atual (183)
+    if recomendacoes['referencia_critica'][0] == 100.0 and recomendacoes['dias_ate_limite'][0] == 0 and \
+       recomendacoes['periodicidade_recomendada'][0] == 183 and \
+       abs(derivas['deriva'][indice] - esperado) < 1e-12 and derivas['referencia'][indice] == 50.0 and \
+       referencia_critica == 20.0 + 0.01 * ((0 + 3) % 5 - 2) and \
+       tempo_analise < 60 and resumo['recomendacoes'] == 2000 and \
+       gravadas == {ids[0]: 730, ids[1]: 183} and aplicadas == 2 and periodicidades == gravadas:
+        print("✓ Análise de deriva validada com sucesso!")
+    else:
+        print("✗ Falha na validação da análise de deriva!")
+
+def validar_transferencia_dados():
+    """Valida a importação e a exportação em lote de instrumentos e pontos de calibração"""
+    print("=== VALIDAÇÃO DA IMPORTAÇÃO E EXPORTAÇÃO EM LOTE ===")
+
+    diretorio = tempfile.mkdtemp(prefix='transferencia_')
+
+    # Exemplo: planilha de 20 mil instrumentos (';' e vírgula decimal) com 4 linhas inválidas
+    caminho_instrumentos = os.path.join(diretorio, 'instrumentos.csv')
+    with open(caminho_instrumentos, 'w', encoding='utf-8') as arquivo:
+        arquivo.write("codigo;descricao;tipo;setor;resolucao;periodicidade_calibracao;data_proxima_calibracao\n")
+        for i in range(20_000):
+            arquivo.write(f"IMP-{i:05d};Paquímetro {i};paquímetro;Produção {i % 7};0,01;365;15/03/2025\n")
+        arquivo.write("IMP-X1;;Paquímetro;Produção 1;0,01;365;\n")
+        arquivo.write("IMP-X2;Sem resolução;Paquímetro;Produção 1;abc;365;\n")
+        arquivo.write("IMP-00001;Duplicado;Paquímetro;Produção 1;0,01;365;\n")
+        arquivo.write("IMP-X3;Separador ambíguo;Paquímetro;Produção 1;1,234.5;365;\n")
+
+    inicio = time.perf_counter()
+    instrumentos = importar('instrumentos', caminho_instrumentos, criar_referencias=True, tamanho_lote=3000)
+    tempo_instrumentos = time.perf_counter() - inicio
+
+    # Histórico: 1000 instrumentos x 3 calibrações x 2 pontos, e um ponto de instrumento desconhecido
+    caminho_pontos = os.path.join(diretorio, 'historico.ndjson')
+    with open(caminho_pontos, 'w', encoding='utf-8') as arquivo:
+        for i in range(1000):
+            for c in range(3):
+                for p in (1, 2):
+                    arquivo.write(json.dumps({
+                        'calibracao': f"HIS-{i:05d}-{c}", 'instrumento': f"IMP-{i:05d}",
+                        'data_calibracao': f"{2021 + c}-05-10", 'sequencia': p, 'valor_referencia': 50.0 * p,
+                        'valor_lido': 50.0 * p + 0.001 * c, 'incerteza_expandida': 0.01, 'conforme': 'sim'
+                    }) + "\n")
+        arquivo.write(json.dumps({'calibracao': 'HIS-X', 'instrumento': 'NAO-EXISTE', 'data_calibracao': '2024-01-01',
+                                  'sequencia': 1, 'valor_referencia': 1, 'valor_lido': 1}) + "\n")
+    pontos = importar('pontos_calibracao', caminho_pontos, tamanho_lote=1000)
+    reimportacao = importar('pontos_calibracao', caminho_pontos, tamanho_lote=1000)
+
+    banco = conexao.obter_conexao()
+    instrumento = dict(banco.execute(
+        "SELECT i.resolucao, i.data_proxima_calibracao, t.nome AS tipo, s.nome AS setor FROM instrumentos i "
+        "JOIN tipos_instrumentos t ON t.id = i.tipo_id JOIN setores s ON s.id = i.setor_id WHERE i.codigo = 'IMP-00008'"
+    ).fetchone())
+    erro_ponto = banco.execute(
+        "SELECT p.erro FROM pontos_calibracao p JOIN calibracoes c ON c.id = p.calibracao_id "
+        "WHERE c.numero = 'HIS-00003-2' AND p.sequencia = 2"
+    ).fetchone()[0]
+    # Versão dos dados incrementada uma vez por bloco gravado, e não por ponto
+    versao_importada = banco.execute("SELECT versao_dados FROM calibracoes WHERE numero = 'HIS-00003-2'").fetchone()[0]
+    suspensoes = banco.execute("SELECT COUNT(*) FROM versao_dados_suspensa").fetchone()[0]
+
+    # Exportação em CSV e NDJSON e nova importação da exportação em outro banco
+    exportados_csv = exportar('instrumentos', os.path.join(diretorio, 'exportados.csv'), tamanho_lote=3000)
+    exportados_ndjson = exportar('pontos_calibracao', os.path.join(diretorio, 'exportados.ndjson'))
+    with open(os.path.join(diretorio, 'exportados.ndjson'), encoding='utf-8') as arquivo:
+        primeiro = json.loads(arquivo.readline())
+    try:
+        exportar('pontos_calibracao', os.path.join(diretorio, 'exportados.parquet'))
+        parquet = 'gerado'
+    except RuntimeError:
+        parquet = 'pyarrow ausente'
+
+    original = conexao.CAMINHO_BANCO
+    conexao.configurar_banco(os.path.join(diretorio, 'copia.db'))
+    conexao.inicializar_banco()
+    copia_instrumentos = importar('instrumentos', os.path.join(diretorio, 'exportados.csv'), criar_referencias=True)
+    copia_pontos = importar('pontos_calibracao', os.path.join(diretorio, 'exportados.ndjson'))
+    conexao.configurar_banco(original)
+
+    # Tipo criado em um bloco desfeito: o id não é reaproveitado pelos blocos seguintes
+    banco = conexao.obter_conexao()
+    referencias = _Referencias(banco, criar=True)
+    try:
+        with conexao.transacao(banco):
+            referencias.resolver('tipo', 'Durômetro')
+            raise RuntimeError("bloco desfeito")
+    except RuntimeError:
+        referencias.descartar()
+    with conexao.transacao(banco):
+        tipo_id = referencias.resolver('tipo', 'Durômetro')
+    referencias.confirmar()
+    tipo_gravado = banco.execute("SELECT nome FROM tipos_instrumentos WHERE id = ?", (tipo_id,)).fetchone()
+
+    print(f"Instrumentos: {instrumentos['inseridas']} inseridos e {instrumentos['rejeitadas']} rejeitados "
+          f"em {tempo_instrumentos:.2f}s")
+    print(f"Erros relatados: {instrumentos['erros']}")
+    print(f"Pontos: {pontos['inseridas']} inseridos; reimportação: {reimportacao['rejeitadas']} rejeitados")
+    print(f"Exportação: {exportados_csv['linhas']} instrumentos (CSV), {exportados_ndjson['linhas']} pontos "
+          f"(NDJSON), Parquet: {parquet}")
+
+    # Verificar se os resultados estão corretos
+    linhas_erro = [linha for linha, _ in instrumentos['erros']]
+    if instrumentos['inseridas'] == 20_000 and linhas_erro == [20_002, 20_003, 20_004, 20_005] and \
+       instrumento == {'resolucao': 0.01, 'data_proxima_calibracao': '2025-03-15', 'tipo': 'Paquímetro',
+                       'setor': 'Produção 1'} and \
+       pontos['inseridas'] == 6000 and pontos['rejeitadas'] == 1 and \
+       reimportacao['inseridas'] == 0 and reimportacao['rejeitadas'] == 6001 and abs(erro_ponto - 0.002) < 1e-9 and \
+       versao_importada == 2 and suspensoes == 0 and tipo_gravado is not None and \
+       referencias.mapas['tipo']['durômetro'] == tipo_id and \
+       exportados_ndjson['linhas'] >= 6000 and primeiro['calibracao'] is not None and \
+       copia_instrumentos['inseridas'] == exportados_csv['linhas'] and copia_instrumentos['rejeitadas'] == 0 and \
+       copia_pontos['inseridas'] + copia_pontos['rejeitadas'] == exportados_ndjson['linhas'] and \
+       copia_pontos['inseridas'] >= 6000:
+        print("✓ Importação e exportação em lote validadas com sucesso!")
+    else:
+        print("✗ Falha na validação da importação e exportação em lote!")
+
+def validar_certificados():
+    """Valida a renderização de certificados a partir do banco e o resultado final da calibração"""
+    print("=== VALIDAÇÃO DOS CERTIFICADOS GERADOS DO BANCO ===")
+
+    banco = conexao.obter_conexao()
+    instrumento_id = banco.execute(
+        "INSERT INTO instrumentos (codigo, descricao, unidade) VALUES ('CERT-INS-1', 'Paquímetro 150 mm', 'mm')"
+    ).lastrowid
+    padrao_id = banco.execute(
+        "INSERT INTO padroes (codigo, descricao, certificado_numero) VALUES ('CERT-PAD-1', 'Bloco padrão', 'RBC-77')"
+    ).lastrowid
+
+    # Conformidade dos pontos: avaliada e conforme, não conforme e não avaliada (nula)
+    cenarios = {'aprovado': (1, 1), 'reprovado': (1, 0), 'nao_avaliado': (1, None)}
+    certificado_ids = {}
+    for resultado, conformidades in cenarios.items():
+        calibracao_id = salvar_calibracao({
+            'numero': f'CERT-{resultado}', 'instrumento_id': instrumento_id, 'data_inicio': '2024-04-01 08:00:00'
+        }, [
+            {'sequencia': s, 'valor_referencia': 50.0 * s, 'valor_lido': 50.0 * s + 0.01, 'erro': 0.01,
+             'incerteza_padrao': 0.005, 'incerteza_expandida': 0.01, 'fator_k': 2.0, 'conforme': conforme,
+             'fontes': [{'descricao': 'Resolução', 'tipo': 'B', 'valor': 0.01, 'divisor': 3 ** 0.5,
+                         'contribuicao': 0.005}]}
+            for s, conforme in enumerate(conformidades, start=1)
+        ])
+        banco.execute("INSERT INTO calibracao_padroes (calibracao_id, padrao_id) VALUES (?, ?)",
+                      (calibracao_id, padrao_id))
+        certificado_ids[resultado] = banco.execute(
+            "INSERT INTO certificados (numero, calibracao_id, data_emissao) VALUES (?, ?, '2024-04-02')",
+            (f'CERT/{resultado}', calibracao_id)
+        ).lastrowid
+
+    contextos = carregar_dados_certificados(list(certificado_ids.values()))
+    resultados = {resultado: contextos[certificado_id]['resultado'] for resultado, certificado_id in certificado_ids.items()}
+    html = {resultado: renderizar_certificado(contextos[certificado_id])
+            for resultado, certificado_id in certificado_ids.items()}
+    finais = {resultado: texto.split('<strong>Resultado final:</strong> ', 1)[1].split('<', 1)[0]
+              for resultado, texto in html.items()}
+
+    # Instrumento de alta resolução: casas decimais da resolução e incertezas com 2 algarismos significativos
+    micrometro_id = banco.execute(
+        "INSERT INTO instrumentos (codigo, descricao, unidade, resolucao) VALUES ('CERT-INS-2', 'Micrômetro', 'mm', 0.0001)"
+    ).lastrowid
+    calibracao_id = salvar_calibracao({
+        'numero': 'CERT-resolucao', 'instrumento_id': micrometro_id, 'data_inicio': '2024-04-01 08:00:00'
+    }, [{'sequencia': 1, 'valor_referencia': 1234567.0, 'valor_lido': 1234567.00012, 'erro': 0.00012,
+         'incerteza_padrao': 0.0000614, 'incerteza_expandida': 0.000123, 'fator_k': 2.0, 'conforme': 1,
+         'fontes': [{'descricao': 'Resolução', 'tipo': 'B', 'valor': 0.00005, 'divisor': 3 ** 0.5,
+                     'contribuicao': 0.0000289}]}])
+    certificado_id = banco.execute(
+        "INSERT INTO certificados (numero, calibracao_id, data_emissao) VALUES ('CERT/resolucao', ?, '2024-04-02')",
+        (calibracao_id,)
+    ).lastrowid
+    alta_resolucao = renderizar_certificado(carregar_dados_certificados([certificado_id])[certificado_id])
+    impressos = ['1234567,0000', '1234567,0001', '<td>0,0001</td>', '<td>0,00012</td>', '0,000029', '0,000061',
+                 '<td>0,00005</td>']
+    ausentes = [texto for texto in impressos if texto not in alta_resolucao]
+
+    destino = os.path.join(tempfile.mkdtemp(prefix='certificados_'), 'saida')
+    lote = gerar_certificados_lote(list(certificado_ids.values()), destino, processos=1)
+    caminhos = banco.execute(
+        "SELECT COUNT(*) FROM certificados WHERE numero LIKE 'CERT/%' AND caminho_arquivo IS NOT NULL"
+    ).fetchone()[0]
+
+    print(f"Resultados: {resultados}")
+    print(f"Resultado final impresso: {finais}")
+    print(f"Lote: {lote['certificados']} certificados em {sorted(os.listdir(destino))}")
+    print(f"Valores ausentes no certificado de alta resolução: {ausentes}")
+
+    # Verificar se os resultados estão corretos
+    if all(resultado == esperado for esperado, resultado in resultados.items()) and \
+       finais == {'aprovado': 'APROVADO', 'reprovado': 'REPROVADO', 'nao_avaliado': 'NÃO AVALIADO'} and \
+       contextos[certificado_ids['nao_avaliado']]['nao_avaliados'] == 1 and \
+       all('RBC-77' in texto and 'Paquímetro 150 mm' in texto and '50,010' in texto for texto in html.values()) and \
+       not ausentes and \
+       lote['certificados'] == 3 and caminhos == 3 and \
+       sorted(os.listdir(destino)) == ['CERT_aprovado.html', 'CERT_nao_avaliado.html', 'CERT_reprovado.html']:
+        print("✓ Certificados gerados do banco validados com sucesso!")
+    else:
+        print("✗ Falha na validação dos certificados gerados do banco!")
+
+def _aplicar_migracoes_processo(caminho, barreira, resultados):
+    """Aplica as migrações em um processo separado, iniciado junto com os demais"""
+    conexao_processo = conexao.criar_conexao(caminho)
+    barreira.wait()
+    try:
+        resultados.put(aplicar_migracoes(conexao_processo))
+    except Exception as erro:
+        resultados.put(repr(erro))
+
+def _inicializar_banco_processo(caminho, barreira, resultados):
+    """Inicializa um banco vazio em um processo separado, iniciado junto com os demais"""
+    conexao_processo = conexao.criar_conexao(caminho)
+    barreira.wait()
+    try:
+        resultados.put(conexao.inicializar_banco(conexao_processo))
+    except Exception as erro:
+        resultados.put(repr(erro))
+
+def validar_migracoes_concorrentes():
+    """Valida a inicialização e as migrações por vários processos iniciados ao mesmo tempo"""
+    print("=== VALIDAÇÃO DAS MIGRAÇÕES CONCORRENTES ===")
+
+    # Exemplo: banco com o schema base e 4 processos (workers web e trabalhadores) aplicando as migrações
+    caminho = os.path.join(tempfile.mkdtemp(prefix='calibracao_'), 'concorrente.db')
+    base = conexao.criar_conexao(caminho)
+    with open(conexao.CAMINHO_SCHEMA, encoding='utf-8') as arquivo:
+        base.executescript(arquivo.read())
+    base.close()
+
+    barreira = multiprocessing.Barrier(4)
+    resultados = multiprocessing.Queue()
+    processos = [
+        multiprocessing.Process(target=_aplicar_migracoes_processo, args=(caminho, barreira, resultados))
+        for _ in range(4)
+    ]
+    for processo in processos:
+        processo.start()
+    retornos = [resultados.get(timeout=120) for _ in processos]
+    for processo in processos:
+        processo.join()
+
+    aplicadas = sorted(versao for retorno in retornos if isinstance(retorno, list) for versao in retorno)
+    esperadas = [versao for versao, _ in listar_migracoes()]
+    verificacao = conexao.criar_conexao(caminho)
+    versao_final = versao_atual(verificacao)
+    verificacao.close()
+
+    # Banco vazio inicializado (schema, dados iniciais e migrações) por 4 processos ao mesmo tempo
+    caminho_vazio = os.path.join(os.path.dirname(caminho), 'vazio.db')
+    processos = [
+        multiprocessing.Process(target=_inicializar_banco_processo, args=(caminho_vazio, barreira, resultados))
+        for _ in range(4)
+    ]
+    for processo in processos:
+        processo.start()
+    criacoes = [resultados.get(timeout=120) for _ in processos]
+    for processo in processos:
+        processo.join()
+    verificacao = conexao.criar_conexao(caminho_vazio)
+    versao_vazio = versao_atual(verificacao)
+    configuracoes = verificacao.execute("SELECT COUNT(*) FROM configuracoes").fetchone()[0]
+    tipos = verificacao.execute("SELECT COUNT(*), COUNT(DISTINCT nome) FROM tipos_instrumentos").fetchone()
+    verificacao.close()
+
+    print(f"Migrações aplicadas por processo: {retornos}")
+    print(f"Versão final do schema: {versao_final}")
+    print(f"Inicialização de banco vazio: {criacoes} (configurações: {configuracoes}, tipos: {tuple(tipos)})")
+
+    # Verificar se os resultados estão corretos
+    if all(isinstance(retorno, list) for retorno in retornos) and aplicadas == esperadas and \
+       versao_final == esperadas[-1] and sorted(criacoes) == [False, False, False, True] and \
+       versao_vazio == esperadas[-1] and configuracoes == 7 and tipos[0] == tipos[1] > 0:
+        print("✓ Migrações concorrentes validadas com sucesso!")
+    else:
+        print("✗ Falha na validação das migrações concorrentes!")
+
+if __name__ == "__main__":
+    print("VALIDAÇÃO DA CAMADA DE PERSISTÊNCIA")
+    print("===================================")
+
+    preparar_banco_temporario()
+
+    # Executar validações
+    validar_gravacao_leitura()
+    validar_recalculo_padrao()
+    validar_recalculo_incremental()
+    validar_modelos_orcamento()
+    validar_agenda_calibracoes()
+    validar_analise_deriva()
+    validar_transferencia_dados()
+    validar_certificados()
+    validar_migracoes_concorrentes()
+
+    conexao.fechar_conexoes()
+    print("Todos os testes de validação foram concluídos!")
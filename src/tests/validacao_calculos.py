@@ -12,6 +12,7 @@ import matplotlib.pyplot as plt
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.calculo_metrologico import CalculoMetrologico
+from models.conformidade import avaliar_conformidade_lote, resumo_por_instrumento
 
 def validar_calculo_erro():
     """Valida o cálculo de erro de medição"""
@@ -153,7 +154,7 @@ def validar_incerteza_tipo_b():
     resultado2 = calc.calcular_incerteza_tipo_b(fontes2)
     print("Exemplo 2: Fontes de incerteza para um termômetro")
     for i, fonte in enumerate(resultado2['fontes']):
-        print(f"Fonte {i+1}: {fonte['descricao']}")
+        print(f"Fonte {i+1}: {fonte['fonte']}")
         print(f"  Incerteza padrão: {fonte['incerteza_padrao']}")
     print(f"Incerteza combinada: {resultado2['incerteza_combinada']}")
     
@@ -236,6 +237,419 @@ def validar_incerteza_completa():
     else:
         print("✗ Falha na validação do cálculo completo de incerteza!")
 
+def validar_incerteza_lote():
+    """Valida o cálculo de incerteza em lote contra o cálculo ponto a ponto"""
+    print("=== VALIDAÇÃO DO CÁLCULO DE INCERTEZA EM LOTE ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: 20 pontos de um paquímetro com 5 repetições cada
+    rng = np.random.default_rng(42)
+    valores_medidos = rng.normal(10.02, 0.01, size=(20, 5))
+    
+    # O ponto 3 tem apenas 3 leituras válidas
+    valores_medidos[3, 3:] = np.nan
+    
+    fontes_por_ponto = []
+    for i in range(20):
+        fontes_por_ponto.append([
+            {
+                'descricao': 'Resolução do instrumento',
+                'valor': 0.01,
+                'distribuicao': 'retangular'
+            },
+            {
+                'descricao': 'Incerteza do padrão',
+                'valor': 0.001 * (1 + i / 10),
+                'distribuicao': 'normal',
+                'divisor': 2.0,
+                'graus_liberdade': 10
+            }
+        ])
+    
+    resultado_lote = calc.calcular_incerteza_completa_lote(valores_medidos, fontes_por_ponto)
+    
+    diferenca_maxima = 0
+    for i in range(20):
+        leituras = [v for v in valores_medidos[i] if not np.isnan(v)]
+        resultado = calc.calcular_incerteza_completa(leituras, fontes_por_ponto[i])
+        diferenca_maxima = max(
+            diferenca_maxima,
+            abs(resultado['incerteza_expandida'] - resultado_lote['incerteza_expandida'][i]),
+            abs(resultado['fator_k'] - resultado_lote['fator_k'][i]),
+            abs(resultado['incerteza_combinada']['graus_liberdade_efetivos'] -
+                resultado_lote['incerteza_combinada']['graus_liberdade_efetivos'][i])
+        )
+    
+    print(f"Pontos calculados: {len(resultado_lote['incerteza_expandida'])}")
+    print(f"Incertezas expandidas (U): {resultado_lote['incerteza_expandida'][:5]} ...")
+    print(f"Diferença máxima em relação ao cálculo por ponto: {diferenca_maxima}")
+    
+    # Verificar se os resultados estão corretos
+    if diferenca_maxima < 1e-12:
+        print("✓ Cálculo de incerteza em lote validado com sucesso!")
+    else:
+        print("✗ Falha na validação do cálculo de incerteza em lote!")
+
+def validar_tabela_quantis():
+    """Valida a tabela de quantis t de Student, com e sem SciPy"""
+    print("=== VALIDAÇÃO DA TABELA DE QUANTIS ===")
+    
+    from models.quantis import TabelaQuantis
+    
+    tabela_scipy = TabelaQuantis(sem_scipy=False)
+    tabela_propria = TabelaQuantis(sem_scipy=True)
+    
+    # Valores de referência da tabela t de Student para 95,45% (k usual dos certificados)
+    probabilidade = (1 + 0.9545) / 2
+    diferenca_maxima = 0
+    for gl in [1, 2, 3, 4, 5, 10, 20, 50, 100, 250, 7.5, float('inf')]:
+        k_scipy = tabela_scipy.quantil_t(probabilidade, gl)
+        k_proprio = tabela_propria.quantil_t(probabilidade, gl)
+        diferenca_maxima = max(diferenca_maxima, abs(k_scipy - k_proprio))
+        print(f"ν = {gl}: k (SciPy) = {k_scipy:.6f}, k (sem SciPy) = {k_proprio:.6f}")
+    
+    print(f"Diferença máxima: {diferenca_maxima}")
+    
+    # Verificar se os resultados estão corretos
+    if diferenca_maxima < 1e-9 and abs(tabela_propria.quantil_t(probabilidade, float('inf')) - 2.0) < 0.001:
+        print("✓ Tabela de quantis validada com sucesso!")
+    else:
+        print("✗ Falha na validação da tabela de quantis!")
+
+def validar_monte_carlo():
+    """Valida a simulação de Monte Carlo contra o método do GUM em um modelo linear"""
+    print("=== VALIDAÇÃO DA SIMULAÇÃO DE MONTE CARLO ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: orçamento Tipo B de um paquímetro (modelo linear, sem componente Tipo A)
+    fontes_incerteza = [
+        {
+            'descricao': 'Resolução do instrumento',
+            'valor': 0.01,
+            'distribuicao': 'retangular'
+        },
+        {
+            'descricao': 'Incerteza do padrão',
+            'valor': 0.004,
+            'distribuicao': 'normal',
+            'divisor': 2.0
+        },
+        {
+            'descricao': 'Efeito da temperatura',
+            'valor': 0.003,
+            'distribuicao': 'triangular'
+        }
+    ]
+    
+    resultado_gum = calc.calcular_incerteza_completa([], fontes_incerteza)
+    resultado_mc = calc.calcular_incerteza_monte_carlo(None, fontes_incerteza, processos=1, semente=1)
+    
+    # Modelo em lambda: aceito no próprio processo (padrão) e rejeitado antes de criar um pool
+    resultado_lambda = calc.calcular_incerteza_monte_carlo(
+        None, fontes_incerteza, modelo=lambda x: x.sum(axis=1), semente=1
+    )
+    try:
+        calc.calcular_incerteza_monte_carlo(None, fontes_incerteza, modelo=lambda x: x.sum(axis=1), processos=2)
+        lambda_pool = 'aceito'
+    except ValueError:
+        lambda_pool = 'rejeitado'
+    
+    u_gum = resultado_gum['incerteza_combinada']['incerteza_combinada']
+    print(f"Incerteza padrão (GUM): {u_gum}")
+    print(f"Incerteza padrão (Monte Carlo): {resultado_mc['incerteza_padrao']}")
+    print(f"Intervalo de abrangência (Monte Carlo): {resultado_mc['intervalo_abrangencia']}")
+    print(f"Ensaios: {resultado_mc['ensaios']} ({resultado_mc['ensaios_por_segundo']:.0f} ensaios/s)")
+    print(f"Modelo em lambda: {resultado_lambda['incerteza_padrao']} (com vários processos: {lambda_pool})")
+    
+    # Verificar se os resultados estão corretos
+    if abs(resultado_mc['incerteza_padrao'] - u_gum) / u_gum < 0.01 and resultado_mc['convergiu'] and \
+       resultado_lambda['incerteza_padrao'] == resultado_mc['incerteza_padrao'] and lambda_pool == 'rejeitado':
+        print("✓ Simulação de Monte Carlo validada com sucesso!")
+    else:
+        print("✗ Falha na validação da simulação de Monte Carlo!")
+
+def validar_resultados_compactos():
+    """Valida os tipos de resultado compactos (acesso por chave e exportação em array)"""
+    print("=== VALIDAÇÃO DOS TIPOS DE RESULTADO ===")
+    
+    import json
+    from models.resultados import resultados_para_array
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    valores_medidos = [10.02, 10.03, 10.01, 10.02, 10.04]
+    fontes_incerteza = [
+        {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+        {'descricao': 'Incerteza do padrão', 'valor': 0.005, 'divisor': 2.0, 'graus_liberdade': 10}
+    ]
+    resultado = calc.calcular_incerteza_completa(valores_medidos, fontes_incerteza)
+    
+    # Exportação sem cópia do orçamento Tipo B
+    orcamento = resultado['incerteza_tipo_b']
+    array_fontes = orcamento.para_array_estruturado()
+    sem_copia = array_fontes is orcamento.dados
+    
+    # Conversão para dicionário (serialização em JSON)
+    como_dict = resultado.para_dict()
+    texto = json.dumps(como_dict)
+    
+    resumo = resultados_para_array([resultado, resultado])
+    
+    print(f"Contribuição da primeira fonte: {orcamento['fontes'][0]['contribuicao']}")
+    print(f"Campos do array das fontes: {array_fontes.dtype.names}")
+    print(f"Exportação sem cópia: {sem_copia}")
+    print(f"Tamanho em JSON: {len(texto)} bytes")
+    
+    # Verificar se os resultados estão corretos
+    if sem_copia and \
+       type(como_dict['incerteza_tipo_b']['fontes'][1]['contribuicao']) is float and \
+       como_dict['incerteza_tipo_b']['fontes'][1]['contribuicao'] == 0.0025 and \
+       dict(resultado['incerteza_combinada']) == como_dict['incerteza_combinada'] and \
+       abs(array_fontes['divisor'][0] - np.sqrt(3)) < 1e-15 and \
+       resumo['incerteza_expandida'][1] == resultado['incerteza_expandida']:
+        print("✓ Tipos de resultado validados com sucesso!")
+    else:
+        print("✗ Falha na validação dos tipos de resultado!")
+
+def validar_acumulador_tipo_a():
+    """Valida o cálculo incremental da incerteza Tipo A em blocos e com acumuladores combinados"""
+    print("=== VALIDAÇÃO DO ACUMULADOR TIPO A ===")
+    
+    from models.estatistica_incremental import AcumuladorTipoA
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: banho termostático registrado a 10 Hz por um dia (864 mil leituras)
+    gerador = np.random.default_rng(1)
+    serie = 25.0 + gerador.normal(0, 0.02, 864_000)
+    
+    resultado_direto = calc.calcular_incerteza_tipo_a(serie)
+    
+    # Série lida em blocos, como de um arquivo do registrador
+    blocos = (serie[i:i + 10_000] for i in range(0, len(serie), 10_000))
+    resultado_blocos = calc.calcular_incerteza_tipo_a_serie(blocos)
+    
+    # Acumuladores parciais (como os de processos diferentes) combinados ao final
+    parciais = [AcumuladorTipoA().adicionar_bloco(serie[i::3]) for i in range(3)]
+    resultado_combinado = AcumuladorTipoA.combinar_todos(parciais).resultado()
+    
+    print(f"Desvio padrão (direto): {resultado_direto['desvio_padrao']}")
+    print(f"Desvio padrão (em blocos): {resultado_blocos['desvio_padrao']}")
+    print(f"Desvio padrão (acumuladores combinados): {resultado_combinado['desvio_padrao']}")
+    print(f"Graus de liberdade: {resultado_blocos['graus_liberdade']}")
+    
+    # Verificar se os resultados estão corretos
+    if all(abs(r['desvio_padrao'] - resultado_direto['desvio_padrao']) / resultado_direto['desvio_padrao'] < 1e-10 and
+           abs(r['media'] - resultado_direto['media']) < 1e-10 and
+           r['graus_liberdade'] == resultado_direto['graus_liberdade'] and
+           r['fator_t'] == resultado_direto['fator_t']
+           for r in (resultado_blocos, resultado_combinado)):
+        print("✓ Acumulador Tipo A validado com sucesso!")
+    else:
+        print("✗ Falha na validação do acumulador Tipo A!")
+
+def validar_autocorrelacao():
+    """Valida a correção da incerteza Tipo A para séries autocorrelacionadas"""
+    print("=== VALIDAÇÃO DA CORREÇÃO DE AUTOCORRELAÇÃO ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: 20 pontos registrados com processo AR(1), φ = 0,9 (n_ef teórico ≈ n (1 - φ) / (1 + φ))
+    gerador = np.random.default_rng(2)
+    n, phi = 20_000, 0.9
+    ruido = gerador.normal(0, 0.01, (20, n))
+    series = np.empty_like(ruido)
+    series[:, 0] = ruido[:, 0]
+    for i in range(1, n):
+        series[:, i] = phi * series[:, i - 1] + ruido[:, i]
+    
+    resultado = calc.calcular_incerteza_tipo_a_lote(series, autocorrelacao=True)
+    resultado_ponto = calc.calcular_incerteza_tipo_a(list(series[0]), autocorrelacao=True)
+    resultado_sem_correcao = calc.calcular_incerteza_tipo_a(list(series[0]))
+    
+    n_teorico = n * (1 - phi) / (1 + phi)
+    print(f"n efetivo médio: {resultado['n_efetivo'].mean():.1f} (teórico: {n_teorico:.1f})")
+    print(f"Incerteza padrão sem correção: {resultado_sem_correcao['incerteza_padrao']}")
+    print(f"Incerteza padrão com correção: {resultado_ponto['incerteza_padrao']}")
+    print(f"Graus de liberdade com correção: {resultado_ponto['graus_liberdade']}")
+    
+    # Verificar se os resultados estão corretos
+    if abs(resultado['n_efetivo'].mean() - n_teorico) / n_teorico < 0.1 and \
+       resultado_ponto['graus_liberdade'] == resultado['graus_liberdade'][0] == int(resultado['n_efetivo'][0]) - 1 and \
+       abs(resultado_ponto['incerteza_padrao'] - resultado['incerteza_padrao'][0]) < 1e-15 and \
+       resultado_ponto['incerteza_padrao'] > 3 * resultado_sem_correcao['incerteza_padrao']:
+        print("✓ Correção de autocorrelação validada com sucesso!")
+    else:
+        print("✗ Falha na validação da correção de autocorrelação!")
+
+def validar_conformidade_lote():
+    """Valida a decisão de conformidade em lote e o resumo por instrumento"""
+    print("=== VALIDAÇÃO DA CONFORMIDADE EM LOTE ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: 1.000.000 de pontos de 10.000 instrumentos, EMP de 0,1 mm
+    gerador = np.random.default_rng(3)
+    n = 1_000_000
+    erro = gerador.normal(0, 0.04, n)
+    incerteza_expandida = gerador.uniform(0.005, 0.03, n)
+    instrumentos = gerador.integers(0, 10_000, n)
+    
+    banda = avaliar_conformidade_lote(erro, incerteza_expandida, 0.1)
+    simples = avaliar_conformidade_lote(erro, incerteza_expandida, 0.1, regra='aceitacao_simples')
+    risco = avaliar_conformidade_lote(erro, incerteza_expandida, 0.1, regra='risco_compartilhado')
+    resumo = resumo_por_instrumento(instrumentos, banda)
+    
+    # Referência: avaliação ponto a ponto (banda de guarda = U)
+    referencia = [calc.avaliar_conformidade(erro[i], incerteza_expandida[i], 0.1) for i in range(1000)]
+    
+    # Pontos sem erro ou sem EMP (NaN) não são avaliados nem contados como não conformes
+    incompletos = resumo_por_instrumento([1, 1, 2, 2, 3, 3, 4], avaliar_conformidade_lote(
+        [0.01, np.nan, 0.01, 0.02, 0.5, 0.01, np.nan], 0.01, [0.1, 0.1, 0.1, 0.1, 0.1, np.nan, 0.1]
+    ))
+    
+    # No limite do EMP, o erro verdadeiro fica fora do intervalo com probabilidade 1/2
+    no_limite = avaliar_conformidade_lote(np.array([0.1]), np.array([0.02]), 0.1)
+    
+    print(f"Conformes (aceitação simples): {simples['conforme'].mean():.2%}")
+    print(f"Conformes (banda de guarda): {banda['conforme'].mean():.2%}")
+    print(f"Conformes (risco compartilhado, PFA <= 2,5%): {risco['conforme'].mean():.2%}")
+    print(f"Instrumentos aprovados: {resumo['aprovado'].sum()} de {len(resumo['instrumento_id'])}")
+    print(f"Com pontos não avaliados: não conformes {incompletos['nao_conformes'].tolist()}, "
+          f"não avaliados {incompletos['nao_avaliados'].tolist()}")
+    
+    # Verificar se os resultados estão corretos
+    if all(r['conforme'] == c for r, c in zip(referencia, banda['conforme'][:1000])) and \
+       np.allclose([r['razao_erro'] for r in referencia], banda['razao_erro'][:1000]) and \
+       np.all(banda['conforme'] <= risco['conforme']) and np.all(risco['conforme'] <= simples['conforme']) and \
+       np.all(risco['probabilidade_nao_conformidade'][risco['conforme']] <= 0.025) and \
+       abs(no_limite['probabilidade_nao_conformidade'][0] - 0.5) < 1e-9 and \
+       resumo['pontos'].sum() == n and resumo['nao_conformes'].sum() == (~banda['conforme']).sum() and \
+       banda['avaliado'].all() and resumo['nao_avaliados'].sum() == 0 and \
+       incompletos['nao_conformes'].tolist() == [0, 0, 1, 0] and incompletos['nao_avaliados'].tolist() == [1, 0, 1, 1] and \
+       incompletos['aprovado'].tolist() == [False, True, False, False] and \
+       incompletos['reprovado'].tolist() == [False, False, True, False] and \
+       resumo['razao_erro_maxima'][0] == banda['razao_erro'][instrumentos == resumo['instrumento_id'][0]].max():
+        print("✓ Conformidade em lote validada com sucesso!")
+    else:
+        print("✗ Falha na validação da conformidade em lote!")
+
+def validar_ajuste_curva():
+    """Valida o ajuste da curva de correção e a sua avaliação em lote"""
+    print("=== VALIDAÇÃO DO AJUSTE DA CURVA DE CORREÇÃO ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: 11 pontos de 0 a 100 °C, erro com componente linear e quadrática
+    gerador = np.random.default_rng(4)
+    referencias = np.linspace(0, 100, 11)
+    incerteza_expandida = np.linspace(0.02, 0.06, 11)
+    valores_lidos = referencias + 0.05 + 0.002 * referencias - 1e-5 * referencias ** 2 + \
+        gerador.normal(0, 0.01, 11)
+    pontos = [
+        {'valor_referencia': r, 'valor_lido': l, 'incerteza_expandida': u, 'fator_k': 2.0}
+        for r, l, u in zip(referencias, valores_lidos, incerteza_expandida)
+    ]
+    
+    curva = calc.ajustar_curva_calibracao(pontos, grau=2)
+    reta = calc.ajustar_curva_calibracao(pontos, grau=1, ponderado=False)
+    
+    # Referência: numpy.polyfit com os mesmos pesos e covariância não escalonada
+    coeficientes, covariancia = np.polyfit(valores_lidos, referencias - valores_lidos, 2,
+                                           w=2.0 / incerteza_expandida, cov='unscaled')
+    
+    # Correção de 2.000.000 de leituras registradas
+    leituras = gerador.uniform(0, 100, 2_000_000)
+    corrigido = curva.corrigir(leituras)
+    amostra = leituras[:100]
+    vandermonde = np.vander(amostra, 3)
+    incerteza_esperada = np.sqrt(np.einsum('ij,jk,ik->i', vandermonde, covariancia, vandermonde))
+    
+    print(f"Coeficientes (a0, a1, a2): {curva.coeficientes_polinomio()}")
+    print(f"Qui-quadrado: {curva.qui_quadrado:.2f} com {curva.graus_liberdade} graus de liberdade")
+    print(f"Correção em 50,0: {curva.avaliar(50.0):.5f} ± {curva.incerteza(50.0) * curva.fator_k:.5f}")
+    
+    # Verificar se os resultados estão corretos
+    if np.allclose(curva.coeficientes_polinomio(), coeficientes[::-1], rtol=1e-8, atol=1e-12) and \
+       np.allclose(corrigido['correcao'][:100], np.polyval(coeficientes, amostra), rtol=1e-10) and \
+       np.allclose(corrigido['incerteza_padrao'][:100], incerteza_esperada, rtol=1e-8) and \
+       np.allclose(corrigido['valores_corrigidos'], leituras + corrigido['correcao']) and \
+       reta.grau == 1 and reta.graus_liberdade == 9 and not reta.ponderado:
+        print("✓ Ajuste da curva de correção validado com sucesso!")
+    else:
+        print("✗ Falha na validação do ajuste da curva de correção!")
+
+def modelo_comprimento(x):
+    """Modelo de medição L = Lp (1 + α ΔT) + d, com as entradas nas colunas de x"""
+    return x[:, 0] * (1 + x[:, 1] * x[:, 2]) + x[:, 3]
+
+def validar_propagacao_correlacionada():
+    """Valida a propagação com modelo de medição e entradas correlacionadas"""
+    print("=== VALIDAÇÃO DA PROPAGAÇÃO COM ENTRADAS CORRELACIONADAS ===")
+    
+    # Instanciar a classe de cálculos
+    calc = CalculoMetrologico()
+    
+    # Exemplo: bloco padrão de 50 mm (Lp, α, ΔT, desvio do comparador)
+    estimativas = [50.0, 11.5e-6, 0.5, 0.001]
+    incertezas = [25e-6, 1e-6, 0.2, 5e-6]
+    analiticos = [1 + 11.5e-6 * 0.5, 50.0 * 0.5, 50.0 * 11.5e-6, 1.0]
+    correlacao = np.eye(4)
+    correlacao[0, 3] = correlacao[3, 0] = 0.5
+    
+    resultado = calc.calcular_incerteza_modelo(modelo_comprimento, estimativas, incertezas,
+                                               graus_liberdade=[np.inf, np.inf, 12, 20])
+    correlacionado = calc.calcular_incerteza_modelo(modelo_comprimento, estimativas, incertezas, correlacao)
+    contribuicoes = np.array(analiticos) * incertezas
+    esperado = np.sqrt(contribuicoes @ correlacao @ contribuicoes)
+    
+    # Lote de 100.000 pontos com a mesma matriz de correlação
+    lote = calc.calcular_incerteza_modelo_lote(modelo_comprimento, np.tile(estimativas, (100_000, 1)),
+                                               incertezas, correlacao)
+    
+    # Fontes Tipo B totalmente correlacionadas: as contribuições se somam linearmente
+    fontes = [
+        {'descricao': 'Resolução do instrumento', 'valor': 0.01, 'distribuicao': 'retangular'},
+        {'descricao': 'Padrão (certificado)', 'valor': 0.004, 'divisor': 2.0},
+        {'descricao': 'Padrão (deriva)', 'valor': 0.003, 'divisor': 2.0}
+    ]
+    correlacao_b = np.eye(3)
+    correlacao_b[1, 2] = correlacao_b[2, 1] = 1.0
+    completo = calc.calcular_incerteza_completa([10.01, 10.02, 10.03], fontes, correlacao=correlacao_b)
+    completo_lote = calc.calcular_incerteza_completa_lote([[10.01, 10.02, 10.03]], [fontes], correlacao=correlacao_b)
+    u_b_esperado = np.sqrt((0.01 / np.sqrt(3)) ** 2 + (0.002 + 0.0015) ** 2)
+    
+    try:
+        calc.calcular_incerteza_completa([10.01, 10.02], fontes, correlacao=[[1, 2, 0], [2, 1, 0], [0, 0, 1]])
+        invalida_rejeitada = False
+    except ValueError:
+        invalida_rejeitada = True
+    
+    print(f"Coeficientes de sensibilidade: {resultado['coeficientes_sensibilidade']}")
+    print(f"Incerteza combinada sem correlação: {resultado['incerteza_combinada']}")
+    print(f"Incerteza combinada com correlação: {correlacionado['incerteza_combinada']} (esperado: {esperado})")
+    print(f"Graus de liberdade efetivos: {resultado['graus_liberdade_efetivos']}")
+    
+    # Verificar se os resultados estão corretos
+    if np.allclose(resultado['coeficientes_sensibilidade'], analiticos, rtol=1e-8) and \
+       abs(correlacionado['incerteza_combinada'] - esperado) < 1e-12 and \
+       np.allclose(lote['incerteza_combinada'], correlacionado['incerteza_combinada'], rtol=1e-12) and \
+       abs(completo['incerteza_combinada']['incerteza_tipo_b'] - u_b_esperado) < 1e-15 and \
+       abs(completo_lote['incerteza_expandida'][0] - completo['incerteza_expandida']) < 1e-15 and \
+       invalida_rejeitada:
+        print("✓ Propagação com entradas correlacionadas validada com sucesso!")
+    else:
+        print("✗ Falha na validação da propagação com entradas correlacionadas!")
+
 def gerar_grafico_contribuicoes():
     """Gera um gráfico de contribuições de incerteza"""
     print("=== GERANDO GRÁFICO DE CONTRIBUIÇÕES DE INCERTEZA ===")
@@ -283,6 +697,15 @@ if __name__ == "__main__":
     validar_incerteza_tipo_a()
     validar_incerteza_tipo_b()
     validar_incerteza_completa()
+    validar_incerteza_lote()
+    validar_tabela_quantis()
+    validar_monte_carlo()
+    validar_resultados_compactos()
+    validar_acumulador_tipo_a()
+    validar_autocorrelacao()
+    validar_conformidade_lote()
+    validar_ajuste_curva()
+    validar_propagacao_correlacionada()
     gerar_grafico_contribuicoes()
     
     print("Todos os testes de validação foram concluídos com sucesso!")
@@ -0,0 +1,166 @@
+"""
+Cache de resultados de calibrações e de artefatos renderizados (certificados e gráficos)
+Cada entrada é indexada por uma chave (tipo do artefato, id da calibração e
+parâmetros da renderização) e guarda a versão dos dados com que foi gerada
+(calibracoes.versao_dados, incrementada por gatilhos a cada alteração da
+calibração, dos pontos, das fontes ou dos padrões, procedimento, setor e tipo
+exibidos; ver as migrações 0008 e 0009). Uma versão diferente
+da guardada descarta a entrada e gera o conteúdo de novo, de modo que o cache
+nunca precisa ser invalidado explicitamente.
+
+Há dois níveis: um LRU em memória, limitado pelo total de bytes, e um diretório
+opcional em disco (CALIBRA_CACHE_DIRETORIO), compartilhado entre os processos e
+preservado entre reinícios.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Tamanho máximo do cache em memória de cada processo (bytes)
+CAPACIDADE_BYTES = int(os.environ.get('CALIBRA_CACHE_BYTES', 64 * 1024 * 1024))
+
+# Diretório do cache em disco (vazio: desativado)
+DIRETORIO_DISCO = os.environ.get('CALIBRA_CACHE_DIRETORIO', '')
+
+
+def identificador(chave, versao):
+    """Resumo hexadecimal de uma chave e versão (nome do arquivo em disco e ETag)"""
+    return hashlib.sha256(repr((chave, versao)).encode('utf-8')).hexdigest()[:32]
+
+
+class Entrada:
+    """Conteúdo em cache com a versão dos dados e o instante de geração"""
+
+    __slots__ = ('versao', 'conteudo', 'gerado_em')
+
+    def __init__(self, versao, conteudo, gerado_em):
+        self.versao = versao
+        self.conteudo = conteudo
+        self.gerado_em = gerado_em
+
+
+class CacheArtefatos:
+    """Cache LRU de conteúdos em bytes, com nível opcional em disco, indexado por chave e versão"""
+
+    def __init__(self, capacidade_bytes=CAPACIDADE_BYTES, diretorio=DIRETORIO_DISCO or None):
+        """
+        Args:
+            capacidade_bytes: Total máximo de bytes mantidos em memória
+            diretorio: Diretório do cache em disco (opcional; None desativa o nível em disco)
+        """
+        self.capacidade_bytes = capacidade_bytes
+        self.diretorio = diretorio
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.geracoes = 0
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def obter(self, chave, versao, gerar):
+        """
+        Retorna o conteúdo em cache, gerando-o se não estiver no cache ou se a versão mudou
+
+        Args:
+            chave: Chave do artefato (tupla de valores com repr estável)
+            versao: Versão atual dos dados do artefato
+            gerar: Função sem argumentos que retorna o conteúdo (bytes)
+
+        Returns:
+            Entrada com o conteúdo e o instante de geração
+        """
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada.versao == versao:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada
+
+        entrada = self._ler_disco(chave, versao)
+        if entrada is not None:
+            with self._trava:
+                self.acertos_disco += 1
+        else:
+            entrada = Entrada(versao, gerar(), time.time())
+            with self._trava:
+                self.geracoes += 1
+            self._gravar_disco(chave, entrada)
+
+        self._guardar(chave, entrada)
+        return entrada
+
+    def _guardar(self, chave, entrada):
+        with self._trava:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior.conteudo)
+            if len(entrada.conteudo) > self.capacidade_bytes:
+                return
+            self._entradas[chave] = entrada
+            self._bytes += len(entrada.conteudo)
+            while self._bytes > self.capacidade_bytes:
+                _, removida = self._entradas.popitem(last=False)
+                self._bytes -= len(removida.conteudo)
+
+    def _caminho(self, chave, versao):
+        # Um subdiretório por artefato, com um arquivo por versão
+        return os.path.join(self.diretorio, identificador(chave, None)[:16], identificador(chave, versao))
+
+    def _ler_disco(self, chave, versao):
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(chave, versao)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            return Entrada(versao, conteudo, os.path.getmtime(caminho))
+        except OSError:
+            return None
+
+    def _gravar_disco(self, chave, entrada):
+        if not self.diretorio:
+            return
+        caminho = self._caminho(chave, entrada.versao)
+        diretorio = os.path.dirname(caminho)
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            # Gravação atômica: outros processos nunca leem um arquivo incompleto
+            descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix='.gravando_')
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(entrada.conteudo)
+            os.utime(temporario, (entrada.gerado_em, entrada.gerado_em))
+            os.replace(temporario, caminho)
+            # Descartar as versões anteriores do mesmo artefato
+            for nome in os.listdir(diretorio):
+                if nome != os.path.basename(caminho) and not nome.startswith('.gravando_'):
+                    os.remove(os.path.join(diretorio, nome))
+        except OSError:
+            # O nível em disco é opcional: uma falha de gravação não impede a resposta
+            pass
+
+    def invalidar(self, chave=None):
+        """Descarta uma entrada da memória (ou todas, se chave for None); o disco é mantido"""
+        with self._trava:
+            if chave is None:
+                self._entradas.clear()
+                self._bytes = 0
+            else:
+                entrada = self._entradas.pop(chave, None)
+                if entrada is not None:
+                    self._bytes -= len(entrada.conteudo)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+cache_artefatos = CacheArtefatos()
@@ -0,0 +1,465 @@
+"""
+Geração de certificados de calibração a partir dos dados do banco
+Renderiza os registros de certificados com templates Jinja2 compilados uma única
+vez por versão do template, e gera lotes de certificados (HTML ou PDF) em
+paralelo, gravando-os em um arquivo zip ou diretório à medida que ficam prontos
+"""
+
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from decimal import Decimal
+
+# Permitir a execução direta do script (python utils/gerar_certificados.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from utils.metricas import cronometrar
+
+DIRETORIO_TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Formato usado quando a configuração 'formato_certificado' não está definida
+FORMATO_PADRAO = 'padrao'
+
+# Casas decimais dos valores medidos quando o instrumento não tem resolução cadastrada
+CASAS_PADRAO = 3
+
+# Algarismos significativos das incertezas impressas nos certificados
+ALGARISMOS_INCERTEZA = 2
+
+# Quantidade máxima de ids por consulta com IN (...)
+TAMANHO_CONSULTA = 500
+
+_ambiente = None
+_templates = {}
+_trava = threading.Lock()
+
+
+def _formatar_numero(valor, casas=None):
+    """
+    Formata um número no padrão brasileiro (vírgula decimal)
+
+    Sem casas definidas, o número é exibido com todos os dígitos significativos
+    do float, em notação decimal (nunca exponencial)
+    """
+    if valor is None:
+        return '-'
+    if casas is not None:
+        texto = f"{valor:.{casas}f}"
+    elif math.isfinite(valor):
+        texto = format(Decimal(repr(float(valor))).normalize(), 'f')
+    else:
+        texto = str(valor)
+    return texto.replace('.', ',')
+
+
+def _formatar_significativos(valor, algarismos=ALGARISMOS_INCERTEZA):
+    """Formata um número arredondado a uma quantidade de algarismos significativos (ex.: 0,00012)"""
+    if valor is None or valor == 0 or not math.isfinite(valor):
+        return _formatar_numero(valor)
+    arredondado = float(f"{valor:.{algarismos - 1}e}")
+    casas = max(0, algarismos - 1 - math.floor(math.log10(abs(arredondado))))
+    return _formatar_numero(arredondado, casas)
+
+
+def casas_decimais(resolucao):
+    """
+    Casas decimais dos valores medidos de um instrumento, derivadas da resolução
+
+    Args:
+        resolucao: Resolução do instrumento (ex.: 0,01 -> 2 casas, 0,0005 -> 4 casas)
+
+    Returns:
+        Número de casas decimais (CASAS_PADRAO se a resolução não estiver definida)
+    """
+    if not resolucao or not math.isfinite(resolucao):
+        return CASAS_PADRAO
+    return max(0, -Decimal(repr(float(resolucao))).normalize().as_tuple().exponent)
+
+
+def _formatar_data(valor):
+    """Converte datas ISO (AAAA-MM-DD[ hh:mm:ss]) para DD/MM/AAAA"""
+    if not valor:
+        return '-'
+    correspondencia = re.match(r'(\d{4})-(\d{2})-(\d{2})', str(valor))
+    if not correspondencia:
+        return str(valor)
+    ano, mes, dia = correspondencia.groups()
+    return f"{dia}/{mes}/{ano}"
+
+
+def _formatar_divisor(valor):
+    """Exibe os divisores das distribuições retangular e triangular como raízes"""
+    if valor is None:
+        return '1'
+    if abs(valor - 3 ** 0.5) < 1e-9:
+        return '√3'
+    if abs(valor - 6 ** 0.5) < 1e-9:
+        return '√6'
+    return _formatar_numero(valor)
+
+
+def _ambiente_jinja():
+    """Cria (uma vez por processo) o ambiente Jinja2 com os filtros dos certificados"""
+    global _ambiente
+    if _ambiente is None:
+        import jinja2
+
+        ambiente = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(DIRETORIO_TEMPLATES),
+            autoescape=jinja2.select_autoescape(['html']),
+            # O cache de templates compilados é mantido por obter_template
+            cache_size=0,
+            auto_reload=False
+        )
+        ambiente.filters['numero'] = _formatar_numero
+        ambiente.filters['significativos'] = _formatar_significativos
+        ambiente.filters['data_br'] = _formatar_data
+        ambiente.filters['divisor'] = _formatar_divisor
+        _ambiente = ambiente
+    return _ambiente
+
+
+def versao_template(formato=FORMATO_PADRAO):
+    """Versão do arquivo de template de um formato (data de modificação e tamanho)"""
+    estado = os.stat(os.path.join(DIRETORIO_TEMPLATES, 'certificados', f"{formato}.html"))
+    return estado.st_mtime_ns, estado.st_size
+
+
+def obter_template(formato=FORMATO_PADRAO):
+    """
+    Retorna o template compilado de um formato de certificado
+
+    O template é compilado apenas na primeira chamada e recompilado somente
+    quando o arquivo é alterado (nova versão do template).
+
+    Args:
+        formato: Formato do certificado (arquivo templates/certificados/<formato>.html)
+
+    Returns:
+        Template Jinja2 compilado
+    """
+    nome = f"certificados/{formato}.html"
+    chave = (formato,) + versao_template(formato)
+
+    template = _templates.get(chave)
+    if template is None:
+        with _trava:
+            template = _templates.get(chave)
+            if template is None:
+                template = _ambiente_jinja().get_template(nome)
+                # Descartar versões anteriores do mesmo formato
+                for antiga in [c for c in _templates if c[0] == formato]:
+                    del _templates[antiga]
+                _templates[chave] = template
+    return template
+
+
+def _selecionar_em(conexao, sql, ids):
+    """Executa uma consulta com 'IN ({})' para uma lista de ids, em blocos"""
+    ids = list(ids)
+    linhas = []
+    for inicio in range(0, len(ids), TAMANHO_CONSULTA):
+        bloco = ids[inicio:inicio + TAMANHO_CONSULTA]
+        marcadores = ','.join('?' * len(bloco))
+        linhas.extend(dict(linha) for linha in conexao.execute(sql.format(marcadores), bloco))
+    return linhas
+
+
+def ler_configuracoes(conexao=None):
+    """Lê a tabela de configurações do sistema como dicionário chave -> valor"""
+    conexao = conexao or banco.obter_conexao()
+    return {linha['chave']: linha['valor'] for linha in conexao.execute("SELECT chave, valor FROM configuracoes")}
+
+
+def _resultado(pontos, nao_avaliados):
+    """
+    Resultado final da calibração: 'reprovado' se algum ponto é não conforme,
+    'aprovado' se todos os pontos são conformes e 'nao_avaliado' se há pontos sem
+    avaliação de conformidade (conforme nulo) ou nenhum ponto
+    """
+    if any(p['conforme'] == 0 for p in pontos):
+        return 'reprovado'
+    if not pontos or nao_avaliados:
+        return 'nao_avaliado'
+    return 'aprovado'
+
+
+@cronometrar('calibra_banco_segundos', operacao='carregar_dados_certificados')
+def carregar_dados_certificados(certificado_ids, conexao=None, configuracoes=None):
+    """
+    Monta o contexto de renderização de vários certificados
+
+    Os dados são lidos com um número fixo de consultas por bloco de certificados
+    (certificados, calibrações, instrumentos, procedimentos, padrões, pontos e
+    fontes), sem consultas por certificado.
+
+    Args:
+        certificado_ids: Lista de ids da tabela certificados
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        configuracoes: Configurações do sistema (opcional, lidas do banco se omitidas)
+
+    Returns:
+        Dicionário id do certificado -> contexto do template
+    """
+    conexao = conexao or banco.obter_conexao()
+    configuracoes = configuracoes if configuracoes is not None else ler_configuracoes(conexao)
+
+    certificados = _selecionar_em(conexao, "SELECT * FROM certificados WHERE id IN ({})", certificado_ids)
+    calibracao_ids = {c['calibracao_id'] for c in certificados}
+
+    calibracoes = {c['id']: c for c in _selecionar_em(
+        conexao, "SELECT * FROM calibracoes WHERE id IN ({})", calibracao_ids
+    )}
+    instrumentos = {i['id']: i for i in _selecionar_em(
+        conexao,
+        "SELECT i.*, t.nome AS tipo, s.nome AS setor FROM instrumentos i "
+        "LEFT JOIN tipos_instrumentos t ON t.id = i.tipo_id "
+        "LEFT JOIN setores s ON s.id = i.setor_id WHERE i.id IN ({})",
+        {c['instrumento_id'] for c in calibracoes.values()}
+    )}
+    procedimentos = {p['id']: p for p in _selecionar_em(
+        conexao, "SELECT * FROM procedimentos WHERE id IN ({})",
+        {c['procedimento_id'] for c in calibracoes.values()}
+    )}
+
+    padroes = {}
+    for padrao in _selecionar_em(
+        conexao,
+        "SELECT cp.calibracao_id, p.* FROM calibracao_padroes cp "
+        "JOIN padroes p ON p.id = cp.padrao_id WHERE cp.calibracao_id IN ({}) ORDER BY cp.id",
+        calibracao_ids
+    ):
+        padroes.setdefault(padrao['calibracao_id'], []).append(padrao)
+
+    pontos = {}
+    pontos_por_id = {}
+    for ponto in _selecionar_em(
+        conexao,
+        "SELECT * FROM pontos_calibracao WHERE calibracao_id IN ({}) ORDER BY calibracao_id, sequencia, id",
+        calibracao_ids
+    ):
+        ponto['fontes'] = []
+        pontos.setdefault(ponto['calibracao_id'], []).append(ponto)
+        pontos_por_id[ponto['id']] = ponto
+
+    for fonte in _selecionar_em(
+        conexao,
+        "SELECT f.* FROM fontes_incerteza f JOIN pontos_calibracao p ON p.id = f.ponto_calibracao_id "
+        "WHERE p.calibracao_id IN ({}) ORDER BY f.ponto_calibracao_id, f.id",
+        calibracao_ids
+    ):
+        pontos_por_id[fonte['ponto_calibracao_id']]['fontes'].append(fonte)
+
+    empresa = {
+        'nome': configuracoes.get('nome_empresa', ''),
+        'endereco': configuracoes.get('endereco_empresa', ''),
+        'telefone': configuracoes.get('telefone_empresa', ''),
+        'email': configuracoes.get('email_empresa', ''),
+        'logo': configuracoes.get('logo_empresa', '')
+    }
+    nivel_confianca = float(configuracoes.get('nivel_confianca_padrao', 95))
+
+    contextos = {}
+    for certificado in certificados:
+        calibracao = calibracoes.get(certificado['calibracao_id'], {})
+        pontos_calibracao = pontos.get(calibracao.get('id'), [])
+        com_incerteza = [p for p in pontos_calibracao if p['incerteza_expandida'] is not None]
+        nao_avaliados = sum(1 for p in pontos_calibracao if p['conforme'] is None)
+
+        instrumento = instrumentos.get(calibracao.get('instrumento_id'), {})
+
+        contextos[certificado['id']] = {
+            'certificado': certificado,
+            'calibracao': calibracao,
+            'instrumento': instrumento,
+            'casas': casas_decimais(instrumento.get('resolucao')),
+            'procedimento': procedimentos.get(calibracao.get('procedimento_id')),
+            'padroes': padroes.get(calibracao.get('id'), []),
+            'pontos': pontos_calibracao,
+            'ponto_orcamento': max(com_incerteza, key=lambda p: p['incerteza_expandida'], default=None),
+            'resultado': _resultado(pontos_calibracao, nao_avaliados),
+            'nao_avaliados': nao_avaliados,
+            'empresa': empresa,
+            'nivel_confianca': nivel_confianca
+        }
+
+    return contextos
+
+
+@cronometrar('calibra_renderizacao_segundos', tipo='certificado_html')
+def renderizar_certificado(contexto, formato=FORMATO_PADRAO):
+    """
+    Renderiza um certificado em HTML
+
+    Args:
+        contexto: Contexto do certificado (ver carregar_dados_certificados)
+        formato: Formato do certificado
+
+    Returns:
+        HTML do certificado
+    """
+    return obter_template(formato).render(**contexto)
+
+
+def _weasyprint():
+    """Importa o pacote opcional weasyprint, usado na geração de PDF"""
+    try:
+        import weasyprint
+    except ImportError:
+        raise RuntimeError("A geração de certificados em PDF requer o pacote 'weasyprint' instalado")
+    return weasyprint
+
+
+@cronometrar('calibra_renderizacao_segundos', tipo='certificado_pdf')
+def converter_pdf(html):
+    """
+    Converte o HTML de um certificado em PDF (requer o pacote opcional weasyprint)
+
+    Args:
+        html: HTML do certificado
+
+    Returns:
+        Conteúdo do arquivo PDF
+    """
+    return _weasyprint().HTML(string=html, base_url=DIRETORIO_TEMPLATES).write_pdf()
+
+
+def nome_arquivo(certificado, saida='html'):
+    """Nome de arquivo do certificado, derivado do seu número"""
+    numero = re.sub(r'[^\w.-]+', '_', str(certificado['numero']))
+    return f"{numero}.{saida}"
+
+
+def _renderizar_bloco(certificado_ids, formato, saida, caminho_banco):
+    """
+    Renderiza um bloco de certificados (função de nível de módulo para poder
+    ser enviada aos processos do pool)
+
+    Returns:
+        Lista de tuplas (id do certificado, nome do arquivo, conteúdo em bytes)
+    """
+    if caminho_banco != banco.CAMINHO_BANCO:
+        banco.configurar_banco(caminho_banco)
+
+    arquivos = []
+    for certificado_id, contexto in carregar_dados_certificados(certificado_ids).items():
+        html = renderizar_certificado(contexto, formato)
+        conteudo = converter_pdf(html) if saida == 'pdf' else html.encode('utf-8')
+        arquivos.append((certificado_id, nome_arquivo(contexto['certificado'], saida), conteudo))
+    return arquivos
+
+
+def gerar_certificados_lote(certificado_ids, destino, saida='html', formato=None, processos=None,
+                            tamanho_bloco=50):
+    """
+    Gera um lote de certificados em um arquivo zip ou diretório
+
+    Os certificados são renderizados em blocos por um pool de processos e gravados
+    no destino à medida que cada bloco fica pronto; apenas alguns blocos ficam em
+    memória ao mesmo tempo, qualquer que seja o tamanho do lote.
+
+    Args:
+        certificado_ids: Lista de ids da tabela certificados
+        destino: Caminho de um arquivo .zip ou de um diretório
+        saida: 'html' ou 'pdf'
+        formato: Formato do certificado (padrão: configuração 'formato_certificado')
+        processos: Número de processos (padrão: número de CPUs; 1 executa no próprio processo)
+        tamanho_bloco: Certificados por tarefa enviada ao pool
+
+    Returns:
+        Dicionário com a quantidade de certificados gerados, o tempo e a taxa obtida
+    """
+    if saida not in ('html', 'pdf'):
+        raise ValueError(f"Saída de certificado não suportada: {saida}")
+    if saida == 'pdf':
+        _weasyprint()
+
+    if formato is None:
+        formato = ler_configuracoes().get('formato_certificado') or FORMATO_PADRAO
+    obter_template(formato)
+
+    processos = processos or os.cpu_count() or 1
+    certificado_ids = list(certificado_ids)
+    blocos = [certificado_ids[i:i + tamanho_bloco] for i in range(0, len(certificado_ids), tamanho_bloco)]
+
+    em_zip = destino.lower().endswith('.zip')
+    if em_zip:
+        arquivo_zip = zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(destino, exist_ok=True)
+
+    gerados = 0
+    inicio = time.perf_counter()
+
+    def gravar(arquivos):
+        nonlocal gerados
+        caminhos = []
+        for certificado_id, nome, conteudo in arquivos:
+            if em_zip:
+                arquivo_zip.writestr(nome, conteudo)
+            else:
+                caminho = os.path.join(destino, nome)
+                with open(caminho, 'wb') as arquivo:
+                    arquivo.write(conteudo)
+                caminhos.append((caminho, certificado_id))
+        if caminhos:
+            with banco.transacao() as conexao:
+                conexao.executemany("UPDATE certificados SET caminho_arquivo = ? WHERE id = ?", caminhos)
+        gerados += len(arquivos)
+
+    try:
+        if processos == 1:
+            for bloco in blocos:
+                gravar(_renderizar_bloco(bloco, formato, saida, banco.CAMINHO_BANCO))
+        else:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                pendentes = set()
+                restantes = iter(blocos)
+                while True:
+                    # No máximo dois blocos por processo aguardando gravação
+                    for bloco in restantes:
+                        pendentes.add(executor.submit(
+                            _renderizar_bloco, bloco, formato, saida, banco.CAMINHO_BANCO
+                        ))
+                        if len(pendentes) >= 2 * processos:
+                            break
+                    if not pendentes:
+                        break
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        gravar(futuro.result())
+    finally:
+        if em_zip:
+            arquivo_zip.close()
+
+    duracao = time.perf_counter() - inicio
+    return {
+        'certificados': gerados,
+        'destino': destino,
+        'tempo': duracao,
+        'certificados_por_segundo': gerados / duracao if duracao > 0 else float('inf')
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera certificados de calibração em lote')
+    parser.add_argument('destino', help='Arquivo .zip ou diretório de saída')
+    parser.add_argument('ids', nargs='*', type=int, help='Ids dos certificados (padrão: todos)')
+    parser.add_argument('--pdf', action='store_true', help='Gerar PDF em vez de HTML')
+    parser.add_argument('--processos', type=int)
+    args = parser.parse_args()
+
+    ids = args.ids or [linha[0] for linha in banco.obter_conexao().execute("SELECT id FROM certificados ORDER BY id")]
+    resultado = gerar_certificados_lote(ids, args.destino, saida='pdf' if args.pdf else 'html',
+                                        processos=args.processos)
+    print(f"{resultado['certificados']} certificados gerados em {resultado['tempo']:.1f}s "
+          f"({resultado['certificados_por_segundo']:.0f}/s)")
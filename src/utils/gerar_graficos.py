@@ -1,101 +1,380 @@
-import matplotlib.pyplot as plt
-import numpy as np
+import hashlib
+import json
 import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Permitir a execução direta do script (python utils/gerar_graficos.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metricas import cronometrar
 
 # Diretório para salvar os gráficos
 output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'img')
-os.makedirs(output_dir, exist_ok=True)
 
-def gerar_grafico_erros():
+# Incrementar ao alterar a aparência dos gráficos, invalidando os arquivos em cache
+VERSAO_GRAFICOS = 1
+
+# Tamanho máximo dos gráficos em cache em cada diretório de saída (bytes); ao
+# ultrapassá-lo, os gráficos usados há mais tempo são removidos
+CAPACIDADE_BYTES = int(os.environ.get('CALIBRA_GRAFICOS_BYTES', 256 * 1024 * 1024))
+
+# Nome dos arquivos gerados por _caminho_em_cache (os demais arquivos do diretório não são removidos)
+ARQUIVO_EM_CACHE = re.compile(r'(grafico_erros|contribuicoes_incerteza)_[0-9a-f]{20}\.(png|svg)')
+
+# Resolução padrão (suficiente para tela e para os certificados em HTML)
+DPI_PADRAO = 150
+
+# Dados do exemplo do certificado, usados quando nenhum dado é informado
+EXEMPLO_ERROS = {
+    'pontos_nominais': [0, 25, 50, 75, 100, 150],
+    'erros': [0.002, 0.015, 0.022, 0.018, 0.025, 0.030],
+    'incertezas': [0.008, 0.010, 0.014, 0.012, 0.016, 0.018],
+    'erro_maximo': 0.05
+}
+
+EXEMPLO_CONTRIBUICOES = {
+    'fontes': ['Repetibilidade', 'Resolução', 'Padrão', 'Temperatura', 'Paralelismo'],
+    'contribuicoes': [0.0037, 0.0058, 0.0005, 0.0012, 0.0017]
+}
+
+def _preparar_diretorio_saida(diretorio=None):
+    """
+    Cria o diretório de saída dos gráficos, se necessário
+
+    Returns:
+        Caminho do diretório de saída
+    """
+    diretorio = diretorio or output_dir
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+def _caminho_em_cache(tipo, dados, formato, dpi, diretorio):
+    """
+    Calcula o caminho do arquivo do gráfico a partir do hash dos dados de entrada
+
+    Gráficos com os mesmos dados, formato e resolução têm o mesmo caminho, de modo
+    que um arquivo já existente pode ser reutilizado sem nova renderização.
+    """
+    conteudo = json.dumps(
+        {'tipo': tipo, 'dados': dados, 'formato': formato, 'dpi': dpi, 'versao': VERSAO_GRAFICOS},
+        sort_keys=True, default=float
+    )
+    resumo = hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:20]
+    return os.path.join(_preparar_diretorio_saida(diretorio), f"{tipo}_{resumo}.{formato}")
+
+def _reutilizar(caminho):
+    """
+    Verifica se um gráfico já está em cache e marca o seu uso
+
+    A data de modificação do arquivo é atualizada a cada uso e define a ordem de
+    remoção em _limitar_cache (a data de acesso não é confiável com noatime).
+
+    Returns:
+        True se o arquivo existe e pode ser reutilizado
+    """
+    try:
+        os.utime(caminho)
+        return True
+    except FileNotFoundError:
+        return False
+
+def _limitar_cache(diretorio, capacidade_bytes=None, preservar=None):
+    """
+    Remove os gráficos usados há mais tempo até o diretório respeitar a capacidade
+
+    Args:
+        diretorio: Diretório de saída dos gráficos
+        capacidade_bytes: Total máximo de bytes (padrão: CAPACIDADE_BYTES)
+        preservar: Caminho que não deve ser removido (o gráfico recém-gerado)
+
+    Returns:
+        Número de arquivos removidos
+    """
+    capacidade_bytes = CAPACIDADE_BYTES if capacidade_bytes is None else capacidade_bytes
+    arquivos = []
+    with os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            if ARQUIVO_EM_CACHE.fullmatch(entrada.name):
+                try:
+                    estado = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((estado.st_mtime, estado.st_size, entrada.path))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    removidos = 0
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= capacidade_bytes:
+            break
+        if caminho == preservar:
+            continue
+        try:
+            os.remove(caminho)
+            removidos += 1
+        except FileNotFoundError:
+            # Já removido por outro processo
+            pass
+        total -= tamanho
+    return removidos
+
+def _nova_figura():
+    """
+    Cria uma figura independente do estado global do pyplot
+
+    A figura usa o backend Agg diretamente, podendo ser gerada com segurança em
+    várias threads ou processos ao mesmo tempo.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figura = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figura)
+    return figura
+
+def _salvar(figura, caminho, dpi):
+    """
+    Grava a figura em um arquivo temporário e o move para o destino final
+
+    Em seguida, remove os gráficos antigos se o diretório passou da capacidade.
+    """
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=os.path.splitext(caminho)[1])
+    try:
+        with os.fdopen(descritor, 'wb') as arquivo:
+            figura.savefig(arquivo, format=os.path.splitext(caminho)[1][1:], dpi=dpi, bbox_inches='tight')
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    _limitar_cache(os.path.dirname(caminho), preservar=caminho)
+
+@cronometrar('calibra_renderizacao_segundos', tipo='grafico_erros')
+def gerar_grafico_erros(pontos_nominais=None, erros=None, incertezas=None, erro_maximo=None,
+                        unidade='mm', formato='png', dpi=DPI_PADRAO, diretorio=None):
     """
-    Gera um gráfico de erros de calibração para o exemplo do certificado
+    Gera o gráfico de erros de calibração com barras de incerteza expandida
+
+    Args:
+        pontos_nominais: Valores nominais dos pontos de calibração
+        erros: Erro de medição em cada ponto
+        incertezas: Incerteza expandida em cada ponto
+        erro_maximo: Erro máximo permitido (opcional, desenha a área de conformidade)
+        unidade: Unidade de medida exibida nos eixos
+        formato: 'png' ou 'svg'
+        dpi: Resolução da imagem
+        diretorio: Diretório de saída (opcional, padrão: static/img)
+
+    Sem dados, gera o gráfico do exemplo do certificado.
+
+    Returns:
+        Caminho do arquivo gerado (ou já existente em cache)
+
+    Raises:
+        ValueError: Se a lista de pontos estiver vazia ou as listas tiverem tamanhos diferentes
     """
-    # Dados do exemplo
-    pontos_nominais = [0, 25, 50, 75, 100, 150]
-    erros = [0.002, 0.015, 0.022, 0.018, 0.025, 0.030]
-    incertezas = [0.008, 0.010, 0.014, 0.012, 0.016, 0.018]
-    
-    # Limites de erro
-    erro_max = 0.05
-    erro_min = -0.05
-    
+    if pontos_nominais is None:
+        return gerar_grafico_erros(unidade=unidade, formato=formato, dpi=dpi, diretorio=diretorio,
+                                   **EXEMPLO_ERROS)
+    if not len(pontos_nominais):
+        raise ValueError("O gráfico de erros requer ao menos um ponto")
+    if not len(pontos_nominais) == len(erros) == len(incertezas):
+        raise ValueError("pontos_nominais, erros e incertezas devem ter o mesmo tamanho")
+
+    dados = {
+        'pontos_nominais': [float(v) for v in pontos_nominais],
+        'erros': [float(v) for v in erros],
+        'incertezas': [float(v) for v in incertezas],
+        'erro_maximo': None if erro_maximo is None else float(erro_maximo),
+        'unidade': unidade
+    }
+    output_path = _caminho_em_cache('grafico_erros', dados, formato, dpi, diretorio)
+    if _reutilizar(output_path):
+        return output_path
+
+    pontos_nominais, erros, incertezas = dados['pontos_nominais'], dados['erros'], dados['incertezas']
+
+    # Limites do eixo x com margem de 3% da faixa
+    margem = max((max(pontos_nominais) - min(pontos_nominais)) * 0.03, 1e-9)
+    x_min, x_max = min(pontos_nominais) - margem, max(pontos_nominais) + margem
+
     # Criar figura
-    plt.figure(figsize=(10, 6))
-    
-    # Plotar área de conformidade
-    plt.fill_between([-5, 155], erro_max, erro_min, color='lightgreen', alpha=0.3, label='Área de conformidade')
-    
-    # Plotar linhas de limite
-    plt.axhline(y=erro_max, color='r', linestyle='--', label='Erro máximo permitido')
-    plt.axhline(y=erro_min, color='r', linestyle='--')
-    plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-    
+    figura = _nova_figura()
+    eixo = figura.add_subplot()
+
+    if erro_maximo is not None:
+        # Plotar área de conformidade e linhas de limite
+        eixo.fill_between([x_min, x_max], erro_maximo, -erro_maximo, color='lightgreen', alpha=0.3,
+                          label='Área de conformidade')
+        eixo.axhline(y=erro_maximo, color='r', linestyle='--', label='Erro máximo permitido')
+        eixo.axhline(y=-erro_maximo, color='r', linestyle='--')
+    eixo.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+
     # Plotar pontos de erro com barras de incerteza
-    plt.errorbar(pontos_nominais, erros, yerr=incertezas, fmt='o', color='blue', 
-                 ecolor='blue', elinewidth=1, capsize=5, label='Erro de medição')
-    
+    eixo.errorbar(pontos_nominais, erros, yerr=incertezas, fmt='o', color='blue',
+                  ecolor='blue', elinewidth=1, capsize=5, label='Erro de medição')
+
     # Plotar linha de tendência
-    plt.plot(pontos_nominais, erros, 'b-', alpha=0.7)
-    
+    eixo.plot(pontos_nominais, erros, 'b-', alpha=0.7)
+
     # Configurar gráfico
-    plt.xlabel('Valor Nominal (mm)')
-    plt.ylabel('Erro (mm)')
-    plt.title('Erros de Medição com Incertezas Expandidas')
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    
-    # Ajustar limites
-    plt.xlim(-5, 155)
-    plt.ylim(-0.06, 0.06)
-    
+    eixo.set_xlabel(f'Valor Nominal ({unidade})')
+    eixo.set_ylabel(f'Erro ({unidade})')
+    eixo.set_title('Erros de Medição com Incertezas Expandidas')
+    eixo.grid(True, alpha=0.3)
+    eixo.legend()
+
+    # Ajustar limites (com erros e incertezas nulos, uma faixa de ±1 na unidade)
+    extremo = max([abs(e) + abs(u) for e, u in zip(erros, incertezas)] + [abs(erro_maximo or 0)]) or 1.0
+    eixo.set_xlim(x_min, x_max)
+    eixo.set_ylim(-extremo * 1.2, extremo * 1.2)
+
     # Salvar gráfico
-    output_path = os.path.join(output_dir, 'grafico_erros.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
+    _salvar(figura, output_path, dpi)
+
     return output_path
 
-def gerar_grafico_contribuicoes():
+@cronometrar('calibra_renderizacao_segundos', tipo='grafico_contribuicoes')
+def gerar_grafico_contribuicoes(fontes=None, contribuicoes=None, unidade='mm', formato='png',
+                                dpi=DPI_PADRAO, diretorio=None):
     """
-    Gera um gráfico de contribuições de incerteza para o exemplo do certificado
+    Gera o gráfico de contribuições de incerteza por fonte
+
+    Args:
+        fontes: Descrição de cada fonte de incerteza
+        contribuicoes: Contribuição (incerteza padrão × coeficiente de sensibilidade) de cada fonte
+        unidade: Unidade de medida exibida no eixo
+        formato: 'png' ou 'svg'
+        dpi: Resolução da imagem
+        diretorio: Diretório de saída (opcional, padrão: static/img)
+
+    Sem dados, gera o gráfico do exemplo do certificado.
+
+    Returns:
+        Caminho do arquivo gerado (ou já existente em cache)
+
+    Raises:
+        ValueError: Se a lista de fontes estiver vazia ou tiver tamanho diferente das contribuições
     """
-    # Dados do exemplo
-    fontes = ['Repetibilidade', 'Resolução', 'Padrão', 'Temperatura', 'Paralelismo']
-    contribuicoes = [0.0037, 0.0058, 0.0005, 0.0012, 0.0017]
-    
+    if fontes is None:
+        return gerar_grafico_contribuicoes(unidade=unidade, formato=formato, dpi=dpi, diretorio=diretorio,
+                                           **EXEMPLO_CONTRIBUICOES)
+    if not len(fontes):
+        raise ValueError("O gráfico de contribuições requer ao menos uma fonte")
+    if len(fontes) != len(contribuicoes):
+        raise ValueError("fontes e contribuicoes devem ter o mesmo tamanho")
+
     # Ordenar por contribuição (maior para menor)
-    indices = np.argsort(contribuicoes)[::-1]
-    fontes = [fontes[i] for i in indices]
-    contribuicoes = [contribuicoes[i] for i in indices]
-    
+    ordenadas = sorted(zip(fontes, (abs(float(c)) for c in contribuicoes)), key=lambda f: f[1], reverse=True)
+    dados = {
+        'fontes': [str(f) for f, _ in ordenadas],
+        'contribuicoes': [c for _, c in ordenadas],
+        'unidade': unidade
+    }
+    output_path = _caminho_em_cache('contribuicoes_incerteza', dados, formato, dpi, diretorio)
+    if _reutilizar(output_path):
+        return output_path
+
+    fontes, contribuicoes = dados['fontes'], dados['contribuicoes']
+
     # Criar figura
-    plt.figure(figsize=(10, 6))
-    
+    figura = _nova_figura()
+    eixo = figura.add_subplot()
+
     # Plotar barras
-    bars = plt.bar(fontes, contribuicoes, color='skyblue')
-    
+    bars = eixo.bar(fontes, contribuicoes, color='skyblue')
+
     # Adicionar valores nas barras
+    deslocamento = max(contribuicoes, default=0) * 0.02
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 0.0001,
-                 f'{height:.4f}',
-                 ha='center', va='bottom', rotation=0)
-    
+        eixo.text(bar.get_x() + bar.get_width()/2., height + deslocamento,
+                  f'{height:.4f}',
+                  ha='center', va='bottom', rotation=0)
+
     # Configurar gráfico
-    plt.xlabel('Fontes de Incerteza')
-    plt.ylabel('Contribuição (mm)')
-    plt.title('Contribuições de Incerteza por Fonte')
-    plt.grid(True, axis='y', alpha=0.3)
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    
+    eixo.set_xlabel('Fontes de Incerteza')
+    eixo.set_ylabel(f'Contribuição ({unidade})')
+    eixo.set_title('Contribuições de Incerteza por Fonte')
+    eixo.grid(True, axis='y', alpha=0.3)
+    eixo.tick_params(axis='x', labelrotation=45)
+    for rotulo in eixo.get_xticklabels():
+        rotulo.set_horizontalalignment('right')
+    figura.tight_layout()
+
     # Salvar gráfico
-    output_path = os.path.join(output_dir, 'contribuicoes_incerteza.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
+    _salvar(figura, output_path, dpi)
+
     return output_path
 
+def dados_graficos_calibracao(calibracao, erro_maximo=None, unidade='mm'):
+    """
+    Extrai os dados dos gráficos de uma calibração lida do banco
+
+    Args:
+        calibracao: Dicionário retornado por database.calibracoes.carregar_calibracao
+        erro_maximo: Erro máximo permitido (opcional)
+        unidade: Unidade de medida
+
+    Returns:
+        Lista de tarefas (tipo, parâmetros) para gerar_graficos_lote: o gráfico de
+        erros e o de contribuições do ponto de maior incerteza expandida (cada um
+        apenas se a calibração tiver os dados necessários; a lista pode ser vazia)
+    """
+    pontos = [p for p in calibracao['pontos'] if p['erro'] is not None and p['incerteza_expandida'] is not None]
+    tarefas = []
+    if pontos:
+        tarefas.append(('erros', {
+            'pontos_nominais': [p['valor_referencia'] for p in pontos],
+            'erros': [p['erro'] for p in pontos],
+            'incertezas': [p['incerteza_expandida'] for p in pontos],
+            'erro_maximo': erro_maximo,
+            'unidade': unidade
+        }))
+
+    ponto_orcamento = max(pontos, key=lambda p: p['incerteza_expandida'], default=None)
+    if ponto_orcamento is not None and ponto_orcamento['fontes']:
+        tarefas.append(('contribuicoes', {
+            'fontes': [f['descricao'] for f in ponto_orcamento['fontes']],
+            'contribuicoes': [f['contribuicao'] or 0.0 for f in ponto_orcamento['fontes']],
+            'unidade': unidade
+        }))
+
+    return tarefas
+
+GERADORES = {
+    'erros': gerar_grafico_erros,
+    'contribuicoes': gerar_grafico_contribuicoes
+}
+
+def _gerar_tarefa(tarefa):
+    """Executa uma tarefa (tipo, parâmetros) de geração de gráfico"""
+    tipo, parametros = tarefa
+    return GERADORES[tipo](**parametros)
+
+def gerar_graficos_lote(tarefas, processos=None):
+    """
+    Gera vários gráficos em paralelo
+
+    Args:
+        tarefas: Lista de tuplas (tipo, parâmetros), com tipo 'erros' ou 'contribuicoes'
+            e os parâmetros da função geradora correspondente
+        processos: Número de processos (padrão: número de CPUs; 1 executa no próprio processo)
+
+    Returns:
+        Lista com o caminho de cada gráfico, na ordem das tarefas
+    """
+    tarefas = list(tarefas)
+    processos = processos or os.cpu_count() or 1
+
+    if processos == 1 or len(tarefas) <= 1:
+        return [_gerar_tarefa(tarefa) for tarefa in tarefas]
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_gerar_tarefa, tarefas, chunksize=max(1, len(tarefas) // (4 * processos))))
+
 if __name__ == "__main__":
     gerar_grafico_erros()
     gerar_grafico_contribuicoes()
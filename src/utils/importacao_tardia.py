@@ -0,0 +1,57 @@
+"""
+Importação tardia de dependências pesadas (NumPy, SciPy, Matplotlib)
+Adia o carregamento desses módulos para o primeiro uso, reduzindo o tempo de
+inicialização e a memória dos workers do gunicorn que não chegam a usá-los
+"""
+
+import importlib
+
+
+class ModuloTardio:
+    """
+    Substituto de um módulo que só é importado no primeiro acesso a um atributo
+
+    Exemplo:
+        np = ModuloTardio('numpy')
+        np.sqrt(2)  # NumPy é importado aqui
+    """
+
+    def __init__(self, nome):
+        """
+        Inicializa o módulo tardio
+
+        Args:
+            nome: Nome completo do módulo a importar (ex.: 'matplotlib.pyplot')
+        """
+        self._nome = nome
+        self._modulo = None
+
+    def _carregar(self):
+        """Importa o módulo real, se ainda não tiver sido importado"""
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        # Chamado apenas para atributos que não pertencem ao próprio substituto
+        return getattr(self._carregar(), atributo)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self):
+        estado = 'carregado' if self._modulo is not None else 'não carregado'
+        return f"<módulo tardio '{self._nome}' ({estado})>"
+
+
+def importar_tardio(nome):
+    """
+    Retorna um substituto para o módulo informado, importado somente no primeiro uso
+
+    Args:
+        nome: Nome completo do módulo
+
+    Returns:
+        Instância de ModuloTardio
+    """
+    return ModuloTardio(nome)
@@ -0,0 +1,285 @@
+"""
+Métricas de desempenho opcionais (formato de exposição do Prometheus)
+Cronometra as etapas do cálculo metrológico, as operações de banco e as
+renderizações, agregando as durações em histogramas. Tudo é desativado por
+padrão: com CALIBRA_METRICAS desligado, cada ponto instrumentado custa apenas
+a verificação de um booleano.
+
+Inclui também um profiler por amostragem (pilhas de todas as threads a cada
+intervalo), ligado e desligado em tempo de execução, que exporta as pilhas no
+formato "collapsed" usado pelos flame graphs.
+
+As métricas são mantidas por processo: com vários workers do gunicorn, cada
+coleta reflete o worker que atendeu a requisição.
+"""
+
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Coleta de métricas ligada desde a inicialização
+ATIVO = os.environ.get('CALIBRA_METRICAS', '0').lower() in ('1', 'true', 'sim')
+
+# Limites superiores dos intervalos dos histogramas, em segundos
+LIMITES_PADRAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Intervalo entre amostras do profiler, em segundos
+INTERVALO_PROFILER = float(os.environ.get('CALIBRA_PROFILER_INTERVALO', '0.005'))
+
+# Profundidade máxima das pilhas amostradas
+PROFUNDIDADE_MAXIMA = 64
+
+# Descrição das métricas conhecidas (linha # HELP)
+DESCRICOES = {
+    'calibra_calculo_segundos': 'Duração das etapas do cálculo metrológico',
+    'calibra_banco_segundos': 'Duração das operações de banco de dados',
+    'calibra_renderizacao_segundos': 'Duração da renderização de gráficos e certificados',
+    'calibra_requisicao_segundos': 'Duração das requisições HTTP'
+}
+
+
+class Histograma:
+    """Histograma cumulativo de durações, com soma e contagem"""
+
+    __slots__ = ('limites', 'contagens', 'soma', 'total', '_trava')
+
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self._trava = threading.Lock()
+
+    def observar(self, valor):
+        """Registra uma duração em segundos"""
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            self.contagens[indice] += 1
+            self.soma += valor
+            self.total += 1
+
+    def instantaneo(self):
+        """Retorna (contagens acumuladas por limite, incluindo +Inf; soma; total)"""
+        with self._trava:
+            contagens, soma, total = list(self.contagens), self.soma, self.total
+        acumuladas = []
+        acumulado = 0
+        for contagem in contagens:
+            acumulado += contagem
+            acumuladas.append(acumulado)
+        return acumuladas, soma, total
+
+
+class RegistroMetricas:
+    """Conjunto de histogramas indexados por nome da métrica e rótulos"""
+
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = limites
+        self._histogramas = {}
+        self._trava = threading.Lock()
+
+    def histograma(self, nome, rotulos=()):
+        """
+        Retorna o histograma de uma métrica e combinação de rótulos, criando-o se necessário
+
+        Args:
+            nome: Nome da métrica
+            rotulos: Tupla ordenada de pares (rótulo, valor)
+        """
+        chave = (nome, rotulos)
+        histograma = self._histogramas.get(chave)
+        if histograma is None:
+            with self._trava:
+                histograma = self._histogramas.setdefault(chave, Histograma(self.limites))
+        return histograma
+
+    def observar(self, nome, duracao, **rotulos):
+        """Registra uma duração (segundos) na métrica com os rótulos informados"""
+        self.histograma(nome, tuple(sorted(rotulos.items()))).observar(duracao)
+
+    def limpar(self):
+        """Descarta todas as observações"""
+        with self._trava:
+            self._histogramas.clear()
+
+    def exportar(self):
+        """
+        Exporta todos os histogramas no formato de texto do Prometheus
+
+        Returns:
+            Texto da exposição (versão 0.0.4)
+        """
+        with self._trava:
+            itens = sorted(self._histogramas.items())
+
+        linhas = []
+        nome_anterior = None
+        for (nome, rotulos), histograma in itens:
+            if nome != nome_anterior:
+                linhas.append(f"# HELP {nome} {DESCRICOES.get(nome, nome)}")
+                linhas.append(f"# TYPE {nome} histogram")
+                nome_anterior = nome
+
+            acumuladas, soma, total = histograma.instantaneo()
+            for limite, acumulada in zip(histograma.limites + (float('inf'),), acumuladas):
+                texto_limite = '+Inf' if limite == float('inf') else repr(limite)
+                linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', texto_limite),))} {acumulada}")
+            linhas.append(f"{nome}_sum{_rotulos(rotulos)} {soma!r}")
+            linhas.append(f"{nome}_count{_rotulos(rotulos)} {total}")
+
+        return '\n'.join(linhas) + '\n' if linhas else ''
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(rotulos):
+    """Formata os rótulos como {a="1",b="2"} (vazio se não houver rótulos)"""
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos) + '}'
+
+
+registro = RegistroMetricas()
+_estado = {'ativo': ATIVO}
+
+
+def ativo():
+    """Indica se a coleta de métricas está ligada"""
+    return _estado['ativo']
+
+
+def ativar(ligar=True):
+    """Liga ou desliga a coleta de métricas em tempo de execução"""
+    _estado['ativo'] = bool(ligar)
+
+
+@contextmanager
+def medir(nome, **rotulos):
+    """
+    Cronometra o bloco e registra a duração na métrica (se a coleta estiver ligada)
+
+    Exemplo:
+        with medir('calibra_banco_segundos', operacao='consulta_vencidas'):
+            ...
+    """
+    if not _estado['ativo']:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+
+def cronometrar(nome, **rotulos):
+    """
+    Decorador que cronometra cada chamada da função (se a coleta estiver ligada)
+
+    Os rótulos são fixados na decoração; com a coleta desligada, a função é
+    chamada diretamente.
+    """
+    chave = tuple(sorted(rotulos.items()))
+
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def cronometrada(*args, **kwargs):
+            if not _estado['ativo']:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registro.histograma(nome, chave).observar(time.perf_counter() - inicio)
+        return cronometrada
+    return decorar
+
+
+class ProfilerAmostragem:
+    """
+    Profiler por amostragem: uma thread registra, a cada intervalo, a pilha de
+    chamadas de todas as outras threads do processo
+
+    O custo é proporcional à frequência de amostragem, e não ao número de
+    chamadas de funções, o que permite ligá-lo em produção sob carga.
+    """
+
+    def __init__(self, intervalo=INTERVALO_PROFILER):
+        """
+        Args:
+            intervalo: Intervalo entre amostras, em segundos
+        """
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._thread = None
+        self._parar = threading.Event()
+        self._trava = threading.Lock()
+
+    @property
+    def ativo(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        """Inicia a amostragem (sem efeito se já estiver ativa)"""
+        with self._trava:
+            if self.ativo:
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._amostrar, name='profiler-amostragem', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        """Interrompe a amostragem, mantendo as pilhas já coletadas"""
+        with self._trava:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._parar.set()
+            thread.join()
+
+    def limpar(self):
+        """Descarta as pilhas coletadas"""
+        with self._trava:
+            self.pilhas.clear()
+            self.amostras = 0
+
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            amostra = Counter()
+            for ident, quadro in sys._current_frames().items():
+                if ident != proprio:
+                    amostra[_pilha(quadro)] += 1
+            with self._trava:
+                self.pilhas.update(amostra)
+                self.amostras += 1
+
+    def exportar(self):
+        """
+        Exporta as pilhas no formato "collapsed" (uma linha "f1;f2;f3 contagem" por pilha),
+        aceito por flamegraph.pl, speedscope e similares
+        """
+        with self._trava:
+            pilhas = self.pilhas.most_common()
+        return ''.join(f"{pilha} {contagem}\n" for pilha, contagem in pilhas)
+
+
+def _pilha(quadro):
+    """Pilha de chamadas a partir de um frame, da raiz para a função atual"""
+    funcoes = []
+    while quadro is not None and len(funcoes) < PROFUNDIDADE_MAXIMA:
+        codigo = quadro.f_code
+        funcoes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+        quadro = quadro.f_back
+    return ';'.join(reversed(funcoes))
+
+
+profiler = ProfilerAmostragem()
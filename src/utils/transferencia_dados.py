@@ -0,0 +1,559 @@
+"""
+Importação e exportação em lote de instrumentos, padrões e pontos de calibração
+Lê e grava CSV e NDJSON em blocos, com memória limitada qualquer que seja o
+tamanho do arquivo, e exporta opcionalmente em Parquet (requer o pacote pyarrow)
+para as análises.
+
+Na importação, cada bloco de linhas é validado de uma vez: os tipos de
+instrumento e os setores são resolvidos por mapas nome -> id carregados no
+início, e os códigos de instrumentos e números de calibrações são conferidos
+com uma consulta por bloco. As linhas válidas do bloco são gravadas em uma única
+transação com executemany; as inválidas são relatadas (número da linha e
+motivo) sem interromper a importação. As colunas exportadas são as mesmas
+aceitas na importação, com as chaves estrangeiras representadas pelos nomes
+(tipo, setor) e códigos (instrumento, calibração).
+
+Os pontos de calibração importados criam as calibrações informadas (coluna
+calibracao, com instrumento e data_calibracao) como concluídas; pontos de
+calibrações que já existiam antes da importação são rejeitados, de modo que
+importar o mesmo arquivo duas vezes não duplica o histórico.
+
+Uso (a partir do diretório src):
+    python utils/transferencia_dados.py importar instrumentos instrumentos.csv
+    python utils/transferencia_dados.py importar pontos_calibracao historico.ndjson --criar-referencias
+    python utils/transferencia_dados.py exportar pontos_calibracao historico.parquet
+"""
+
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import sys
+import time
+
+# Permitir a execução direta do script (python utils/transferencia_dados.py)
+if __package__ in (None, ''):
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import conexao as banco
+from database.calibracoes import versao_dados_em_lote
+
+# Linhas validadas e gravadas por transação (e lidas por vez na exportação)
+TAMANHO_LOTE = 5000
+
+# Erros de linha guardados no resumo da importação
+MAX_ERROS_RELATADOS = 1000
+
+# Quantidade máxima de parâmetros por consulta com IN (...)
+TAMANHO_CONSULTA = 500
+
+FORMATOS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.parquet': 'parquet'}
+
+# Número com vírgula decimal e, opcionalmente, ponto de milhar em grupos de três (1.234,5)
+NUMERO_VIRGULA = re.compile(r'[+-]?(\d{1,3}(\.\d{3})+|\d*),\d*([eE][+-]?\d+)?')
+
+
+def _texto(valor):
+    return str(valor).strip()
+
+
+def _real(valor):
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    texto = str(valor).strip()
+    # Planilhas em português: vírgula decimal (1,5) e, opcionalmente, ponto de milhar (1.234,5);
+    # valores ambíguos (1,234.5 ou 1,234,5) são rejeitados em vez de lidos com outra escala
+    if ',' in texto:
+        if not NUMERO_VIRGULA.fullmatch(texto):
+            raise ValueError(f"{valor!r} não é um número (separador decimal ambíguo)")
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto)
+
+
+def _inteiro(valor):
+    numero = _real(valor)
+    if not numero.is_integer():
+        raise ValueError(f"{valor!r} não é um número inteiro")
+    return int(numero)
+
+
+def _data(valor):
+    """Datas ISO (AAAA-MM-DD) ou no formato brasileiro (DD/MM/AAAA)"""
+    texto = str(valor).strip()[:10]
+    if '/' in texto:
+        return datetime.datetime.strptime(texto, '%d/%m/%Y').date().isoformat()
+    return datetime.date.fromisoformat(texto).isoformat()
+
+
+def _booleano(valor):
+    texto = str(valor).strip().lower()
+    if texto in ('1', 'true', 'sim', 's', 'conforme'):
+        return 1
+    if texto in ('0', 'false', 'nao', 'não', 'n', 'nao_conforme'):
+        return 0
+    raise ValueError(f"{valor!r} não é um valor lógico")
+
+
+# Campos de cada entidade: (coluna do arquivo, conversão, obrigatório); as colunas
+# tipo e setor são resolvidas em tipo_id e setor_id
+ENTIDADES = {
+    'instrumentos': (
+        ('codigo', _texto, True), ('descricao', _texto, True), ('tipo', _texto, False),
+        ('fabricante', _texto, False), ('modelo', _texto, False), ('numero_serie', _texto, False),
+        ('resolucao', _real, False), ('faixa_minima', _real, False), ('faixa_maxima', _real, False),
+        ('unidade', _texto, False), ('localizacao', _texto, False), ('setor', _texto, False),
+        ('status', _texto, False), ('criticidade', _texto, False), ('periodicidade_calibracao', _inteiro, False),
+        ('data_ultima_calibracao', _data, False), ('data_proxima_calibracao', _data, False),
+        ('erro_maximo_permitido', _real, False), ('observacoes', _texto, False)
+    ),
+    'padroes': (
+        ('codigo', _texto, True), ('descricao', _texto, True), ('tipo', _texto, False),
+        ('fabricante', _texto, False), ('modelo', _texto, False), ('numero_serie', _texto, False),
+        ('resolucao', _real, False), ('faixa_minima', _real, False), ('faixa_maxima', _real, False),
+        ('unidade', _texto, False), ('incerteza_padrao', _real, False), ('fator_k', _real, False),
+        ('certificado_numero', _texto, False), ('certificado_validade', _data, False),
+        ('rastreabilidade', _texto, False), ('status', _texto, False), ('observacoes', _texto, False)
+    ),
+    'pontos_calibracao': (
+        ('calibracao', _texto, True), ('instrumento', _texto, False), ('data_calibracao', _data, False),
+        ('sequencia', _inteiro, True), ('valor_referencia', _real, True), ('valor_lido', _real, True),
+        ('erro', _real, False), ('incerteza_padrao', _real, False), ('incerteza_expandida', _real, False),
+        ('fator_k', _real, False), ('conforme', _booleano, False), ('erro_maximo_permitido', _real, False),
+        ('observacoes', _texto, False)
+    )
+}
+
+SQL_EXPORTAR = {
+    'instrumentos': (
+        "SELECT i.codigo, i.descricao, t.nome AS tipo, i.fabricante, i.modelo, i.numero_serie, i.resolucao, "
+        "i.faixa_minima, i.faixa_maxima, i.unidade, i.localizacao, s.nome AS setor, i.status, i.criticidade, "
+        "i.periodicidade_calibracao, i.data_ultima_calibracao, i.data_proxima_calibracao, "
+        "i.erro_maximo_permitido, i.observacoes FROM instrumentos i "
+        "LEFT JOIN tipos_instrumentos t ON t.id = i.tipo_id LEFT JOIN setores s ON s.id = i.setor_id "
+        "ORDER BY i.id"
+    ),
+    'padroes': (
+        "SELECT p.codigo, p.descricao, t.nome AS tipo, p.fabricante, p.modelo, p.numero_serie, p.resolucao, "
+        "p.faixa_minima, p.faixa_maxima, p.unidade, p.incerteza_padrao, p.fator_k, p.certificado_numero, "
+        "p.certificado_validade, p.rastreabilidade, p.status, p.observacoes FROM padroes p "
+        "LEFT JOIN tipos_instrumentos t ON t.id = p.tipo_id ORDER BY p.id"
+    ),
+    'pontos_calibracao': (
+        "SELECT c.numero AS calibracao, i.codigo AS instrumento, "
+        "date(COALESCE(c.data_fim, c.data_inicio)) AS data_calibracao, p.sequencia, p.valor_referencia, "
+        "p.valor_lido, p.erro, p.incerteza_padrao, p.incerteza_expandida, p.fator_k, p.conforme, "
+        "p.erro_maximo_permitido, p.observacoes FROM pontos_calibracao p "
+        "JOIN calibracoes c ON c.id = p.calibracao_id LEFT JOIN instrumentos i ON i.id = c.instrumento_id "
+        "ORDER BY p.calibracao_id, p.sequencia, p.id"
+    )
+}
+
+SQL_INSERIR_CALIBRACAO = (
+    "INSERT INTO calibracoes (numero, instrumento_id, data_inicio, data_fim, status) "
+    "VALUES (?, ?, ?, ?3, 'concluida')"
+)
+
+
+def _formato(caminho, formato=None):
+    formato = formato or FORMATOS.get(os.path.splitext(caminho)[1].lower())
+    if formato not in ('csv', 'ndjson', 'parquet'):
+        raise ValueError(f"Formato de arquivo não suportado: {caminho} (use .csv, .ndjson ou .parquet)")
+    return formato
+
+
+def _pyarrow():
+    """Importa o pacote opcional pyarrow, usado na exportação em Parquet"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("A exportação em Parquet requer o pacote 'pyarrow' instalado")
+    return pyarrow
+
+
+def _selecionar_em(conexao, sql, valores):
+    """Executa uma consulta com 'IN ({})' para uma lista de valores, em blocos"""
+    valores = list(valores)
+    linhas = []
+    for inicio in range(0, len(valores), TAMANHO_CONSULTA):
+        bloco = valores[inicio:inicio + TAMANHO_CONSULTA]
+        linhas.extend(conexao.execute(sql.format(','.join('?' * len(bloco))), bloco).fetchall())
+    return linhas
+
+
+def ler_registros(arquivo, formato, delimitador=None):
+    """
+    Lê os registros de um arquivo CSV ou NDJSON, um por vez
+
+    Args:
+        arquivo: Arquivo de texto aberto
+        formato: 'csv' ou 'ndjson'
+        delimitador: Delimitador do CSV (opcional, padrão: ';' se o cabeçalho o contiver, senão ',')
+
+    Returns:
+        Iterador de tuplas (número da linha, dicionário coluna -> valor)
+    """
+    if formato == 'ndjson':
+        for numero, linha in enumerate(arquivo, 1):
+            if linha.strip():
+                try:
+                    registro = json.loads(linha)
+                except ValueError as erro:
+                    registro = erro
+                yield numero, registro
+        return
+
+    cabecalho = arquivo.readline()
+    if delimitador is None:
+        delimitador = ';' if ';' in cabecalho else ','
+    colunas = [coluna.strip().lstrip('\ufeff') for coluna in next(csv.reader([cabecalho], delimiter=delimitador))]
+    for numero, valores in enumerate(csv.reader(arquivo, delimiter=delimitador), 2):
+        if any(valor.strip() for valor in valores):
+            yield numero, dict(zip(colunas, valores))
+
+
+def _lotes(registros, tamanho):
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _converter(registro, campos):
+    """Converte e valida os campos de um registro; lança ValueError com o motivo"""
+    if not isinstance(registro, dict):
+        raise ValueError(f"registro inválido ({registro})")
+    linha = {}
+    for nome, conversao, obrigatorio in campos:
+        valor = registro.get(nome)
+        if valor is None or (isinstance(valor, str) and not valor.strip()):
+            if obrigatorio:
+                raise ValueError(f"'{nome}' é obrigatório")
+            linha[nome] = None
+            continue
+        try:
+            linha[nome] = conversao(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{nome}' inválido: {valor!r}")
+    return linha
+
+
+class _Referencias:
+    """
+    Mapas nome -> id de tipos de instrumento e setores, carregados uma vez por importação
+
+    Os tipos e setores criados por um bloco ficam em mapas pendentes até a
+    transação do bloco ser confirmada (confirmar); se ela for desfeita, os ids
+    pendentes são descartados (descartar) e não são usados pelos blocos seguintes.
+    """
+
+    def __init__(self, conexao, criar):
+        self.conexao = conexao
+        self.criar = criar
+        self.mapas = {
+            'tipo': self._carregar("SELECT nome, id FROM tipos_instrumentos"),
+            'setor': self._carregar("SELECT nome, id FROM setores")
+        }
+        self.pendentes = {'tipo': {}, 'setor': {}}
+
+    def _carregar(self, sql):
+        return {nome.strip().casefold(): id_ for nome, id_ in self.conexao.execute(sql) if nome}
+
+    def resolver(self, coluna, nome):
+        """Id do tipo ou setor com esse nome (criado, se permitido); lança ValueError se não existir"""
+        if nome is None:
+            return None
+        chave = nome.casefold()
+        id_ = self.mapas[coluna].get(chave) or self.pendentes[coluna].get(chave)
+        if id_ is None:
+            if not self.criar:
+                raise ValueError(f"{coluna} '{nome}' não cadastrado")
+            tabela = 'tipos_instrumentos' if coluna == 'tipo' else 'setores'
+            id_ = self.conexao.execute(f"INSERT INTO {tabela} (nome) VALUES (?)", (nome,)).lastrowid
+            self.pendentes[coluna][chave] = id_
+        return id_
+
+    def confirmar(self):
+        """Incorpora aos mapas os tipos e setores criados pelo bloco já gravado"""
+        for coluna, pendentes in self.pendentes.items():
+            self.mapas[coluna].update(pendentes)
+            pendentes.clear()
+
+    def descartar(self):
+        """Esquece os tipos e setores criados por um bloco cuja transação foi desfeita"""
+        for pendentes in self.pendentes.values():
+            pendentes.clear()
+
+
+def _importar_cadastro(conexao, tabela, validos, referencias, erros):
+    """Valida e grava um bloco de instrumentos ou padrões"""
+    codigos = [linha['codigo'] for _, linha in validos]
+    existentes = {codigo for (codigo,) in _selecionar_em(
+        conexao, f"SELECT codigo FROM {tabela} WHERE codigo IN ({{}})", set(codigos)
+    )}
+
+    linhas, vistos = [], set()
+    for numero, linha in validos:
+        try:
+            if linha['codigo'] in existentes or linha['codigo'] in vistos:
+                raise ValueError(f"código '{linha['codigo']}' já cadastrado")
+            linha['status'] = linha['status'] or 'ativo'
+            linha['tipo_id'] = referencias.resolver('tipo', linha.pop('tipo'))
+            if 'setor' in linha:
+                linha['setor_id'] = referencias.resolver('setor', linha.pop('setor'))
+        except ValueError as erro:
+            erros.append((numero, str(erro)))
+            continue
+        vistos.add(linha['codigo'])
+        linhas.append(linha)
+
+    if linhas:
+        colunas = list(linhas[0])
+        conexao.executemany(
+            f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join(':' + c for c in colunas)})", linhas
+        )
+    return len(linhas)
+
+
+def _importar_pontos(conexao, validos, criadas, erros):
+    """
+    Valida e grava um bloco de pontos de calibração, criando as calibrações novas
+
+    Args:
+        criadas: Calibrações criadas pelos blocos já gravados desta importação (numero -> id)
+
+    Returns:
+        Tupla (pontos inseridos, calibrações criadas pelo bloco (numero -> id)), a
+        incorporar em criadas após a confirmação da transação do bloco
+    """
+    numeros = {linha['calibracao'] for _, linha in validos} - set(criadas)
+    anteriores = {numero for (numero,) in _selecionar_em(
+        conexao, "SELECT numero FROM calibracoes WHERE numero IN ({})", numeros
+    )}
+    instrumentos = dict(_selecionar_em(
+        conexao, "SELECT codigo, id FROM instrumentos WHERE codigo IN ({})",
+        {linha['instrumento'] for _, linha in validos if linha['instrumento'] is not None}
+    ))
+
+    novas, aceitos = {}, []
+    for numero, linha in validos:
+        calibracao = linha['calibracao']
+        try:
+            if calibracao in anteriores:
+                raise ValueError(f"calibração '{calibracao}' já existia antes da importação")
+            if calibracao not in criadas and calibracao not in novas:
+                if linha['instrumento'] not in instrumentos:
+                    raise ValueError(f"instrumento '{linha['instrumento']}' não cadastrado")
+                if linha['data_calibracao'] is None:
+                    raise ValueError("'data_calibracao' é obrigatório na primeira linha de uma calibração")
+                novas[calibracao] = (calibracao, instrumentos[linha['instrumento']], linha['data_calibracao'])
+        except ValueError as erro:
+            erros.append((numero, str(erro)))
+            continue
+        aceitos.append(linha)
+
+    ids = dict(criadas)
+    if novas:
+        conexao.executemany(SQL_INSERIR_CALIBRACAO, novas.values())
+        novas = dict(_selecionar_em(conexao, "SELECT numero, id FROM calibracoes WHERE numero IN ({})", novas))
+        ids.update(novas)
+
+    # Uma atualização da versão dos dados por calibração do bloco, e não por ponto
+    with versao_dados_em_lote(conexao, {ids[linha['calibracao']] for linha in aceitos}):
+        conexao.executemany(
+            "INSERT INTO pontos_calibracao (calibracao_id, sequencia, valor_referencia, valor_lido, erro, "
+            "incerteza_padrao, incerteza_expandida, fator_k, conforme, erro_maximo_permitido, observacoes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (ids[linha['calibracao']], linha['sequencia'], linha['valor_referencia'], linha['valor_lido'],
+                 linha['erro'] if linha['erro'] is not None else linha['valor_lido'] - linha['valor_referencia'],
+                 linha['incerteza_padrao'], linha['incerteza_expandida'], linha['fator_k'], linha['conforme'],
+                 linha['erro_maximo_permitido'], linha['observacoes'])
+                for linha in aceitos
+            ]
+        )
+    return len(aceitos), novas
+
+
+def importar(entidade, caminho, formato=None, delimitador=None, criar_referencias=False,
+             tamanho_lote=TAMANHO_LOTE, conexao=None, progresso=None):
+    """
+    Importa instrumentos, padrões ou pontos de calibração de um arquivo CSV ou NDJSON
+
+    Args:
+        entidade: 'instrumentos', 'padroes' ou 'pontos_calibracao'
+        caminho: Arquivo de origem (ou '-' para a entrada padrão)
+        formato: 'csv' ou 'ndjson' (padrão: pela extensão do arquivo)
+        delimitador: Delimitador do CSV (padrão: detectado pelo cabeçalho)
+        criar_referencias: Se True, cadastra os tipos e setores não encontrados
+        tamanho_lote: Linhas validadas e gravadas por transação
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+        progresso: Função chamada com o resumo parcial após cada lote (opcional)
+
+    Returns:
+        Dicionário com linhas lidas, inseridas, rejeitadas, erros [(linha, motivo), ...]
+        (até MAX_ERROS_RELATADOS) e tempo
+    """
+    if entidade not in ENTIDADES:
+        raise ValueError(f"Entidade não suportada: {entidade} (use {', '.join(ENTIDADES)})")
+    formato = formato or ('csv' if caminho == '-' else _formato(caminho))
+    if formato == 'parquet':
+        raise ValueError("A importação aceita apenas CSV e NDJSON")
+
+    conexao = conexao or banco.obter_conexao()
+    campos = ENTIDADES[entidade]
+    referencias = _Referencias(conexao, criar_referencias)
+    criadas = {}
+    resumo = {'linhas': 0, 'inseridas': 0, 'rejeitadas': 0, 'erros': []}
+    inicio = time.perf_counter()
+
+    arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8-sig', newline='')
+    try:
+        for lote in _lotes(ler_registros(arquivo, formato, delimitador), tamanho_lote):
+            erros, validos = [], []
+            for numero, registro in lote:
+                try:
+                    validos.append((numero, _converter(registro, campos)))
+                except ValueError as erro:
+                    erros.append((numero, str(erro)))
+
+            novas = {}
+            try:
+                with banco.transacao(conexao):
+                    if entidade == 'pontos_calibracao':
+                        inseridas, novas = _importar_pontos(conexao, validos, criadas, erros)
+                    else:
+                        inseridas = _importar_cadastro(conexao, entidade, validos, referencias, erros)
+            except BaseException:
+                referencias.descartar()
+                raise
+            # Ids criados pelo bloco só passam a ser usados depois do COMMIT
+            referencias.confirmar()
+            criadas.update(novas)
+
+            resumo['linhas'] += len(lote)
+            resumo['inseridas'] += inseridas
+            resumo['rejeitadas'] += len(erros)
+            espaco = MAX_ERROS_RELATADOS - len(resumo['erros'])
+            resumo['erros'].extend(sorted(erros)[:max(espaco, 0)])
+            if progresso:
+                progresso(dict(resumo, tempo=time.perf_counter() - inicio))
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+    resumo['tempo'] = time.perf_counter() - inicio
+    return resumo
+
+
+def _tipo_arrow(pa, conversao):
+    return {_real: pa.float64(), _inteiro: pa.int64(), _booleano: pa.int8(), _data: pa.date32()}.get(
+        conversao, pa.string()
+    )
+
+
+def exportar(entidade, caminho, formato=None, delimitador=',', tamanho_lote=TAMANHO_LOTE, conexao=None):
+    """
+    Exporta instrumentos, padrões ou pontos de calibração em CSV, NDJSON ou Parquet
+
+    As linhas são lidas e gravadas em blocos de tamanho_lote (um grupo de linhas
+    por bloco no Parquet), sem carregar a tabela inteira em memória.
+
+    Args:
+        entidade: 'instrumentos', 'padroes' ou 'pontos_calibracao'
+        caminho: Arquivo de destino (ou '-' para a saída padrão, em CSV ou NDJSON)
+        formato: 'csv', 'ndjson' ou 'parquet' (padrão: pela extensão do arquivo)
+        delimitador: Delimitador do CSV
+        tamanho_lote: Linhas lidas e gravadas por vez
+        conexao: Conexão a usar (opcional, padrão: conexão da thread atual)
+
+    Returns:
+        Dicionário com as linhas exportadas e o tempo
+    """
+    if entidade not in ENTIDADES:
+        raise ValueError(f"Entidade não suportada: {entidade} (use {', '.join(ENTIDADES)})")
+    formato = formato or ('csv' if caminho == '-' else _formato(caminho))
+    pa = _pyarrow() if formato == 'parquet' else None
+
+    conexao = conexao or banco.obter_conexao()
+    campos = ENTIDADES[entidade]
+    colunas = [nome for nome, _, _ in campos]
+    inicio = time.perf_counter()
+    exportadas = 0
+
+    cursor = conexao.cursor()
+    cursor.row_factory = None
+    cursor.execute(SQL_EXPORTAR[entidade])
+
+    if formato == 'parquet':
+        esquema = pa.schema([(nome, _tipo_arrow(pa, conversao)) for nome, conversao, _ in campos])
+        datas = [i for i, (_, conversao, _) in enumerate(campos) if conversao is _data]
+        with pa.parquet.ParquetWriter(caminho, esquema) as escritor:
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                valores = [list(coluna) for coluna in zip(*linhas)]
+                for i in datas:
+                    valores[i] = [datetime.date.fromisoformat(v[:10]) if v else None for v in valores[i]]
+                escritor.write_table(pa.Table.from_arrays(
+                    [pa.array(coluna, type=campo.type) for coluna, campo in zip(valores, esquema)], schema=esquema
+                ))
+                exportadas += len(linhas)
+        return {'linhas': exportadas, 'tempo': time.perf_counter() - inicio}
+
+    arquivo = sys.stdout if caminho == '-' else open(caminho, 'w', encoding='utf-8', newline='')
+    try:
+        if formato == 'csv':
+            escritor = csv.writer(arquivo, delimiter=delimitador)
+            escritor.writerow(colunas)
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            if formato == 'csv':
+                escritor.writerows(linhas)
+            else:
+                bloco = io.StringIO()
+                for linha in linhas:
+                    bloco.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False))
+                    bloco.write('\n')
+                arquivo.write(bloco.getvalue())
+            exportadas += len(linhas)
+    finally:
+        if arquivo is not sys.stdout:
+            arquivo.close()
+
+    return {'linhas': exportadas, 'tempo': time.perf_counter() - inicio}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Importa e exporta instrumentos, padrões e pontos de calibração')
+    parser.add_argument('operacao', choices=['importar', 'exportar'])
+    parser.add_argument('entidade', choices=list(ENTIDADES))
+    parser.add_argument('arquivo', help="Arquivo .csv, .ndjson ou .parquet (exportação); '-' para stdin/stdout")
+    parser.add_argument('--formato', choices=['csv', 'ndjson', 'parquet'])
+    parser.add_argument('--delimitador', help='Delimitador do CSV')
+    parser.add_argument('--criar-referencias', action='store_true', help='Cadastrar tipos e setores não encontrados')
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    banco.inicializar_banco()
+    if args.operacao == 'exportar':
+        resultado = exportar(args.entidade, args.arquivo, args.formato, args.delimitador or ',', args.tamanho_lote)
+        print(f"{resultado['linhas']} linhas exportadas em {resultado['tempo']:.1f}s", file=sys.stderr)
+    else:
+        resultado = importar(args.entidade, args.arquivo, args.formato, args.delimitador, args.criar_referencias,
+                             args.tamanho_lote)
+        for linha, motivo in resultado['erros']:
+            print(f"linha {linha}: {motivo}", file=sys.stderr)
+        print(f"{resultado['inseridas']} de {resultado['linhas']} linhas importadas em {resultado['tempo']:.1f}s "
+              f"({resultado['rejeitadas']} rejeitadas)", file=sys.stderr)